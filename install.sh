@@ -82,12 +82,14 @@ cp -r ./* "$APP_DIR/"
 # Remove installation scripts from the installed location (they're not needed there)
 rm -f "$APP_DIR/install.sh" "$APP_DIR/uninstall.sh" "$APP_DIR/commit-to-install.sh"
 
-# Make the launcher script executable
-chmod +x "$APP_DIR/pactl-gui.sh"
+# Make the launcher scripts executable
+chmod +x "$APP_DIR/pactl-gui.sh" "$APP_DIR/pactl-gui-cli.sh" "$APP_DIR/pactl-gui-daemon.sh"
 
-# Create symlink in bin directory
-echo -e "${YELLOW}Creating symbolic link in $BIN_DIR...${NC}"
+# Create symlinks in bin directory
+echo -e "${YELLOW}Creating symbolic links in $BIN_DIR...${NC}"
 ln -sf "$APP_DIR/pactl-gui.sh" "$BIN_DIR/pactl-gui"
+ln -sf "$APP_DIR/pactl-gui-cli.sh" "$BIN_DIR/pactl-gui-cli"
+ln -sf "$APP_DIR/pactl-gui-daemon.sh" "$BIN_DIR/pactl-gui-daemon"
 
 # Install desktop file with correct paths
 echo -e "${YELLOW}Installing desktop file to $DESKTOP_DIR...${NC}"
@@ -142,6 +144,9 @@ echo "• From your application menu (Audio → PulseAudio GUI)"
 echo "• By typing 'pactl-gui' in a terminal"
 echo "• By running '$BIN_DIR/pactl-gui'"
 echo ""
+echo -e "${BLUE}For scripts and automation, use the headless 'pactl-gui-cli' command${NC}"
+echo -e "${BLUE}Run 'pactl-gui-daemon' in your session to share one cached state between all windows and scripts${NC}"
+echo ""
 echo -e "${YELLOW}Note: If the application doesn't appear in your menu immediately:${NC}"
 echo "1. Log out and log back in to your desktop session"
 echo "2. Or restart your desktop environment"
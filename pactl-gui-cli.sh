@@ -0,0 +1,5 @@
+#!/bin/bash
+
+# Launch the headless pactl-gui command-line interface
+# (runs from the caller's directory so relative file arguments keep working)
+exec python3 "$(dirname "$(readlink -f "$0")")/src/cli.py" "$@"
@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# Launch the pactl-gui state daemon (serves pactl-gui and pactl-gui-cli over a Unix socket)
+exec python3 "$(dirname "$(readlink -f "$0")")/src/daemon.py" "$@"
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+PulseAudio Control GUI (pactl-gui)
+Headless command-line entry point
+
+Never imports tkinter or the ui package, so it runs without a display and
+starts quickly enough for cron jobs and login scripts. Modules are imported
+inside each subcommand so a call only pays for what it uses.
+"""
+
+import argparse
+import json
+import os
+import sys
+from functools import partial
+
+# Ensure we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _logger(args):
+    """Log executed commands to stderr in verbose mode."""
+    if args.verbose:
+        return lambda text: print(text, file=sys.stderr)
+    return None
+
+
+def _emit(args, data, text_lines):
+    """Print a result as JSON or plain text."""
+    if args.json:
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for line in text_lines:
+            print(line)
+
+
+def _runner(args):
+    """
+    Return the object that runs audio server operations.
+
+    A running pactl-gui-daemon is used unless --no-daemon is given; otherwise
+    the PipeWire graph is read with pw-dump where available, else pactl is
+    run directly. All of them implement AudioBackend.
+    """
+    if not hasattr(args, '_runner'):
+        client = None
+        if not args.no_daemon:
+            from utils.daemon_client import DaemonClient
+            client = DaemonClient.connect()
+        if client is None:
+            from utils.pactl_runner import PactlRunner
+            from utils.pipewire_backend import PipeWireBackend
+            client = PipeWireBackend.connect() or PactlRunner()
+        args._runner = client
+    return args._runner
+
+
+def _fetch_state(args, kinds=('modules', 'sinks', 'sources')):
+    """Fetch the requested object lists from the audio server."""
+    runner = _runner(args)
+    if hasattr(runner, 'get_state'):
+        from utils.daemon_client import DaemonError
+        try:
+            state = runner.get_state(kinds)
+            return {kind: state[kind] for kind in kinds}
+        except DaemonError:
+            pass  # The list methods below fall back to pactl
+
+    fetchers = {
+        'modules': runner.list_modules,
+        'sinks': runner.list_sinks,
+        'sources': runner.list_sources,
+    }
+    logger = _logger(args)
+    return {kind: fetchers[kind](logger) for kind in kinds}
+
+
+def _fetch_grouping(args):
+    """Fetch the device grouping, precomputed by the daemon if one is running."""
+    runner = _runner(args)
+    if hasattr(runner, 'get_grouping'):
+        from utils.daemon_client import DaemonError
+        try:
+            return runner.get_grouping(args.show_monitors)
+        except DaemonError:
+            pass
+
+    from utils.device_grouping import DeviceGrouping
+    state = _fetch_state(args)
+    return DeviceGrouping.group_devices(
+        state['modules'], state['sinks'], state['sources'], show_monitors=args.show_monitors
+    )
+
+
+def cmd_list(args):
+    """List sinks, sources and/or modules."""
+    kinds = ('sinks', 'sources', 'modules') if args.kind == 'all' else (args.kind,)
+    state = _fetch_state(args, kinds)
+
+    if args.short:
+        data = {kind: [{'id': r.get('id', ''), 'name': r.get('name', '')} for r in state[kind]] for kind in kinds}
+    else:
+        data = state
+
+    lines = []
+    for kind in kinds:
+        if len(kinds) > 1:
+            lines.append(f"{kind.title()}:")
+        for record in state[kind]:
+            label = record.get('description') or record.get('argument') or ''
+            line = f"{record.get('id', ''):>6}  {record.get('name', '')}"
+            if label and not args.short:
+                line += f"  ({label})"
+            lines.append(("  " if len(kinds) > 1 else "") + line)
+
+    _emit(args, data if len(kinds) > 1 else data[kinds[0]], lines)
+    return 0
+
+
+def cmd_tree(args):
+    """Show the device grouping used by the Manage tab."""
+    from utils.tree_model import TreeModel, VIRTUAL_DEVICES_KEY
+    nodes = TreeModel.from_grouping(_fetch_grouping(args), show_monitors=args.show_monitors)
+
+    def summarize(node):
+        return {'id': node.entity_id, 'name': node.name}
+
+    def members(children):
+        return {kind: [summarize(child) for child in children if child.kind == kind[:-1]]
+                for kind in ('modules', 'sinks', 'sources')}
+
+    def member_lines(members_by_kind):
+        return [f"    {kind[:-1]} #{record['id']} {record['name']}"
+                for kind, records in members_by_kind.items() for record in records]
+
+    data = {'virtual_devices': {}, 'hardware': {}}
+    lines = []
+    for node in nodes:
+        if node.key == VIRTUAL_DEVICES_KEY:
+            lines.append("Virtual Devices")
+            for device in node.children:
+                data['virtual_devices'][device.name] = members(device.children)
+                lines.append(f"  {device.name}")
+                lines.extend(member_lines(data['virtual_devices'][device.name]))
+            continue
+
+        data['hardware'][node.name] = []
+        lines.append(f"Hardware: {node.name}")
+        for entry in node.children:
+            if entry.kind == 'hardware_device_group':
+                name, entry_members = entry.name, members(entry.children)
+            else:
+                # A sink or source that belongs to no device
+                name, entry_members = entry.label, {f"{entry.kind}s": [summarize(entry)]}
+            data['hardware'][node.name].append({'name': name, **entry_members})
+            lines.append(f"  {name}")
+            lines.extend(member_lines(entry_members))
+
+    _emit(args, data, lines)
+    return 0
+
+
+def cmd_create(args):
+    """Create a duplex null sink."""
+    success = _runner(args).create_duplex_sink(
+        args.name,
+        args.description or f"{args.name} Virtual Device",
+        args.channels,
+        rate=args.rate,
+        format=args.sample_format,
+        channel_map=args.channel_map,
+        sink_properties=args.properties,
+        logger=_logger(args)
+    )
+    _emit(args, {'name': args.name, 'created': success},
+          [f"Created duplex sink: {args.name}" if success else f"Failed to create duplex sink: {args.name}"])
+    return 0 if success else 1
+
+
+def cmd_unload(args):
+    """Unload modules by ID, or all null sinks."""
+    runner = _runner(args)
+    logger = _logger(args)
+    if args.all_null_sinks:
+        count, errors = runner.unload_all_null_sinks(logger)
+    else:
+        if not args.module_ids:
+            print("Error: give module IDs or --all-null-sinks", file=sys.stderr)
+            return 2
+        count, errors = 0, []
+        for module_id in args.module_ids:
+            if runner.unload_module(module_id, logger):
+                count += 1
+            else:
+                errors.append(f"Failed to unload module #{module_id}")
+
+    _emit(args, {'unloaded': count, 'errors': errors}, [f"Unloaded {count} module(s)"] + errors)
+    return 0 if not errors else 1
+
+
+def cmd_apply_preset(args):
+    """Create a duplex sink from a named audio preset."""
+    from utils.preset_manager import PresetManager
+
+    preset = PresetManager(os.path.join(APP_ROOT, "presets")).get_preset(args.preset)
+    if not preset:
+        print(f"Error: preset not found: {args.preset}", file=sys.stderr)
+        return 1
+
+    name = args.sink_name or args.preset.lower().replace(" ", "").replace(".", "")
+    rate = preset.get("rate")
+    success = _runner(args).create_duplex_sink(
+        name,
+        preset.get("description", f"{args.preset} Virtual Device"),
+        int(preset.get("channels", 2)),
+        rate=int(rate) if rate else None,
+        format=preset.get("format"),
+        channel_map=preset.get("channel_map") or None,
+        sink_properties=preset.get("properties") or None,
+        logger=_logger(args)
+    )
+    _emit(args, {'preset': args.preset, 'name': name, 'created': success},
+          [f"Created duplex sink '{name}' from preset '{args.preset}'" if success
+           else f"Failed to create duplex sink '{name}' from preset '{args.preset}'"])
+    return 0 if success else 1
+
+
+def cmd_restore(args):
+    """Restore the virtual devices of a snapshot file."""
+    from utils.pactl_runner import PactlError
+    from utils.snapshot_format import SnapshotFormat
+    from utils.snapshot_restore import SnapshotRestorer
+
+    try:
+        snapshot = SnapshotFormat.load(args.file)
+    except (ValueError, OSError) as e:
+        print(f"Error loading snapshot: {e}", file=sys.stderr)
+        return 1
+
+    runner = _runner(args)
+    logger = _logger(args)
+    # A failed listing must not look like a server without virtual devices
+    try:
+        live_modules = runner.list_modules(logger, raise_errors=True)
+    except PactlError as e:
+        print(f"Error: could not read the current configuration: {e}", file=sys.stderr)
+        return 1
+    plan = SnapshotRestorer.plan_restore(snapshot, live_modules, args.remove_extras)
+    # The daemon applies the plan itself so other clients cannot interleave writes
+    if hasattr(runner, 'apply_plan'):
+        apply_plan = runner.apply_plan
+    else:
+        apply_plan = partial(SnapshotRestorer.apply_plan, backend=runner)
+    count, errors = (0, []) if args.dry_run else apply_plan(plan, logger)
+
+    data = {action: [entry['name'] for entry in entries] for action, entries in plan.items()}
+    data.update({'applied': count, 'errors': errors, 'dry_run': args.dry_run})
+    lines = [f"{action}: {', '.join(names) if names else '-'}" for action, names in
+             ((action, data[action]) for action in ('create', 'keep', 'remove'))]
+    _emit(args, data, lines + errors)
+    return 0 if not errors else 1
+
+
+def cmd_snapshot(args):
+    """Capture the current state to a file, the history archive or stdout."""
+    from utils.snapshot_format import SnapshotFormat
+
+    state = _fetch_state(args)
+    name = os.path.basename(args.file).split('.')[0] if args.file else ""
+    snapshot = SnapshotFormat.new_snapshot(state['sinks'], state['sources'], state['modules'], name=name)
+
+    if not args.archive and not args.file:
+        json.dump(SnapshotFormat.encode(snapshot), sys.stdout, separators=(',', ':'))
+        sys.stdout.write("\n")
+        return 0
+
+    # One result for both destinations, so --json prints a single document
+    result = {}
+    lines = []
+    if args.archive:
+        from config.paths import history_archive_path
+        from utils.snapshot_archive import SnapshotArchive
+        path = args.archive_path or history_archive_path()
+        written = SnapshotArchive(path).append(snapshot)
+        result.update(archive=path, recorded=written)
+        lines.append(f"Recorded snapshot in {path}" if written else "State unchanged; nothing recorded")
+    if args.file:
+        SnapshotFormat.save(args.file, snapshot, args.compression)
+        result['file'] = args.file
+        lines.append(f"Saved snapshot to {args.file}")
+    _emit(args, result, lines)
+    return 0
+
+
+def cmd_history(args):
+    """Inspect the snapshot history archive."""
+    import time
+    from config.paths import history_archive_path
+    from utils.snapshot_archive import SnapshotArchive
+
+    archive = SnapshotArchive(args.archive_path or history_archive_path())
+
+    def fmt(timestamp_ms):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp_ms / 1000)) + f".{timestamp_ms % 1000:03d}"
+
+    if args.disappeared:
+        found = archive.find_disappearance(args.disappeared, args.since_ms, args.until_ms)
+        if found is None:
+            bounded = args.since_ms is not None or args.until_ms is not None
+            searched = "the searched range" if bounded else "the recorded history"
+            _emit(args, {'name': args.disappeared, 'disappeared': None},
+                  [f"'{args.disappeared}' did not disappear within {searched}"])
+            return 1
+        last_seen, first_missing = found
+        _emit(args, {'name': args.disappeared, 'last_seen_ms': last_seen, 'first_missing_ms': first_missing},
+              [f"'{args.disappeared}' was last seen at {fmt(last_seen)} and missing at {fmt(first_missing)}"])
+        return 0
+
+    entries = archive.summary()
+    _emit(args, [{'timestamp_ms': ts, 'keyframe': keyframe} for ts, keyframe in entries],
+          [f"{position:>6}  {fmt(ts)}{'  (keyframe)' if keyframe else ''}"
+           for position, (ts, keyframe) in enumerate(entries)])
+    return 0
+
+
+def build_parser():
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="pactl-gui-cli",
+        description="Headless interface to the pactl-gui device management tools"
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log executed pactl commands to stderr")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="run pactl directly even if pactl-gui-daemon is running")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    list_parser = subparsers.add_parser("list", help="list sinks, sources or modules")
+    list_parser.add_argument("kind", nargs="?", default="all", choices=("sinks", "sources", "modules", "all"))
+    list_parser.add_argument("--short", action="store_true", help="only show IDs and names")
+    list_parser.set_defaults(func=cmd_list)
+
+    tree_parser = subparsers.add_parser("tree", help="show virtual and hardware device groups")
+    tree_parser.add_argument("--show-monitors", action="store_true", help="include monitor sources")
+    tree_parser.set_defaults(func=cmd_tree)
+
+    create_parser = subparsers.add_parser("create", help="create a duplex null sink")
+    create_parser.add_argument("name", help="sink name (no spaces)")
+    create_parser.add_argument("--description")
+    create_parser.add_argument("--channels", type=int, default=2)
+    create_parser.add_argument("--rate", type=int)
+    create_parser.add_argument("--sample-format")
+    create_parser.add_argument("--channel-map")
+    create_parser.add_argument("--properties", help="additional sink properties")
+    create_parser.set_defaults(func=cmd_create)
+
+    unload_parser = subparsers.add_parser("unload", help="unload modules")
+    unload_parser.add_argument("module_ids", nargs="*", metavar="MODULE_ID")
+    unload_parser.add_argument("--all-null-sinks", action="store_true", help="unload every module-null-sink")
+    unload_parser.set_defaults(func=cmd_unload)
+
+    preset_parser = subparsers.add_parser("apply-preset", help="create a duplex sink from an audio preset")
+    preset_parser.add_argument("preset", help="preset name, e.g. 'Stereo' or '5.1 Surround'")
+    preset_parser.add_argument("--sink-name", help="sink name (defaults to the preset name)")
+    preset_parser.set_defaults(func=cmd_apply_preset)
+
+    restore_parser = subparsers.add_parser("restore", help="restore virtual devices from a snapshot file")
+    restore_parser.add_argument("file")
+    restore_parser.add_argument("--remove-extras", action="store_true",
+                                help="unload virtual devices that are not in the snapshot")
+    restore_parser.add_argument("--dry-run", action="store_true", help="only show what would change")
+    restore_parser.set_defaults(func=cmd_restore)
+
+    snapshot_parser = subparsers.add_parser("snapshot", help="capture the current state")
+    snapshot_parser.add_argument("file", nargs="?", help="snapshot file to write (.json, .json.gz, .json.zst)")
+    snapshot_parser.add_argument("--compression", choices=("gzip", "zstd"))
+    snapshot_parser.add_argument("--archive", action="store_true", help="append to the history archive")
+    snapshot_parser.add_argument("--archive-path", help="history archive location")
+    snapshot_parser.set_defaults(func=cmd_snapshot)
+
+    history_parser = subparsers.add_parser("history", help="inspect the snapshot history archive")
+    history_parser.add_argument("--disappeared", metavar="NAME", help="find when a device last disappeared")
+    history_parser.add_argument("--since-ms", type=int, metavar="MS",
+                                help="with --disappeared, only search from this time (ms since the epoch)")
+    history_parser.add_argument("--until-ms", type=int, metavar="MS",
+                                help="with --disappeared, only search up to this time (ms since the epoch)")
+    history_parser.add_argument("--archive-path", help="history archive location")
+    history_parser.set_defaults(func=cmd_history)
+
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Standard file locations for pactl-gui, following the XDG base directory spec.
+"""
+
+import os
+
+
+APP_NAME = "pactl-gui"
+
+
+def _xdg_dir(variable: str, fallback: str) -> str:
+    """Resolve an XDG base directory, ignoring relative paths as the spec requires."""
+    base = os.environ.get(variable, "")
+    if not os.path.isabs(base):
+        base = os.path.expanduser(fallback)
+    return os.path.join(base, APP_NAME)
+
+
+def state_dir() -> str:
+    """Directory for persistent state such as the snapshot history archive."""
+    return _xdg_dir("XDG_STATE_HOME", "~/.local/state")
+
+
+def history_archive_path() -> str:
+    """Default location of the snapshot history archive."""
+    return os.path.join(state_dir(), "history.pgsa")
+
+
+def cache_dir() -> str:
+    """Directory for disposable data that only speeds things up."""
+    return _xdg_dir("XDG_CACHE_HOME", "~/.cache")
+
+
+def last_state_path() -> str:
+    """Location of the state shown at the previous exit, used for warm starts."""
+    return os.path.join(cache_dir(), "last-state.json")
+
+
+def runtime_dir() -> str:
+    """
+    Directory for sockets and other per-session files.
+
+    Falls back to a private directory under the system temporary directory
+    when XDG_RUNTIME_DIR is not set.
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR", "")
+    if os.path.isabs(base):
+        return os.path.join(base, APP_NAME)
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), f"{APP_NAME}-{os.getuid()}")
+
+
+def daemon_socket_path() -> str:
+    """Unix socket the pactl-gui daemon listens on."""
+    return os.path.join(runtime_dir(), "daemon.sock")
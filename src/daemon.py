@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+PulseAudio Control GUI (pactl-gui)
+State daemon entry point
+
+Keeps the audio server state cached and serves it to pactl-gui windows and
+pactl-gui-cli over a Unix socket (see utils/state_daemon.py).
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import sys
+import threading
+
+# Ensure we can import our modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_parser():
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="pactl-gui-daemon",
+        description="Cache the audio server state for pactl-gui and pactl-gui-cli"
+    )
+    parser.add_argument("--socket", help="Unix socket to listen on (default: $XDG_RUNTIME_DIR/pactl-gui/daemon.sock)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log activity to stderr")
+    parser.add_argument("--settle", type=float, default=0.05, metavar="SECONDS",
+                        help="refresh once server events have stopped for this long (default: 0.05)")
+    parser.add_argument("--max-delay", type=float, default=0.5, metavar="SECONDS",
+                        help="refresh at most this long after the first event of a burst (default: 0.5)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-textfile", metavar="PATH",
+                        help="write Prometheus metrics to PATH for the node_exporter textfile collector")
+    parser.add_argument("--metrics-interval", type=float, default=15.0, metavar="SECONDS",
+                        help="how often to rewrite the metrics textfile (default: 15)")
+    return parser
+
+
+def main(argv=None):
+    """Daemon entry point."""
+    args = build_parser().parse_args(argv)
+
+    if shutil.which("pactl") is None:
+        print("Error: PulseAudio command-line utility (pactl) not found!", file=sys.stderr)
+        return 1
+
+    from config.paths import daemon_socket_path
+    from utils.pipewire_backend import PipeWireBackend
+    from utils.state_daemon import StateDaemon
+
+    logger = (lambda text: print(text, file=sys.stderr, flush=True)) if args.verbose else None
+    # On PipeWire the daemon follows the graph with 'pw-dump --monitor'
+    backend = PipeWireBackend.connect()
+    daemon = StateDaemon(args.socket or daemon_socket_path(), logger=logger, backend=backend,
+                         settle=args.settle, max_delay=args.max_delay)
+
+    if args.metrics_port or args.metrics_textfile:
+        from utils.metrics_exporter import MetricsExporter
+        exporter = MetricsExporter(lambda: daemon.state['snapshot'] if daemon.state else None)
+        if args.metrics_port:
+            try:
+                exporter.serve(args.metrics_port)
+            except OSError as e:
+                print(f"Error: cannot serve metrics on port {args.metrics_port}: {e}", file=sys.stderr)
+                return 1
+        if args.metrics_textfile:
+            exporter.start_textfile_writer(args.metrics_textfile, args.metrics_interval, logger)
+
+    def stop(signum, frame):
+        # shutdown() waits for serve_forever, which runs on this thread
+        threading.Thread(target=daemon.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    try:
+        daemon.serve_forever()
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if backend:
+            backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,20 +4,98 @@ PulseAudio Control GUI (pactl-gui)
 Main application entry point
 """
 
-import tkinter as tk
 import os
+import shutil
 import sys
 
 # Ensure we can import our modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import our UI components
-from ui.main_window import MainWindow
+# Set to a non-empty value to print startup timings and exit (see tools/bench_startup.py)
+STARTUP_PROBE_ENV = "PACTL_GUI_STARTUP_PROBE"
+
+# Set to a number of seconds to measure the idle cost of the open window and exit (see tools/bench_idle.py)
+IDLE_PROBE_ENV = "PACTL_GUI_IDLE_PROBE"
+
+# Optional Prometheus metrics for the GUI process (see utils/metrics_exporter.py)
+METRICS_PORT_ENV = "PACTL_GUI_METRICS_PORT"
+METRICS_TEXTFILE_ENV = "PACTL_GUI_METRICS_TEXTFILE"
+
+
+def start_metrics_exporter(app):
+    """Publish metrics for the window's live snapshot if requested in the environment."""
+    port = os.environ.get(METRICS_PORT_ENV)
+    textfile = os.environ.get(METRICS_TEXTFILE_ENV)
+    if not port and not textfile:
+        return None
+
+    from utils.metrics_exporter import MetricsExporter
+    exporter = MetricsExporter(lambda: app.live_snapshot)
+    try:
+        if port:
+            exporter.serve(int(port))
+        if textfile:
+            exporter.start_textfile_writer(textfile, logger=lambda text: print(text, file=sys.stderr))
+    except (OSError, ValueError) as e:
+        print(f"Warning: metrics exporter not started: {e}", file=sys.stderr)
+    return exporter
+
+
+def install_startup_probe(root, app):
+    """
+    Report startup milestones on stdout as JSON lines, then quit.
+
+    Each line holds an event name and a time.time() timestamp; the benchmark
+    compares them with the time it launched the process.
+    """
+    import json
+    import time
+
+    def report(event):
+        print(json.dumps({"event": event, "time": time.time()}), flush=True)
+
+    def on_first_expose(event):
+        root.unbind("<Expose>")
+        report("first_paint")
+
+    def wait_for_tree():
+        if app.tree_populated_at is None:
+            root.after(5, wait_for_tree)
+            return
+        report("tree_populated")
+        root.after_idle(root.destroy)
+
+    root.bind("<Expose>", on_first_expose)
+    root.after_idle(wait_for_tree)
+
+
+def install_idle_probe(root, app, seconds):
+    """
+    Once the tree is populated, leave the window idle for the given time,
+    report its wakeups and CPU use on stdout as one JSON line, then quit.
+    """
+    import json
+
+    def wait_for_tree():
+        if app.tree_populated_at is None:
+            root.after(50, wait_for_tree)
+            return
+        app.idle_meter.reset()
+        root.after(int(seconds * 1000), finish)
+
+    def finish():
+        report = app.idle_meter.report()
+        report["poll_interval"] = app.poller.interval
+        print(json.dumps(report), flush=True)
+        root.destroy()
+
+    root.after_idle(wait_for_tree)
+
 
 def main():
     """Main application entry point."""
     # Check if pactl is available
-    if os.system("which pactl > /dev/null") != 0:
+    if shutil.which("pactl") is None:
         print("Error: PulseAudio command-line utility (pactl) not found!")
         print("Please install PulseAudio utilities package:")
         print("  Debian/Ubuntu: sudo apt-get install pulseaudio-utils")
@@ -25,12 +103,26 @@ def main():
         print("  openSUSE: sudo zypper install pulseaudio-utils")
         sys.exit(1)
 
+    # Import the UI only once we know it can be used
+    import tkinter as tk
+    from ui.main_window import MainWindow
+
     # Create the main window
     root = tk.Tk()
     app = MainWindow(root)
-    
+
+    exporter = start_metrics_exporter(app)
+
+    if os.environ.get(STARTUP_PROBE_ENV):
+        install_startup_probe(root, app)
+    elif os.environ.get(IDLE_PROBE_ENV):
+        install_idle_probe(root, app, float(os.environ[IDLE_PROBE_ENV]))
+
     # Start the main application loop
     root.mainloop()
 
+    if exporter:
+        exporter.stop()
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -3,18 +3,70 @@ Main application window for the pactl-gui application.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox
+import datetime
 import os
-import json
+import threading
+import time
 import re
+from collections import deque
 from typing import Dict, Any, List, Optional
 
 # Importing our utility modules
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.pactl_runner import PactlRunner
+from config.paths import history_archive_path, last_state_path
+from utils.adaptive_poller import AdaptivePoller, IdleMeter, snapshot_fingerprint
+from utils.audio_backend import fingerprint_of
+from utils.daemon_client import DaemonClient
+from utils.details_prefetch import DETAIL_KINDS, DetailJob, DetailsPrefetcher
+from utils.details_text import DetailsCache, DetailsText
+from utils.metrics import WAKEUPS
+from utils.pactl_runner import PactlRunner, PactlError
+from utils.pipewire_backend import PipeWireBackend
 from utils.preset_manager import PresetManager
+from utils.snapshot_archive import SnapshotArchive
+from utils.snapshot_format import SnapshotFormat
+from utils.snapshot_restore import SnapshotRestorer
+from utils.state_cache import StateCache
+from utils.tiered_listing import TieredLister
+from utils.tree_model import TreeModel
+from ui.tree_adapter import ChunkedTreeRenderer
+
+
+# How often the watchdog checks for slow pactl commands, while any are
+# running and while none are
+WATCHDOG_INTERVAL_MS = 500
+WATCHDOG_IDLE_INTERVAL_MS = 2000
+
+# Commands running longer than this are reported in the Output tab
+SLOW_COMMAND_SECONDS = 2.0
+
+# With a tiered listing, a changed refresh lists only the kinds whose short
+# rows changed in full for the history snapshot; while nothing changes, all
+# of them are listed again this often, so volume and mute changes that the
+# short rows do not show still reach the archive
+SNAPSHOT_MAX_AGE_SECONDS = 600.0
+
+# The full listings for a changed refresh wait this long, so a burst of
+# changes (e.g. removing every null sink) is listed once
+SNAPSHOT_DELAY_MS = 2000
+
+# The lists a snapshot holds
+SNAPSHOT_KINDS = ('modules', 'sinks', 'sources')
+
+# Lines the Output tab keeps; older ones are dropped so a window left open
+# all day does not grow without bound
+MAX_OUTPUT_LINES = 5000
+
+# Details of the rows in view are prefetched once the tree has been still
+# this long; revalidated details are picked up this often
+PREFETCH_DELAY_MS = 150
+PREFETCH_POLL_MS = 20
+
+# Most rows in view whose details are prefetched
+PREFETCH_MAX_ROWS = 100
 
 
 class MainWindow:
@@ -28,6 +80,38 @@ class MainWindow:
             root: The root Tkinter window
         """
         self.root = root
+        
+        # Use the shared state of a running pactl-gui-daemon if there is one,
+        # else read the PipeWire graph directly where pw-dump is available;
+        # all of them implement AudioBackend
+        self.daemon = DaemonClient.connect()
+        self.runner = self.daemon or PipeWireBackend.connect() or PactlRunner()
+        # The tree is built from brief records; full ones are fetched on demand
+        self.listing = TieredLister(self.runner)
+        # Details panel texts already built for the current tree, and the
+        # workers that build them ahead of time for the rows in view
+        self.details_cache = DetailsCache()
+        self.details_prefetcher = DetailsPrefetcher(self.listing, self.details_cache)
+        self._prefetch_after_id = None
+        self._revalidation_after_id = None
+        
+        # Start fetching the initial state right away so the pactl round-trips
+        # overlap with widget construction
+        self._fetch = self._start_background_fetch()
+        self._refresh_pending = False
+        self.tree_populated_at = None
+        
+        # Automatic refresh: poll, backing off while nothing changes, and not
+        # at all while the window is minimized or unfocused
+        self.poller = AdaptivePoller()
+        self.idle_meter = IdleMeter()
+        self.auto_refresh_var = tk.BooleanVar(value=True)
+        self._poll_after_id = None
+        self._polling = False
+        self._pause_check_pending = False
+        self._output_fingerprints = None
+        self._reported_commands = set()
+        
         self.root.title("PulseAudio Control GUI")
         self.root.geometry("800x600")
         self.root.minsize(700, 500)
@@ -37,6 +121,35 @@ class MainWindow:
         
         # Output text for command results (will be initialized in setup_output_tab)
         self.output_text = None
+        self._pending_output = deque(maxlen=MAX_OUTPUT_LINES)
+        
+        # Snapshot history for the Manage tab timeline
+        self.history_archive = SnapshotArchive(history_archive_path())
+        self.live_snapshot = None
+        self._snapshot_fetch = None
+        self._snapshot_after_id = None
+        # kind -> fingerprint of the tree's list, for the kinds still to be
+        # listed in full
+        self._snapshot_pending = {}
+        # Full lists behind the live snapshot, and the fingerprints of the
+        # tree's lists they were taken for
+        self._snapshot_lists = {}
+        self._snapshot_fingerprints = {}
+        self._snapshot_taken_at = None
+        self.history_position = None
+        self._history_after_id = None
+        self._updating_history_scale = False
+        
+        # Names of the sinks of the last refresh, for checking new sink names
+        self.sink_names = set()
+        
+        # Blocking actions (removing all null sinks, saving a preset) run on a
+        # worker thread; on_close sets the event to cancel the one running
+        self._action = None
+        self._action_cancel = threading.Event()
+        
+        # True while the tree shows the state cached at the previous exit
+        self.showing_cached_state = False
         
         # Status bar variables
         self.status_var = tk.StringVar()
@@ -58,15 +171,24 @@ class MainWindow:
         self.tab_control.add(self.manage_tab, text="Manage")
         self.tab_control.add(self.output_tab, text="Output")
         
+        # Tabs other than Manage are built the first time they are shown
+        self._tab_builders = {
+            str(self.create_tab): self.setup_create_tab,
+            str(self.output_tab): self.setup_output_tab,
+        }
+        
         # Bind tab change event to reset form state
         self.tab_control.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         
         self.tab_control.pack(expand=1, fill="both")
         
         # Set up tab contents
-        self.setup_create_tab()
         self.setup_manage_tab()
-        self.setup_output_tab()
+        
+        # Large trees are inserted a slice at a time, with progress in the status bar
+        self.tree_renderer = ChunkedTreeRenderer(self.root, self.unified_tree, self._show_render_progress)
+        self._status_before_render = None
+        self.tab_control.select(self.manage_tab)
         
         # Status bar at the bottom
         self.status_bar = ttk.Label(
@@ -76,6 +198,240 @@ class MainWindow:
             anchor=tk.W
         )
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        self.add_output("PulseAudio Control GUI started. Ready for commands.")
+        
+        # Save the last-known state when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Show the state from the previous run until the live state arrives
+        self.status_var.set("Loading audio devices...")
+        self._show_cached_state()
+        self.root.after_idle(self._finish_background_fetch)
+        self.root.after(WATCHDOG_INTERVAL_MS, self._watchdog)
+        
+        for sequence in ("<FocusIn>", "<FocusOut>", "<Map>", "<Unmap>"):
+            self.root.bind(sequence, self._on_window_state_change, add="+")
+
+    def _start_background_fetch(self):
+        """
+        Fetch modules, sinks and sources in parallel on worker threads.
+        
+        Returns: A tuple of (threads, results), where results maps each kind
+            to (records or PactlError, log lines) once its thread has finished
+        """
+        results = {}
+        
+        def fetch(kind):
+            log_lines = []
+            try:
+                records = self.listing.list(kind, logger=log_lines.append, raise_errors=True)
+            except PactlError as e:
+                records = e
+            results[kind] = (records, log_lines)
+        
+        threads = [
+            threading.Thread(target=fetch, args=(kind,), daemon=True)
+            for kind in ('modules', 'sinks', 'sources')
+        ]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def _finish_background_fetch(self):
+        """Show the fetched state once all background fetch threads have finished."""
+        WAKEUPS.increment('fetch')
+        threads, results = self._fetch
+        if any(thread.is_alive() for thread in threads):
+            self.root.after(10, self._finish_background_fetch)
+            return
+        
+        self._fetch = None
+        polled, self._polling = self._polling, False
+        
+        # Log on the Tk thread, in a stable order
+        state = {}
+        errors = []
+        for kind in ('modules', 'sinks', 'sources'):
+            records, log_lines = results[kind]
+            for line in log_lines:
+                self.add_output(line)
+            if isinstance(records, PactlError):
+                errors.append(records)
+            else:
+                state[kind] = records
+        
+        if errors:
+            # Back off as if nothing changed, so a sick server is not polled harder
+            self.poller.observe(self.poller.fingerprint)
+            self._degrade_to_cached_state(errors)
+        else:
+            changed = self.poller.observe(self._state_fingerprint(state))
+            if changed or self.showing_cached_state or self.history_position is not None:
+                if self.tree_populated_at is None:
+                    self.add_output("Loaded initial state in the background")
+                self.showing_cached_state = False
+                self._apply_state(state['modules'], state['sinks'], state['sources'])
+            else:
+                if self.listing.tiered and (self._snapshot_taken_at is None or
+                                            time.monotonic() - self._snapshot_taken_at >= SNAPSHOT_MAX_AGE_SECONDS):
+                    self._start_snapshot_fetch({kind: fingerprint_of(state[kind]) for kind in SNAPSHOT_KINDS})
+                if not polled:
+                    # Nothing changed: keep the tree as it is instead of rebuilding it
+                    self.status_var.set("No changes since the last refresh")
+        if not polled:
+            self.poller.poke()
+        
+        if self.tree_populated_at is None:
+            self.tree_populated_at = time.time()
+        
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.refresh_all_views()
+        else:
+            self._schedule_poll()
+
+    def _state_fingerprint(self, state):
+        """
+        Identify fetched state for change detection.
+
+        When the backend reports that every list's raw output is the same as
+        last time, the previous fingerprint is reused without looking at the
+        records; otherwise they are hashed, ignoring per-read noise.
+        """
+        outputs = tuple(fingerprint_of(state[kind]) for kind in ('modules', 'sinks', 'sources'))
+        unchanged = None not in outputs and outputs == self._output_fingerprints
+        self._output_fingerprints = outputs
+        if unchanged:
+            return self.poller.fingerprint
+        return snapshot_fingerprint(state['modules'], state['sinks'], state['sources'])
+
+    def _degrade_to_cached_state(self, errors):
+        """Keep showing the last known state, read-only, after a failed refresh."""
+        timed_out = any(error.timed_out for error in errors)
+        problem = "is not responding" if timed_out else "returned an error"
+        for error in errors:
+            self.add_output(f"Refresh failed: {error}")
+        
+        if self.unified_tree.get_children():
+            if not self.showing_cached_state:
+                self.showing_cached_state = True
+                self._tag_tree_items("stale")
+            self.unload_button.config(state="disabled")
+            self.status_var.set(f"Audio server {problem} - showing the last known state")
+        else:
+            self.status_var.set(f"Audio server {problem}")
+
+    def _watchdog(self):
+        """Report pactl commands that are taking unusually long in the Output tab."""
+        WAKEUPS.increment('watchdog')
+        running = PactlRunner.in_flight_commands()
+        for command_id, command_str, elapsed, timeout in running:
+            if elapsed >= SLOW_COMMAND_SECONDS and command_id not in self._reported_commands:
+                self._reported_commands.add(command_id)
+                self.add_output(
+                    f"Warning: '{command_str}' has been running for {elapsed:.1f}s "
+                    f"(it will be stopped after {timeout:.0f}s)"
+                )
+                self.status_var.set("Audio server is slow to respond...")
+        self._reported_commands &= {entry[0] for entry in running}
+        self.root.after(WATCHDOG_INTERVAL_MS if running else WATCHDOG_IDLE_INTERVAL_MS, self._watchdog)
+
+    def _schedule_poll(self, immediately=False):
+        """(Re)arm the automatic refresh timer for the poller's current interval."""
+        if self._poll_after_id is not None:
+            self.root.after_cancel(self._poll_after_id)
+            self._poll_after_id = None
+        delay = self.poller.next_delay()
+        if delay is None or not self.auto_refresh_var.get():
+            return
+        if immediately:
+            self._poll_after_id = self.root.after_idle(self._poll)
+        else:
+            self._poll_after_id = self.root.after(int(delay * 1000), self._poll)
+
+    def _poll(self):
+        """Fetch the state in the background; the result is only shown if it changed."""
+        self._poll_after_id = None
+        WAKEUPS.increment('poll')
+        if self._fetch is not None:
+            # The running fetch reschedules the poll when it finishes
+            return
+        if self.history_position is not None:
+            # Leave the user on the timeline entry they are looking at
+            self._schedule_poll()
+            return
+        self._polling = True
+        self._fetch = self._start_background_fetch()
+        self.root.after_idle(self._finish_background_fetch)
+
+    def _on_window_state_change(self, event):
+        """Re-check minimized and focus state once pending focus and map events are handled."""
+        if not self._pause_check_pending:
+            self._pause_check_pending = True
+            self.root.after_idle(self._update_poll_pause)
+
+    def _update_poll_pause(self):
+        """Pause automatic refresh while the window is minimized or unfocused."""
+        self._pause_check_pending = False
+        try:
+            # Focus moves between our own widgets too; None means another application has it
+            focused = self.root.focus_get() is not None
+        except (KeyError, tk.TclError):
+            focused = True
+        minimized = self.root.state() == 'iconic'
+        
+        resumed = False
+        for reason, active in (('unfocused', not focused), ('minimized', minimized)):
+            if active:
+                self.poller.pause(reason)
+            else:
+                resumed = self.poller.resume(reason) or resumed
+        
+        if resumed:
+            # Something may have changed while we were not looking
+            self.poller.poke()
+            self._schedule_poll(immediately=True)
+        elif self.poller.paused:
+            self._schedule_poll()
+
+    def toggle_auto_refresh(self):
+        """Start or stop automatic refresh from the View menu."""
+        if self.auto_refresh_var.get():
+            self.poller.poke()
+            self._schedule_poll(immediately=True)
+            self.add_output("Automatic refresh enabled")
+        else:
+            self._schedule_poll()
+            self.add_output("Automatic refresh disabled")
+
+    def show_idle_statistics(self):
+        """Report the cost of keeping the window open since the last report."""
+        report = self.idle_meter.report()
+        self.idle_meter.reset()
+        if not self.auto_refresh_var.get():
+            polling = "automatic refresh off"
+        elif self.poller.paused:
+            polling = "automatic refresh paused"
+        else:
+            polling = f"automatic refresh every {self.poller.interval:.0f}s"
+        message = (
+            f"Over the last {report['minutes']:.1f} min: {report['wakeups_per_minute']:.1f} wakeups/min, "
+            f"{report['cpu_percent']:.2f}% CPU; {polling}"
+        )
+        self.add_output(message)
+        self.status_var.set(message)
+
+    def _ensure_tab_built(self, tab):
+        """
+        Build a deferred tab the first time it is shown.
+        
+        Returns: True if the tab was built by this call
+        """
+        builder = self._tab_builders.pop(str(tab), None)
+        if builder:
+            builder()
+        return builder is not None
 
     def setup_menu(self):
         """Set up the application menu."""
@@ -86,9 +442,17 @@ class MainWindow:
         file_menu.add_command(label="Save Preset...", command=self.save_preset)
         file_menu.add_command(label="Load Preset...", command=self.load_preset)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
         menubar.add_cascade(label="File", menu=file_menu)
         
+        # View menu
+        view_menu = tk.Menu(menubar, tearoff=0)
+        view_menu.add_checkbutton(label="Auto Refresh", variable=self.auto_refresh_var,
+                                  command=self.toggle_auto_refresh)
+        view_menu.add_separator()
+        view_menu.add_command(label="Idle Statistics", command=self.show_idle_statistics)
+        menubar.add_cascade(label="View", menu=view_menu)
+        
         # Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
         help_menu.add_command(label="About", command=self.show_about)
@@ -362,6 +726,26 @@ class MainWindow:
         )
         show_monitors_cb.pack(anchor=tk.W, padx=0, pady=(0, 5))
         
+        # History timeline: browse recorded states of the audio graph
+        history_frame = ttk.Frame(frame)
+        history_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(history_frame, text="History:").pack(side=tk.LEFT)
+        
+        self.history_scale = ttk.Scale(
+            history_frame,
+            from_=0,
+            to=0,
+            orient=tk.HORIZONTAL,
+            command=self.on_history_scale_moved
+        )
+        self.history_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        ttk.Button(history_frame, text="Live", width=5, command=self.show_live_state).pack(side=tk.LEFT)
+        
+        self.history_label_var = tk.StringVar(value="Live")
+        ttk.Label(history_frame, textvariable=self.history_label_var, width=36).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Create tree frame for the unified tree and scrollbars
         tree_frame = ttk.Frame(frame)
         tree_frame.pack(fill=tk.BOTH, expand=True)
@@ -391,9 +775,20 @@ class MainWindow:
         self.unified_tree.tag_configure("source", background="#FFE0E0")
         self.unified_tree.tag_configure("category", background="#F0F0F0", font=("", 9, "bold"))
         
+        # State cached at the previous exit, shown until the live state arrives
+        self.unified_tree.tag_configure("stale", foreground="#808080")
+        
+        # Timeline highlighting (configured last so it takes priority)
+        self.unified_tree.tag_configure("history_changed", background="#FFF3C0")
+        self.unified_tree.tag_configure("history_removed", background="#FFC8C8", foreground="#800000")
+        
         # Scrollbars
         y_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.unified_tree.yview)
-        self.unified_tree.configure(yscrollcommand=y_scrollbar.set)
+        
+        def on_tree_scrolled(first, last):
+            y_scrollbar.set(first, last)
+            self._schedule_details_prefetch()
+        self.unified_tree.configure(yscrollcommand=on_tree_scrolled)
         
         x_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL, command=self.unified_tree.xview)
         self.unified_tree.configure(xscrollcommand=x_scrollbar.set)
@@ -409,6 +804,7 @@ class MainWindow:
         
         # Selection handling
         self.unified_tree.bind("<<TreeviewSelect>>", self.on_unified_tree_select)
+        self.unified_tree.bind("<<TreeviewOpen>>", self._schedule_details_prefetch)
         
         # Button frame
         button_frame = ttk.Frame(self.manage_tab, padding="5")
@@ -475,8 +871,7 @@ class MainWindow:
         # Initialize details display
         self.update_details_display("Select an item to see details")
         
-        # Initial load
-        self.refresh_all_views()
+        # The initial load is applied by _finish_background_fetch
 
     def setup_output_tab(self):
         """Set up the Output tab content."""
@@ -504,8 +899,10 @@ class MainWindow:
         )
         clear_button.pack(pady=10)
         
-        # Add initial message
-        self.add_output("PulseAudio Control GUI started. Ready for commands.")
+        # Show messages logged before the tab was built
+        pending, self._pending_output = self._pending_output, deque(maxlen=MAX_OUTPUT_LINES)
+        for text, timestamp in pending:
+            self._write_output(text, timestamp)
 
     def add_output(self, text: str):
         """
@@ -514,13 +911,19 @@ class MainWindow:
         Args:
             text: The text to add
         """
+        timestamp = time.strftime("%H:%M:%S")
+        if self.output_text:
+            self._write_output(text, timestamp)
+        else:
+            # Output tab not built yet; keep the message until it is
+            self._pending_output.append((text, timestamp))
+
+    def _write_output(self, text: str, timestamp: str):
+        """Insert a formatted message into the output window."""
         if self.output_text:
-            import datetime
-            
             # Add timestamp for command execution
             if text.startswith("$ "):
                 # Command execution - add separator and timestamp
-                timestamp = datetime.datetime.now().strftime("%H:%M:%S")
                 self.output_text.insert(tk.END, f"\n[{timestamp}] {text}\n")
             elif text.startswith("Command ") or text.startswith("Error:") or text.startswith("Output:"):
                 # Command result - indent slightly
@@ -529,6 +932,11 @@ class MainWindow:
                 # Regular application message
                 self.output_text.insert(tk.END, text + "\n")
             
+            # Drop the oldest lines beyond the limit
+            lines = int(self.output_text.index("end-1c").split(".")[0])
+            if lines > MAX_OUTPUT_LINES:
+                self.output_text.delete("1.0", f"{lines - MAX_OUTPUT_LINES + 1}.0")
+            
             self.output_text.see(tk.END)  # Scroll to the end
     
     def clear_output(self):
@@ -625,11 +1033,14 @@ class MainWindow:
             if properties:
                 advanced_options['sink_properties'] = properties
         
-        self.status_var.set(f"Creating duplex sink '{name}'...")
-        self.root.update()
-        
-        success = PactlRunner.create_duplex_sink(name, description, channels, logger=self.add_output, **advanced_options)
+        def create(logger, cancel_event):
+            return self.runner.create_duplex_sink(name, description, channels, logger=logger, **advanced_options)
         
+        self._start_action(f"Creating duplex sink '{name}'...", create,
+                           lambda success: self._finish_create_duplex_sink(success, name, description))
+
+    def _finish_create_duplex_sink(self, success, name, description):
+        """Report the result of create_duplex_sink and refresh."""
         if success:
             self.add_output(f"Created duplex sink: {name} ({description})")
             self.status_var.set(f"Created duplex sink: {name}")
@@ -641,24 +1052,30 @@ class MainWindow:
             messagebox.showerror("Error", f"Failed to create duplex sink: {name}")
 
     def refresh_all_views(self):
-        """Refresh all views with hierarchical relationships."""
-        self.status_var.set("Refreshing all components...")
-        self.root.update()
+        """
+        Refresh all views with hierarchical relationships.
         
-        # Get all data
-        modules = PactlRunner.list_modules(logger=self.add_output)
-        sinks = PactlRunner.list_sinks(logger=self.add_output)
-        sources = PactlRunner.list_sources(logger=self.add_output)
+        The state is fetched on worker threads, so the window stays responsive
+        even while the audio server hangs; a refresh requested while another
+        one is running is queued and runs after it.
+        """
+        if self._fetch is not None:
+            self._refresh_pending = True
+            return
         
-        # Clear existing items
-        for item in self.unified_tree.get_children():
-            self.unified_tree.delete(item)
+        self.status_var.set("Refreshing all components...")
+        self._fetch = self._start_background_fetch()
+        self.root.after_idle(self._finish_background_fetch)
+
+    def _apply_state(self, modules, sinks, sources):
+        """Show freshly fetched module, sink and source lists in the Manage tab."""
+        self.sink_names = {sink.get('name', '') for sink in sinks}
         
-        # Build relationship mapping
-        device_map = self._map_modules_to_devices(modules, sinks, sources)
+        # Leave any timeline view and record the state in the history archive
+        self.history_position = None
+        self._take_live_snapshot({'modules': modules, 'sinks': sinks, 'sources': sources})
         
-        # Populate unified tree view with categorized device grouping
-        self._populate_unified_tree(device_map, modules, sinks, sources)
+        self._render_tree(modules, sinks, sources)
         
         # Reset the details label
         self.update_details_display("Select an item to see details")
@@ -667,416 +1084,364 @@ class MainWindow:
         self.status_var.set(f"Found {len(modules)} modules, {len(sinks)} sinks, {len(sources)} sources")
         self.add_output(f"Refreshed all components: {len(modules)} modules, {len(sinks)} sinks, {len(sources)} sources")
 
-    def _map_modules_to_devices(self, modules, sinks, sources):
+    def _take_live_snapshot(self, state):
+        """
+        Make the live snapshot for the timeline, the history archive and the
+        last-state cache, and record it once the tree is on screen.
+        
+        A tiered listing gives null sinks brief records, so the snapshot is
+        built from full listings taken on a worker thread instead of from
+        state, SNAPSHOT_DELAY_MS later, of only the kinds whose lists
+        changed since the last one.
+        """
+        if not self.listing.tiered:
+            self._set_live_snapshot(state)
+            return
+        changed = {}
+        for kind in SNAPSHOT_KINDS:
+            fingerprint = fingerprint_of(state[kind])
+            if fingerprint is None or fingerprint != self._snapshot_fingerprints.get(kind):
+                changed[kind] = fingerprint
+        if not changed:
+            return
+        self._snapshot_pending.update(changed)
+        if self._snapshot_after_id is None:
+            self._snapshot_after_id = self.root.after(SNAPSHOT_DELAY_MS, self._start_pending_snapshot)
+
+    def _start_pending_snapshot(self):
+        """Start the full listings that are due, unless some are running."""
+        self._snapshot_after_id = None
+        if self._snapshot_fetch is None and self._snapshot_pending:
+            pending, self._snapshot_pending = self._snapshot_pending, {}
+            self._start_snapshot_fetch(pending)
+
+    def _start_snapshot_fetch(self, kinds):
         """
-        Create a mapping of which modules created which sinks and sources.
-        Groups by device name (sink_name) rather than module ID for better organization.
+        List kinds in full on a worker thread; queued if a listing is running.
         
-        Returns: Dictionary mapping device names to lists of related modules, sinks and sources
+        Args:
+            kinds: Maps each kind to list to the fingerprint of the tree's
+                list it is taken for
         """
-        device_map = {}
+        if self._snapshot_fetch is not None:
+            self._snapshot_pending.update(kinds)
+            return
         
-        # First, identify all device names from null-sink modules
-        for module in modules:
-            module_name = module.get('name', '')
-            module_args = module.get('argument', '')
-            
-            if 'null-sink' in module_name:
-                # Extract the sink_name from module arguments
-                # Handle various formats and special characters
-                import re
-                sink_match = re.search(r'sink_name=([a-zA-Z0-9_.-]+)', module_args)
-                if sink_match:
-                    device_name = sink_match.group(1)
-                    if device_name not in device_map:
-                        device_map[device_name] = {'modules': [], 'sinks': [], 'sources': []}
-                    device_map[device_name]['modules'].append(module)
-        
-        # Map sinks to device names
-        for sink in sinks:
-            sink_name = sink.get('name', '')
-            # Check if this sink belongs to any of our tracked devices
-            if sink_name in device_map:
-                device_map[sink_name]['sinks'].append(sink)
-        
-        # Map sources to device names
-        for source in sources:
-            source_name = source.get('name', '')
-            
-            # Check for monitor sources (these are created automatically for sinks)
-            if ".monitor" in source_name:
-                # This is likely a sink's monitor source
-                base_name = source_name.replace(".monitor", "")
-                if base_name in device_map:
-                    device_map[base_name]['sources'].append(source)
-            else:
-                # Direct source match
-                if source_name in device_map:
-                    device_map[source_name]['sources'].append(source)
-        
-        return device_map
-
-    def _populate_unified_tree(self, device_map, modules, sinks, sources):
-        """Populate the unified tree view with categorized device grouping."""
-        # Create main category groups
-        virtual_group = self.unified_tree.insert(
-            "", "end", 
-            text="Virtual Devices",
-            values=("", "category", ""),
-            tags=("category",)
+        results = {}
+        
+        def fetch():
+            log_lines = []
+            try:
+                results['state'] = self.listing.full_state(logger=log_lines.append, raise_errors=True,
+                                                           kinds=tuple(kinds))
+            except PactlError as e:
+                results['state'] = e
+            results['log_lines'] = log_lines
+        
+        thread = threading.Thread(target=fetch, daemon=True)
+        thread.start()
+        self._snapshot_fetch = (thread, results, kinds)
+        self.root.after(10, self._finish_snapshot_fetch)
+
+    def _finish_snapshot_fetch(self):
+        """Use the full listings once their thread has finished."""
+        thread, results, kinds = self._snapshot_fetch
+        if thread.is_alive():
+            self.root.after(10, self._finish_snapshot_fetch)
+            return
+        
+        self._snapshot_fetch = None
+        for line in results['log_lines']:
+            self.add_output(line)
+        state = results['state']
+        if isinstance(state, PactlError):
+            self.add_output(f"Could not take a history snapshot: {state}")
+        else:
+            self._snapshot_lists.update(state)
+            self._snapshot_fingerprints.update(kinds)
+            if all(kind in kinds for kind in SNAPSHOT_KINDS):
+                self._snapshot_taken_at = time.monotonic()
+            if all(kind in self._snapshot_lists for kind in SNAPSHOT_KINDS):
+                self._set_live_snapshot(self._snapshot_lists)
+        
+        if self._snapshot_after_id is None:
+            self._start_pending_snapshot()
+
+    def _set_live_snapshot(self, state):
+        """Make fully listed state the live snapshot and record it once the tree is on screen."""
+        self.live_snapshot = SnapshotFormat.new_snapshot(state['sinks'], state['sources'], state['modules'])
+        self.root.after_idle(self._record_history, self.live_snapshot)
+
+    def _render_tree(self, modules, sinks, sources, expanded=None, on_done=None):
+        """
+        Rebuild the unified tree from module, sink and source lists.
+        
+        A large tree is inserted over several idle callbacks, expanded items
+        and Virtual Devices first, so the window stays responsive meanwhile.
+        
+        Args:
+            expanded: Paths of items to expand; defaults to the items
+                currently expanded, if the tree is not empty
+            on_done: Called once every item is in the tree
+        """
+        if expanded is None and (self.tree_renderer.busy or self.unified_tree.get_children()):
+            expanded = self._expanded_tree_paths()
+        self.details_cache.new_version()
+        self.details_prefetcher.cancel()
+        if self._status_before_render is not None:
+            # The previous render was cut short: take its status message back
+            self.status_var.set(self._status_before_render)
+            self._status_before_render = None
+        
+        # Group the devices, then replace the tree's items with the result
+        nodes = TreeModel.build(
+            modules, sinks, sources,
+            show_system=self.show_system_var.get(),
+            show_monitors=self.show_monitors_var.get()
+        )
+        self.tree_renderer.render(
+            nodes, expanded,
+            extra_tags=("stale",) if self.showing_cached_state else (),
+            on_done=on_done
         )
+
+    def _show_render_progress(self, done, total):
+        """Show how far a chunked tree render got in the status bar."""
+        if self._status_before_render is None:
+            self._status_before_render = self.status_var.get()
+        if done < total:
+            self.status_var.set(f"Showing devices: {done} of {total} items...")
+        else:
+            self.status_var.set(self._status_before_render)
+            self._status_before_render = None
+
+    def _tree_item_path(self, item):
+        """
+        Identify a tree item by its position in the hierarchy.
         
-        # Create system modules group if needed
-        system_group = None
-        if self.show_system_var.get():
-            system_group = self.unified_tree.insert(
-                "", "end", 
-                text="System Modules",
-                values=("", "category", ""),
-                tags=("category",)
-            )
+        Item IDs change on every rebuild, so each level is described by its
+        type and name (or label for items without a name).
+        """
+        path = []
+        while item:
+            values = self.unified_tree.item(item, 'values')
+            item_type = str(values[1]) if len(values) > 1 else ""
+            item_name = str(values[2]) if len(values) > 2 and values[2] else self.unified_tree.item(item, 'text')
+            path.append([item_type, item_name])
+            item = self.unified_tree.parent(item)
+        path.reverse()
+        return path
+
+    def _expanded_tree_paths(self):
+        """List the paths of all expanded tree items."""
+        if self.tree_renderer.busy:
+            # The tree is still being filled in: what it will show is what was asked for
+            return list(self.tree_renderer.expanded)
+        expanded = []
+        pending = list(self.unified_tree.get_children())
+        while pending:
+            item = pending.pop()
+            children = self.unified_tree.get_children(item)
+            if children and self.unified_tree.item(item, 'open'):
+                expanded.append(self._tree_item_path(item))
+                pending.extend(children)
+        return expanded
+
+    def _tag_tree_items(self, tag):
+        """Add a tag to every item in the tree, including those a render has still to insert."""
+        if self.tree_renderer.busy:
+            self.tree_renderer.extra_tags += (tag,)
+        pending = list(self.unified_tree.get_children())
+        while pending:
+            item = pending.pop()
+            pending.extend(self.unified_tree.get_children(item))
+            tags = tuple(self.unified_tree.item(item, 'tags')) + (tag,)
+            self.unified_tree.item(item, tags=tags)
+
+    def _show_cached_state(self):
+        """Render the state saved at the previous exit, marked as stale."""
+        cached = StateCache.load(last_state_path())
+        if cached is None:
+            return
         
-        # Track what we've added to avoid duplicates
-        added_modules = set()
-        added_sinks = set()
-        added_sources = set()
+        snapshot, expanded = cached
+        self.showing_cached_state = True
+        self._render_tree(snapshot['modules'], snapshot['sinks'], snapshot['sources'], expanded)
         
-        # Process virtual devices (unchanged - working well)
-        for device_name in sorted(device_map.keys()):
-            device_data = device_map[device_name]
-            
-            # Create device group
-            device_item = self.unified_tree.insert(
-                virtual_group, "end", 
-                text=f"Virtual Device: {device_name}",
-                values=("", "device_group", device_name),
-                tags=("category",)
-            )
-            
-            # Add modules for this device
-            for module in device_data['modules']:
-                module_id = module.get('id', '')
-                module_name = module.get('name', '')
-                
-                module_item = self.unified_tree.insert(
-                    device_item, "end", 
-                    text=f"Module: {module_name}",
-                    values=(module_id, "module", module_name),
-                    tags=("module",)
-                )
-                added_modules.add(module_id)
-            
-            # Add sinks for this device
-            for sink in device_data['sinks']:
-                sink_id = sink.get('id', '')
-                sink_name = sink.get('name', '')
-                sink_desc = sink.get('description', sink_name)
-                
-                self.unified_tree.insert(
-                    device_item, "end", 
-                    text=f"Output: {sink_desc}",
-                    values=(sink_id, "sink", sink_name),
-                    tags=("sink",)
-                )
-                added_sinks.add(sink_id)
-            
-            # Add sources for this device
-            for source in device_data['sources']:
-                source_id = source.get('id', '')
-                source_name = source.get('name', '')
-                source_desc = source.get('description', source_name)
-                
-                self.unified_tree.insert(
-                    device_item, "end", 
-                    text=f"Input: {source_desc}",
-                    values=(source_id, "source", source_name),
-                    tags=("source",)
-                )
-                added_sources.add(source_id)
+        saved = snapshot.get('created', '').replace('T', ' ')[:19]
+        self.status_var.set(f"Showing last known state from {saved} - refreshing...")
+        self.update_details_display("Showing the last known state - refreshing from the audio server...")
+
+    def on_close(self):
+        """Save the last-known state for the next launch and close the window."""
+        if self.live_snapshot:
+            try:
+                StateCache.save(last_state_path(), self.live_snapshot, self._expanded_tree_paths())
+            except OSError as e:
+                print(f"Could not save the last known state: {e}", file=sys.stderr)
+        self.history_archive.close()
+        self.details_prefetcher.close()
+        self._action_cancel.set()
+        PactlRunner.cancel_all()
+        self.runner.close()
+        self.root.destroy()
+
+    def _record_history(self, snapshot):
+        """Append a snapshot to the history archive and update the timeline range."""
+        try:
+            self.history_archive.append(snapshot)
+        except (OSError, ValueError) as e:
+            self.add_output(f"Error recording history: {str(e)}")
+        if self.history_position is None:
+            self._update_history_scale()
+            return
+        # Leave the user on the timeline entry they are looking at
+        try:
+            self.history_scale.configure(to=max(len(self.history_archive) - 1, 0))
+        except (OSError, ValueError):
+            pass
+
+    def _update_history_scale(self):
+        """Resize the timeline slider to the archive and move it to the live end."""
+        try:
+            count = len(self.history_archive)
+        except (OSError, ValueError):
+            count = 0
+        
+        self._updating_history_scale = True
+        try:
+            self.history_scale.configure(to=max(count - 1, 0))
+            self.history_scale.set(max(count - 1, 0))
+        finally:
+            self._updating_history_scale = False
         
-        # Process hardware devices with new categorization
-        remaining_modules = [m for m in modules if m.get('id', '') not in added_modules]
-        remaining_sinks = [s for s in sinks if s.get('id', '') not in added_sinks]
-        remaining_sources = [s for s in sources if s.get('id', '') not in added_sources]
+        self.history_scale.configure(state="normal" if count > 1 else "disabled")
+        self.history_label_var.set(f"Live ({count} recorded states)" if count else "Live")
+
+    def on_history_scale_moved(self, value):
+        """Handle movement of the timeline slider."""
+        if self._updating_history_scale:
+            return
         
-        # Categorize hardware devices
-        hardware_categories = self._categorize_hardware_devices(
-            remaining_modules, remaining_sinks, remaining_sources
+        # Rebuilding a past state is cheap, but avoid doing it for every pixel of a drag
+        if self._history_after_id is not None:
+            self.root.after_cancel(self._history_after_id)
+        self._history_after_id = self.root.after(
+            80, self._show_history_position, int(round(float(value)))
         )
+
+    def _show_history_position(self, position):
+        """Show the tree as it was at a timeline position, highlighting differences."""
+        self._history_after_id = None
+        count = len(self.history_archive)
+        if count == 0:
+            return
         
-        # Create hardware category groups directly at top level
-        category_names = {
-            'builtin': '🔌 Built-in Audio',
-            'usb': '🎧 USB Audio',
-            'bluetooth': '📡 Bluetooth Audio', 
-            'hdmi': '📺 HDMI/DisplayPort'
-        }
+        if position >= count - 1:
+            self.show_live_state()
+            return
         
-        for category, display_name in category_names.items():
-            devices = hardware_categories.get(category, [])
-            
-            # Only create category if it has devices
-            if devices:
-                category_item = self.unified_tree.insert(
-                    "", "end",  # Insert directly at root level
-                    text=display_name,
-                    values=("", "hardware_category", category),
-                    tags=("category",)
-                )
-                
-                # Add devices to this category
-                for device in devices:
-                    self._add_hardware_device_to_tree(device, category_item, added_modules, added_sinks, added_sources)
-        
-        # Add system modules if showing them
-        if system_group:
-            system_modules = [m for m in remaining_modules if m.get('id', '') not in added_modules]
-            for module in system_modules:
-                self._add_standalone_module_to_tree(module, system_group, added_modules)
-        
-        # Auto-expand the virtual devices by default
-        self.unified_tree.item(virtual_group, open=True)
-
-    def _add_hardware_device_to_tree(self, device_entry, parent_item, added_modules, added_sinks, added_sources):
-        """Add a hardware device entry to the tree."""
-        device_type = device_entry.get('type')
-        
-        if device_type == 'hardware_device_group':
-            # New grouped hardware device with proper device grouping
-            device_info = device_entry.get('device_info')
-            modules = device_entry.get('modules', [])
-            sinks = device_entry.get('sinks', [])
-            sources = device_entry.get('sources', [])
-            
-            device_name = device_info['device_name']
-            
-            # Create device group
-            device_item = self.unified_tree.insert(
-                parent_item, "end",
-                text=device_name,
-                values=("", "hardware_device_group", device_name),
-                tags=("category",)
-            )
-            
-            # Add modules
-            for module in modules:
-                module_id = module.get('id', '')
-                module_name = module.get('name', '')
-                self.unified_tree.insert(
-                    device_item, "end",
-                    text=f"Module: {module_name}",
-                    values=(module_id, "module", module_name),
-                    tags=("module",)
-                )
-                added_modules.add(module_id)
-            
-            # Add sinks
-            for sink in sinks:
-                sink_id = sink.get('id', '')
-                sink_name = sink.get('name', '')
-                sink_desc = sink.get('description', sink_name)
-                self.unified_tree.insert(
-                    device_item, "end",
-                    text=f"Output: {sink_desc}",
-                    values=(sink_id, "sink", sink_name),
-                    tags=("sink",)
-                )
-                added_sinks.add(sink_id)
+        try:
+            past = self.history_archive.snapshot(position)
+            timestamp = self.history_archive.timestamp(position)
+        except (OSError, ValueError, IndexError) as e:
+            self.add_output(f"Error reading history: {str(e)}")
+            return
+        
+        when = datetime.datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%d %H:%M:%S")
+        
+        def highlight_differences():
+            differences = self._highlight_history_differences(past, self.live_snapshot or {})
+            self.history_label_var.set(f"{when} ({differences} difference(s) from live)")
+        
+        self.history_position = position
+        self._render_tree(past['modules'], past['sinks'], past['sources'], on_done=highlight_differences)
+        self.unload_button.config(state="disabled")
+        self.update_details_display("Viewing history - select an item to see its recorded state")
+        self.status_var.set(f"Showing recorded state from {when}")
+
+    def show_live_state(self):
+        """Leave the timeline view and show the live state again."""
+        if self.history_position is None:
+            return
+        
+        self.history_position = None
+        live = self.live_snapshot
+        if live:
+            self._render_tree(live['modules'], live['sinks'], live['sources'])
+        self._update_history_scale()
+        self.update_details_display("Select an item to see details")
+        self.status_var.set("Showing live state")
+
+    def _highlight_history_differences(self, past, live):
+        """
+        Tag tree items of a past state that differ from the live state.
+        
+        Returns: The number of differences, including devices that only exist live
+        """
+        live_records = {}
+        past_records = {}
+        for snapshot, records in ((live, live_records), (past, past_records)):
+            for entity_type, collection in (("sink", "sinks"), ("source", "sources"), ("module", "modules")):
+                for record in snapshot.get(collection, []):
+                    records[self._history_key(entity_type, record)] = record
+        
+        differences = 0
+        pending = list(self.unified_tree.get_children())
+        while pending:
+            item = pending.pop()
+            pending.extend(self.unified_tree.get_children(item))
+            
+            values = self.unified_tree.item(item, 'values')
+            if len(values) < 3 or values[1] not in ("sink", "source", "module"):
+                continue
             
-            # Add sources (including monitors if checkbox enabled)
-            for source in sources:
-                source_id = source.get('id', '')
-                source_name = source.get('name', '')
-                source_desc = source.get('description', source_name)
-                
-                # Check if it's a monitor source
-                if '.monitor' in source_name:
-                    if self.show_monitors_var.get():
-                        self.unified_tree.insert(
-                            device_item, "end",
-                            text=f"Monitor: {source_desc}",
-                            values=(source_id, "source", source_name),
-                            tags=("source",)
-                        )
-                else:
-                    self.unified_tree.insert(
-                        device_item, "end",
-                        text=f"Input: {source_desc}",
-                        values=(source_id, "source", source_name),
-                        tags=("source",)
-                    )
-                added_sources.add(source_id)
-        
-        elif device_type == 'hardware_device':
-            # Legacy hardware device handling (for backward compatibility)
-            module = device_entry.get('module')
-            sinks = device_entry.get('sinks', [])
-            sources = device_entry.get('sources', [])
+            entity_id, entity_type, entity_name = values
+            past_record = past_records.get(self._history_key(entity_type, {'id': str(entity_id), 'name': entity_name}))
+            if past_record is None:
+                continue
             
-            if module:
-                # Create device name from module or first sink/source
-                device_name = self._extract_device_name(
-                    module.get('name', ''), 
-                    module.get('argument', '')
-                )
-                
-                # If we have sinks/sources, use their description for better naming
-                if sinks:
-                    device_name = sinks[0].get('description', device_name)
-                elif sources:
-                    device_name = sources[0].get('description', device_name)
-                
-                # Create device group
-                device_item = self.unified_tree.insert(
-                    parent_item, "end",
-                    text=device_name,
-                    values=("", "hardware_device_group", device_name),
-                    tags=("category",)
-                )
-                
-                # Add module
-                module_id = module.get('id', '')
-                module_name = module.get('name', '')
-                self.unified_tree.insert(
-                    device_item, "end",
-                    text=f"Module: {module_name}",
-                    values=(module_id, "module", module_name),
-                    tags=("module",)
-                )
-                added_modules.add(module_id)
-                
-                # Add sinks
-                for sink in sinks:
-                    sink_id = sink.get('id', '')
-                    sink_name = sink.get('name', '')
-                    sink_desc = sink.get('description', sink_name)
-                    self.unified_tree.insert(
-                        device_item, "end",
-                        text=f"Output: {sink_desc}",
-                        values=(sink_id, "sink", sink_name),
-                        tags=("sink",)
-                    )
-                    added_sinks.add(sink_id)
-                
-                # Add sources (including monitors if checkbox enabled)
-                for source in sources:
-                    source_id = source.get('id', '')
-                    source_name = source.get('name', '')
-                    source_desc = source.get('description', source_name)
-                    
-                    # Check if it's a monitor source
-                    if '.monitor' in source_name:
-                        if self.show_monitors_var.get():
-                            self.unified_tree.insert(
-                                device_item, "end",
-                                text=f"Monitor: {source_desc}",
-                                values=(source_id, "source", source_name),
-                                tags=("source",)
-                            )
-                    else:
-                        self.unified_tree.insert(
-                            device_item, "end",
-                            text=f"Input: {source_desc}",
-                            values=(source_id, "source", source_name),
-                            tags=("source",)
-                        )
-                    added_sources.add(source_id)
-        
-        elif device_type == 'orphaned_sink':
-            # Standalone sink
-            sink = device_entry.get('sink')
-            if sink:
-                sink_id = sink.get('id', '')
-                sink_name = sink.get('name', '')
-                sink_desc = sink.get('description', sink_name)
-                self.unified_tree.insert(
-                    parent_item, "end",
-                    text=f"Output: {sink_desc}",
-                    values=(sink_id, "sink", sink_name),
-                    tags=("sink",)
-                )
-                added_sinks.add(sink_id)
-        
-        elif device_type == 'orphaned_source':
-            # Standalone source
-            source = device_entry.get('source')
-            if source:
-                source_id = source.get('id', '')
-                source_name = source.get('name', '')
-                source_desc = source.get('description', source_name)
-                
-                if '.monitor' in source_name:
-                    self.unified_tree.insert(
-                        parent_item, "end",
-                        text=f"Monitor: {source_desc}",
-                        values=(source_id, "source", source_name),
-                        tags=("source",)
-                    )
-                else:
-                    self.unified_tree.insert(
-                        parent_item, "end",
-                        text=f"Input: {source_desc}",
-                        values=(source_id, "source", source_name),
-                        tags=("source",)
-                    )
-                added_sources.add(source_id)
-
-    def _add_standalone_module_to_tree(self, module, parent_group, added_modules):
-        """Helper method to add a standalone module to the tree."""
-        module_id = module.get('id', '')
-        module_name = module.get('name', '')
-        
-        # Extract device name from module
-        device_name = self._extract_device_name(module_name, module.get('argument', ''))
-        
-        # Create module node
-        self.unified_tree.insert(
-            parent_group, "end", 
-            text=device_name,
-            values=(module_id, "module", module_name),
-            tags=("module",)
-        )
-        added_modules.add(module_id)
-
-    def _add_orphaned_devices(self, sinks, sources, added_sinks, added_sources, virtual_group, hardware_group):
-        """Add sinks and sources that aren't associated with any visible module."""
-        # Process orphaned sinks
-        orphaned_sinks = [s for s in sinks if s.get('id', '') not in added_sinks]
-        for sink in orphaned_sinks:
-            sink_id = sink.get('id', '')
-            sink_name = sink.get('name', '')
-            sink_desc = sink.get('description', sink_name)
+            live_record = live_records.get(self._history_key(entity_type, past_record))
+            if live_record is None:
+                tag = "history_removed"
+            elif live_record != past_record:
+                tag = "history_changed"
+            else:
+                continue
             
-            # Determine appropriate category
-            parent_group = hardware_group  # Default 
-            if 'null' in sink_name or 'virtual' in sink_name.lower():
-                parent_group = virtual_group
-                
-            self.unified_tree.insert(
-                parent_group, "end", 
-                text=f"Output: {sink_desc}",
-                values=(sink_id, "sink", sink_name),
-                tags=("sink",)
-            )
+            tags = tuple(self.unified_tree.item(item, 'tags')) + (tag,)
+            self.unified_tree.item(item, tags=tags)
+            differences += 1
         
-        # Process orphaned sources
-        orphaned_sources = [s for s in sources if s.get('id', '') not in added_sources]
-        for source in orphaned_sources:
-            source_id = source.get('id', '')
-            source_name = source.get('name', '')
-            source_desc = source.get('description', source_name)
-            
-            # Determine appropriate category
-            parent_group = hardware_group  # Default to hardware
-            if 'null' in source_name or 'virtual' in source_name.lower() or '.monitor' in source_name:
-                parent_group = virtual_group
-                
-            self.unified_tree.insert(
-                parent_group, "end", 
-                text=f"Input: {source_desc}",
-                values=(source_id, "source", source_name),
-                tags=("source",)
-            )
+        differences += len(set(live_records) - set(past_records))
+        return differences
+
+    @staticmethod
+    def _history_key(entity_type, record):
+        """Identify a record across snapshots: modules by ID, devices by name."""
+        if entity_type == "module":
+            return (entity_type, str(record.get('id', '')), record.get('name', ''))
+        return (entity_type, record.get('name', ''))
+
+    def _generate_history_details(self, entity_id, entity_type, entity_name):
+        """Describe an item as it was recorded at the current timeline position."""
+        past = self.history_archive.snapshot(self.history_position)
+        collection = {"sink": "sinks", "source": "sources", "module": "modules"}.get(entity_type)
+        if not collection:
+            return f"{entity_name}\n\n(recorded state)"
+        
+        for record in past.get(collection, []):
+            if str(record.get('id', '')) == str(entity_id):
+                lines = [f"{entity_type.title()} #{entity_id}: {entity_name} (recorded state)", ""]
+                for key, value in record.items():
+                    if key == 'properties':
+                        lines.append("Properties:")
+                        lines.extend(f"  {prop_key} = {prop_value}" for prop_key, prop_value in value.items())
+                    elif key not in ['id', 'name']:
+                        lines.append(f"{key}: {value}")
+                return "\n".join(lines)
+        
+        return f"{entity_type.title()} #{entity_id}: {entity_name}\nRecorded data not found."
 
     def on_unified_tree_select(self, event):
         """Handle selection event from the unified tree view."""
@@ -1097,6 +1462,15 @@ class MainWindow:
         
         entity_id, entity_type, entity_name = values
         
+        if self.history_position is not None or self.showing_cached_state:
+            # Past states are read-only; cached module IDs may no longer be valid
+            self.unload_button.config(state="disabled")
+            if self.showing_cached_state:
+                self.update_details_display(f"{entity_name}\n\n(last known state - refreshing...)")
+                return
+            self.update_details_display(self._generate_history_details(entity_id, entity_type, entity_name))
+            return
+        
         # Generate technical specifications for the selected item
         details = self._generate_detailed_info(entity_id, entity_type, entity_name, selected[0])
         
@@ -1107,364 +1481,132 @@ class MainWindow:
             self.unload_button.config(state="disabled")
         
         self.update_details_display(details)
+        self._schedule_details_prefetch()
 
     def _generate_detailed_info(self, entity_id, entity_type, entity_name, tree_item_id):
-        """Generate tiered technical specifications for the selected item."""
-        
-        if entity_type == "category":
-            return f"{entity_name} - {len(self.unified_tree.get_children(tree_item_id))} items"
-        elif entity_type == "hardware_category":
-            # Hardware category summary
-            children_count = len(self.unified_tree.get_children(tree_item_id))
-            category_descriptions = {
-                'builtin': 'Built-in audio devices (onboard, PCI sound cards)',
-                'usb': 'USB connected audio devices',
-                'bluetooth': 'Bluetooth wireless audio devices', 
-                'hdmi': 'HDMI/DisplayPort audio from graphics cards'
-            }
-            description = category_descriptions.get(entity_name, 'Hardware audio devices')
-            return f"{description}\n\nDevices: {children_count}"
-        elif entity_type == "device_group":
-            return self._generate_device_group_summary(entity_name, tree_item_id)
-        elif entity_type == "hardware_device_group":
-            # Use the same device group summary but with hardware context
-            return self._generate_hardware_device_group_summary(entity_name, tree_item_id)
-        elif entity_type == "module":
-            return self._generate_module_summary(entity_id, entity_name)
-        elif entity_type == "sink":
-            return self._generate_sink_summary(entity_id, entity_name, tree_item_id)
-        elif entity_type == "source":
-            return self._generate_source_summary(entity_id, entity_name, tree_item_id)
-        else:
-            return "Select an item to see details"
-
-    def _generate_device_group_summary(self, device_name, tree_item_id):
-        """Generate comprehensive summary for virtual device groups."""
-        children = self.unified_tree.get_children(tree_item_id)
-        
-        # Collect information from child components
-        module_info = None
-        sink_info = None
-        source_info = None
-        
-        for child in children:
-            child_item = self.unified_tree.item(child)
-            child_values = child_item.get('values', [])
-            if len(child_values) >= 3:
-                child_id, child_type, child_name = child_values
-                
-                if child_type == "module":
-                    # Get module details
-                    modules = PactlRunner.list_modules()
-                    for mod in modules:
-                        if str(mod.get('id', '')) == str(child_id):
-                            module_info = mod
-                            break
-                            
-                elif child_type == "sink":
-                    # Get sink details  
-                    sinks = PactlRunner.list_sinks()
-                    for sink in sinks:
-                        if str(sink.get('id', '')) == str(child_id):
-                            sink_info = sink
-                            break
-                            
-                elif child_type == "source":
-                    # Get source details
-                    sources = PactlRunner.list_sources()
-                    for source in sources:
-                        if str(source.get('id', '')) == str(child_id):
-                            source_info = source
-                            break
-        
-        if self.show_all_details_var.get():
-            # Full details view - show all component information
-            info = f"Virtual Device: {device_name}\n"
-            info += f"{'='*50}\n\n"
-            
-            if module_info:
-                info += f"MODULE DETAILS:\n"
-                info += f"ID: {module_info.get('id', 'Unknown')}\n"
-                info += f"Name: {module_info.get('name', 'Unknown')}\n"
-                info += f"Arguments: {module_info.get('argument', 'None')}\n\n"
-            
-            if sink_info:
-                info += f"SINK (OUTPUT) DETAILS:\n"
-                for key, value in sink_info.items():
-                    if key not in ['id', 'name']:
-                        info += f"{key}: {value}\n"
-                info += "\n"
-            
-            if source_info:
-                info += f"SOURCE (INPUT) DETAILS:\n"
-                for key, value in source_info.items():
-                    if key not in ['id', 'name']:
-                        info += f"{key}: {value}\n"
-            
-            return info
+        """
+        Generate tiered technical specifications for the selected item.
+        
+        A text already built for the item, detail level and tree (when it
+        was prefetched or last selected) is returned at once and checked
+        against freshly fetched records in the background. Otherwise a
+        loading text is returned, and the details are built on a prefetch
+        worker and shown by _show_revalidated_details, since fetching the
+        records may wait for a full listing.
+        """
+        full = self.show_all_details_var.get()
+        job = self._detail_job(tree_item_id, entity_id, entity_type, entity_name)
+        key = self.details_cache.key(tree_item_id, full)
+        details = self.details_cache.peek(key)
+        if details is not None:
+            if job.components:
+                self.details_prefetcher.revalidate(job, key, full, details)
+                self._poll_details_revalidation()
+            return details
+        
+        if not job.components:
+            # Nothing to fetch
+            records = DetailsPrefetcher.records(self.listing, job)
+            return DetailsText.for_item(entity_id, entity_type, entity_name, job.child_count, records, full)
+        
+        # Groups are not complete until the tree is
+        self.details_prefetcher.build(job, key, full, store=not self.tree_renderer.busy)
+        self._poll_details_revalidation()
+        return f"{entity_name}\n\nLoading details..."
+
+    def _detail_job(self, item, entity_id, entity_type, entity_name):
+        """Gather what a tree item's details are built from, for building them off the Tk thread."""
+        children = self.unified_tree.get_children(item)
+        if entity_type in DETAIL_KINDS:
+            components = ((entity_type, entity_id),)
+        elif entity_type in ("device_group", "hardware_device_group"):
+            components = []
+            for child in children:
+                child_values = self.unified_tree.item(child).get('values', [])
+                if len(child_values) >= 3:
+                    components.append((child_values[1], child_values[0]))
+            components = tuple(components)
         else:
-            # Summary view - aggregate key specifications
-            info = f"Virtual Device: {device_name}\n"
-            
-            # Device overview
-            component_count = len(children)
-            info += f"Components: {component_count} (module, sink, source)\n"
-            
-            # Get primary audio specs from sink (most comprehensive)
-            if sink_info:
-                state = sink_info.get('state', 'Unknown')
-                info += f"State: {state}\n"
-                
-                driver = sink_info.get('driver', 'Unknown')
-                info += f"Driver: {driver}\n"
-                
-                # Audio Engineering Essentials
-                sample_spec = sink_info.get('sample_spec', 'Unknown')
-                info += f"\nAudio Specification: {sample_spec}\n"
-                
-                channel_map = sink_info.get('channel_map', 'Unknown')
-                info += f"Channel Layout: {channel_map}\n"
-                
-                latency = sink_info.get('latency', 'Unknown')
-                info += f"Latency: {latency}\n"
-                
-                # Buffer settings from properties
-                properties = sink_info.get('properties', {})
-                quantum_limit = properties.get('clock.quantum-limit', 'N/A')
-                info += f"Buffer Quantum Limit: {quantum_limit}\n"
-                
-                # Volume and mute
-                mute = sink_info.get('mute', 'Unknown')
-                info += f"\nMute: {mute}\n"
-                
-                volume = sink_info.get('volume', 'Unknown')
-                if volume != 'Unknown' and len(str(volume)) < 100:
-                    info += f"Volume: {volume}\n"
-            
-            # Module configuration summary
-            if module_info:
-                info += f"\nModule Configuration:\n"
-                args = module_info.get('argument', '')
-                
-                # Parse key module parameters
-                if 'channels=' in args:
-                    import re
-                    channels_match = re.search(r'channels=(\d+)', args)
-                    if channels_match:
-                        channels = int(channels_match.group(1))
-                        channel_names = {1: "Mono", 2: "Stereo", 6: "5.1 Surround", 8: "7.1 Surround"}
-                        channel_desc = channel_names.get(channels, f"{channels}-channel")
-                        info += f"Created as: {channel_desc}\n"
-                
-                if 'rate=' in args:
-                    import re
-                    rate_match = re.search(r'rate=(\d+)', args)
-                    if rate_match:
-                        rate = rate_match.group(1)
-                        info += f"Sample Rate Override: {rate} Hz\n"
-            
-            # Source monitoring info
-            if source_info:
-                monitor_of = source_info.get('monitor_of_sink', 'N/A')
-                if monitor_of != 'N/A':
-                    info += f"\nMonitor Source: Available for recording output\n"
-            
-            # Usage instructions
-            info += f"\nUsage:\n"
-            info += f"• Applications can output audio to '{device_name}'\n"
-            info += f"• Input monitor available for recording/routing\n"
-            info += f"• Select module component to remove entire device\n"
-            
-            return info
-
-    def _generate_module_summary(self, module_id, module_name):
-        """Generate tiered summary for module items."""
-        # Get full module data
-        modules = PactlRunner.list_modules()
-        module_data = None
-        
-        for mod in modules:
-            mod_id = mod.get('id', '')
-            if str(mod_id) == str(module_id) or mod_id == module_id:
-                module_data = mod
-                break
-        
-        if not module_data:
-            return f"Module #{module_id}: {module_name}\nModule data not found."
-        
-        if self.show_all_details_var.get():
-            # Full technical details
-            info = f"Module #{module_id}: {module_name}\n\n"
-            for key, value in module_data.items():
-                if key == 'properties':
-                    info += f"Properties:\n"
-                    for prop_key, prop_value in value.items():
-                        info += f"  {prop_key} = {prop_value}\n"
-                elif key not in ['id', 'name']:
-                    info += f"{key}: {value}\n"
-            return info
+            components = ()
+        return DetailJob(item, entity_id, entity_type, entity_name, len(children), components)
+
+    def _poll_details_revalidation(self):
+        """Pick up revalidated details shortly."""
+        if self._revalidation_after_id is None:
+            self._revalidation_after_id = self.root.after(PREFETCH_POLL_MS, self._show_revalidated_details)
+
+    def _show_revalidated_details(self):
+        """Show the selected item's details again if they changed since they were shown from the cache."""
+        self._revalidation_after_id = None
+        selected = self.unified_tree.selection()
+        if selected and self.history_position is None and not self.showing_cached_state:
+            current_key = self.details_cache.key(selected[0], self.show_all_details_var.get())
+            for key, details in self.details_prefetcher.take_results():
+                if key == current_key:
+                    self.update_details_display(details)
         else:
-            # Summary view
-            info = f"Module #{module_id}: {module_name}\n"
-            info += f"Type: {module_name}\n"
-            
-            # Parse key info from arguments
-            args = module_data.get('argument', '')
-            if 'sink_name=' in args:
-                import re
-                sink_match = re.search(r'sink_name=([a-zA-Z0-9_.-]+)', args)
-                if sink_match:
-                    info += f"Device Name: {sink_match.group(1)}\n"
-            
-            if 'channels=' in args:
-                import re
-                channels_match = re.search(r'channels=(\d+)', args)
-                if channels_match:
-                    channels = int(channels_match.group(1))
-                    channel_names = {1: "Mono", 2: "Stereo", 6: "5.1 Surround", 8: "7.1 Surround"}
-                    channel_desc = channel_names.get(channels, f"{channels}-channel")
-                    info += f"Audio Format: {channel_desc}\n"
-            
-            return info
-
-    def _generate_sink_summary(self, sink_id, sink_name, tree_item_id):
-        """Generate tiered summary for sink (output) items."""
-        # Get full sink data
-        sinks = PactlRunner.list_sinks()
-        sink_data = None
-        
-        for sink in sinks:
-            s_id = sink.get('id', '')
-            if str(s_id) == str(sink_id) or s_id == sink_id:
-                sink_data = sink
-                break
+            self.details_prefetcher.take_results()
+        if self.details_prefetcher.revalidating:
+            self._poll_details_revalidation()
+
+    def _schedule_details_prefetch(self, event=None):
+        """Cancel the details prefetch in progress and start another once the tree is still."""
+        self.details_prefetcher.cancel()
+        if self._prefetch_after_id is not None:
+            self.root.after_cancel(self._prefetch_after_id)
+        self._prefetch_after_id = self.root.after(PREFETCH_DELAY_MS, self._prefetch_details)
+
+    def _prefetch_details(self):
+        """Build the details of the selection's neighbours and the rows in view on worker threads."""
+        self._prefetch_after_id = None
+        WAKEUPS.increment('prefetch')
+        if self.history_position is not None or self.showing_cached_state:
+            # Details of past and cached states are not built from live records
+            return
+        if self.tree_renderer.busy:
+            self._schedule_details_prefetch()
+            return
         
-        if not sink_data:
-            return f"Sink #{sink_id}: {sink_name}\nSink data not found."
-        
-        if self.show_all_details_var.get():
-            # Full technical details
-            info = f"Sink #{sink_id}: {sink_name}\n\n"
-            for key, value in sink_data.items():
-                if key == 'properties':
-                    info += f"Properties:\n"
-                    for prop_key, prop_value in value.items():
-                        info += f"  {prop_key} = {prop_value}\n"
-                elif key == 'formats':
-                    info += f"Formats:\n"
-                    for fmt in value:
-                        info += f"  {fmt}\n"
-                elif key not in ['id', 'name']:
-                    info += f"{key}: {value}\n"
-            return info
-        else:
-            # Summary view - Identity/Status first, then Audio Engineering essentials
-            info = f"Audio Output #{sink_id}\n"
-            
-            # Identity/Status
-            info += f"Name: {sink_name}\n"
-            description = sink_data.get('description', sink_name)
-            info += f"Description: {description}\n"
-            state = sink_data.get('state', 'Unknown')
-            info += f"State: {state}\n"
-            driver = sink_data.get('driver', 'Unknown')
-            info += f"Driver: {driver}\n"
-            
-            # Audio Engineering Essentials
-            sample_spec = sink_data.get('sample_spec', 'Unknown')
-            info += f"\nSample Specification: {sample_spec}\n"
-            
-            channel_map = sink_data.get('channel_map', 'Unknown')
-            info += f"Channel Map: {channel_map}\n"
-            
-            latency = sink_data.get('latency', 'Unknown')
-            info += f"Latency: {latency}\n"
-            
-            # Get buffer/quantum info from properties
-            properties = sink_data.get('properties', {})
-            quantum_limit = properties.get('clock.quantum-limit', 'N/A')
-            info += f"Buffer Quantum Limit: {quantum_limit}\n"
-            
-            # Status info
-            mute = sink_data.get('mute', 'Unknown')
-            info += f"\nMute: {mute}\n"
-            volume = sink_data.get('volume', 'Unknown')
-            if volume != 'Unknown' and len(volume) < 100:  # Don't show if too long
-                info += f"Volume: {volume}\n"
-            
-            return info
-
-    def _generate_source_summary(self, source_id, source_name, tree_item_id):
-        """Generate tiered summary for source (input) items."""
-        # Get full source data
-        sources = PactlRunner.list_sources()
-        source_data = None
-        
-        for source in sources:
-            s_id = source.get('id', '')
-            if str(s_id) == str(source_id) or s_id == source_id:
-                source_data = source
+        items = []
+        selected = self.unified_tree.selection()
+        if selected:
+            # Likely next: the selection's children and siblings
+            item = selected[0]
+            items.extend(self.unified_tree.get_children(item))
+            items.extend(neighbour for neighbour in (self.unified_tree.prev(item), self.unified_tree.next(item))
+                         if neighbour)
+        items.extend(self._visible_tree_items())
+        
+        jobs = []
+        seen = set()
+        for item in items:
+            values = self.unified_tree.item(item, 'values')
+            if item in seen or len(values) < 3:
+                continue
+            seen.add(item)
+            jobs.append(self._detail_job(item, *values))
+        self.details_prefetcher.prefetch(jobs, self.show_all_details_var.get())
+
+    def _visible_tree_items(self):
+        """The items in the tree's viewport, top to bottom."""
+        tree = self.unified_tree
+        item = ''
+        for y in range(0, min(tree.winfo_height(), 100), 5):
+            # The first rows may be covered by the headings
+            item = tree.identify_row(y)
+            if item:
                 break
         
-        if not source_data:
-            return f"Source #{source_id}: {source_name}\nSource data not found."
-        
-        if self.show_all_details_var.get():
-            # Full technical details
-            info = f"Source #{source_id}: {source_name}\n\n"
-            for key, value in source_data.items():
-                if key == 'properties':
-                    info += f"Properties:\n"
-                    for prop_key, prop_value in value.items():
-                        info += f"  {prop_key} = {prop_value}\n"
-                elif key == 'formats':
-                    info += f"Formats:\n"
-                    for fmt in value:
-                        info += f"  {fmt}\n"
-                elif key not in ['id', 'name']:
-                    info += f"{key}: {value}\n"
-            return info
-        else:
-            # Summary view - Identity/Status first, then Audio Engineering essentials
-            info = f"Audio Input #{source_id}\n"
-            
-            # Identity/Status
-            info += f"Name: {source_name}\n"
-            description = source_data.get('description', source_name)
-            info += f"Description: {description}\n"
-            state = source_data.get('state', 'Unknown')
-            info += f"State: {state}\n"
-            driver = source_data.get('driver', 'Unknown')
-            info += f"Driver: {driver}\n"
-            
-            # Audio Engineering Essentials
-            sample_spec = source_data.get('sample_spec', 'Unknown')
-            info += f"\nSample Specification: {sample_spec}\n"
-            
-            channel_map = source_data.get('channel_map', 'Unknown')
-            info += f"Channel Map: {channel_map}\n"
-            
-            latency = source_data.get('latency', 'Unknown')
-            info += f"Latency: {latency}\n"
-            
-            # Get buffer/quantum info from properties
-            properties = source_data.get('properties', {})
-            quantum_limit = properties.get('clock.quantum-limit', 'N/A')
-            info += f"Buffer Quantum Limit: {quantum_limit}\n"
-            
-            # Status info
-            mute = source_data.get('mute', 'Unknown')
-            info += f"\nMute: {mute}\n"
-            volume = source_data.get('volume', 'Unknown')
-            if volume != 'Unknown' and len(volume) < 100:  # Don't show if too long
-                info += f"Volume: {volume}\n"
-            
-            # Monitor info for sources
-            monitor_of = source_data.get('monitor_of_sink', 'N/A')
-            if monitor_of != 'N/A':
-                info += f"Monitor of Sink: {monitor_of}\n"
-            
-            return info
+        items = []
+        while item and len(items) < PREFETCH_MAX_ROWS and tree.bbox(item):
+            items.append(item)
+            if tree.item(item, 'open') and tree.get_children(item):
+                item = tree.get_children(item)[0]
+                continue
+            while item and not tree.next(item):
+                item = tree.parent(item)
+            item = tree.next(item) if item else ''
+        return items
 
     def unload_selected_from_tree(self):
         """Unload the selected module from the unified tree view."""
@@ -1491,12 +1633,14 @@ class MainWindow:
         ):
             return
         
-        self.status_var.set(f"Unloading module #{module_id}...")
-        self.root.update()
-        
-        # Unload the module
-        success = PactlRunner.unload_module(str(module_id), logger=self.add_output)
+        def unload(logger, cancel_event):
+            return self.runner.unload_module(str(module_id), logger=logger)
         
+        self._start_action(f"Unloading module #{module_id}...", unload,
+                           lambda success: self._finish_unload_module(success, module_id))
+
+    def _finish_unload_module(self, success, module_id):
+        """Report the result of unloading a module and refresh."""
         if success:
             self.add_output(f"Unloaded module #{module_id}")
             self.status_var.set(f"Unloaded module #{module_id}")
@@ -1507,6 +1651,57 @@ class MainWindow:
             self.status_var.set("Error unloading module")
             messagebox.showerror("Error", f"Failed to unload module #{module_id}")
 
+    def _start_action(self, status, work, on_done):
+        """
+        Run a blocking action on a worker thread, as refresh_all_views does
+        for the state, so the window stays responsive while it runs.
+        
+        Args:
+            status: Status bar text while the action runs
+            work: Called on the worker thread with a logger and the cancel
+                event that on_close sets; returns the action's result
+            on_done: Called on the Tk thread with the result
+        
+        Returns:
+            False if another action is still running and this one was not started
+        """
+        if self._action is not None:
+            self.status_var.set("Wait for the running action to finish")
+            return False
+        
+        log_lines = deque()
+        results = {}
+        
+        def run():
+            try:
+                results['value'] = work(log_lines.append, self._action_cancel)
+            except Exception as e:
+                results['error'] = e
+        
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self._action = (thread, log_lines, results, on_done)
+        self.status_var.set(status)
+        self.root.after(10, self._finish_action)
+        return True
+
+    def _finish_action(self):
+        """Show the action's output as it comes, and its result once it has finished."""
+        thread, log_lines, results, on_done = self._action
+        while log_lines:
+            self.add_output(log_lines.popleft())
+        if thread.is_alive():
+            self.root.after(10, self._finish_action)
+            return
+        
+        self._action = None
+        if 'error' in results:
+            self.add_output(f"Error: {results['error']}")
+            self.status_var.set("Error")
+            messagebox.showerror("Error", str(results['error']))
+            return
+        on_done(results['value'])
+
     def unload_all_null_sinks(self):
         """Unload all null sink modules."""
         # Confirm with the user
@@ -1517,11 +1712,12 @@ class MainWindow:
         ):
             return
         
-        self.status_var.set("Removing all null sinks...")
-        self.root.update()
-        
-        # Unload all null sinks
-        count, errors = PactlRunner.unload_all_null_sinks(logger=self.add_output)
+        self._start_action("Removing all null sinks...", self.runner.unload_all_null_sinks,
+                           self._finish_unload_all_null_sinks)
+
+    def _finish_unload_all_null_sinks(self, result):
+        """Report the result of unload_all_null_sinks and refresh."""
+        count, errors = result
         
         # Update UI with results
         if count > 0:
@@ -1549,36 +1745,43 @@ class MainWindow:
         os.makedirs("presets", exist_ok=True)
         
         # Ask for preset name
+        from tkinter import filedialog
         filename = filedialog.asksaveasfilename(
             initialdir="presets",
             title="Save Preset",
-            filetypes=(("JSON files", "*.json"), ("All files", "*.*")),
+            filetypes=(
+                ("Snapshot files", "*.json"),
+                ("Compressed snapshot files", "*.json.gz *.json.zst"),
+                ("All files", "*.*")
+            ),
             defaultextension=".json"
         )
         
         if not filename:
             return  # User canceled
         
-        self.status_var.set("Saving preset...")
-        self.root.update()
-        
-        # Get current configuration
-        sinks = PactlRunner.list_sinks(logger=self.add_output)
-        sources = PactlRunner.list_sources(logger=self.add_output)
-        modules = PactlRunner.list_modules(logger=self.add_output)
+        def list_state(logger, cancel_event):
+            # Listings are bounded by their deadlines, and on_close kills them;
+            # a failed one is reported by _finish_action instead of saving an
+            # empty preset
+            return (self.runner.list_sinks(logger=logger, raise_errors=True),
+                    self.runner.list_sources(logger=logger, raise_errors=True),
+                    self.runner.list_modules(logger=logger, raise_errors=True))
         
+        self._start_action("Saving preset...", list_state,
+                           lambda state: self._write_preset(filename, *state))
+
+    def _write_preset(self, filename, sinks, sources, modules):
+        """Save the listed configuration as a preset file."""
         # Create preset data
-        preset_data = {
-            "sinks": sinks,
-            "sources": sources,
-            "modules": modules,
-            "name": os.path.basename(filename).replace(".json", ""),
-            "created": "TODO: Add timestamp"  # Would add datetime.now().isoformat() in a real implementation
-        }
+        preset_name = os.path.basename(filename)
+        for extension in (".gz", ".zst", ".json"):
+            if preset_name.endswith(extension):
+                preset_name = preset_name[:-len(extension)]
+        preset_data = SnapshotFormat.new_snapshot(sinks, sources, modules, name=preset_name)
         
         try:
-            with open(filename, 'w') as f:
-                json.dump(preset_data, f, indent=2)
+            SnapshotFormat.save(filename, preset_data)
             
             self.add_output(f"Saved preset to {filename}")
             self.status_var.set(f"Saved preset to {filename}")
@@ -1588,12 +1791,98 @@ class MainWindow:
             messagebox.showerror("Error", f"Failed to save preset: {str(e)}")
 
     def load_preset(self):
-        """Load a saved preset."""
-        messagebox.showinfo(
-            "Info", 
-            "Preset loading is not yet implemented in this version."
+        """Load a saved preset and restore its virtual devices."""
+        from tkinter import filedialog
+        filename = filedialog.askopenfilename(
+            initialdir="presets",
+            title="Load Preset",
+            filetypes=(
+                ("Snapshot files", "*.json *.json.gz *.json.zst"),
+                ("All files", "*.*")
+            )
+        )
+
+        if not filename:
+            return  # User canceled
+
+        try:
+            snapshot = SnapshotFormat.load(filename)
+        except (ValueError, IOError, OSError) as e:
+            self.add_output(f"Error loading preset: {str(e)}")
+            self.status_var.set("Error loading preset")
+            messagebox.showerror("Error", f"Failed to load preset: {str(e)}")
+            return
+
+        if not isinstance(snapshot, dict) or not isinstance(snapshot.get('modules'), list):
+            messagebox.showerror("Error", "Invalid preset file: no module list found")
+            return
+
+        def list_modules(logger, cancel_event):
+            try:
+                return self.runner.list_modules(logger=logger, raise_errors=True)
+            except PactlError as e:
+                return e
+
+        self._start_action("Comparing preset with current configuration...", list_modules,
+                           lambda live_modules: self._plan_preset(filename, snapshot, live_modules))
+
+    def _plan_preset(self, filename, snapshot, live_modules):
+        """Compare a preset with the live modules, confirm removals and apply the plan."""
+        # Plan against the live server, matching virtual devices by name; a
+        # failed listing would otherwise recreate every device in the preset
+        if isinstance(live_modules, PactlError):
+            self.add_output(f"Could not read the current configuration: {live_modules}")
+            self.status_var.set("Preset not loaded")
+            messagebox.showerror("Error", "Could not read the current configuration; nothing was changed."
+                                          f"\n\n{live_modules}")
+            return
+        plan = SnapshotRestorer.plan_restore(snapshot, live_modules, remove_extras=True)
+
+        remove_extras = False
+        if plan['remove']:
+            extra_names = ", ".join(entry['name'] for entry in plan['remove'])
+            remove_extras = messagebox.askyesno(
+                "Remove Extra Devices",
+                f"{len(plan['remove'])} virtual device(s) are not part of this preset:\n"
+                f"{extra_names}\n\nRemove them?"
+            )
+        if not remove_extras:
+            plan['remove'] = []
+
+        if not plan['create'] and not plan['remove']:
+            self.add_output(f"Preset {filename} already matches the current configuration")
+            self.status_var.set("Preset already applied")
+            messagebox.showinfo("Info", "All virtual devices from this preset are already present.")
+            return
+
+        def apply(logger, cancel_event):
+            # The daemon applies the plan itself so other clients cannot interleave writes
+            if self.daemon:
+                return self.daemon.apply_plan(plan, logger=logger)
+            return SnapshotRestorer.apply_plan(plan, logger=logger, backend=self.runner)
+
+        self._start_action(
+            f"Restoring preset: creating {len(plan['create'])}, removing {len(plan['remove'])}...",
+            apply, lambda result: self._finish_load_preset(filename, plan, *result)
+        )
+
+    def _finish_load_preset(self, filename, plan, count, errors):
+        """Report the result of restoring a preset and refresh."""
+        self.add_output(
+            f"Restored preset {filename}: {len(plan['create'])} created, "
+            f"{len(plan['keep'])} unchanged, {len(plan['remove'])} removed"
         )
 
+        if errors:
+            error_msg = "\n".join(errors)
+            self.add_output(f"Errors occurred:\n{error_msg}")
+            self.status_var.set(f"Restored preset with {len(errors)} error(s)")
+            messagebox.showerror("Error", f"Some errors occurred:\n{error_msg}")
+        else:
+            self.status_var.set(f"Restored preset ({count} change(s) applied)")
+
+        self.refresh_all_views()
+
     def show_about(self):
         """Show the about dialog."""
         messagebox.showinfo(
@@ -1686,56 +1975,6 @@ class MainWindow:
         # Update command preview
         self.update_command_preview()
 
-    def _extract_device_name(self, module_name, module_args):
-        """
-        Extract a human-readable name from module information.
-        
-        Args:
-            module_name: The name of the module (e.g., 'module-null-sink')
-            module_args: The module's arguments string
-            
-        Returns:
-            A human-readable description of the device
-        """
-        # For null sinks, get the sink name
-        if 'null-sink' in module_name:
-            import re
-            sink_match = re.search(r'sink_name=([a-zA-Z0-9_.-]+)', module_args)
-            if sink_match:
-                sink_name = sink_match.group(1)
-                return f"Virtual Device: {sink_name}"
-            return "Virtual Audio Device"
-                
-        # For hardware devices
-        if 'alsa-card' in module_name:
-            import re
-            card_match = re.search(r'card_name=([^=\s]+)', module_args)
-            if card_match:
-                card_name = card_match.group(1).strip('"\'')
-                return f"Hardware: {card_name}"
-        
-        # For HDMI, USB, or other recognizable hardware
-        if any(hw_term in module_name for hw_term in ['hdmi', 'usb', 'bluetooth']):
-            # Make the module name more readable
-            for prefix in ['module-', 'alsa-']:
-                if module_name.startswith(prefix):
-                    module_name = module_name[len(prefix):]
-            return f"Hardware: {module_name.replace('-', ' ').title()}"
-        
-        # For bluez devices 
-        if 'bluez' in module_name:
-            import re
-            device_match = re.search(r'device=([^=\s]+)', module_args)
-            if device_match:
-                device_name = device_match.group(1).strip('"\'')
-                return f"Bluetooth: {device_name}"
-        
-        # For other modules, just make the name more readable
-        display_name = module_name.replace('module-', '')
-        display_name = display_name.replace('-', ' ').title()
-        
-        return display_name
-
     def on_audio_preset_selected(self, event):
         """Handle selection from the audio preset dropdown."""
         selected_preset = self.audio_preset_var.get()
@@ -1835,9 +2074,8 @@ class MainWindow:
         if not clean_base:
             clean_base = "custom"
         
-        # Get current sinks to check for conflicts
-        existing_sinks = PactlRunner.list_sinks()
-        existing_names = {sink.get('name', '') for sink in existing_sinks}
+        # Check for conflicts with the sinks of the last refresh
+        existing_names = self.sink_names
         
         # Check if base name is available
         if clean_base not in existing_names:
@@ -1877,11 +2115,9 @@ class MainWindow:
             valid_chars = re.sub(r'[^a-zA-Z0-9_-]', '', clean_name)
             return False, valid_chars, f"Sink name can only contain letters, numbers, hyphens, and underscores.\nSuggested name: {valid_chars}"
         
-        # Check for conflicts
-        existing_sinks = PactlRunner.list_sinks()
-        existing_names = {sink.get('name', '') for sink in existing_sinks}
-        
-        if clean_name in existing_names:
+        # Check for conflicts with the sinks of the last refresh; listing them
+        # here would block the window on the server
+        if clean_name in self.sink_names:
             # Suggest an available name
             suggested_name = self._get_available_name(clean_name)
             return False, suggested_name, f"Name '{clean_name}' already exists.\nSuggested name: {suggested_name}"
@@ -1953,6 +2189,10 @@ class MainWindow:
         selected_tab = self.tab_control.select()
         tab_text = self.tab_control.tab(selected_tab, "text")
         
+        # Build deferred tabs on first visit; a new tab starts in its initial state
+        if self._ensure_tab_built(selected_tab):
+            return
+        
         # If switching to Create tab, refresh the placeholder state
         if tab_text == "Create":
             self.refresh_create_tab_state()
@@ -2090,634 +2330,3 @@ class MainWindow:
             self.status_var.set("Showing monitor sources under parent devices")
         else:
             self.status_var.set("Monitor sources hidden")
-
-    def _detect_device_type(self, sink_data=None, source_data=None, module_data=None):
-        """
-        Detect the hardware device type based on module, sink, or source data.
-        Updated for PipeWire compatibility.
-        
-        Returns: One of 'builtin', 'usb', 'bluetooth', 'hdmi', 'unknown'
-        """
-        # Combine all available data for analysis
-        all_data = []
-        if module_data:
-            all_data.append(module_data)
-        if sink_data:
-            all_data.append(sink_data)
-        if source_data:
-            all_data.append(source_data)
-        
-        # Check properties from all sources
-        for data in all_data:
-            if not data:
-                continue
-            
-            # Check device name first (PipeWire pattern)
-            name = data.get('name', '').lower()
-            
-            # PipeWire ALSA device patterns
-            if 'alsa_output.usb-' in name or 'alsa_input.usb-' in name:
-                return 'usb'
-            if 'alsa_output.pci-' in name or 'alsa_input.pci-' in name:
-                # Determine if PCI device is HDMI/GPU or built-in audio
-                properties = data.get('properties', {})
-                device_desc = properties.get('device.description', '').lower()
-                if any(gpu in device_desc for gpu in ['nvidia', 'amd', 'radeon', 'intel hd', 'hdmi']):
-                    return 'hdmi'
-                else:
-                    return 'builtin'
-            if 'bluez' in name or 'bluetooth' in name:
-                return 'bluetooth'
-                
-            # Traditional PulseAudio module name patterns
-            if any(term in name for term in ['usb', 'usb-audio']):
-                return 'usb'
-            if any(term in name for term in ['bluez', 'bluetooth']):
-                return 'bluetooth'
-            if any(term in name for term in ['hdmi', 'displayport']):
-                return 'hdmi'
-            
-            # Check properties
-            properties = data.get('properties', {})
-            
-            # USB detection
-            if properties.get('device.bus') == 'usb':
-                return 'usb'
-            if 'usb' in properties.get('device.api', '').lower():
-                return 'usb'
-            
-            # Bluetooth detection
-            if properties.get('device.api') == 'bluez5':
-                return 'bluetooth'
-            if 'bluetooth' in properties.get('device.description', '').lower():
-                return 'bluetooth'
-            
-            # HDMI/DisplayPort detection
-            if any(term in properties.get('device.description', '').lower() 
-                   for term in ['hdmi', 'displayport', 'dp']):
-                return 'hdmi'
-            if 'nvidia' in properties.get('device.description', '').lower():
-                return 'hdmi'  # NVIDIA cards typically provide HDMI audio
-            
-            # PCI/Built-in detection
-            if properties.get('device.bus') == 'pci':
-                # Check if it's GPU audio (HDMI) or built-in audio
-                description = properties.get('device.description', '').lower()
-                if any(gpu in description for gpu in ['nvidia', 'amd', 'intel hd', 'radeon']):
-                    return 'hdmi'
-                else:
-                    return 'builtin'
-        
-        # Default to built-in for unidentified hardware
-        return 'builtin'
-
-    def _categorize_hardware_devices(self, modules, sinks, sources):
-        """
-        Categorize hardware devices by connection type and group individual devices.
-        Updated for PipeWire compatibility - works with direct device names instead of card modules.
-        
-        Returns: Dictionary with categories as keys and device groups as values.
-        """
-        categories = {
-            'builtin': [],
-            'usb': [],
-            'bluetooth': [],
-            'hdmi': []
-        }
-        
-        # Track processed devices to avoid duplicates
-        processed_sinks = set()
-        processed_sources = set()
-        processed_modules = set()
-        
-        # Create device groups by parsing PipeWire device names
-        device_groups = {}  # Maps device identifier to device info
-        
-        # Process all sinks to identify hardware devices
-        for sink in sinks:
-            sink_name = sink.get('name', '')
-            sink_id = sink.get('id', '')
-            
-            # Skip virtual device sinks
-            if any(virtual_name in sink_name for virtual_name in ['test', 'voip']):
-                continue
-            
-            # Skip monitor sources in this pass
-            if '.monitor' in sink_name:
-                continue
-            
-            # Parse hardware device info from sink name
-            device_info = self._extract_hardware_device_info_from_name(sink_name, sink)
-            if device_info:
-                device_key = device_info['device_key']
-                
-                # Initialize device group if not exists
-                if device_key not in device_groups:
-                    device_groups[device_key] = {
-                        'device_info': device_info,
-                        'modules': [],
-                        'sinks': [],
-                        'sources': []
-                    }
-                
-                device_groups[device_key]['sinks'].append(sink)
-                processed_sinks.add(sink_id)
-        
-        # Process all sources to match them to existing device groups
-        for source in sources:
-            source_name = source.get('name', '')
-            source_id = source.get('id', '')
-            
-            # Skip virtual device sources
-            if any(virtual_name in source_name for virtual_name in ['test', 'voip']):
-                continue
-            
-            # Handle monitor sources based on checkbox
-            if '.monitor' in source_name and not self.show_monitors_var.get():
-                continue
-            
-            # Parse device info from source name
-            device_info = self._extract_hardware_device_info_from_name(source_name, source)
-            if device_info:
-                device_key = device_info['device_key']
-                
-                # Initialize device group if not exists (for input-only devices)
-                if device_key not in device_groups:
-                    device_groups[device_key] = {
-                        'device_info': device_info,
-                        'modules': [],
-                        'sinks': [],
-                        'sources': []
-                    }
-                
-                device_groups[device_key]['sources'].append(source)
-                processed_sources.add(source_id)
-        
-        # Handle remaining hardware modules (for PipeWire compatibility)
-        for module in modules:
-            module_id = module.get('id', '')
-            module_name = module.get('name', '')
-            
-            if module_id in processed_modules:
-                continue
-                
-            # Skip virtual device modules
-            if 'null-sink' in module_name:
-                continue
-                
-            # Only include relevant hardware modules
-            if any(hw_term in module_name.lower() 
-                  for hw_term in ['alsa', 'bluetooth', 'bluez', 'usb', 'hdmi']):
-                
-                device_info = self._extract_hardware_device_info(module)
-                if device_info:
-                    device_key = device_info['device_key']
-                    
-                    # Try to match to existing device group first
-                    matched = False
-                    for existing_key, existing_group in device_groups.items():
-                        if self._devices_match(device_info, existing_group['device_info']):
-                            existing_group['modules'].append(module)
-                            matched = True
-                            break
-                    
-                    # Create new group if no match
-                    if not matched:
-                        device_groups[device_key] = {
-                            'device_info': device_info,
-                            'modules': [module],
-                            'sinks': [],
-                            'sources': []
-                        }
-                
-                processed_modules.add(module_id)
-        
-        # Process orphaned sinks/sources (those not matched to any device)
-        for sink in sinks:
-            if sink.get('id') not in processed_sinks:
-                sink_name = sink.get('name', '')
-                if any(virtual_name in sink_name for virtual_name in ['test', 'voip']):
-                    continue
-                    
-                device_type = self._detect_device_type(sink_data=sink)
-                device_entry = {
-                    'type': 'orphaned_sink',
-                    'sink': sink
-                }
-                categories[device_type].append(device_entry)
-        
-        for source in sources:
-            if source.get('id') not in processed_sources:
-                source_name = source.get('name', '')
-                if any(virtual_name in source_name for virtual_name in ['test', 'voip']):
-                    continue
-                if '.monitor' in source_name and not self.show_monitors_var.get():
-                    continue
-                    
-                device_type = self._detect_device_type(source_data=source)
-                device_entry = {
-                    'type': 'orphaned_source', 
-                    'source': source
-                }
-                categories[device_type].append(device_entry)
-        
-        # Finally, categorize the complete device groups
-        for device_key, device_group in device_groups.items():
-            device_info = device_group['device_info']
-            device_type = device_info['device_type']
-            
-            device_entry = {
-                'type': 'hardware_device_group',
-                'device_info': device_info,
-                'modules': device_group['modules'],
-                'sinks': device_group['sinks'],
-                'sources': device_group['sources']
-            }
-            
-            categories[device_type].append(device_entry)
-        
-        return categories
-
-    def _extract_hardware_device_info(self, module_or_device):
-        """Extract device information for hardware device identification."""
-        properties = module_or_device.get('properties', {})
-        module_name = module_or_device.get('name', '')
-        module_args = module_or_device.get('argument', '')
-        
-        # Get device description - primary identifier
-        device_description = (
-            properties.get('device.description', '') or
-            properties.get('alsa.card_name', '') or
-            module_or_device.get('description', '')
-        )
-        
-        # Get card name from module arguments if available
-        if 'card=' in module_args:
-            import re
-            card_match = re.search(r'card=([^=\s]+)', module_args)
-            if card_match:
-                card_name = card_match.group(1).strip('"\'')
-                if not device_description:
-                    device_description = card_name
-        
-        # Fall back to module name if no description
-        if not device_description:
-            device_description = module_name.replace('module-', '').replace('-', ' ').title()
-        
-        # Determine device type
-        device_type = self._detect_device_type(module_data=module_or_device)
-        
-        # Create unique device key for grouping
-        # Use device.string if available, otherwise device description + bus info
-        device_string = properties.get('device.string', '')
-        if device_string:
-            device_key = device_string
-        else:
-            bus_info = properties.get('device.bus', 'unknown')
-            device_key = f"{device_description}_{bus_info}_{device_type}"
-        
-        return {
-            'device_key': device_key,
-            'device_type': device_type,
-            'device_name': device_description,
-            'device_string': device_string,
-            'properties': properties
-        }
-
-    def _match_sink_to_device(self, sink, device_groups):
-        """Match a sink to an existing hardware device group."""
-        sink_properties = sink.get('properties', {})
-        sink_device_string = sink_properties.get('device.string', '')
-        
-        # Try to match by device.string first (most reliable)
-        if sink_device_string:
-            for device_key, device_group in device_groups.items():
-                if device_group['device_info']['device_string'] == sink_device_string:
-                    return device_key
-        
-        # Try to match by device description
-        sink_desc = sink.get('description', '')
-        for device_key, device_group in device_groups.items():
-            device_name = device_group['device_info']['device_name']
-            # Check if sink description contains device name or vice versa
-            if device_name in sink_desc or sink_desc in device_name:
-                return device_key
-        
-        # Try to match by owner module
-        sink_owner_module = sink.get('owner_module', '')
-        if sink_owner_module:
-            for device_key, device_group in device_groups.items():
-                for module in device_group['modules']:
-                    if str(module.get('id', '')) == str(sink_owner_module):
-                        return device_key
-        
-        return None
-
-    def _match_source_to_device(self, source, device_groups):
-        """Match a source to an existing hardware device group."""
-        source_properties = source.get('properties', {})
-        source_device_string = source_properties.get('device.string', '')
-        
-        # Try to match by device.string first (most reliable)
-        if source_device_string:
-            for device_key, device_group in device_groups.items():
-                if device_group['device_info']['device_string'] == source_device_string:
-                    return device_key
-        
-        # Try to match by device description
-        source_desc = source.get('description', '')
-        for device_key, device_group in device_groups.items():
-            device_name = device_group['device_info']['device_name']
-            # Check if source description contains device name or vice versa
-            if device_name in source_desc or source_desc in device_name:
-                return device_key
-        
-        # Try to match by owner module
-        source_owner_module = source.get('owner_module', '')
-        if source_owner_module:
-            for device_key, device_group in device_groups.items():
-                for module in device_group['modules']:
-                    if str(module.get('id', '')) == str(source_owner_module):
-                        return device_key
-        
-        return None
-
-    def _generate_hardware_device_group_summary(self, device_name, tree_item_id):
-        """Generate comprehensive summary for hardware device groups."""
-        children = self.unified_tree.get_children(tree_item_id)
-        
-        # Collect information from child components
-        module_info = None
-        sink_info = None
-        source_info = None
-        
-        for child in children:
-            child_item = self.unified_tree.item(child)
-            child_values = child_item.get('values', [])
-            if len(child_values) >= 3:
-                child_id, child_type, child_name = child_values
-                
-                if child_type == "module":
-                    # Get module details
-                    modules = PactlRunner.list_modules()
-                    for mod in modules:
-                        if str(mod.get('id', '')) == str(child_id):
-                            module_info = mod
-                            break
-                            
-                elif child_type == "sink":
-                    # Get sink details  
-                    sinks = PactlRunner.list_sinks()
-                    for sink in sinks:
-                        if str(sink.get('id', '')) == str(child_id):
-                            sink_info = sink
-                            break
-                            
-                elif child_type == "source":
-                    # Get source details
-                    sources = PactlRunner.list_sources()
-                    for source in sources:
-                        if str(source.get('id', '')) == str(child_id):
-                            source_info = source
-                            break
-        
-        if self.show_all_details_var.get():
-            # Full details view - show all component information
-            info = f"Hardware Device: {device_name}\n"
-            info += f"{'='*50}\n\n"
-            
-            if module_info:
-                info += f"MODULE DETAILS:\n"
-                info += f"ID: {module_info.get('id', 'Unknown')}\n"
-                info += f"Name: {module_info.get('name', 'Unknown')}\n"
-                info += f"Arguments: {module_info.get('argument', 'None')}\n"
-                
-                # Add module properties if available
-                module_properties = module_info.get('properties', {})
-                if module_properties:
-                    info += f"Module Properties:\n"
-                    for prop_key, prop_value in module_properties.items():
-                        info += f"  {prop_key} = {prop_value}\n"
-                info += "\n"
-            
-            if sink_info:
-                info += f"SINK (OUTPUT) DETAILS:\n"
-                for key, value in sink_info.items():
-                    if key not in ['id', 'name']:
-                        if key == 'properties' and isinstance(value, dict):
-                            info += f"Sink Properties:\n"
-                            for prop_key, prop_value in value.items():
-                                info += f"  {prop_key} = {prop_value}\n"
-                        else:
-                            info += f"{key}: {value}\n"
-                info += "\n"
-            
-            if source_info:
-                info += f"SOURCE (INPUT) DETAILS:\n"
-                for key, value in source_info.items():
-                    if key not in ['id', 'name']:
-                        if key == 'properties' and isinstance(value, dict):
-                            info += f"Source Properties:\n"
-                            for prop_key, prop_value in value.items():
-                                info += f"  {prop_key} = {prop_value}\n"
-                        else:
-                            info += f"{key}: {value}\n"
-            
-            return info
-        else:
-            # Summary view - hardware device specifications
-            info = f"Hardware Device: {device_name}\n"
-            
-            # Device overview
-            component_count = len(children)
-            info += f"Components: {component_count}\n"
-            
-            # Get device information from the best available source
-            device_info = sink_info or source_info or module_info
-            if device_info:
-                state = device_info.get('state', 'Unknown')
-                info += f"State: {state}\n"
-                
-                driver = device_info.get('driver', 'Unknown')
-                info += f"Driver: {driver}\n"
-                
-                # Hardware device properties
-                properties = device_info.get('properties', {})
-                
-                # Device identification and connection info
-                device_class = properties.get('device.class', 'Unknown')
-                if device_class != 'Unknown':
-                    info += f"Device Class: {device_class}\n"
-                
-                device_api = properties.get('device.api', 'Unknown')
-                if device_api != 'Unknown':
-                    info += f"API: {device_api}\n"
-                
-                # Connection info
-                device_bus = properties.get('device.bus', 'Unknown')
-                if device_bus != 'Unknown':
-                    info += f"Connection: {device_bus.upper()}\n"
-                
-                # Vendor/Product information
-                vendor_name = properties.get('device.vendor.name', '')
-                product_name = properties.get('device.product.name', '')
-                if vendor_name and product_name:
-                    info += f"Manufacturer: {vendor_name}\n"
-                    info += f"Product: {product_name}\n"
-                elif vendor_name:
-                    info += f"Vendor: {vendor_name}\n"
-                
-                # Hardware ID information
-                vendor_id = properties.get('device.vendor.id', '')
-                product_id = properties.get('device.product.id', '')
-                if vendor_id and product_id:
-                    info += f"Hardware ID: {vendor_id}:{product_id}\n"
-                
-                # Audio Engineering Essentials
-                sample_spec = device_info.get('sample_spec', 'Unknown')
-                if sample_spec != 'Unknown':
-                    info += f"\nAudio Specification: {sample_spec}\n"
-                
-                channel_map = device_info.get('channel_map', 'Unknown')
-                if channel_map != 'Unknown':
-                    info += f"Channel Layout: {channel_map}\n"
-                
-                latency = device_info.get('latency', 'Unknown')
-                if latency != 'Unknown':
-                    info += f"Latency: {latency}\n"
-                
-                # Buffer settings from properties
-                quantum_limit = properties.get('clock.quantum-limit', 'N/A')
-                if quantum_limit != 'N/A':
-                    info += f"Buffer Quantum Limit: {quantum_limit}\n"
-                
-                # Volume and mute status
-                mute = device_info.get('mute', 'Unknown')
-                if mute != 'Unknown':
-                    info += f"\nMute: {mute}\n"
-                
-                volume = device_info.get('volume', 'Unknown')
-                if volume != 'Unknown' and len(str(volume)) < 100:
-                    info += f"Volume: {volume}\n"
-            
-            # Usage instructions for hardware devices
-            info += f"\nHardware Device:\n"
-            info += f"• Physical audio device connected to system\n"
-            if sink_info:
-                info += f"• Applications can play audio through this device\n"
-            if source_info and '.monitor' not in source_info.get('name', ''):
-                info += f"• Can record audio from this device\n"
-            if module_info and 'card' in module_info.get('name', ''):
-                info += f"• Select module component to unload device driver\n"
-            else:
-                info += f"• Hardware managed by system audio drivers\n"
-            
-            return info
-
-    def _extract_hardware_device_info_from_name(self, device_name, device_data):
-        """
-        Extract device information from PipeWire device names.
-        
-        Examples:
-        - alsa_output.usb-BOSS_GCS-8-01.pro-output-0 -> Device: BOSS GCS-8
-        - alsa_input.usb-BEHRINGER_UMC404HD_192k-00.pro-input-0 -> Device: BEHRINGER UMC404HD
-        - alsa_output.pci-0000_01_00.1.hdmi-stereo -> Device: GPU HDMI Audio
-        """
-        if not device_name:
-            return None
-        
-        # Parse PipeWire ALSA device naming patterns
-        if device_name.startswith('alsa_'):
-            # Extract connection type and device identifier
-            parts = device_name.split('.')
-            if len(parts) >= 2:
-                connection_part = parts[1]  # e.g., "usb-BOSS_GCS-8-01" or "pci-0000_01_00"
-                
-                # Determine connection type
-                if connection_part.startswith('usb-'):
-                    device_type = 'usb'
-                    # Extract device name from USB identifier
-                    usb_part = connection_part[4:]  # Remove "usb-"
-                    # Parse patterns like "BOSS_GCS-8-01" or "BEHRINGER_UMC404HD_192k-00"
-                    device_identifier = usb_part.rsplit('-', 1)[0]  # Remove trailing number
-                    # Clean up device name
-                    device_name_clean = device_identifier.replace('_', ' ').replace('-', ' ')
-                    # Extract brand and model
-                    if ' ' in device_name_clean:
-                        parts = device_name_clean.split(' ', 1)
-                        brand = parts[0]
-                        model = parts[1] if len(parts) > 1 else ''
-                        device_display_name = f"{brand} {model}".strip()
-                    else:
-                        device_display_name = device_name_clean
-                    
-                elif connection_part.startswith('pci-'):
-                    # PCI devices (usually GPU HDMI or built-in audio)
-                    properties = device_data.get('properties', {})
-                    device_desc = properties.get('device.description', '')
-                    
-                    if any(gpu in device_desc.lower() for gpu in ['nvidia', 'amd', 'radeon', 'intel hd']):
-                        device_type = 'hdmi'
-                        device_display_name = device_desc or 'GPU Audio'
-                        device_identifier = connection_part
-                    else:
-                        device_type = 'builtin'
-                        device_display_name = device_desc or 'Built-in Audio'
-                        device_identifier = connection_part
-                        
-                elif connection_part.startswith('bluez-'):
-                    device_type = 'bluetooth'
-                    device_identifier = connection_part
-                    properties = device_data.get('properties', {})
-                    device_display_name = properties.get('device.description', 'Bluetooth Audio')
-                    
-                else:
-                    # Unknown connection type
-                    device_type = 'builtin'
-                    device_identifier = connection_part
-                    device_display_name = device_data.get('description', device_name)
-                
-                # Create device key for grouping (without input/output suffix)
-                device_key = f"{device_type}_{device_identifier}"
-                
-                return {
-                    'device_key': device_key,
-                    'device_type': device_type,
-                    'device_name': device_display_name,
-                    'device_identifier': device_identifier,
-                    'connection_part': connection_part,
-                    'properties': device_data.get('properties', {})
-                }
-        
-        # Fallback for non-ALSA devices
-        device_type = self._detect_device_type(sink_data=device_data if 'sink' in str(type(device_data)) else None,
-                                             source_data=device_data if 'source' in str(type(device_data)) else None)
-        device_display_name = device_data.get('description', device_name)
-        
-        return {
-            'device_key': f"{device_type}_{device_name}",
-            'device_type': device_type,
-            'device_name': device_display_name,
-            'device_identifier': device_name,
-            'connection_part': device_name,
-            'properties': device_data.get('properties', {})
-        }
-
-    def _devices_match(self, device_info1, device_info2):
-        """Check if two device info objects represent the same physical device."""
-        # Primary match: same device identifier
-        if device_info1['device_identifier'] == device_info2['device_identifier']:
-            return True
-        
-        # Secondary match: same connection part (for PipeWire ALSA devices)
-        if (device_info1.get('connection_part') and device_info2.get('connection_part') and
-            device_info1['connection_part'] == device_info2['connection_part']):
-            return True
-        
-        # Tertiary match: similar device names
-        name1 = device_info1['device_name'].lower()
-        name2 = device_info2['device_name'].lower()
-        if name1 == name2:
-            return True
-        
-        return False
\ No newline at end of file
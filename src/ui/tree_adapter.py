@@ -0,0 +1,184 @@
+"""
+Renders the tree view model (utils/tree_model.py) into a ttk.Treeview.
+
+All grouping decisions are made by TreeModel; this module only turns its
+nodes into Treeview items. Each item's id is its node's key, and its values
+are (entity id, kind, name), as the Manage tab handlers expect.
+
+ChunkedTreeRenderer inserts the items of a large tree in time slices
+scheduled with after_idle, so the window keeps handling input while a
+graph with thousands of objects is shown. Items the user can see come
+first: the top level, everything under Virtual Devices, and the children
+of expanded items; the contents of collapsed items follow.
+"""
+
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+from utils.tree_model import TreeModel, VIRTUAL_DEVICES_KEY
+
+# Longest time one slice of a chunked render may insert items for
+SLICE_SECONDS = 0.008
+
+
+def node_path_level(node) -> tuple:
+    """A node's level in a tree item path: its kind, and its name or, without one, its text."""
+    return (node.kind, node.name or node.text)
+
+
+class TreeviewAdapter:
+    """
+    Show TreeNode tuples in a ttk.Treeview.
+    """
+
+    @staticmethod
+    def insert(tree, parent_key: str, node, open: Optional[bool] = None, extra_tags: tuple = ()):
+        """Insert one node as the last child of parent_key (without its children)."""
+        tree.insert(
+            parent_key, "end",
+            iid=node.key,
+            text=node.text,
+            values=(node.entity_id, node.kind, node.name),
+            tags=node.tags + extra_tags,
+            open=node.open if open is None else open
+        )
+
+    @staticmethod
+    def render(tree, nodes):
+        """Replace every item in the tree with the nodes."""
+        children = tree.get_children()
+        if children:
+            tree.delete(*children)
+        for parent_key, node in TreeModel.walk(nodes):
+            TreeviewAdapter.insert(tree, parent_key, node)
+
+    @staticmethod
+    def insertion_order(nodes, expanded: Optional[set] = None) -> list:
+        """
+        Order the nodes for a chunked render: every parent before its
+        children, the children of one parent together and in order, and the
+        visible items before the contents of collapsed ones.
+
+        Args:
+            expanded: Paths (tuples of node_path_level()) of the items to
+                expand; None keeps each node's own open flag
+
+        Returns:
+            A list of (parent key, node, open, path) tuples
+        """
+        order = []
+        visible = deque([('', nodes, (), True)])
+        hidden = deque()
+        while visible or hidden:
+            parent_key, children, parent_path, shown = (visible or hidden).popleft()
+            for node in children:
+                path = parent_path + (node_path_level(node),)
+                is_open = node.open if expanded is None or not node.children else path in expanded
+                order.append((parent_key, node, is_open, path))
+                if node.children:
+                    # Virtual Devices are rendered in full before anything that is collapsed
+                    child_shown = shown and (is_open or node.key == VIRTUAL_DEVICES_KEY
+                                             or parent_key.startswith(VIRTUAL_DEVICES_KEY))
+                    (visible if child_shown else hidden).append((node.key, node.children, path, child_shown))
+        return order
+
+
+class ChunkedTreeRenderer:
+    """
+    Replaces the items of a Treeview with tree model nodes, a slice of at
+    most SLICE_SECONDS at a time.
+
+    The first slice runs in render() itself, so a small tree is complete
+    when it returns; the rest run from after_idle callbacks, between which
+    Tk handles pending input and redraws. Starting a new render cancels the
+    one in progress.
+    """
+
+    def __init__(self, root, tree, on_progress: Optional[Callable[[int, int], None]] = None):
+        """
+        Args:
+            on_progress: Called with (items inserted, total items) after each
+                deferred slice, last with both equal
+        """
+        self.root = root
+        self.tree = tree
+        self.on_progress = on_progress
+        # Paths of the items the render in progress expands, as lists of [kind, name] levels
+        self.expanded = None
+        # Tags added to every item of the render in progress
+        self.extra_tags = ()
+        self._pending = deque()
+        self._total = 0
+        self._on_done = None
+        self._after_id = None
+
+    @property
+    def busy(self) -> bool:
+        """True while items of the last render are still to be inserted."""
+        return bool(self._pending)
+
+    def render(self, nodes, expanded: Optional[List[list]] = None, extra_tags: tuple = (),
+               on_done: Optional[Callable[[], None]] = None):
+        """
+        Start replacing the tree's items with the nodes.
+
+        Args:
+            expanded: Paths of the items to expand, as lists of [kind, name]
+                levels; None keeps each node's own open flag
+            extra_tags: Tags added to every item
+            on_done: Called once every item has been inserted
+        """
+        self.cancel()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+
+        wanted = None if expanded is None else {tuple(tuple(level) for level in path) for path in expanded}
+        order = TreeviewAdapter.insertion_order(nodes, wanted)
+        self.expanded = [[list(level) for level in path] for _, node, is_open, path in order
+                         if is_open and node.children]
+        self._pending = deque(order)
+        self._total = len(self._pending)
+        self.extra_tags = tuple(extra_tags)
+        self._on_done = on_done
+        self._insert_slice()
+        if self._pending:
+            self._after_id = self.root.after_idle(self._next_slice)
+        else:
+            self._finish()
+
+    def cancel(self):
+        """Stop the render in progress, leaving the items inserted so far."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._pending = deque()
+        self._on_done = None
+
+    def _insert_slice(self):
+        """Insert pending items until they run out or the slice's time is up."""
+        deadline = time.perf_counter() + SLICE_SECONDS
+        pending = self._pending
+        tree, extra_tags = self.tree, self.extra_tags
+        while pending:
+            parent_key, node, is_open, _ = pending.popleft()
+            TreeviewAdapter.insert(tree, parent_key, node, is_open, extra_tags)
+            if time.perf_counter() >= deadline:
+                break
+
+    def _next_slice(self):
+        self._after_id = None
+        self._insert_slice()
+        if self.on_progress:
+            self.on_progress(self._total - len(self._pending), self._total)
+        if self._pending:
+            self._after_id = self.root.after_idle(self._next_slice)
+        else:
+            self._finish()
+
+    def _finish(self):
+        self.expanded = None
+        on_done, self._on_done = self._on_done, None
+        if on_done:
+            on_done()
@@ -0,0 +1,125 @@
+"""
+Adaptive polling for automatic refresh without an event stream.
+
+When nothing tells the GUI that the audio server changed (restricted
+sandboxes, broken pulse-compat layers, or simply no daemon), the only way
+to stay current is to poll. AdaptivePoller keeps that cheap: the interval
+doubles every time a poll finds the same state, drops back to the minimum
+as soon as a poll finds a change or the user does something, and polling
+stops entirely while paused (e.g. minimized or unfocused).
+
+IdleMeter measures what leaving the window open costs: timer wakeups and
+process CPU time per minute.
+"""
+
+import json
+import time
+from typing import List, Dict, Any, Optional
+
+from utils.metrics import WAKEUPS
+
+# Interval after a change or a user action
+MIN_INTERVAL_SECONDS = 2.0
+
+# Interval once the state has stayed the same for a while
+MAX_INTERVAL_SECONDS = 60.0
+
+# Factor the interval grows by after every unchanged poll
+BACKOFF_FACTOR = 2.0
+
+# Record fields that change on every read without the state changing
+VOLATILE_FIELDS = ('latency',)
+
+
+def snapshot_fingerprint(modules: List[Dict[str, Any]], sinks: List[Dict[str, Any]],
+                         sources: List[Dict[str, Any]]) -> int:
+    """Identify a state so that two reads of an unchanged server compare equal."""
+    def stable(records):
+        return [{key: value for key, value in record.items() if key not in VOLATILE_FIELDS} for record in records]
+    return hash(json.dumps([stable(modules), stable(sinks), stable(sources)], sort_keys=True))
+
+
+class AdaptivePoller:
+    """
+    Decides when to poll next.
+
+    The poller only does the bookkeeping; the caller runs the timer and the
+    poll, and reports each result with observe().
+    """
+
+    def __init__(self, min_interval: float = MIN_INTERVAL_SECONDS, max_interval: float = MAX_INTERVAL_SECONDS,
+                 factor: float = BACKOFF_FACTOR):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.interval = min_interval
+        self.fingerprint = None
+        self._pause_reasons = set()
+
+    @property
+    def paused(self) -> bool:
+        return bool(self._pause_reasons)
+
+    def next_delay(self) -> Optional[float]:
+        """Seconds until the next poll, or None while paused."""
+        return None if self.paused else self.interval
+
+    def observe(self, fingerprint) -> bool:
+        """
+        Record the state found by a poll (or any other refresh).
+
+        Returns:
+            True if the state differs from the previous one
+        """
+        changed = fingerprint != self.fingerprint
+        self.fingerprint = fingerprint
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.factor, self.max_interval)
+        return changed
+
+    def poke(self):
+        """Poll at the fastest rate again, e.g. after a user action."""
+        self.interval = self.min_interval
+
+    def pause(self, reason: str):
+        self._pause_reasons.add(reason)
+
+    def resume(self, reason: str) -> bool:
+        """
+        Lift one pause reason.
+
+        Returns:
+            True if this resumed polling
+        """
+        was_paused = self.paused
+        self._pause_reasons.discard(reason)
+        return was_paused and not self.paused
+
+
+class IdleMeter:
+    """Timer wakeups and CPU time of this process since the last reset."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._started = time.monotonic()
+        self._cpu_started = time.process_time()
+        self._wakeups_started = sum(WAKEUPS.snapshot().values())
+
+    def report(self) -> Dict[str, float]:
+        """
+        Returns:
+            'minutes' measured, 'wakeups_per_minute' and 'cpu_percent' (of
+            one core) over that time
+        """
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        cpu = time.process_time() - self._cpu_started
+        wakeups = sum(WAKEUPS.snapshot().values()) - self._wakeups_started
+        return {
+            'minutes': elapsed / 60,
+            'wakeups_per_minute': wakeups * 60 / elapsed,
+            'cpu_percent': 100 * cpu / elapsed,
+        }
@@ -0,0 +1,174 @@
+"""
+The interface every audio server backend implements.
+
+The GUI, the CLI and the daemon only talk to the audio server through an
+AudioBackend, so transports can be swapped without touching them:
+
+    PactlRunner       runs pactl (and pacmd for writes); the reference
+                      implementation
+    PipeWireBackend   reads the PipeWire graph with pw-dump
+    DaemonClient      asks a running pactl-gui-daemon
+
+tools/backend_conformance.py checks a backend against this contract using
+the fake audio server in tools/, and tools/bench_backends.py compares the
+backends' latency and throughput.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import List, Dict, Any, Tuple, Optional, Callable
+
+
+# A change reported by the audio server, e.g. ('new', 'sink', '12').
+# kind is 'new', 'change' or 'remove'; facility uses pactl's names ('sink',
+# 'source', 'module', 'card', 'server', 'sink-input', ...); index is the id of
+# the affected record as a string, or '' for server-wide events.
+AudioEvent = namedtuple('AudioEvent', 'kind facility index')
+
+
+class Records(list):
+    """
+    A list of records together with a fingerprint of the raw server output
+    it was parsed from.
+
+    Two lists with the same non-None fingerprint hold the same records, so
+    a caller can compare fingerprints instead of contents. Backends return
+    the same Records object again while the output stays the same; treat it
+    as read-only.
+    """
+
+    __slots__ = ('fingerprint',)
+
+    def __init__(self, records=(), fingerprint: Optional[bytes] = None):
+        super().__init__(records)
+        self.fingerprint = fingerprint
+
+
+def fingerprint_of(records) -> Optional[bytes]:
+    """The fingerprint of a list returned by a backend, or None if it has none."""
+    return getattr(records, 'fingerprint', None)
+
+
+class Subscription:
+    """
+    A running event stream started by AudioBackend.subscribe().
+
+    The stream runs on its own thread until close() is called or its
+    process exits.
+    """
+
+    def __init__(self, process=None, thread: Optional[threading.Thread] = None,
+                 on_close: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            process: The process producing the events, terminated on close()
+            thread: The thread delivering the events
+            on_close: Called by close() instead of stopping the process and
+                thread, for streams that share them with other subscribers
+        """
+        self.process = process
+        self.thread = thread
+        self.on_close = on_close
+        self._closed = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return not self._closed.is_set() and self.thread is not None and self.thread.is_alive()
+
+    def wait(self, poll: float = 0.5):
+        """Block until the stream ends or is closed."""
+        while self.active:
+            self._closed.wait(poll)
+
+    def close(self):
+        """Stop the stream; safe to call more than once."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self.on_close is not None:
+            self.on_close()
+            return
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+
+
+class AudioBackend(ABC):
+    """
+    Lists, creates and removes audio objects and reports changes.
+
+    Records are dictionaries in the format of PactlRunner.parse_sinks,
+    parse_sources and parse_modules. Every list method takes an optional
+    logger callback and raise_errors; without raise_errors a failure returns
+    an empty list, with it a PactlError is raised. Backends that can tell
+    cheaply whether the server output changed return Records lists.
+    """
+
+    @abstractmethod
+    def list_sinks(self, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """List sinks (outputs)."""
+
+    @abstractmethod
+    def list_sources(self, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """List sources (inputs), including monitor sources."""
+
+    @abstractmethod
+    def list_modules(self, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """List loaded modules."""
+
+    @abstractmethod
+    def load_module(self, module_name: str, argument: str = '', logger=None) -> bool:
+        """Load a module with a raw argument string."""
+
+    @abstractmethod
+    def unload_module(self, module_id: str, logger=None) -> bool:
+        """Unload a module by id."""
+
+    @abstractmethod
+    def create_duplex_sink(
+        self,
+        name: str,
+        description: str,
+        channels: int = 2,
+        rate: Optional[int] = None,
+        format: Optional[str] = None,
+        channel_map: Optional[str] = None,
+        sink_properties: Optional[str] = None,
+        logger=None
+    ) -> bool:
+        """Create a duplex null sink (see PactlRunner.create_duplex_sink)."""
+
+    @abstractmethod
+    def unload_all_null_sinks(self, logger=None,
+                              cancel_event: Optional[threading.Event] = None) -> Tuple[int, List[str]]:
+        """
+        Unload every module-null-sink; returns (number unloaded, errors).
+        Setting cancel_event stops before the next module and kills a
+        running command where the backend can.
+        """
+
+    @abstractmethod
+    def set_sink_volume(self, sink: str, volume: str, logger=None) -> bool:
+        """
+        Set a sink's volume.
+
+        Args:
+            sink: Sink name or id
+            volume: A pactl volume, e.g. '50%', '+5%' or '32768'
+        """
+
+    @abstractmethod
+    def subscribe(self, on_event: Callable[[AudioEvent], None]) -> Subscription:
+        """
+        Report server changes as they happen.
+
+        on_event is called on the subscription's thread for every change.
+        """
+
+    def invalidate(self):
+        """Forget cached state so the next read asks the server again."""
+
+    def close(self):
+        """Release connections and background processes."""
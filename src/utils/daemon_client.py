@@ -0,0 +1,248 @@
+"""
+Client for the pactl-gui state daemon.
+
+DaemonClient offers the same list and write methods as PactlRunner, so the
+GUI and the CLI can use either one interchangeably. When the daemon goes
+away, calls fall back to running pactl directly.
+"""
+
+import json
+import os
+import socket
+import threading
+from typing import List, Dict, Any, Tuple, Optional
+
+from config.paths import daemon_socket_path
+from utils.audio_backend import AudioBackend, Subscription
+from utils.pactl_runner import PactlRunner
+
+
+# Set to a non-empty value to never use the daemon
+NO_DAEMON_ENV = "PACTL_GUI_NO_DAEMON"
+
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+
+class DaemonError(Exception):
+    """The daemon reported an error or sent an invalid response."""
+
+
+class DaemonUnavailableError(DaemonError):
+    """The request could not be delivered; the daemon did not act on it."""
+
+
+class DaemonClient(AudioBackend):
+    """
+    A connection to the pactl-gui daemon.
+
+    Safe to share between threads; requests on one client are sent one at
+    a time.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        """
+        Args:
+            path: Daemon socket (defaults to the standard location)
+            timeout: Seconds to wait for a response
+        """
+        self.path = path or daemon_socket_path()
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, path: Optional[str] = None) -> Optional['DaemonClient']:
+        """
+        Connect to a running daemon.
+
+        Returns:
+            A connected client, or None if no daemon is running or its use
+            is disabled with PACTL_GUI_NO_DAEMON
+        """
+        if os.environ.get(NO_DAEMON_ENV):
+            return None
+        client = cls(path)
+        try:
+            client._open()
+        except OSError:
+            return None
+        return client
+
+    def close(self):
+        """Close the connection; the next call reconnects."""
+        if self._reader is not None:
+            self._reader.close()
+        if self._socket is not None:
+            self._socket.close()
+        self._socket = None
+        self._reader = None
+
+    def _open(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self._socket = sock
+        self._reader = sock.makefile('rb')
+
+    def call(self, method: str, **params) -> Any:
+        """
+        Call a daemon method.
+
+        Raises:
+            DaemonUnavailableError: The request could not be sent
+            DaemonError: The daemon returned an error or the connection broke
+                while waiting for the response
+        """
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            request = json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+
+            try:
+                if self._socket is None:
+                    self._open()
+                self._socket.sendall(request.encode() + b'\n')
+            except OSError as e:
+                self.close()
+                raise DaemonUnavailableError(f"pactl-gui daemon unavailable: {e}") from e
+
+            try:
+                line = self._reader.readline()
+            except OSError as e:
+                self.close()
+                raise DaemonError(f"No response from pactl-gui daemon: {e}") from e
+            if not line:
+                self.close()
+                raise DaemonError("pactl-gui daemon closed the connection")
+
+        try:
+            response = json.loads(line)
+        except ValueError as e:
+            raise DaemonError("Invalid response from pactl-gui daemon") from e
+        if response.get('id') != request_id:
+            self.close()
+            raise DaemonError("Response does not match the request")
+        if 'error' in response:
+            raise DaemonError(response['error'].get('message', 'Unknown daemon error'))
+        return response.get('result')
+
+    # Reads: served from the daemon's snapshot, falling back to pactl
+
+    def get_state(self, kinds=('modules', 'sinks', 'sources')) -> Dict[str, Any]:
+        """Fetch the shared snapshot, including its version number."""
+        return self.call('get_state', kinds=list(kinds))
+
+    def get_grouping(self, show_monitors: bool = False) -> Dict[str, Any]:
+        """Fetch the precomputed device grouping (see DeviceGrouping.group_devices)."""
+        return self.call('get_grouping', show_monitors=show_monitors)
+
+    def _list(self, kind: str, fallback, logger, raise_errors: bool) -> List[Dict[str, Any]]:
+        try:
+            return self.get_state((kind,))[kind]
+        except DaemonError as e:
+            if logger:
+                logger(f"{e}; running pactl directly")
+            return fallback(logger, raise_errors)
+
+    def list_sinks(self, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        return self._list('sinks', PactlRunner.list_sinks, logger, raise_errors)
+
+    def list_sources(self, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        return self._list('sources', PactlRunner.list_sources, logger, raise_errors)
+
+    def list_modules(self, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        return self._list('modules', PactlRunner.list_modules, logger, raise_errors)
+
+    # Writes: serialized by the daemon; only retried directly if never delivered
+
+    def _write(self, method: str, params: Dict[str, Any], fallback, logger, failed=lambda message: False):
+        """
+        Run a write in the daemon, or with fallback if it never got the request.
+
+        Any other DaemonError (an error reported by the daemon, a dropped
+        connection, no response) is logged and returned as failed(message),
+        the method's failure value; the write may have been applied, so it
+        is not retried.
+        """
+        try:
+            response = self.call(method, **params)
+        except DaemonUnavailableError as e:
+            if logger:
+                logger(f"{e}; running pactl directly")
+            return fallback()
+        except DaemonError as e:
+            if logger:
+                logger(str(e))
+            return failed(str(e))
+        if logger:
+            for line in response.get('log', []):
+                logger(line)
+        return response.get('result')
+
+    def load_module(self, module_name: str, argument: str = '', logger=None) -> bool:
+        return self._write(
+            'load_module', {'module_name': module_name, 'argument': argument},
+            lambda: PactlRunner.load_module(module_name, argument, logger), logger
+        )
+
+    def unload_module(self, module_id: str, logger=None) -> bool:
+        return self._write(
+            'unload_module', {'module_id': str(module_id)},
+            lambda: PactlRunner.unload_module(module_id, logger), logger
+        )
+
+    def create_duplex_sink(
+        self,
+        name: str,
+        description: str,
+        channels: int = 2,
+        rate: Optional[int] = None,
+        format: Optional[str] = None,
+        channel_map: Optional[str] = None,
+        sink_properties: Optional[str] = None,
+        logger=None
+    ) -> bool:
+        params = {
+            'name': name, 'description': description, 'channels': channels, 'rate': rate,
+            'format': format, 'channel_map': channel_map, 'sink_properties': sink_properties,
+        }
+        return self._write(
+            'create_duplex_sink', params,
+            lambda: PactlRunner.create_duplex_sink(logger=logger, **params), logger
+        )
+
+    def unload_all_null_sinks(self, logger=None, cancel_event=None) -> Tuple[int, List[str]]:
+        # Once the daemon has the request it runs it to the end; only the
+        # pactl fallback can be cancelled
+        result = self._write(
+            'unload_all_null_sinks', {},
+            lambda: PactlRunner.unload_all_null_sinks(logger, cancel_event), logger,
+            lambda message: (0, [message])
+        )
+        return tuple(result)
+
+    def set_sink_volume(self, sink: str, volume: str, logger=None) -> bool:
+        return self._write(
+            'set_sink_volume', {'sink': str(sink), 'volume': str(volume)},
+            lambda: PactlRunner.set_sink_volume(sink, volume, logger), logger
+        )
+
+    def subscribe(self, on_event) -> Subscription:
+        """Report server changes; the daemon does not push events, so they come from pactl."""
+        return PactlRunner.subscribe(on_event)
+
+    def apply_plan(self, plan: Dict[str, List[Dict[str, Any]]], logger=None) -> Tuple[int, List[str]]:
+        """Execute a SnapshotRestorer plan inside the daemon."""
+        from utils.snapshot_restore import SnapshotRestorer
+        result = self._write(
+            'apply_plan', {'plan': plan},
+            lambda: SnapshotRestorer.apply_plan(plan, logger), logger,
+            lambda message: (0, [message])
+        )
+        return tuple(result)
@@ -0,0 +1,154 @@
+"""
+Builds details panel texts ahead of time, on worker threads.
+
+When a device group is expanded, its children are nearly always clicked
+next. DetailsPrefetcher takes DetailJob tuples for the rows in view and
+around the selection, fetches the full records behind them through the
+TieredLister (a server query if they are not held yet) and puts the texts
+in the DetailsCache, so selecting one of them shows its text at once.
+
+Every prefetch() starts a new generation: jobs of an older one that have
+not started are cancelled, and running ones stop before their next step.
+revalidate() checks a text shown from the cache against freshly fetched
+records and reports a changed text through take_results(), for the Tk
+thread to show; build() does the same for a text that was not cached, so
+the Tk thread never waits for the server.
+"""
+
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from utils.details_text import DetailsCache, DetailsText, Record
+
+# Tree item types whose details come from a full record, and the list they are in
+DETAIL_KINDS = {'module': 'modules', 'sink': 'sinks', 'source': 'sources'}
+
+# Worker threads; fetching records is mostly waiting for the server
+PREFETCH_WORKERS = 2
+
+# What the details of one tree item are built from, gathered from the tree
+# on the Tk thread so workers never touch it:
+#   item         the tree item id
+#   entity_id, entity_type, entity_name
+#                the item's values
+#   child_count  number of children the item has in the tree
+#   components   (type, id) of the records behind the item: the item itself
+#                for a module, sink or source, its children for a group
+DetailJob = namedtuple('DetailJob', 'item entity_id entity_type entity_name child_count components')
+
+
+class DetailsPrefetcher:
+    """
+    Builds details texts for DetailJob tuples on a small thread pool.
+    """
+
+    def __init__(self, listing, cache: DetailsCache, workers: int = PREFETCH_WORKERS):
+        self.listing = listing
+        self.cache = cache
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._futures = []
+        # (cache key, text) pairs from revalidate() that differ from the text shown
+        self._results = []
+        self._revalidating = 0
+
+    @staticmethod
+    def records(listing, job: DetailJob) -> Tuple[Record, ...]:
+        """
+        The full records a job's text is built from: (record,) for a module,
+        sink or source, and (module, sink, source) for a group, where each
+        is the last child of that type whose record was found, or None.
+        """
+        if job.entity_type in DETAIL_KINDS:
+            return (listing.details(DETAIL_KINDS[job.entity_type], job.entity_id),)
+        if job.entity_type not in ("device_group", "hardware_device_group"):
+            return ()
+        found = {}
+        for child_type, child_id in job.components:
+            if child_type not in DETAIL_KINDS:
+                continue
+            record = listing.details(DETAIL_KINDS[child_type], child_id)
+            if record is not None:
+                found[child_type] = record
+        return found.get('module'), found.get('sink'), found.get('source')
+
+    @property
+    def revalidating(self) -> bool:
+        """True while revalidate() jobs are running or their results are waiting."""
+        with self._lock:
+            return bool(self._revalidating or self._results)
+
+    def prefetch(self, jobs: Iterable[DetailJob], full: bool):
+        """Cancel the previous prefetch and build the texts of jobs not cached yet, in order."""
+        generation = self.cancel()
+        futures = []
+        for job in jobs:
+            key = self.cache.key(job.item, full)
+            if self.cache.peek(key) is None:
+                futures.append(self._executor.submit(self._build, job, key, full, generation))
+        with self._lock:
+            self._futures = futures
+
+    def cancel(self) -> int:
+        """Drop the jobs of the current generation and start a new one; returns its number."""
+        with self._lock:
+            self.generation += 1
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.cancel()
+        return self.generation
+
+    def revalidate(self, job: DetailJob, key: tuple, full: bool, shown: str):
+        """Build a job's text from freshly fetched records; report it if it is not the text shown."""
+        with self._lock:
+            self._revalidating += 1
+        self._executor.submit(self._revalidate, job, key, full, shown)
+
+    def build(self, job: DetailJob, key: tuple, full: bool, store: bool = True):
+        """
+        Build the text of a job that is not cached and report it through
+        take_results(); store=False leaves it out of the cache.
+        """
+        with self._lock:
+            self._revalidating += 1
+        self._executor.submit(self._revalidate, job, key, full, None, store)
+
+    def take_results(self) -> List[Tuple[tuple, str]]:
+        """The (cache key, text) pairs revalidation found changed since the last call."""
+        with self._lock:
+            results, self._results = self._results, []
+        return results
+
+    def close(self):
+        """Cancel everything; running jobs finish in the background."""
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _build(self, job: DetailJob, key: tuple, full: bool, generation: int):
+        if generation != self.generation:
+            return
+        records = self.records(self.listing, job)
+        if generation != self.generation:
+            return
+        text = DetailsText.for_item(job.entity_id, job.entity_type, job.entity_name, job.child_count,
+                                    records, full)
+        self.cache.put(key, records, text)
+
+    def _revalidate(self, job: DetailJob, key: tuple, full: bool, shown: Optional[str], store: bool = True):
+        try:
+            records = self.records(self.listing, job)
+            text = self.cache.get(key, records)
+            if text is None:
+                text = DetailsText.for_item(job.entity_id, job.entity_type, job.entity_name, job.child_count,
+                                            records, full)
+                if store:
+                    self.cache.put(key, records, text)
+            if text != shown:
+                with self._lock:
+                    self._results.append((key, text))
+        finally:
+            with self._lock:
+                self._revalidating -= 1
@@ -0,0 +1,371 @@
+"""
+Text of the Manage tab details panel, free of any GUI imports.
+
+DetailsText builds the summary or full description of a tree item from the
+records behind it; each builder appends lines to a list and joins them once.
+DetailsCache keeps the texts built so far, keyed by tree item, detail level
+and snapshot version, so moving through the tree with the arrow keys only
+builds a text the first time an item is shown.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+# Module arguments shown in the summaries
+SINK_NAME_ARGUMENT = re.compile(r'sink_name=([a-zA-Z0-9_.-]+)')
+CHANNELS_ARGUMENT = re.compile(r'channels=(\d+)')
+RATE_ARGUMENT = re.compile(r'rate=(\d+)')
+
+CHANNEL_NAMES = {1: "Mono", 2: "Stereo", 6: "5.1 Surround", 8: "7.1 Surround"}
+
+HARDWARE_CATEGORY_DESCRIPTIONS = {
+    'builtin': 'Built-in audio devices (onboard, PCI sound cards)',
+    'usb': 'USB connected audio devices',
+    'bluetooth': 'Bluetooth wireless audio devices',
+    'hdmi': 'HDMI/DisplayPort audio from graphics cards'
+}
+
+# Texts a DetailsCache keeps before dropping the least recently used
+MAX_CACHED_TEXTS = 4096
+
+Record = Optional[Dict[str, Any]]
+
+
+def _channel_description(argument: str) -> Optional[str]:
+    """'Stereo', '5.1 Surround'... for a channels= module argument, or None without one."""
+    if 'channels=' not in argument:
+        return None
+    match = CHANNELS_ARGUMENT.search(argument)
+    if not match:
+        return None
+    channels = int(match.group(1))
+    return CHANNEL_NAMES.get(channels, f"{channels}-channel")
+
+
+def _add_properties(lines: list, properties: Dict[str, Any]):
+    lines.extend(f"  {prop_key} = {prop_value}\n" for prop_key, prop_value in properties.items())
+
+
+class DetailsText:
+    """
+    Build the details panel text of each kind of tree item.
+    """
+
+    @staticmethod
+    def for_item(entity_id, entity_type: str, entity_name: str, child_count: int,
+                 records: Sequence[Record], full: bool) -> str:
+        """
+        The text of any tree item.
+
+        Args:
+            entity_type: The item's kind, as in its tree values
+            child_count: Number of the item's children in the tree
+            records: The full records behind the item: (record,) for a
+                module, sink or source; (module, sink, source) for a group
+            full: Show every field rather than a summary
+        """
+        if entity_type == "category":
+            return DetailsText.category(entity_name, child_count)
+        if entity_type == "hardware_category":
+            return DetailsText.hardware_category(entity_name, child_count)
+        if entity_type == "device_group":
+            return DetailsText.device_group(entity_name, child_count, *records, full)
+        if entity_type == "hardware_device_group":
+            return DetailsText.hardware_device_group(entity_name, child_count, *records, full)
+        if entity_type == "module":
+            return DetailsText.module(entity_id, entity_name, records[0], full)
+        if entity_type in ("sink", "source"):
+            return DetailsText.device(entity_type, entity_id, entity_name, records[0], full)
+        return "Select an item to see details"
+
+    @staticmethod
+    def category(label: str, item_count: int) -> str:
+        return f"{label} - {item_count} items"
+
+    @staticmethod
+    def hardware_category(category: str, device_count: int) -> str:
+        description = HARDWARE_CATEGORY_DESCRIPTIONS.get(category, 'Hardware audio devices')
+        return f"{description}\n\nDevices: {device_count}"
+
+    @staticmethod
+    def device_group(device_name: str, component_count: int, module: Record, sink: Record,
+                     source: Record, full: bool) -> str:
+        """A virtual device: its null sink module and the sink and source it created."""
+        lines = [f"Virtual Device: {device_name}\n"]
+        add = lines.append
+        if full:
+            add(f"{'='*50}\n\n")
+            if module:
+                add("MODULE DETAILS:\n")
+                add(f"ID: {module.get('id', 'Unknown')}\n")
+                add(f"Name: {module.get('name', 'Unknown')}\n")
+                add(f"Arguments: {module.get('argument', 'None')}\n\n")
+            if sink:
+                add("SINK (OUTPUT) DETAILS:\n")
+                lines.extend(f"{key}: {value}\n" for key, value in sink.items() if key not in ('id', 'name'))
+                add("\n")
+            if source:
+                add("SOURCE (INPUT) DETAILS:\n")
+                lines.extend(f"{key}: {value}\n" for key, value in source.items() if key not in ('id', 'name'))
+            return "".join(lines)
+
+        add(f"Components: {component_count} (module, sink, source)\n")
+        if sink:
+            add(f"State: {sink.get('state', 'Unknown')}\n")
+            add(f"Driver: {sink.get('driver', 'Unknown')}\n")
+            add(f"\nAudio Specification: {sink.get('sample_spec', 'Unknown')}\n")
+            add(f"Channel Layout: {sink.get('channel_map', 'Unknown')}\n")
+            add(f"Latency: {sink.get('latency', 'Unknown')}\n")
+            add(f"Buffer Quantum Limit: {sink.get('properties', {}).get('clock.quantum-limit', 'N/A')}\n")
+            add(f"\nMute: {sink.get('mute', 'Unknown')}\n")
+            volume = sink.get('volume', 'Unknown')
+            if volume != 'Unknown' and len(str(volume)) < 100:
+                add(f"Volume: {volume}\n")
+
+        if module:
+            add("\nModule Configuration:\n")
+            argument = module.get('argument', '')
+            channels = _channel_description(argument)
+            if channels:
+                add(f"Created as: {channels}\n")
+            if 'rate=' in argument:
+                match = RATE_ARGUMENT.search(argument)
+                if match:
+                    add(f"Sample Rate Override: {match.group(1)} Hz\n")
+
+        if source and source.get('monitor_of_sink', 'N/A') != 'N/A':
+            add("\nMonitor Source: Available for recording output\n")
+
+        add("\nUsage:\n")
+        add(f"• Applications can output audio to '{device_name}'\n")
+        add("• Input monitor available for recording/routing\n")
+        add("• Select module component to remove entire device\n")
+        return "".join(lines)
+
+    @staticmethod
+    def hardware_device_group(device_name: str, component_count: int, module: Record, sink: Record,
+                              source: Record, full: bool) -> str:
+        """A physical device: its card module and its sinks and sources."""
+        lines = [f"Hardware Device: {device_name}\n"]
+        add = lines.append
+        if full:
+            add(f"{'='*50}\n\n")
+            if module:
+                add("MODULE DETAILS:\n")
+                add(f"ID: {module.get('id', 'Unknown')}\n")
+                add(f"Name: {module.get('name', 'Unknown')}\n")
+                add(f"Arguments: {module.get('argument', 'None')}\n")
+                module_properties = module.get('properties', {})
+                if module_properties:
+                    add("Module Properties:\n")
+                    _add_properties(lines, module_properties)
+                add("\n")
+            for record, heading, properties_heading in ((sink, "SINK (OUTPUT) DETAILS:\n", "Sink Properties:\n"),
+                                                        (source, "SOURCE (INPUT) DETAILS:\n",
+                                                         "Source Properties:\n")):
+                if not record:
+                    continue
+                add(heading)
+                for key, value in record.items():
+                    if key in ('id', 'name'):
+                        continue
+                    if key == 'properties' and isinstance(value, dict):
+                        add(properties_heading)
+                        _add_properties(lines, value)
+                    else:
+                        add(f"{key}: {value}\n")
+                if record is sink:
+                    add("\n")
+            return "".join(lines)
+
+        add(f"Components: {component_count}\n")
+        device = sink or source or module
+        if device:
+            add(f"State: {device.get('state', 'Unknown')}\n")
+            add(f"Driver: {device.get('driver', 'Unknown')}\n")
+            properties = device.get('properties', {})
+
+            device_class = properties.get('device.class', 'Unknown')
+            if device_class != 'Unknown':
+                add(f"Device Class: {device_class}\n")
+            device_api = properties.get('device.api', 'Unknown')
+            if device_api != 'Unknown':
+                add(f"API: {device_api}\n")
+            device_bus = properties.get('device.bus', 'Unknown')
+            if device_bus != 'Unknown':
+                add(f"Connection: {device_bus.upper()}\n")
+
+            vendor_name = properties.get('device.vendor.name', '')
+            product_name = properties.get('device.product.name', '')
+            if vendor_name and product_name:
+                add(f"Manufacturer: {vendor_name}\n")
+                add(f"Product: {product_name}\n")
+            elif vendor_name:
+                add(f"Vendor: {vendor_name}\n")
+            vendor_id = properties.get('device.vendor.id', '')
+            product_id = properties.get('device.product.id', '')
+            if vendor_id and product_id:
+                add(f"Hardware ID: {vendor_id}:{product_id}\n")
+
+            sample_spec = device.get('sample_spec', 'Unknown')
+            if sample_spec != 'Unknown':
+                add(f"\nAudio Specification: {sample_spec}\n")
+            channel_map = device.get('channel_map', 'Unknown')
+            if channel_map != 'Unknown':
+                add(f"Channel Layout: {channel_map}\n")
+            latency = device.get('latency', 'Unknown')
+            if latency != 'Unknown':
+                add(f"Latency: {latency}\n")
+            quantum_limit = properties.get('clock.quantum-limit', 'N/A')
+            if quantum_limit != 'N/A':
+                add(f"Buffer Quantum Limit: {quantum_limit}\n")
+            mute = device.get('mute', 'Unknown')
+            if mute != 'Unknown':
+                add(f"\nMute: {mute}\n")
+            volume = device.get('volume', 'Unknown')
+            if volume != 'Unknown' and len(str(volume)) < 100:
+                add(f"Volume: {volume}\n")
+
+        add("\nHardware Device:\n")
+        add("• Physical audio device connected to system\n")
+        if sink:
+            add("• Applications can play audio through this device\n")
+        if source and '.monitor' not in source.get('name', ''):
+            add("• Can record audio from this device\n")
+        if module and 'card' in module.get('name', ''):
+            add("• Select module component to unload device driver\n")
+        else:
+            add("• Hardware managed by system audio drivers\n")
+        return "".join(lines)
+
+    @staticmethod
+    def module(module_id, module_name: str, record: Record, full: bool) -> str:
+        if not record:
+            return f"Module #{module_id}: {module_name}\nModule data not found."
+
+        if full:
+            lines = [f"Module #{module_id}: {module_name}\n\n"]
+            DetailsText._add_fields(lines, record)
+            return "".join(lines)
+
+        lines = [f"Module #{module_id}: {module_name}\n", f"Type: {module_name}\n"]
+        argument = record.get('argument', '')
+        if 'sink_name=' in argument:
+            match = SINK_NAME_ARGUMENT.search(argument)
+            if match:
+                lines.append(f"Device Name: {match.group(1)}\n")
+        channels = _channel_description(argument)
+        if channels:
+            lines.append(f"Audio Format: {channels}\n")
+        return "".join(lines)
+
+    @staticmethod
+    def device(kind: str, device_id, device_name: str, record: Record, full: bool) -> str:
+        """A sink or, with kind 'source', a source."""
+        title = "Sink" if kind == 'sink' else "Source"
+        if not record:
+            return f"{title} #{device_id}: {device_name}\n{title} data not found."
+
+        if full:
+            lines = [f"{title} #{device_id}: {device_name}\n\n"]
+            DetailsText._add_fields(lines, record)
+            return "".join(lines)
+
+        # Identity and status first, then the audio essentials
+        heading = "Audio Output" if kind == 'sink' else "Audio Input"
+        properties = record.get('properties', {})
+        lines = [
+            f"{heading} #{device_id}\n",
+            f"Name: {device_name}\n",
+            f"Description: {record.get('description', device_name)}\n",
+            f"State: {record.get('state', 'Unknown')}\n",
+            f"Driver: {record.get('driver', 'Unknown')}\n",
+            f"\nSample Specification: {record.get('sample_spec', 'Unknown')}\n",
+            f"Channel Map: {record.get('channel_map', 'Unknown')}\n",
+            f"Latency: {record.get('latency', 'Unknown')}\n",
+            f"Buffer Quantum Limit: {properties.get('clock.quantum-limit', 'N/A')}\n",
+            f"\nMute: {record.get('mute', 'Unknown')}\n",
+        ]
+        volume = record.get('volume', 'Unknown')
+        if volume != 'Unknown' and len(volume) < 100:  # Don't show if too long
+            lines.append(f"Volume: {volume}\n")
+        if kind == 'source':
+            monitor_of = record.get('monitor_of_sink', 'N/A')
+            if monitor_of != 'N/A':
+                lines.append(f"Monitor of Sink: {monitor_of}\n")
+        return "".join(lines)
+
+    @staticmethod
+    def _add_fields(lines: list, record: Dict[str, Any]):
+        """Every field of a record but its id and name, properties and formats one per line."""
+        for key, value in record.items():
+            if key == 'properties':
+                lines.append("Properties:\n")
+                _add_properties(lines, value)
+            elif key == 'formats':
+                lines.append("Formats:\n")
+                lines.extend(f"  {fmt}\n" for fmt in value)
+            elif key not in ('id', 'name'):
+                lines.append(f"{key}: {value}\n")
+
+
+class DetailsCache:
+    """
+    Details texts by (item, detail level, snapshot version).
+
+    Each text is kept with the records it was built from and only returned
+    for the very same record objects: a full record fetched again after a
+    volume change is a new object, while one the record pool reused is not.
+    Starting a new version drops every text of the previous one.
+    """
+
+    def __init__(self, max_texts: int = MAX_CACHED_TEXTS):
+        self.max_texts = max_texts
+        self.version = 0
+        self._lock = threading.Lock()
+        # (version, item, full) -> (records, text), least recently used first
+        self._texts = OrderedDict()
+
+    def new_version(self):
+        """Start a new snapshot version; called whenever the tree is rebuilt."""
+        with self._lock:
+            self.version += 1
+            self._texts.clear()
+
+    def key(self, item: Hashable, full: bool) -> tuple:
+        """The cache key of an item's text at the current version."""
+        return (self.version, item, full)
+
+    def get(self, key: tuple, records: Sequence[Record] = ()) -> Optional[str]:
+        """The text cached under key if it was built from these records, else None."""
+        with self._lock:
+            entry = self._texts.get(key)
+            if entry is None:
+                return None
+            cached_records, text = entry
+            if len(cached_records) != len(records) or any(
+                    cached is not record for cached, record in zip(cached_records, records)):
+                return None
+            self._texts.move_to_end(key)
+            return text
+
+    def peek(self, key: tuple) -> Optional[str]:
+        """The text cached under key, whatever records it was built from, or None."""
+        with self._lock:
+            entry = self._texts.get(key)
+            return None if entry is None else entry[1]
+
+    def put(self, key: tuple, records: Sequence[Record], text: str):
+        """Keep a text built from records, unless its version is over."""
+        with self._lock:
+            if key[0] != self.version:
+                return
+            self._texts[key] = (tuple(records), text)
+            self._texts.move_to_end(key)
+            while len(self._texts) > self.max_texts:
+                self._texts.popitem(last=False)
+
+    def __len__(self):
+        return len(self._texts)
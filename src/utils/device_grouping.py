@@ -0,0 +1,647 @@
+"""
+Device grouping logic for pactl-gui.
+
+Groups modules, sinks and sources into virtual devices and hardware device
+categories. Kept free of any GUI imports so the command-line interface and
+other headless tools can reuse it.
+"""
+
+import re
+
+
+class DeviceGrouping:
+    """
+    Build device groups from PactlRunner module, sink and source lists.
+    """
+
+    @staticmethod
+    def map_modules_to_devices(modules, sinks, sources):
+        """
+        Create a mapping of which modules created which sinks and sources.
+        Groups by device name (sink_name) rather than module ID for better organization.
+        
+        Returns: Dictionary mapping device names to lists of related modules, sinks and sources
+        """
+        device_map = {}
+        
+        # First, identify all device names from null-sink modules
+        for module in modules:
+            module_name = module.get('name', '')
+            module_args = module.get('argument', '')
+            
+            if 'null-sink' in module_name:
+                # Extract the sink_name from module arguments
+                # Handle various formats and special characters
+                sink_match = re.search(r'sink_name=([a-zA-Z0-9_.-]+)', module_args)
+                if sink_match:
+                    device_name = sink_match.group(1)
+                    if device_name not in device_map:
+                        device_map[device_name] = {'modules': [], 'sinks': [], 'sources': []}
+                    device_map[device_name]['modules'].append(module)
+        
+        # Map sinks to device names
+        for sink in sinks:
+            sink_name = sink.get('name', '')
+            # Check if this sink belongs to any of our tracked devices
+            if sink_name in device_map:
+                device_map[sink_name]['sinks'].append(sink)
+        
+        # Map sources to device names
+        for source in sources:
+            source_name = source.get('name', '')
+            
+            # Check for monitor sources (these are created automatically for sinks)
+            if ".monitor" in source_name:
+                # This is likely a sink's monitor source
+                base_name = source_name.replace(".monitor", "")
+                if base_name in device_map:
+                    device_map[base_name]['sources'].append(source)
+            else:
+                # Direct source match
+                if source_name in device_map:
+                    device_map[source_name]['sources'].append(source)
+        
+        return device_map
+
+    @staticmethod
+    def group_devices(modules, sinks, sources, show_monitors=False):
+        """
+        Build the complete grouping shown in the Manage tab.
+        
+        Objects claimed by a virtual device are left out of the hardware
+        categories.
+        
+        Returns: Dictionary with 'virtual' (as returned by map_modules_to_devices)
+            and 'hardware' (as returned by categorize_hardware_devices)
+        """
+        device_map = DeviceGrouping.map_modules_to_devices(modules, sinks, sources)
+        grouped_modules = {m.get('id') for d in device_map.values() for m in d['modules']}
+        grouped_sinks = {s.get('id') for d in device_map.values() for s in d['sinks']}
+        grouped_sources = {s.get('id') for d in device_map.values() for s in d['sources']}
+        
+        categories = DeviceGrouping.categorize_hardware_devices(
+            [m for m in modules if m.get('id') not in grouped_modules],
+            [s for s in sinks if s.get('id') not in grouped_sinks],
+            [s for s in sources if s.get('id') not in grouped_sources],
+            show_monitors=show_monitors
+        )
+        return {'virtual': device_map, 'hardware': categories}
+
+    @staticmethod
+    def extract_device_name(module_name, module_args):
+        """
+        Extract a human-readable name from module information.
+        
+        Args:
+            module_name: The name of the module (e.g., 'module-null-sink')
+            module_args: The module's arguments string
+            
+        Returns:
+            A human-readable description of the device
+        """
+        # For null sinks, get the sink name
+        if 'null-sink' in module_name:
+            sink_match = re.search(r'sink_name=([a-zA-Z0-9_.-]+)', module_args)
+            if sink_match:
+                sink_name = sink_match.group(1)
+                return f"Virtual Device: {sink_name}"
+            return "Virtual Audio Device"
+                
+        # For hardware devices
+        if 'alsa-card' in module_name:
+            card_match = re.search(r'card_name=([^=\s]+)', module_args)
+            if card_match:
+                card_name = card_match.group(1).strip('"\'')
+                return f"Hardware: {card_name}"
+        
+        # For HDMI, USB, or other recognizable hardware
+        if any(hw_term in module_name for hw_term in ['hdmi', 'usb', 'bluetooth']):
+            # Make the module name more readable
+            for prefix in ['module-', 'alsa-']:
+                if module_name.startswith(prefix):
+                    module_name = module_name[len(prefix):]
+            return f"Hardware: {module_name.replace('-', ' ').title()}"
+        
+        # For bluez devices 
+        if 'bluez' in module_name:
+            device_match = re.search(r'device=([^=\s]+)', module_args)
+            if device_match:
+                device_name = device_match.group(1).strip('"\'')
+                return f"Bluetooth: {device_name}"
+        
+        # For other modules, just make the name more readable
+        display_name = module_name.replace('module-', '')
+        display_name = display_name.replace('-', ' ').title()
+        
+        return display_name
+
+    @staticmethod
+    def detect_device_type(sink_data=None, source_data=None, module_data=None):
+        """
+        Detect the hardware device type based on module, sink, or source data.
+        Updated for PipeWire compatibility.
+        
+        Returns: One of 'builtin', 'usb', 'bluetooth', 'hdmi', 'unknown'
+        """
+        # Combine all available data for analysis
+        all_data = []
+        if module_data:
+            all_data.append(module_data)
+        if sink_data:
+            all_data.append(sink_data)
+        if source_data:
+            all_data.append(source_data)
+        
+        # Check properties from all sources
+        for data in all_data:
+            if not data:
+                continue
+            
+            # Check device name first (PipeWire pattern)
+            name = data.get('name', '').lower()
+            
+            # PipeWire ALSA device patterns
+            if 'alsa_output.usb-' in name or 'alsa_input.usb-' in name:
+                return 'usb'
+            if 'alsa_output.pci-' in name or 'alsa_input.pci-' in name:
+                # Determine if PCI device is HDMI/GPU or built-in audio
+                properties = data.get('properties', {})
+                device_desc = properties.get('device.description', '').lower()
+                if any(gpu in device_desc for gpu in ['nvidia', 'amd', 'radeon', 'intel hd', 'hdmi']):
+                    return 'hdmi'
+                else:
+                    return 'builtin'
+            if 'bluez' in name or 'bluetooth' in name:
+                return 'bluetooth'
+                
+            # Traditional PulseAudio module name patterns
+            if any(term in name for term in ['usb', 'usb-audio']):
+                return 'usb'
+            if any(term in name for term in ['bluez', 'bluetooth']):
+                return 'bluetooth'
+            if any(term in name for term in ['hdmi', 'displayport']):
+                return 'hdmi'
+            
+            # Check properties
+            properties = data.get('properties', {})
+            
+            # USB detection
+            if properties.get('device.bus') == 'usb':
+                return 'usb'
+            if 'usb' in properties.get('device.api', '').lower():
+                return 'usb'
+            
+            # Bluetooth detection
+            if properties.get('device.api') == 'bluez5':
+                return 'bluetooth'
+            if 'bluetooth' in properties.get('device.description', '').lower():
+                return 'bluetooth'
+            
+            # HDMI/DisplayPort detection
+            if any(term in properties.get('device.description', '').lower() 
+                   for term in ['hdmi', 'displayport', 'dp']):
+                return 'hdmi'
+            if 'nvidia' in properties.get('device.description', '').lower():
+                return 'hdmi'  # NVIDIA cards typically provide HDMI audio
+            
+            # PCI/Built-in detection
+            if properties.get('device.bus') == 'pci':
+                # Check if it's GPU audio (HDMI) or built-in audio
+                description = properties.get('device.description', '').lower()
+                if any(gpu in description for gpu in ['nvidia', 'amd', 'intel hd', 'radeon']):
+                    return 'hdmi'
+                else:
+                    return 'builtin'
+        
+        # Default to built-in for unidentified hardware
+        return 'builtin'
+
+    @staticmethod
+    def categorize_hardware_devices(modules, sinks, sources, show_monitors=False):
+        """
+        Categorize hardware devices by connection type and group individual devices.
+        Updated for PipeWire compatibility - works with direct device names instead of card modules.
+        
+        Args:
+            show_monitors: Whether monitor sources are included in the groups
+        
+        Returns: Dictionary with categories as keys and device groups as values.
+        """
+        categories = {
+            'builtin': [],
+            'usb': [],
+            'bluetooth': [],
+            'hdmi': []
+        }
+        
+        # Track processed devices to avoid duplicates
+        processed_sinks = set()
+        processed_sources = set()
+        processed_modules = set()
+        
+        # Create device groups by parsing PipeWire device names
+        device_groups = {}  # Maps device identifier to device info
+        
+        # Process all sinks to identify hardware devices
+        for sink in sinks:
+            sink_name = sink.get('name', '')
+            sink_id = sink.get('id', '')
+            
+            # Skip virtual device sinks
+            if any(virtual_name in sink_name for virtual_name in ['test', 'voip']):
+                continue
+            
+            # Skip monitor sources in this pass
+            if '.monitor' in sink_name:
+                continue
+            
+            # Identify the hardware device behind the sink
+            device_info = DeviceGrouping.device_info_for(sink)
+            if device_info:
+                device_key = device_info['device_key']
+                
+                # Initialize device group if not exists
+                if device_key not in device_groups:
+                    device_groups[device_key] = {
+                        'device_info': device_info,
+                        'modules': [],
+                        'sinks': [],
+                        'sources': []
+                    }
+                
+                device_groups[device_key]['sinks'].append(sink)
+                processed_sinks.add(sink_id)
+        
+        # Process all sources to match them to existing device groups
+        for source in sources:
+            source_name = source.get('name', '')
+            source_id = source.get('id', '')
+            
+            # Skip virtual device sources
+            if any(virtual_name in source_name for virtual_name in ['test', 'voip']):
+                continue
+            
+            # Handle monitor sources based on checkbox
+            if '.monitor' in source_name and not show_monitors:
+                continue
+            
+            # Identify the hardware device behind the source
+            device_info = DeviceGrouping.device_info_for(source)
+            if device_info:
+                device_key = device_info['device_key']
+                
+                # Initialize device group if not exists (for input-only devices)
+                if device_key not in device_groups:
+                    device_groups[device_key] = {
+                        'device_info': device_info,
+                        'modules': [],
+                        'sinks': [],
+                        'sources': []
+                    }
+                
+                device_groups[device_key]['sources'].append(source)
+                processed_sources.add(source_id)
+        
+        # Handle remaining hardware modules (for PipeWire compatibility)
+        for module in modules:
+            module_id = module.get('id', '')
+            module_name = module.get('name', '')
+            
+            if module_id in processed_modules:
+                continue
+                
+            # Skip virtual device modules
+            if 'null-sink' in module_name:
+                continue
+                
+            # Only include relevant hardware modules
+            if any(hw_term in module_name.lower() 
+                  for hw_term in ['alsa', 'bluetooth', 'bluez', 'usb', 'hdmi']):
+                
+                device_info = DeviceGrouping.extract_hardware_device_info(module)
+                if device_info:
+                    device_key = device_info['device_key']
+                    
+                    # Try to match to existing device group first
+                    matched = False
+                    for existing_key, existing_group in device_groups.items():
+                        if DeviceGrouping.devices_match(device_info, existing_group['device_info']):
+                            existing_group['modules'].append(module)
+                            matched = True
+                            break
+                    
+                    # Create new group if no match
+                    if not matched:
+                        device_groups[device_key] = {
+                            'device_info': device_info,
+                            'modules': [module],
+                            'sinks': [],
+                            'sources': []
+                        }
+                
+                processed_modules.add(module_id)
+        
+        # Process orphaned sinks/sources (those not matched to any device)
+        for sink in sinks:
+            if sink.get('id') not in processed_sinks:
+                sink_name = sink.get('name', '')
+                if any(virtual_name in sink_name for virtual_name in ['test', 'voip']):
+                    continue
+                    
+                device_type = DeviceGrouping.detect_device_type(sink_data=sink)
+                device_entry = {
+                    'type': 'orphaned_sink',
+                    'sink': sink
+                }
+                categories[device_type].append(device_entry)
+        
+        for source in sources:
+            if source.get('id') not in processed_sources:
+                source_name = source.get('name', '')
+                if any(virtual_name in source_name for virtual_name in ['test', 'voip']):
+                    continue
+                if '.monitor' in source_name and not show_monitors:
+                    continue
+                    
+                device_type = DeviceGrouping.detect_device_type(source_data=source)
+                device_entry = {
+                    'type': 'orphaned_source', 
+                    'source': source
+                }
+                categories[device_type].append(device_entry)
+        
+        # Finally, categorize the complete device groups
+        for device_key, device_group in device_groups.items():
+            device_info = device_group['device_info']
+            device_type = device_info['device_type']
+            
+            device_entry = {
+                'type': 'hardware_device_group',
+                'device_info': device_info,
+                'modules': device_group['modules'],
+                'sinks': device_group['sinks'],
+                'sources': device_group['sources']
+            }
+            
+            categories[device_type].append(device_entry)
+        
+        return categories
+
+    @staticmethod
+    def extract_hardware_device_info(module_or_device):
+        """Extract device information for hardware device identification."""
+        properties = module_or_device.get('properties', {})
+        module_name = module_or_device.get('name', '')
+        module_args = module_or_device.get('argument', '')
+        
+        # Get device description - primary identifier
+        device_description = (
+            properties.get('device.description', '') or
+            properties.get('alsa.card_name', '') or
+            module_or_device.get('description', '')
+        )
+        
+        # Get card name from module arguments if available
+        if 'card=' in module_args:
+            card_match = re.search(r'card=([^=\s]+)', module_args)
+            if card_match:
+                card_name = card_match.group(1).strip('"\'')
+                if not device_description:
+                    device_description = card_name
+        
+        # Fall back to module name if no description
+        if not device_description:
+            device_description = module_name.replace('module-', '').replace('-', ' ').title()
+        
+        # Determine device type
+        device_type = DeviceGrouping.detect_device_type(module_data=module_or_device)
+        
+        # Create unique device key for grouping
+        # Use device.string if available, otherwise device description + bus info
+        device_string = properties.get('device.string', '')
+        if device_string:
+            device_key = device_string
+        else:
+            bus_info = properties.get('device.bus', 'unknown')
+            device_key = f"{device_description}_{bus_info}_{device_type}"
+        
+        return {
+            'device_key': device_key,
+            'device_type': device_type,
+            'device_name': device_description,
+            'device_string': device_string,
+            'properties': properties
+        }
+
+    @staticmethod
+    def match_sink_to_device(sink, device_groups):
+        """Match a sink to an existing hardware device group."""
+        sink_properties = sink.get('properties', {})
+        sink_device_string = sink_properties.get('device.string', '')
+        
+        # Try to match by device.string first (most reliable)
+        if sink_device_string:
+            for device_key, device_group in device_groups.items():
+                if device_group['device_info']['device_string'] == sink_device_string:
+                    return device_key
+        
+        # Try to match by device description
+        sink_desc = sink.get('description', '')
+        for device_key, device_group in device_groups.items():
+            device_name = device_group['device_info']['device_name']
+            # Check if sink description contains device name or vice versa
+            if device_name in sink_desc or sink_desc in device_name:
+                return device_key
+        
+        # Try to match by owner module
+        sink_owner_module = sink.get('owner_module', '')
+        if sink_owner_module:
+            for device_key, device_group in device_groups.items():
+                for module in device_group['modules']:
+                    if str(module.get('id', '')) == str(sink_owner_module):
+                        return device_key
+        
+        return None
+
+    @staticmethod
+    def match_source_to_device(source, device_groups):
+        """Match a source to an existing hardware device group."""
+        source_properties = source.get('properties', {})
+        source_device_string = source_properties.get('device.string', '')
+        
+        # Try to match by device.string first (most reliable)
+        if source_device_string:
+            for device_key, device_group in device_groups.items():
+                if device_group['device_info']['device_string'] == source_device_string:
+                    return device_key
+        
+        # Try to match by device description
+        source_desc = source.get('description', '')
+        for device_key, device_group in device_groups.items():
+            device_name = device_group['device_info']['device_name']
+            # Check if source description contains device name or vice versa
+            if device_name in source_desc or source_desc in device_name:
+                return device_key
+        
+        # Try to match by owner module
+        source_owner_module = source.get('owner_module', '')
+        if source_owner_module:
+            for device_key, device_group in device_groups.items():
+                for module in device_group['modules']:
+                    if str(module.get('id', '')) == str(source_owner_module):
+                        return device_key
+        
+        return None
+
+    @staticmethod
+    def device_info_for(record):
+        """
+        Identify the hardware device a sink or source belongs to.
+        
+        Records from the PipeWire backend name their device exactly in a
+        'device' entry; others are matched by their device name.
+        """
+        device = record.get('device')
+        if device:
+            return DeviceGrouping.extract_hardware_device_info_from_device(device, record)
+        return DeviceGrouping.extract_hardware_device_info_from_name(record.get('name', ''), record)
+
+    @staticmethod
+    def extract_hardware_device_info_from_device(device, device_data):
+        """
+        Build device information from a PipeWire device entry.
+        
+        Every node of the same PipeWire device gets the same key, so the
+        grouping needs no name heuristics.
+        """
+        description = device.get('description', '')
+        if device.get('api') == 'bluez5' or device.get('bus') == 'bluetooth':
+            device_type = 'bluetooth'
+        elif device.get('bus') == 'usb':
+            device_type = 'usb'
+        elif device.get('form_factor') == 'hdmi' or any(
+                term in description.lower() for term in ['hdmi', 'displayport', 'nvidia', 'amd', 'radeon', 'intel hd']):
+            device_type = 'hdmi'
+        else:
+            device_type = 'builtin'
+        
+        return {
+            'device_key': f"device_{device.get('id', '')}",
+            'device_type': device_type,
+            'device_name': description or device_data.get('description', device.get('name', '')),
+            'device_identifier': device.get('name', ''),
+            'connection_part': device.get('name', ''),
+            'properties': device_data.get('properties', {})
+        }
+
+    @staticmethod
+    def extract_hardware_device_info_from_name(device_name, device_data):
+        """
+        Extract device information from PipeWire device names.
+        
+        Examples:
+        - alsa_output.usb-BOSS_GCS-8-01.pro-output-0 -> Device: BOSS GCS-8
+        - alsa_input.usb-BEHRINGER_UMC404HD_192k-00.pro-input-0 -> Device: BEHRINGER UMC404HD
+        - alsa_output.pci-0000_01_00.1.hdmi-stereo -> Device: GPU HDMI Audio
+        """
+        if not device_name:
+            return None
+        
+        # Parse PipeWire ALSA device naming patterns
+        if device_name.startswith('alsa_'):
+            # Extract connection type and device identifier
+            parts = device_name.split('.')
+            if len(parts) >= 2:
+                connection_part = parts[1]  # e.g., "usb-BOSS_GCS-8-01" or "pci-0000_01_00"
+                
+                # Determine connection type
+                if connection_part.startswith('usb-'):
+                    device_type = 'usb'
+                    # Extract device name from USB identifier
+                    usb_part = connection_part[4:]  # Remove "usb-"
+                    # Parse patterns like "BOSS_GCS-8-01" or "BEHRINGER_UMC404HD_192k-00"
+                    device_identifier = usb_part.rsplit('-', 1)[0]  # Remove trailing number
+                    # Clean up device name
+                    device_name_clean = device_identifier.replace('_', ' ').replace('-', ' ')
+                    # Extract brand and model
+                    if ' ' in device_name_clean:
+                        parts = device_name_clean.split(' ', 1)
+                        brand = parts[0]
+                        model = parts[1] if len(parts) > 1 else ''
+                        device_display_name = f"{brand} {model}".strip()
+                    else:
+                        device_display_name = device_name_clean
+                    
+                elif connection_part.startswith('pci-'):
+                    # PCI devices (usually GPU HDMI or built-in audio)
+                    properties = device_data.get('properties', {})
+                    device_desc = properties.get('device.description', '')
+                    
+                    if any(gpu in device_desc.lower() for gpu in ['nvidia', 'amd', 'radeon', 'intel hd']):
+                        device_type = 'hdmi'
+                        device_display_name = device_desc or 'GPU Audio'
+                        device_identifier = connection_part
+                    else:
+                        device_type = 'builtin'
+                        device_display_name = device_desc or 'Built-in Audio'
+                        device_identifier = connection_part
+                        
+                elif connection_part.startswith('bluez-'):
+                    device_type = 'bluetooth'
+                    device_identifier = connection_part
+                    properties = device_data.get('properties', {})
+                    device_display_name = properties.get('device.description', 'Bluetooth Audio')
+                    
+                else:
+                    # Unknown connection type
+                    device_type = 'builtin'
+                    device_identifier = connection_part
+                    device_display_name = device_data.get('description', device_name)
+                
+                # Create device key for grouping (without input/output suffix)
+                device_key = f"{device_type}_{device_identifier}"
+                
+                return {
+                    'device_key': device_key,
+                    'device_type': device_type,
+                    'device_name': device_display_name,
+                    'device_identifier': device_identifier,
+                    'connection_part': connection_part,
+                    'properties': device_data.get('properties', {})
+                }
+        
+        # Fallback for non-ALSA devices
+        device_type = DeviceGrouping.detect_device_type(sink_data=device_data if 'sink' in str(type(device_data)) else None,
+                                             source_data=device_data if 'source' in str(type(device_data)) else None)
+        device_display_name = device_data.get('description', device_name)
+        
+        return {
+            'device_key': f"{device_type}_{device_name}",
+            'device_type': device_type,
+            'device_name': device_display_name,
+            'device_identifier': device_name,
+            'connection_part': device_name,
+            'properties': device_data.get('properties', {})
+        }
+
+    @staticmethod
+    def devices_match(device_info1, device_info2):
+        """Check if two device info objects represent the same physical device."""
+        # Primary match: same device identifier
+        # (device info extracted from a module has no identifier)
+        identifier1 = device_info1.get('device_identifier')
+        if identifier1 and identifier1 == device_info2.get('device_identifier'):
+            return True
+        
+        # Secondary match: same connection part (for PipeWire ALSA devices)
+        if (device_info1.get('connection_part') and device_info2.get('connection_part') and
+            device_info1['connection_part'] == device_info2['connection_part']):
+            return True
+        
+        # Tertiary match: similar device names
+        name1 = device_info1['device_name'].lower()
+        name2 = device_info2['device_name'].lower()
+        if name1 == name2:
+            return True
+        
+        return False
@@ -0,0 +1,151 @@
+"""
+Coalescing of audio server change events.
+
+Plugging in a USB interface or restarting PipeWire produces dozens to
+hundreds of events within a few milliseconds. EventCoalescer collects them
+into bursts: a burst ends once no event has arrived for the settle window,
+or when the maximum delay since its first event has passed, whichever comes
+first. Events for the same object are merged, so each burst yields at most
+one event per object and the consumer refreshes once per burst.
+"""
+
+import threading
+import time
+from typing import List, Optional
+
+from utils.audio_backend import AudioEvent
+from utils.metrics import EVENT_BURST_SIZE
+
+# Quiet time that ends a burst
+DEFAULT_SETTLE_SECONDS = 0.05
+
+# Longest a burst may be held back while events keep arriving
+DEFAULT_MAX_DELAY_SECONDS = 0.5
+
+# Which pactl list each event facility invalidates; None means all of them
+FACILITY_KINDS = {
+    'sink': ('sinks',),
+    'source': ('sources',),
+    'module': ('modules',),
+    'card': None,
+    'server': None,
+}
+ALL_KINDS = ('modules', 'sinks', 'sources')
+
+
+def merge_kinds(first: str, last: str) -> Optional[str]:
+    """
+    Combine the first and last event kinds seen for one object in a burst.
+
+    Returns:
+        The kind that describes the net change, or None if the object was
+        created and removed again within the burst
+    """
+    if first == 'new':
+        return None if last == 'remove' else 'new'
+    if last == 'remove':
+        return 'remove'
+    # Removed and created again, or changed: either way the record changed
+    return 'change'
+
+
+def affected_kinds(events: List[AudioEvent]) -> tuple:
+    """The pactl lists ('modules', 'sinks', 'sources') that events may have changed."""
+    kinds = set()
+    for event in events:
+        facility_kinds = FACILITY_KINDS.get(event.facility, ())
+        if facility_kinds is None:
+            return ALL_KINDS
+        kinds.update(facility_kinds)
+    return tuple(kind for kind in ALL_KINDS if kind in kinds)
+
+
+class EventCoalescer:
+    """
+    Collects events from any thread and hands them to one consumer in bursts.
+
+    The consumer loops on next_burst(). Events that arrive while it is
+    still handling the previous burst are marked as overlapping: the
+    consumer's refresh may already have seen an object created then, so a
+    create and remove of such an object becomes a remove instead of
+    cancelling out.
+    """
+
+    def __init__(self, settle: float = DEFAULT_SETTLE_SECONDS, max_delay: float = DEFAULT_MAX_DELAY_SECONDS):
+        """
+        Args:
+            settle: Seconds without events that end a burst
+            max_delay: Seconds after its first event at which a burst ends
+                even if events keep arriving
+        """
+        self.settle = settle
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        # (facility, index) -> [first kind, last kind, overlapping]
+        self._pending = {}
+        self._received = 0
+        self._first_at = None
+        self._last_at = None
+        self._consuming = False
+        self._closed = False
+
+    def add(self, event: AudioEvent):
+        """Queue an event; cheap enough to call for every line of a burst."""
+        now = time.monotonic()
+        with self._condition:
+            key = (event.facility, event.index)
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [event.kind, event.kind, self._consuming]
+            else:
+                entry[1] = event.kind
+            self._received += 1
+            self._last_at = now
+            if self._first_at is None:
+                self._first_at = now
+                self._condition.notify_all()
+
+    def next_burst(self) -> Optional[List[AudioEvent]]:
+        """
+        Wait for the next burst to end and return its merged events.
+
+        The list may be empty when every object in the burst was created
+        and removed again. Returns None once close() has been called.
+        """
+        with self._condition:
+            self._consuming = False
+            while True:
+                if self._closed:
+                    return None
+                if self._first_at is None:
+                    self._condition.wait()
+                    continue
+                now = time.monotonic()
+                deadline = min(self._last_at + self.settle, self._first_at + self.max_delay)
+                if now < deadline:
+                    self._condition.wait(deadline - now)
+                    continue
+                break
+
+            pending, received = self._pending, self._received
+            self._pending, self._received = {}, 0
+            self._first_at = self._last_at = None
+            self._consuming = True
+
+        events = []
+        for (facility, index), (first, last, overlapping) in pending.items():
+            kind = merge_kinds(first, last)
+            if kind is None and overlapping:
+                kind = 'remove'
+            if kind is not None:
+                events.append(AudioEvent(kind, facility, index))
+
+        EVENT_BURST_SIZE.observe('received', received)
+        EVENT_BURST_SIZE.observe('merged', len(events))
+        return events
+
+    def close(self):
+        """Wake the consumer; next_burst() returns None from now on."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
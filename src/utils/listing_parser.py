@@ -0,0 +1,369 @@
+"""
+Parsers for 'pactl list' output that work on the raw bytes.
+
+PactlRunner reads list commands as bytes and parses them here instead of
+decoding the whole output and splitting, stripping and splitting it again
+line by line. Each record is located with bytes.find(), and only the parts
+that are kept are decoded, through a memoryview so no intermediate copies
+are made: the header fields and the property block of each sink or source,
+and the formats. Port lists and everything else that is skipped is never
+decoded, and a property block is turned into a dict in one pass.
+
+The results are the same dictionaries PactlRunner.parse_sinks,
+parse_sources and parse_modules have always returned.
+
+Very large listings (tens of megabytes on multi-seat or broadcast
+machines) are split on record boundaries and parsed on several cores by a
+process pool; parse_listing() does this automatically above
+PARALLEL_THRESHOLD_BYTES. Set PACTL_GUI_PARALLEL_PARSE to 'never' to keep
+parsing in-process, or to 'always' to split any listing big enough to
+chunk.
+
+Given a RecordPool (utils/record_pool.py), the in-process parsers return
+the records and property dicts of the previous listing for the parts of the
+output that did not change instead of parsing them again.
+"""
+
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Union, Optional
+
+from utils.record_pool import RecordPool, intern_properties
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Environment variable choosing when to parse on several cores:
+# 'auto' (default), 'always' or 'never'
+PARALLEL_ENV = "PACTL_GUI_PARALLEL_PARSE"
+
+# Listings at least this large are parsed in parallel in 'auto' mode
+PARALLEL_THRESHOLD_BYTES = 8 * 2 ** 20
+
+# Chunks are never made smaller than this; below it the pickling round
+# trip costs more than the parsing saved
+MIN_CHUNK_BYTES = 2 ** 20
+
+# Upper bound on parser processes
+MAX_WORKERS = 8
+
+HEADERS = {'sinks': b'Sink #', 'sources': b'Source #', 'modules': b'Module #'}
+
+# Field names of 'pactl list sinks/sources' and the keys they are stored under;
+# other fields are stored lowercased with underscores
+SINK_FIELDS = {
+    'State': 'state',
+    'Name': 'name',
+    'Description': 'description',
+    'Driver': 'driver',
+    'Sample Specification': 'sample_spec',
+    'Channel Map': 'channel_map',
+    'Owner Module': 'owner_module',
+    'Mute': 'mute',
+    'Volume': 'volume',
+    'Base Volume': 'base_volume',
+    'Monitor Source': 'monitor_source',
+    'Latency': 'latency',
+    'Flags': 'flags',
+}
+SOURCE_FIELDS = {key: value for key, value in SINK_FIELDS.items() if key != 'Monitor Source'}
+SOURCE_FIELDS['Monitor of Sink'] = 'monitor_of_sink'
+
+PROPERTIES = b'\n\tProperties:\n'
+PROPERTIES_TEXT = PROPERTIES.decode()
+FORMATS = b'\n\tFormats:\n'
+
+# End of an indented block: a line that is not indented by two tabs
+BLOCK_END = re.compile(rb'\n(?!\t\t)')
+
+
+def _decode(view: memoryview, start: int, end: int) -> str:
+    return str(view[start:end], 'utf-8', 'replace')
+
+
+def _block_end(data: bytes, start: int, end: int) -> int:
+    match = BLOCK_END.search(data, start, end)
+    return match.start() if match else end
+
+
+def _content_end(data: bytes, start: int, end: int) -> int:
+    """End of a record without its trailing newlines, which depend on whether another record follows."""
+    while end > start and data[end - 1] == 0x0A:
+        end -= 1
+    return end
+
+
+def _records(data: bytes, header: bytes):
+    """Yield (start, header line end, end) offsets of every record in a listing."""
+    separator = b'\n' + header
+    if data.startswith(header):
+        start = 0
+    else:
+        start = data.find(separator)
+        if start == -1:
+            return
+        start += 1
+    while start != -1:
+        following = data.find(separator, start)
+        end = len(data) if following == -1 else following + 1
+        line_end = data.find(b'\n', start, end)
+        yield start, (end if line_end == -1 else line_end), end
+        start = -1 if following == -1 else following + 1
+
+
+def parse_properties(block: str) -> Dict[str, str]:
+    """
+    Parse a property block: lines of 'key = "value"', each indented by two
+    tabs, without the trailing newline.
+    """
+    # Split between the lines' closing and opening quotes, so each item is
+    # key = "value and dict() builds the result without a Python-level loop
+    items = block[2:-1].split('"\n\t\t')
+    if block.startswith('\t\t') and block.endswith('"') and len(items) == block.count('\n') + 1:
+        try:
+            return dict(item.split(' = "', 1) for item in items)
+        except ValueError:
+            pass
+    properties = {}
+    for line in block.split('\n'):
+        key, separator, value = line.partition(' = ')
+        if separator:
+            properties[key.strip()] = value.strip().strip('"')
+    return properties
+
+
+def parse_devices(output: BytesLike, kind: str, pool: Optional[RecordPool] = None) -> List[Dict[str, Any]]:
+    """
+    Parse the output of 'pactl list sinks' or 'pactl list sources'.
+
+    Args:
+        output: The raw output, or a memoryview of it
+        kind: 'sinks' or 'sources'
+        pool: Record pool to reuse unchanged records from; must be entered
+    """
+    header, field_names = (b'Sink #', SINK_FIELDS) if kind == 'sinks' else (b'Source #', SOURCE_FIELDS)
+    data = bytes(output)
+    view = memoryview(data)
+    # Field name as printed -> record key, worked out once per listing
+    names = {}
+    records = []
+
+    for start, line_end, end in _records(data, header):
+        if pool is not None:
+            digest = pool.key(view[start:_content_end(data, start, end)])
+            pooled = pool.record(digest)
+            if pooled is not None:
+                records.append(pooled)
+                continue
+        record = {'id': _decode(view, start + len(header), line_end).strip(), 'properties': {}}
+        records.append(record)
+
+        properties = data.find(PROPERTIES, line_end, end)
+        formats = data.find(FORMATS, line_end, end)
+        fields_end = min(position for position in (properties, formats, end) if position != -1)
+
+        # Header fields, one per line; continuation lines have no colon
+        for line in _decode(view, line_end + 1, fields_end).split('\n\t'):
+            key, separator, value = line.partition(':')
+            if separator:
+                name = names.get(key)
+                if name is None:
+                    stripped = key.strip()
+                    name = names[key] = field_names.get(stripped, stripped.lower().replace(' ', '_'))
+                record[name] = value.strip()
+
+        if properties != -1:
+            block_start = properties + len(PROPERTIES)
+            block_end = _block_end(data, block_start, end)
+            if pool is None:
+                record['properties'] = parse_properties(_decode(view, block_start, block_end))
+            else:
+                record['properties'] = pool.properties(view[block_start:block_end], parse_properties)
+        if formats != -1:
+            block_start = formats + len(FORMATS)
+            block = _decode(view, block_start, _block_end(data, block_start, end))
+            record['formats'] = [line.strip() for line in block.split('\n') if line.strip()]
+        if pool is not None:
+            pool.add_record(digest, record)
+    return records
+
+
+def parse_modules(output: BytesLike, pool: Optional[RecordPool] = None) -> List[Dict[str, Any]]:
+    """
+    Parse the output of 'pactl list modules'.
+
+    Args:
+        output: The raw output, or a memoryview of it
+        pool: Record pool to reuse unchanged records from; must be entered
+    """
+    header = b'Module #'
+    data = bytes(output)
+    view = memoryview(data)
+    records = []
+
+    for start, line_end, end in _records(data, header):
+        if pool is not None:
+            digest = pool.key(view[start:_content_end(data, start, end)])
+            pooled = pool.record(digest)
+            if pooled is not None:
+                records.append(pooled)
+                continue
+        record = {'id': _decode(view, start + len(header), line_end).strip(), 'properties': {}}
+        records.append(record)
+
+        # Modules are short and every part of them is kept: decode each once
+        text = _decode(view, line_end, end)
+        fields, separator, block = text.partition(PROPERTIES_TEXT)
+        lines = iter(fields.split('\n'))
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith('Name: '):
+                record['name'] = stripped[6:].strip()
+            elif stripped.startswith('Argument: '):
+                argument = stripped[10:].strip()
+                if argument.startswith('{') and not argument.endswith('}'):
+                    # The argument block continues until a line ending with '}'
+                    for continued in lines:
+                        argument += '\n' + continued
+                        if continued.strip().endswith('}'):
+                            break
+                record['argument'] = argument
+            elif stripped.startswith('Usage counter: '):
+                record['usage_counter'] = stripped[15:].strip()
+
+        if separator:
+            record['properties'] = parse_properties(block.rstrip('\n'))
+            if pool is not None:
+                record['properties'] = intern_properties(record['properties'])
+        if pool is not None:
+            pool.add_record(digest, record)
+    return records
+
+
+def parse_short(output: BytesLike, columns: tuple) -> List[Dict[str, Any]]:
+    """
+    Parse the output of 'pactl list short'; empty columns are left out.
+
+    Every column is kept, so the output is decoded in one go.
+
+    Args:
+        output: The raw output, or a memoryview of it
+        columns: The record keys of the tab-separated columns
+    """
+    records = []
+    for line in str(memoryview(output), 'utf-8', 'replace').splitlines():
+        record = {column: value for column, value in zip(columns, line.split('\t')) if value}
+        if 'id' in record and 'name' in record:
+            records.append(record)
+    return records
+
+
+def parse(output: BytesLike, kind: str, pool: Optional[RecordPool] = None) -> List[Dict[str, Any]]:
+    """Parse a full listing of 'sinks', 'sources' or 'modules' in this process."""
+    return parse_modules(output, pool) if kind == 'modules' else parse_devices(output, kind, pool)
+
+
+def parallel_workers() -> int:
+    """Parser processes to use: the cores this process may run on, up to MAX_WORKERS."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    return min(cores, MAX_WORKERS)
+
+
+def split_records(output: BytesLike, kind: str, parts: int) -> List[bytes]:
+    """
+    Split a listing into at most parts chunks of about equal size, each
+    starting at a record header, so every chunk parses on its own.
+    """
+    data = bytes(output)
+    separator = b'\n' + HEADERS[kind]
+    bounds = [0]
+    for part in range(1, parts):
+        position = data.find(separator, max(len(data) * part // parts, bounds[-1]))
+        if position == -1:
+            break
+        bounds.append(position + 1)
+    bounds.append(len(data))
+    return [data[start:end] for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+class _Pool:
+    """The shared parser process pool, started on first use."""
+
+    _executor = None
+    _lock = threading.Lock()
+    # Set once the pool could not be started or broke; parsing stays in-process
+    broken = False
+
+    @staticmethod
+    def get() -> Optional[ProcessPoolExecutor]:
+        with _Pool._lock:
+            if _Pool._executor is None and not _Pool.broken:
+                # Workers are spawned rather than forked: the GUI would fork
+                # a process with Tk and worker threads running
+                try:
+                    _Pool._executor = ProcessPoolExecutor(max_workers=parallel_workers(),
+                                                          mp_context=multiprocessing.get_context('spawn'))
+                except (TypeError, ValueError, OSError):
+                    # mp_context needs Python 3.7
+                    _Pool.broken = True
+            return _Pool._executor
+
+    @staticmethod
+    def discard():
+        with _Pool._lock:
+            executor, _Pool._executor = _Pool._executor, None
+            _Pool.broken = True
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def parse_parallel(output: BytesLike, kind: str, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Parse a listing in chunks on the shared process pool.
+
+    The chunks' records are joined in their original order. Falls back to
+    parsing in this process if the pool cannot be used.
+
+    Args:
+        workers: Number of chunks to split into (default: parallel_workers())
+    """
+    chunks = split_records(output, kind, workers or parallel_workers())
+    executor = _Pool.get() if len(chunks) > 1 else None
+    if executor is None:
+        return parse(output, kind)
+    try:
+        records = []
+        for chunk_records in executor.map(parse, chunks, [kind] * len(chunks)):
+            records.extend(chunk_records)
+        return records
+    except (BrokenProcessPool, OSError, RuntimeError):
+        _Pool.discard()
+        return parse(output, kind)
+
+
+def parse_listing(output: BytesLike, kind: str, pool: Optional[RecordPool] = None) -> List[Dict[str, Any]]:
+    """
+    Parse a full listing, on several cores if it is large enough (see
+    PARALLEL_THRESHOLD_BYTES and PARALLEL_ENV).
+
+    Args:
+        pool: Record pool to reuse unchanged records from when the listing
+            is parsed in-process; parser processes cannot share it
+    """
+    mode = os.environ.get(PARALLEL_ENV, 'auto')
+    size = len(output)
+    workers = 0
+    if mode == 'always' or (mode != 'never' and size >= PARALLEL_THRESHOLD_BYTES):
+        workers = min(parallel_workers(), size // MIN_CHUNK_BYTES)
+    if workers >= 2:
+        return parse_parallel(output, kind, workers)
+    if pool is None:
+        return parse(output, kind)
+    with pool:
+        return parse(output, kind, pool)
@@ -0,0 +1,103 @@
+"""
+In-process metrics for pactl-gui.
+
+PactlRunner records how long every pactl command takes and how many calls
+shared an identical command already in flight, EventCoalescer how large
+each burst of server events was, and the GUI how often its timers wake
+it up; the exporter in
+metrics_exporter.py publishes the recorded values. Recording is a few
+dictionary updates under a lock, cheap enough to stay enabled all the time.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import List, Dict, Tuple
+
+# Upper bounds of the command latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the event burst size buckets, in events
+BURST_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """A cumulative histogram with fixed buckets, one series per label value."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label: str, value: float):
+        """Record one observation for a label value."""
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum
+                series = self._series[label] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def snapshot(self) -> Dict[str, Tuple[List[int], float, int]]:
+        """
+        Copy the recorded data.
+
+        Returns:
+            A dictionary mapping label values to (cumulative bucket counts
+            including +Inf, sum, count)
+        """
+        with self._lock:
+            series = {label: (list(counts), total) for label, (counts, total) in self._series.items()}
+
+        result = {}
+        for label, (counts, total) in series.items():
+            cumulative = []
+            running = 0
+            for count in counts:
+                running += count
+                cumulative.append(running)
+            result[label] = (cumulative, total, running)
+        return result
+
+
+class Counter:
+    """A monotonically increasing count, one series per label value."""
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def increment(self, label: str, amount: int = 1):
+        with self._lock:
+            self._series[label] = self._series.get(label, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        """Copy the recorded counts."""
+        with self._lock:
+            return dict(self._series)
+
+
+# Duration of pactl commands by command class (e.g. 'list sinks', 'load-module')
+COMMAND_LATENCY = Histogram()
+
+# Calls answered by an identical command that was already running, by command class
+COMMAND_SHARED = Counter()
+
+# List calls whose output was identical to the previous one, so parsing was skipped
+PARSE_SKIPPED = Counter()
+
+# Timer callbacks run by the GUI, by timer ('poll', 'watchdog', ...)
+WAKEUPS = Counter()
+
+# Events per coalesced burst: 'received' as reported, 'merged' after merging per object
+EVENT_BURST_SIZE = Histogram(BURST_BUCKETS)
+
+
+def command_class(command: List[str]) -> str:
+    """Label a pactl command by what it does rather than by its arguments."""
+    if not command:
+        return ""
+    if command[0] == 'list' and len(command) > 1:
+        return f"list {command[-1]}"
+    return command[0]
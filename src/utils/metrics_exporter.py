@@ -0,0 +1,251 @@
+"""
+Prometheus metrics exporter for pactl-gui.
+
+Publishes audio graph health in the Prometheus text exposition format,
+either over HTTP on a localhost port or as a file for the node_exporter
+textfile collector. All values come from the snapshot the host process
+already holds (the daemon's shared state or the GUI's live snapshot) and
+from the recorded command timings, so a scrape never runs pactl.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from utils.metrics import COMMAND_LATENCY, COMMAND_SHARED, EVENT_BURST_SIZE, PARSE_SKIPPED, WAKEUPS
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Every state a sink can report; exported as a state set
+SINK_STATES = ('RUNNING', 'IDLE', 'SUSPENDED')
+
+VOLUME_PATTERN = re.compile(r'([\w-]+):\s*\d+\s*/\s*(\d+)%')
+LATENCY_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*usec')
+
+# Default interval between textfile updates, in seconds
+TEXTFILE_INTERVAL_SECONDS = 15.0
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class _MetricWriter:
+    """Accumulates metric families in the text exposition format."""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name: str, kind: str, help_text: str, samples: List[Tuple[str, tuple, float]]):
+        """
+        Add a metric family.
+
+        Args:
+            samples: (name suffix, ((label, value), ...), sample value) tuples
+        """
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+            label_text = f"{{{label_text}}}" if label_text else ""
+            self.lines.append(f"{name}{suffix}{label_text} {_format_value(value)}")
+
+    def gauge(self, name: str, help_text: str, samples: List[Tuple[tuple, float]]):
+        self.family(name, "gauge", help_text, [("", labels, value) for labels, value in samples])
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+class MetricsExporter:
+    """Renders and publishes metrics for the current snapshot."""
+
+    def __init__(self, snapshot_source: Callable[[], Optional[Dict[str, Any]]]):
+        """
+        Args:
+            snapshot_source: Returns the current snapshot dictionary (with
+                'sinks', 'sources' and 'modules'), or None if none is available
+                yet. Called on every scrape, so it must not run pactl.
+        """
+        self.snapshot_source = snapshot_source
+        self._server = None
+        self._stopping = threading.Event()
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        writer = _MetricWriter()
+        snapshot = self.snapshot_source()
+
+        writer.gauge("pactl_gui_snapshot_available",
+                     "Whether a snapshot of the audio server state is available.",
+                     [((), 1 if snapshot else 0)])
+
+        if snapshot:
+            sinks = snapshot.get('sinks', [])
+            modules = snapshot.get('modules', [])
+            null_sinks = [m for m in modules if m.get('name') == 'module-null-sink']
+
+            writer.gauge("pactl_gui_sinks", "Number of sinks.", [((), len(sinks))])
+            writer.gauge("pactl_gui_sources", "Number of sources, including monitors.",
+                         [((), len(snapshot.get('sources', [])))])
+            writer.gauge("pactl_gui_modules", "Number of loaded modules.", [((), len(modules))])
+            writer.gauge("pactl_gui_null_sinks", "Number of loaded module-null-sink instances.",
+                         [((), len(null_sinks))])
+            self._render_sinks(writer, sinks)
+
+        self._render_command_latency(writer)
+        self._render_event_bursts(writer)
+        self._render_idle_cost(writer)
+        return writer.text()
+
+    @staticmethod
+    def _render_sinks(writer: _MetricWriter, sinks: List[Dict[str, Any]]):
+        states, volumes, muted, latencies = [], [], [], []
+        for sink in sinks:
+            name = sink.get('name', '')
+            current = sink.get('state', '').upper()
+            for state in SINK_STATES:
+                states.append(((('sink', name), ('state', state)), 1 if current == state else 0))
+
+            for channel, percent in VOLUME_PATTERN.findall(sink.get('volume', '')):
+                volumes.append(((('sink', name), ('channel', channel)), int(percent) / 100))
+
+            if 'mute' in sink:
+                muted.append(((('sink', name),), 1 if sink['mute'] == 'yes' else 0))
+
+            latency = LATENCY_PATTERN.search(sink.get('latency', ''))
+            if latency:
+                latencies.append(((('sink', name),), float(latency.group(1)) / 1e6))
+
+        writer.gauge("pactl_gui_sink_state", "Current state of each sink (1 for the active state).", states)
+        writer.gauge("pactl_gui_sink_volume_ratio", "Sink volume per channel (1.0 is 100%).", volumes)
+        writer.gauge("pactl_gui_sink_muted", "Whether each sink is muted.", muted)
+        writer.gauge("pactl_gui_sink_latency_seconds", "Latency reported for each sink.", latencies)
+
+    @staticmethod
+    def _render_command_latency(writer: _MetricWriter):
+        samples = []
+        bounds = COMMAND_LATENCY.buckets + (float('inf'),)
+        for command, (cumulative, total, count) in sorted(COMMAND_LATENCY.snapshot().items()):
+            for bound, value in zip(bounds, cumulative):
+                samples.append(("_bucket", (('command', command), ('le', _format_value(bound))), value))
+            samples.append(("_sum", (('command', command),), total))
+            samples.append(("_count", (('command', command),), count))
+        writer.family("pactl_gui_command_duration_seconds", "histogram",
+                      "Duration of pactl commands by command class.", samples)
+
+        shared = [("", (('command', command),), count)
+                  for command, count in sorted(COMMAND_SHARED.snapshot().items())]
+        writer.family("pactl_gui_command_shared_total", "counter",
+                      "Calls answered by an identical pactl command already in flight.", shared)
+
+        skipped = [("", (('command', command),), count)
+                   for command, count in sorted(PARSE_SKIPPED.snapshot().items())]
+        writer.family("pactl_gui_parse_skipped_total", "counter",
+                      "List calls whose output matched the previous one, so it was not parsed again.", skipped)
+
+    @staticmethod
+    def _render_event_bursts(writer: _MetricWriter):
+        bursts = EVENT_BURST_SIZE.snapshot()
+        samples = []
+        bounds = EVENT_BURST_SIZE.buckets + (float('inf'),)
+        for stage, (cumulative, total, count) in sorted(bursts.items()):
+            for bound, value in zip(bounds, cumulative):
+                samples.append(("_bucket", (('stage', stage), ('le', _format_value(bound))), value))
+            samples.append(("_sum", (('stage', stage),), total))
+            samples.append(("_count", (('stage', stage),), count))
+        writer.family("pactl_gui_event_burst_size", "histogram",
+                      "Server events per coalesced burst, as received and after merging per object.", samples)
+
+        # Each burst causes at most one refresh
+        received = bursts.get('received')
+        ratio = [((), received[1] / received[2])] if received and received[2] else []
+        writer.gauge("pactl_gui_event_coalescing_ratio",
+                     "Server events received per coalesced burst.", ratio)
+
+    @staticmethod
+    def _render_idle_cost(writer: _MetricWriter):
+        wakeups = [("", (('timer', timer),), count) for timer, count in sorted(WAKEUPS.snapshot().items())]
+        writer.family("pactl_gui_wakeups_total", "counter",
+                      "Timer callbacks run by the GUI, by timer.", wakeups)
+        writer.family("pactl_gui_process_cpu_seconds_total", "counter",
+                      "CPU time used by this process.", [("", (), time.process_time())])
+
+    # Publishing
+
+    def serve(self, port: int, address: str = '127.0.0.1'):
+        """
+        Serve /metrics over HTTP on a background thread.
+
+        Binds to localhost by default; the metrics name the user's devices.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((address, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+
+    def write_textfile(self, path: str):
+        """
+        Write the metrics to a file for the node_exporter textfile collector.
+
+        The file is replaced atomically so the collector never reads a
+        partial file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w') as f:
+            f.write(self.render())
+        os.replace(temporary, path)
+
+    def start_textfile_writer(self, path: str, interval: float = TEXTFILE_INTERVAL_SECONDS, logger=None):
+        """Rewrite the textfile every interval seconds on a background thread."""
+        def run():
+            while not self._stopping.is_set():
+                try:
+                    self.write_textfile(path)
+                except OSError as e:
+                    if logger:
+                        logger(f"Could not write metrics to {path}: {e}")
+                self._stopping.wait(interval)
+
+        threading.Thread(target=run, name="metrics-textfile", daemon=True).start()
+
+    def stop(self):
+        """Stop the HTTP server and the textfile writer."""
+        self._stopping.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
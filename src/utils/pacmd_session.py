@@ -0,0 +1,225 @@
+"""
+Long-lived pacmd session for PulseAudio write commands.
+
+Every pactl call starts a process and opens a new connection to the audio
+server. pacmd instead reads commands from stdin for as long as it runs, so
+one session can carry any number of commands at the cost of a pipe write.
+
+pacmd has no per-command status or end-of-response marker. Each command is
+therefore followed by a sentinel that the server does not know; the
+"Unknown command: <sentinel>" reply marks the end of the command's output.
+PulseAudio's CLI prints nothing for a successful load-module, unload-module
+or set-* command, so any other output means the command failed.
+
+Only commands whose pactl and pacmd forms mean the same thing are sent
+through the session (see PacmdSession.translate); everything else, and
+everything on servers without pacmd (such as PipeWire), keeps using pactl.
+"""
+
+import itertools
+import os
+import queue
+import re
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from typing import List, Optional
+
+# Set to a non-empty value to always run commands with pactl
+NO_SESSION_ENV = "PACTL_GUI_NO_PACMD"
+
+SENTINEL_PREFIX = "__pactl_gui_sync_"
+PROMPT = ">>> "
+
+# Seconds to wait for a new session to answer its first sentinel
+START_TIMEOUT_SECONDS = 2.0
+
+# Seconds to wait before trying to start a session again after a failure
+RETRY_DELAY_SECONDS = 30.0
+
+# pacmd volumes are raw values where this means 100%
+VOLUME_NORM = 65536
+
+PERCENT_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)%$')
+MUTE_VALUES = ('0', '1', 'yes', 'no', 'true', 'false', 'on', 'off')
+
+
+class PacmdSessionError(Exception):
+    """The session ended or stopped answering; the command's outcome is unknown."""
+
+    def __init__(self, message: str, timed_out: bool = False):
+        super().__init__(message)
+        self.timed_out = timed_out
+
+
+class PacmdSession:
+    """
+    One pacmd process shared by every caller.
+
+    Commands are sent one at a time. The session starts on first use and
+    is restarted after it dies, but not more often than RETRY_DELAY_SECONDS.
+    """
+
+    def __init__(self, executable: str = 'pacmd'):
+        self.executable = executable
+        self.process = None
+        self._lines = None
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._retry_at = 0.0
+
+    @staticmethod
+    def translate(command: List[str]) -> Optional[str]:
+        """
+        Convert a pactl command to the equivalent pacmd command line.
+
+        Returns:
+            The pacmd command line, or None if the command has to run with
+            pactl (reads print a different format, and relative volumes,
+            mute toggles and dB values have no pacmd form)
+        """
+        if not command or any('\n' in part for part in command):
+            return None
+
+        name, args = command[0], command[1:]
+        if name == 'load-module' and args:
+            # pactl joins the module arguments with spaces, as pacmd does
+            return ' '.join(command)
+        if name == 'unload-module' and len(args) == 1 and args[0].isdigit():
+            return ' '.join(command)
+        if name in ('set-sink-volume', 'set-source-volume') and len(args) == 2:
+            volume = args[1]
+            match = PERCENT_PATTERN.match(volume)
+            if match:
+                volume = str(round(float(match.group(1)) * VOLUME_NORM / 100))
+            elif not volume.isdigit():
+                return None
+            return f"{name} {args[0]} {volume}"
+        if name in ('set-sink-mute', 'set-source-mute') and len(args) == 2:
+            if args[1].lower() not in MUTE_VALUES:
+                return None
+            return ' '.join(command)
+        return None
+
+    @property
+    def available(self) -> bool:
+        """Whether the session is running or may be started now."""
+        if self.process is not None and self.process.poll() is None:
+            return True
+        return not os.environ.get(NO_SESSION_ENV) and time.monotonic() >= self._retry_at
+
+    def execute(self, line: str, timeout: float) -> Optional[str]:
+        """
+        Run one pacmd command line.
+
+        Returns:
+            The command's output ('' on success), or None if no session is
+            available; the caller should then run the command with pactl
+
+        Raises:
+            PacmdSessionError: The session died or did not answer within
+                timeout seconds; it is closed and the command may or may not
+                have run
+        """
+        with self._lock:
+            if not self._ensure_started():
+                return None
+            try:
+                return self._exchange(line, time.monotonic() + timeout)
+            except PacmdSessionError:
+                self._close()
+                self._retry_at = time.monotonic() + RETRY_DELAY_SECONDS
+                raise
+
+    def close(self):
+        """End the session."""
+        with self._lock:
+            self._close()
+
+    def _ensure_started(self) -> bool:
+        if self.process is not None:
+            if self.process.poll() is None:
+                return True
+            self._close()
+        if not self.available or shutil.which(self.executable) is None:
+            return False
+
+        try:
+            self.process = subprocess.Popen(
+                [self.executable],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                start_new_session=True
+            )
+        except OSError:
+            self._retry_at = time.monotonic() + RETRY_DELAY_SECONDS
+            return False
+
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_lines, args=(self.process.stdout, self._lines),
+                         name="pacmd-session", daemon=True).start()
+
+        # Discard the welcome banner; a server without a CLI ends the session here
+        try:
+            self._exchange(None, time.monotonic() + START_TIMEOUT_SECONDS)
+        except PacmdSessionError:
+            self._close()
+            self._retry_at = time.monotonic() + RETRY_DELAY_SECONDS
+            return False
+        return True
+
+    @staticmethod
+    def _read_lines(stream, lines: queue.Queue):
+        try:
+            for line in stream:
+                lines.put(line)
+        finally:
+            stream.close()
+            lines.put(None)
+
+    def _exchange(self, line: Optional[str], deadline: float) -> str:
+        """Send a command line followed by a sentinel and collect the reply."""
+        sentinel = f"{SENTINEL_PREFIX}{next(self._sequence)}"
+        marker = f"Unknown command: {sentinel}"
+        request = f"{sentinel}\n"
+        if line is not None:
+            request = f"{line}\n{request}"
+        try:
+            self.process.stdin.write(request)
+            self.process.stdin.flush()
+        except OSError as e:
+            raise PacmdSessionError(f"pacmd session closed: {e}") from e
+
+        output = []
+        while True:
+            try:
+                received = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise PacmdSessionError("pacmd session did not answer in time", timed_out=True)
+            if received is None:
+                raise PacmdSessionError("pacmd session ended")
+            while received.startswith(PROMPT):
+                received = received[len(PROMPT):]
+            if received.strip() == marker:
+                return "".join(output)
+            output.append(received)
+
+    def _close(self):
+        if self.process is None:
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.process.wait()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process = None
+        self._lines = None
@@ -2,302 +2,585 @@
 PulseAudio command execution and parsing utilities.
 """
 
+import hashlib
+import itertools
+import os
+import signal
 import subprocess
 import re
-from typing import List, Dict, Any, Tuple, Optional
+import threading
+import time
+from functools import partial
+from typing import List, Dict, Any, Tuple, Optional, Union
 
+from utils import listing_parser
+from utils.audio_backend import AudioBackend, AudioEvent, Records, Subscription
+from utils.metrics import COMMAND_LATENCY, COMMAND_SHARED, PARSE_SKIPPED, command_class
+from utils.pacmd_session import PacmdSession, PacmdSessionError
+from utils.record_pool import RecordPool
 
-class PactlRunner:
+
+# Seconds a command may run before its process group is killed, by command class.
+# Reads should answer quickly; loading a module can legitimately take longer.
+COMMAND_TIMEOUTS = {
+    'list': 5.0,
+    'info': 5.0,
+    'stat': 5.0,
+    'load-module': 10.0,
+    'unload-module': 10.0,
+    'set-sink-volume': 3.0,
+    'set-source-volume': 3.0,
+    'set-sink-mute': 3.0,
+    'set-source-mute': 3.0,
+}
+DEFAULT_TIMEOUT = 10.0
+
+# Return codes reported for commands that did not finish on their own
+# (124 matches coreutils 'timeout')
+TIMEOUT_RETURN_CODE = 124
+CANCELLED_RETURN_CODE = 125
+
+# How often a running command checks its cancellation event
+CANCEL_POLL_SECONDS = 0.05
+
+# Format of 'pactl subscribe' lines, e.g. "Event 'new' on sink #12"
+EVENT_PATTERN = re.compile(r"^Event '([\w-]+)' on ([\w-]+)(?: #(\d+))?")
+
+# Read-only command classes; identical ones that overlap share a single run
+SHARED_COMMANDS = ('list', 'info', 'stat')
+
+# Size of the output fingerprints, in bytes
+FINGERPRINT_SIZE = 16
+
+# Columns of 'pactl list short', by list
+SHORT_COLUMNS = {
+    'sinks': ('id', 'name', 'driver', 'sample_spec', 'state'),
+    'sources': ('id', 'name', 'driver', 'sample_spec', 'state'),
+    'modules': ('id', 'name', 'argument'),
+}
+
+
+def _as_bytes(output: Union[str, bytes]) -> bytes:
+    return output.encode() if isinstance(output, str) else output
+
+
+class PactlError(Exception):
+    """A pactl command failed, timed out or was cancelled."""
+
+    def __init__(self, command: List[str], output: str, return_code: int):
+        super().__init__(f"pactl {' '.join(command)} failed (exit code {return_code}): {output.strip()}")
+        self.command = command
+        self.output = output
+        self.return_code = return_code
+
+    @property
+    def timed_out(self) -> bool:
+        return self.return_code == TIMEOUT_RETURN_CODE
+
+
+class _Flight:
+    """The pending result of a shared read, handed to every caller waiting for it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class PactlRunner(AudioBackend):
     """
     A class to execute PulseAudio commands and parse their output.
+
+    The reference AudioBackend. All methods are static, so the class can be
+    used directly as well as through an instance.
     """
 
+    # Commands currently running: id -> (command string, start time, timeout, process)
+    _in_flight = {}
+    _in_flight_lock = threading.Lock()
+    _in_flight_ids = itertools.count(1)
+
+    # Shared reads in progress: key -> _Flight
+    _flights = {}
+    _flights_lock = threading.Lock()
+
+    # Carries write commands when the server accepts pacmd (see utils/pacmd_session.py)
+    _session = PacmdSession()
+
+    # Last parse of each list command: command tuple -> Records
+    _parsed = {}
+
+    # Records of the last full listing of each kind, reused while unchanged
+    # (see utils/record_pool.py)
+    _pools = {kind: RecordPool() for kind in ('sinks', 'sources', 'modules')}
+
+    @staticmethod
+    def timeout_for(command: List[str]) -> float:
+        """Deadline in seconds for a command, based on its command class."""
+        return COMMAND_TIMEOUTS.get(command[0] if command else '', DEFAULT_TIMEOUT)
+
+    @staticmethod
+    def in_flight_commands() -> List[Tuple[int, str, float, float]]:
+        """
+        List the commands that are currently running.
+
+        Returns:
+            A list of (id, command string, seconds running, timeout) tuples
+        """
+        now = time.monotonic()
+        with PactlRunner._in_flight_lock:
+            entries = list(PactlRunner._in_flight.items())
+        return [(command_id, command_str, now - started, timeout)
+                for command_id, (command_str, started, timeout, process) in entries]
+
+    @staticmethod
+    def cancel_all():
+        """Kill every running command, e.g. when the application exits."""
+        with PactlRunner._in_flight_lock:
+            processes = [entry[3] for entry in PactlRunner._in_flight.values()]
+        processes.append(PactlRunner._session.process)
+        for process in processes:
+            if process is not None:
+                PactlRunner._kill_process_group(process)
+
+    @staticmethod
+    def _single_flight(key: tuple, function) -> Tuple[Any, bool]:
+        """
+        Call function, unless a call with the same key is already running.
+
+        Callers that arrive while the first call runs wait for it and get
+        its result (or its exception) instead of repeating the work.
+
+        Returns:
+            A tuple of (result, shared), where shared is True if the result
+            came from another caller's call
+        """
+        with PactlRunner._flights_lock:
+            flight = PactlRunner._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = PactlRunner._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            COMMAND_SHARED.increment(command_class(list(key[1:])))
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = function()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with PactlRunner._flights_lock:
+                del PactlRunner._flights[key]
+            flight.done.set()
+        return flight.result, False
+
     @staticmethod
-    def run_command(command: List[str], logger=None) -> Tuple[str, int]:
+    def _kill_process_group(process: subprocess.Popen):
+        """Kill a command together with anything it started."""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    @staticmethod
+    def _wait(process: subprocess.Popen, started: float, timeout: Optional[float],
+              cancel_event: Optional[threading.Event]) -> Tuple[Any, Optional[str]]:
+        """
+        Wait for a command, killing it on timeout or cancellation.
+
+        Returns:
+            A tuple of (output, reason), where reason is None if the command
+            finished on its own, else 'timed out' or 'cancelled'
+        """
+        while True:
+            wait = None
+            if timeout is not None:
+                wait = max(0.0, started + timeout - time.monotonic())
+            if cancel_event is not None:
+                wait = CANCEL_POLL_SECONDS if wait is None else min(wait, CANCEL_POLL_SECONDS)
+            try:
+                output, _ = process.communicate(timeout=wait)
+                return output, None
+            except subprocess.TimeoutExpired:
+                if cancel_event is not None and cancel_event.is_set():
+                    reason = 'cancelled'
+                elif timeout is not None and time.monotonic() - started >= timeout:
+                    reason = 'timed out'
+                else:
+                    continue
+            PactlRunner._kill_process_group(process)
+            output, _ = process.communicate()
+            return output, reason
+
+    @staticmethod
+    def run_command(
+        command: List[str],
+        logger=None,
+        timeout: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+        binary: bool = False
+    ) -> Tuple[Union[str, bytes], int]:
         """
         Run a pactl command and return its output.
 
+        The command runs in its own process group, which is killed if it
+        exceeds its deadline or is cancelled, so a hung audio server can
+        never block the caller for longer than the timeout.
+
+        Read commands (see SHARED_COMMANDS) without a cancel_event that
+        are already running for another caller are not started again;
+        the caller waits for the running one and shares its output.
+
+        Write commands with a pacmd equivalent go through the persistent
+        pacmd session when the server offers one, which avoids starting a
+        process per command; otherwise they run with pactl as usual. A
+        session command cannot be killed on its own: with a cancel_event
+        it is not sent once the event is set, and cancel_all() ends the
+        session.
+
         Args:
             command: A list of command components (e.g., ['list', 'sinks'])
             logger: Optional callback function to log command execution
+            timeout: Seconds before the command is killed (defaults to the
+                deadline for its command class, see COMMAND_TIMEOUTS)
+            cancel_event: Optional event; setting it kills the command
+            binary: Return the output of a successful command as the bytes
+                pactl wrote, without decoding it (for the parsers in
+                utils/listing_parser.py); error messages are still strings
+
+        Returns:
+            A tuple containing (output_string, return_code)
+        """
+        if timeout is None:
+            timeout = PactlRunner.timeout_for(command)
+
+        if cancel_event is None and command and command[0] in SHARED_COMMANDS:
+            result, shared = PactlRunner._single_flight(
+                ('run', binary) + tuple(command),
+                lambda: PactlRunner._execute(command, logger, timeout, None, binary=binary)
+            )
+            if shared:
+                PactlRunner._log_shared(command, logger)
+            return result
+
+        session_line = PacmdSession.translate(command)
+        if session_line is not None and PactlRunner._session.available:
+            if cancel_event is not None and cancel_event.is_set():
+                message = f"Command cancelled before it started: pactl {' '.join(command)}"
+                if logger:
+                    logger(message)
+                return message, CANCELLED_RETURN_CODE
+            result = PactlRunner._execute_in_session(command, session_line, logger, timeout)
+            if result is not None:
+                return result
+        return PactlRunner._execute(command, logger, timeout, cancel_event, binary=binary)
+
+    @staticmethod
+    def _execute_in_session(command: List[str], line: str, logger, timeout: float) -> Optional[Tuple[str, int]]:
+        """
+        Run a command through the pacmd session.
+
+        Returns:
+            A tuple of (output, return_code), or None if no session could be
+            started and the command should run with pactl instead
+        """
+        command_str = f"pactl {' '.join(command)}"
+        started = time.monotonic()
+        command_id = next(PactlRunner._in_flight_ids)
+        with PactlRunner._in_flight_lock:
+            PactlRunner._in_flight[command_id] = (command_str, started, timeout, PactlRunner._session.process)
+        try:
+            output = PactlRunner._session.execute(line, timeout)
+        except PacmdSessionError as e:
+            # The command may have run, so it is not retried with pactl
+            output = f"{e}: {command_str}"
+            return_code = TIMEOUT_RETURN_CODE if e.timed_out else 1
+        else:
+            return_code = 0 if output is not None and not output.strip() else 1
+        finally:
+            with PactlRunner._in_flight_lock:
+                del PactlRunner._in_flight[command_id]
+        if output is None:
+            return None
+        COMMAND_LATENCY.observe(command_class(command), time.monotonic() - started)
+
+        if logger:
+            logger(f"$ {command_str} (pacmd session)")
+            if return_code == 0:
+                logger("Command completed successfully")
+            else:
+                logger(f"Command failed (exit code {return_code})")
+                logger(f"Error: {output.strip()}")
+        return output, return_code
+
+    @staticmethod
+    def _log_shared(command: List[str], logger):
+        if logger:
+            logger(f"$ pactl {' '.join(command)}")
+            logger("Shared the result of the identical command already running")
+
+    @staticmethod
+    def run_program(
+        program: str,
+        args: List[str],
+        logger=None,
+        timeout: float = DEFAULT_TIMEOUT,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Tuple[str, int]:
+        """
+        Run another audio tool (e.g. pw-dump) with the same deadline,
+        cancellation, watchdog and metrics handling as pactl commands.
 
         Returns:
             A tuple containing (output_string, return_code)
         """
-        full_command = ['pactl'] + command
+        return PactlRunner._execute(args, logger, timeout, cancel_event, program)
+
+    @staticmethod
+    def _execute(
+        command: List[str],
+        logger,
+        timeout: float,
+        cancel_event: Optional[threading.Event],
+        program: str = 'pactl',
+        binary: bool = False
+    ) -> Tuple[Union[str, bytes], int]:
+        """Start a command and wait for it (see run_command)."""
+        full_command = [program] + command
         command_str = ' '.join(full_command)
         
         # Log the command being executed
         if logger:
             logger(f"$ {command_str}")
         
+        started = time.monotonic()
         try:
-            result = subprocess.run(
+            process = subprocess.Popen(
                 full_command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                check=False
+                text=not binary,
+                start_new_session=True
             )
-            
-            # Log the result
-            if logger:
-                if result.returncode == 0:
-                    if result.stdout.strip():
-                        # Only log output for commands that produce meaningful output
-                        if any(cmd in command_str for cmd in ['list', 'info']):
-                            logger(f"Command completed successfully (output truncated for readability)")
-                        else:
-                            logger(f"Command completed successfully")
-                            if result.stdout.strip():
-                                logger(f"Output: {result.stdout.strip()}")
-                    else:
-                        logger(f"Command completed successfully")
-                else:
-                    logger(f"Command failed (exit code {result.returncode})")
-                    if result.stdout.strip():
-                        logger(f"Error: {result.stdout.strip()}")
-            
-            return result.stdout, result.returncode
         except Exception as e:
             error_msg = str(e)
             if logger:
                 logger(f"Command execution failed: {error_msg}")
             return error_msg, 1
+        
+        command_id = next(PactlRunner._in_flight_ids)
+        with PactlRunner._in_flight_lock:
+            PactlRunner._in_flight[command_id] = (command_str, started, timeout, process)
+        try:
+            output, reason = PactlRunner._wait(process, started, timeout, cancel_event)
+        finally:
+            with PactlRunner._in_flight_lock:
+                del PactlRunner._in_flight[command_id]
+        COMMAND_LATENCY.observe(command_class(command) if program == 'pactl' else program, time.monotonic() - started)
+        if output is None:
+            output = b'' if binary else ''
+        if binary and (reason is not None or process.returncode != 0):
+            # Failures are reported as text
+            output = output.decode(errors='replace')
+        
+        if reason is not None:
+            return_code = TIMEOUT_RETURN_CODE if reason == 'timed out' else CANCELLED_RETURN_CODE
+            message = f"Command {reason} after {time.monotonic() - started:.1f}s: {command_str}"
+            if logger:
+                logger(message)
+            return message, return_code
+        
+        # Log the result
+        if logger:
+            if process.returncode == 0:
+                if output.strip():
+                    # Only log output for commands that produce meaningful output
+                    if program != 'pactl' or any(cmd in command_str for cmd in ['list', 'info']):
+                        logger(f"Command completed successfully (output truncated for readability)")
+                    else:
+                        logger(f"Command completed successfully")
+                        if output.strip():
+                            logger(f"Output: {output.strip()}")
+                else:
+                    logger(f"Command completed successfully")
+            else:
+                logger(f"Command failed (exit code {process.returncode})")
+                if output.strip():
+                    logger(f"Error: {output.strip()}")
+        
+        return output, process.returncode
+
+    @staticmethod
+    def _list(command: List[str], parse, logger, raise_errors: bool) -> List[Dict[str, Any]]:
+        """
+        Run a list command and parse its output.
+
+        Overlapping calls for the same command share one run and one parse,
+        so every caller gets the same list; callers must not modify it. The
+        output is read and parsed as bytes.
+        """
+        def fetch():
+            output, return_code = PactlRunner.run_command(command, logger, binary=True)
+            if return_code != 0:
+                return None, output, return_code
+            return PactlRunner._parse_cached(command, output, parse), '', return_code
+
+        (records, output, return_code), shared = PactlRunner._single_flight(('parse',) + tuple(command), fetch)
+        if shared:
+            PactlRunner._log_shared(command, logger)
+        if return_code != 0:
+            if raise_errors:
+                raise PactlError(command, output, return_code)
+            return []
+        return records
 
     @staticmethod
-    def list_sinks(logger=None) -> List[Dict[str, Any]]:
+    def _parse_cached(command: List[str], output: bytes, parse) -> Records:
+        """
+        Parse a list command's output, unless it is byte-for-byte the output
+        parsed last time; then the previous Records are returned as they are.
+        """
+        fingerprint = hashlib.blake2b(output, digest_size=FINGERPRINT_SIZE).digest()
+        key = tuple(command)
+        cached = PactlRunner._parsed.get(key)
+        if cached is not None and cached.fingerprint == fingerprint:
+            PARSE_SKIPPED.increment(command_class(command))
+            return cached
+        records = Records(parse(output), fingerprint)
+        PactlRunner._parsed[key] = records
+        return records
+
+    @staticmethod
+    def _parse_pooled(output: bytes, kind: str) -> List[Dict[str, Any]]:
+        """Parse a full listing, reusing the unchanged records of the last one of its kind."""
+        return listing_parser.parse_listing(output, kind, PactlRunner._pools[kind])
+
+    @staticmethod
+    def list_sinks(logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Get a comprehensive list of all audio sinks (outputs) with full specifications.
 
         Args:
             logger: Optional callback function to log command execution
+            raise_errors: Raise PactlError on failure instead of returning an empty list
 
         Returns:
             A list of dictionaries containing complete sink information
         """
-        output, return_code = PactlRunner.run_command(['list', 'sinks'], logger)
-        if return_code != 0:
-            return []
-        
-        sinks = []
-        current_sink = None
-        current_section = None
-        
-        for line in output.splitlines():
-            line_stripped = line.strip()
-            
-            if line.startswith('Sink #'):
-                # Save previous sink and start new one
-                if current_sink:
-                    sinks.append(current_sink)
-                sink_id = line.split('#')[1].strip()
-                current_sink = {'id': sink_id, 'properties': {}}
-                current_section = None
-                
-            elif current_sink:
-                if line_stripped.startswith('Properties:'):
-                    current_section = 'properties'
-                elif line_stripped.startswith('Formats:'):
-                    current_section = 'formats'
-                    current_sink['formats'] = []
-                elif current_section == 'properties' and '=' in line_stripped:
-                    # Parse property line: key = "value"
-                    parts = line_stripped.split(' = ', 1)
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        value = parts[1].strip().strip('"')
-                        current_sink['properties'][key] = value
-                elif current_section == 'formats' and line_stripped:
-                    current_sink['formats'].append(line_stripped)
-                elif ':' in line and current_section not in ['properties', 'formats']:
-                    # Parse regular field: Key: Value
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    # Map to standardized field names
-                    field_map = {
-                        'State': 'state',
-                        'Name': 'name', 
-                        'Description': 'description',
-                        'Driver': 'driver',
-                        'Sample Specification': 'sample_spec',
-                        'Channel Map': 'channel_map',
-                        'Owner Module': 'owner_module',
-                        'Mute': 'mute',
-                        'Volume': 'volume',
-                        'Base Volume': 'base_volume',
-                        'Monitor Source': 'monitor_source',
-                        'Latency': 'latency',
-                        'Flags': 'flags'
-                    }
-                    
-                    field_name = field_map.get(key, key.lower().replace(' ', '_'))
-                    current_sink[field_name] = value
-        
-        if current_sink:
-            sinks.append(current_sink)
-            
-        return sinks
+        return PactlRunner._list(['list', 'sinks'], partial(PactlRunner._parse_pooled, kind='sinks'),
+                                 logger, raise_errors)
+
+    @staticmethod
+    def parse_sinks(output: Union[str, bytes]) -> List[Dict[str, Any]]:
+        """Parse the output of 'pactl list sinks' (see utils/listing_parser.py)."""
+        return listing_parser.parse_listing(_as_bytes(output), 'sinks')
 
     @staticmethod
-    def list_sources(logger=None) -> List[Dict[str, Any]]:
+    def list_sources(logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Get a comprehensive list of all audio sources (inputs) with full specifications.
 
         Args:
             logger: Optional callback function to log command execution
+            raise_errors: Raise PactlError on failure instead of returning an empty list
 
         Returns:
             A list of dictionaries containing complete source information
         """
-        output, return_code = PactlRunner.run_command(['list', 'sources'], logger)
-        if return_code != 0:
-            return []
-        
-        sources = []
-        current_source = None
-        current_section = None
-        
-        for line in output.splitlines():
-            line_stripped = line.strip()
-            
-            if line.startswith('Source #'):
-                # Save previous source and start new one
-                if current_source:
-                    sources.append(current_source)
-                source_id = line.split('#')[1].strip()
-                current_source = {'id': source_id, 'properties': {}}
-                current_section = None
-                
-            elif current_source:
-                if line_stripped.startswith('Properties:'):
-                    current_section = 'properties'
-                elif line_stripped.startswith('Formats:'):
-                    current_section = 'formats'
-                    current_source['formats'] = []
-                elif current_section == 'properties' and '=' in line_stripped:
-                    # Parse property line: key = "value"
-                    parts = line_stripped.split(' = ', 1)
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        value = parts[1].strip().strip('"')
-                        current_source['properties'][key] = value
-                elif current_section == 'formats' and line_stripped:
-                    current_source['formats'].append(line_stripped)
-                elif ':' in line and current_section not in ['properties', 'formats']:
-                    # Parse regular field: Key: Value
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    # Map to standardized field names
-                    field_map = {
-                        'State': 'state',
-                        'Name': 'name',
-                        'Description': 'description', 
-                        'Driver': 'driver',
-                        'Sample Specification': 'sample_spec',
-                        'Channel Map': 'channel_map',
-                        'Owner Module': 'owner_module',
-                        'Mute': 'mute',
-                        'Volume': 'volume',
-                        'Base Volume': 'base_volume',
-                        'Monitor of Sink': 'monitor_of_sink',
-                        'Latency': 'latency',
-                        'Flags': 'flags'
-                    }
-                    
-                    field_name = field_map.get(key, key.lower().replace(' ', '_'))
-                    current_source[field_name] = value
-        
-        if current_source:
-            sources.append(current_source)
-            
-        return sources
+        return PactlRunner._list(['list', 'sources'], partial(PactlRunner._parse_pooled, kind='sources'),
+                                 logger, raise_errors)
 
     @staticmethod
-    def list_modules(logger=None) -> List[Dict[str, Any]]:
+    def parse_sources(output: Union[str, bytes]) -> List[Dict[str, Any]]:
+        """Parse the output of 'pactl list sources' (see utils/listing_parser.py)."""
+        return listing_parser.parse_listing(_as_bytes(output), 'sources')
+
+    @staticmethod
+    def list_modules(logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Get a comprehensive list of all loaded PulseAudio modules with full specifications.
 
         Args:
             logger: Optional callback function to log command execution
+            raise_errors: Raise PactlError on failure instead of returning an empty list
 
         Returns:
             A list of dictionaries containing complete module information
         """
-        output, return_code = PactlRunner.run_command(['list', 'modules'], logger)
-        if return_code != 0:
-            return []
-        
-        modules = []
-        current_module = None
-        current_section = None
-        
-        for line in output.splitlines():
-            line_stripped = line.strip()
-            
-            if line.startswith('Module #'):
-                # Save previous module and start new one
-                if current_module:
-                    modules.append(current_module)
-                module_id = line.split('#')[1].strip()
-                current_module = {'id': module_id, 'properties': {}}
-                current_section = None
-                
-            elif current_module:
-                if line_stripped.startswith('Properties:'):
-                    current_section = 'properties'
-                elif current_section == 'properties' and '=' in line_stripped:
-                    # Parse property line: key = "value"
-                    parts = line_stripped.split(' = ', 1)
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        value = parts[1].strip().strip('"')
-                        current_module['properties'][key] = value
-                elif line_stripped.startswith('Name: '):
-                    current_module['name'] = line_stripped[6:].strip()
-                elif line_stripped.startswith('Argument: '):
-                    # Handle multi-line arguments
-                    arg_content = line_stripped[10:].strip()
-                    if arg_content.startswith('{'):
-                        # Multi-line argument block
-                        current_section = 'argument'
-                        current_module['argument'] = arg_content
-                    else:
-                        # Single line argument
-                        current_module['argument'] = arg_content
-                elif current_section == 'argument':
-                    # Continue collecting multi-line argument
-                    if 'argument' not in current_module:
-                        current_module['argument'] = ''
-                    current_module['argument'] += '\n' + line
-                    if line_stripped.endswith('}'):
-                        current_section = None
-                elif line_stripped.startswith('Usage counter: '):
-                    current_module['usage_counter'] = line_stripped[15:].strip()
-                    current_section = None  # Reset section after usage counter
-        
-        if current_module:
-            modules.append(current_module)
-            
-        return modules
+        return PactlRunner._list(['list', 'modules'], partial(PactlRunner._parse_pooled, kind='modules'),
+                                 logger, raise_errors)
+
+    @staticmethod
+    def parse_modules(output: Union[str, bytes]) -> List[Dict[str, Any]]:
+        """Parse the output of 'pactl list modules' (see utils/listing_parser.py)."""
+        return listing_parser.parse_listing(_as_bytes(output), 'modules')
+
+    @staticmethod
+    def list_short(kind: str, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get one brief record per sink, source or module from 'pactl list short'.
+
+        The short listing prints a single line per object, a small fraction
+        of the full listing on large graphs.
+
+        Args:
+            kind: 'sinks', 'sources' or 'modules'
+            logger: Optional callback function to log command execution
+            raise_errors: Raise PactlError on failure instead of returning an empty list
+
+        Returns:
+            Records holding only the columns in SHORT_COLUMNS[kind]
+        """
+        return PactlRunner._list(['list', 'short', kind], partial(PactlRunner.parse_short, kind=kind),
+                                 logger, raise_errors)
+
+    @staticmethod
+    def parse_short(output: Union[str, bytes], kind: str) -> List[Dict[str, Any]]:
+        """Parse the output of 'pactl list short <kind>'; empty columns are left out."""
+        return listing_parser.parse_short(_as_bytes(output), SHORT_COLUMNS[kind])
+
+    @staticmethod
+    def load_module(module_name: str, argument: str = '', logger=None) -> bool:
+        """
+        Load a PulseAudio module with a raw argument string.
+
+        Args:
+            module_name: The module to load (e.g., 'module-null-sink')
+            argument: The module argument string exactly as reported by
+                'pactl list modules'; passed through as a single argument so
+                quoted values are preserved
+            logger: Optional callback function to log command execution
+
+        Returns:
+            True if successful, False otherwise
+        """
+        cmd_args = ['load-module', module_name]
+        if argument and argument.strip():
+            cmd_args.append(argument.strip())
+
+        output, return_code = PactlRunner.run_command(cmd_args, logger)
+        return return_code == 0
 
     @staticmethod
-    def unload_module(module_id: str, logger=None) -> bool:
+    def unload_module(module_id: str, logger=None, cancel_event: Optional[threading.Event] = None) -> bool:
         """
         Unload a PulseAudio module by ID.
 
         Args:
             module_id: The numeric ID of the module to unload
             logger: Optional callback function to log command execution
+            cancel_event: Optional event that cancels the command (see run_command)
 
         Returns:
             True if successful, False otherwise
         """
-        output, return_code = PactlRunner.run_command(['unload-module', module_id], logger)
+        output, return_code = PactlRunner.run_command(['unload-module', module_id], logger,
+                                                      cancel_event=cancel_event)
         return return_code == 0
 
     @staticmethod
@@ -354,12 +637,14 @@ class PactlRunner:
         return return_code == 0
 
     @staticmethod
-    def unload_all_null_sinks(logger=None) -> Tuple[int, List[str]]:
+    def unload_all_null_sinks(logger=None, cancel_event: Optional[threading.Event] = None) -> Tuple[int, List[str]]:
         """
         Unload all null sink modules.
         
         Args:
             logger: Optional callback function to log command execution
+            cancel_event: Optional event; setting it cancels the running
+                unload-module and leaves the remaining modules loaded
         
         Returns:
             A tuple containing (number_of_modules_unloaded, list_of_errors)
@@ -370,13 +655,68 @@ class PactlRunner:
         successful = 0
         errors = []
         
-        for module in null_sink_modules:
+        for position, module in enumerate(null_sink_modules):
+            if cancel_event is not None and cancel_event.is_set():
+                errors.append(f"Cancelled with {len(null_sink_modules) - position} module(s) left")
+                break
             module_id = module.get('id', '')
             if module_id:
-                success = PactlRunner.unload_module(module_id, logger)
+                success = PactlRunner.unload_module(module_id, logger, cancel_event)
                 if success:
                     successful += 1
                 else:
                     errors.append(f"Failed to unload module #{module_id}")
         
-        return successful, errors 
\ No newline at end of file
+        return successful, errors 
+
+    @staticmethod
+    def set_sink_volume(sink: str, volume: str, logger=None) -> bool:
+        """
+        Set a sink's volume.
+
+        Args:
+            sink: Sink name or id
+            volume: A pactl volume, e.g. '50%', '+5%' or '32768'
+            logger: Optional callback function to log command execution
+
+        Returns:
+            True if successful, False otherwise
+        """
+        output, return_code = PactlRunner.run_command(['set-sink-volume', str(sink), str(volume)], logger)
+        return return_code == 0
+
+    @staticmethod
+    def parse_event(line: str) -> Optional[AudioEvent]:
+        """Parse one 'pactl subscribe' line; returns None for anything else."""
+        match = EVENT_PATTERN.match(line)
+        if not match:
+            return None
+        kind, facility, index = match.groups()
+        return AudioEvent(kind, facility, index or '')
+
+    @staticmethod
+    def subscribe(on_event) -> Subscription:
+        """
+        Follow 'pactl subscribe' and report every event.
+
+        Raises:
+            OSError: pactl could not be started
+        """
+        process = subprocess.Popen(
+            ['pactl', 'subscribe'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            start_new_session=True
+        )
+
+        def read():
+            for line in process.stdout:
+                event = PactlRunner.parse_event(line)
+                if event is not None:
+                    on_event(event)
+            process.wait()
+
+        thread = threading.Thread(target=read, name="pactl-subscribe", daemon=True)
+        thread.start()
+        return Subscription(process, thread)
@@ -0,0 +1,583 @@
+"""
+PipeWire backend built on 'pw-dump'.
+
+On PipeWire systems 'pactl' talks to the pulse compatibility layer, which
+needs three 'pactl list' calls (and three parses) for one refresh and
+hides how nodes belong to devices. One 'pw-dump' call returns the whole
+graph as JSON: nodes, devices, ports, links, clients and modules. This
+module maps that graph onto the same sink, source and module records that
+PactlRunner produces, and adds a 'device' entry to every node that belongs
+to a PipeWire device, so DeviceGrouping can group hardware exactly instead
+of guessing from names.
+
+Records follow what the pulse layer reports where the graph allows it:
+sink and source ids are the node's object.serial, each sink has a
+'<name>.monitor' source, and PipeWire modules appear with the module flag
+set in their id. Null sinks loaded through the pulse layer are listed as
+module-null-sink modules; their arguments are rebuilt from the node and
+only cover sink_name, channels, rate and media.class.
+
+Writes are delegated to PactlRunner; the pulse layer accepts them.
+"""
+
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import List, Dict, Any, Optional, Iterable
+
+from utils.audio_backend import AudioBackend, AudioEvent, Subscription
+from utils.pactl_runner import PactlRunner
+
+
+# Set to 'pactl' to never use this backend
+BACKEND_ENV = "PACTL_GUI_BACKEND"
+
+DUMP_TIMEOUT_SECONDS = 5.0
+
+# After pw-dump fails (e.g. PulseAudio with pw-dump installed), use pactl for this long
+RETRY_DELAY_SECONDS = 30.0
+
+# Delay before restarting 'pw-dump --monitor' after it exits
+MONITOR_RESTART_DELAY_SECONDS = 2.0
+
+# Flags the pulse layer sets in the ids of monitor sources and PipeWire modules
+MONITOR_FLAG = 1 << 16
+MODULE_FLAG = 1 << 29
+
+# The pulse layer's volume value for 100%
+VOLUME_NORM = 65536
+
+NODE_TYPE = 'PipeWire:Interface:Node'
+DEVICE_TYPE = 'PipeWire:Interface:Device'
+MODULE_TYPE = 'PipeWire:Interface:Module'
+
+# media.class -> the record lists a node appears in
+NODE_CLASSES = {
+    'Audio/Sink': ('sinks',),
+    'Audio/Source': ('sources',),
+    'Audio/Source/Virtual': ('sources',),
+    'Audio/Duplex': ('sinks', 'sources'),
+}
+
+# media.class -> the 'pactl subscribe' facility of the node's events
+EVENT_FACILITIES = {
+    'Audio/Sink': 'sink',
+    'Audio/Duplex': 'sink',
+    'Audio/Source': 'source',
+    'Audio/Source/Virtual': 'source',
+    'Stream/Output/Audio': 'sink-input',
+    'Stream/Input/Audio': 'source-output',
+}
+
+NODE_STATES = {
+    'running': 'RUNNING',
+    'idle': 'IDLE',
+    'suspended': 'SUSPENDED',
+}
+
+SAMPLE_FORMATS = {
+    'U8': 'u8',
+    'ALAW': 'aLaw',
+    'ULAW': 'uLaw',
+    'S16LE': 's16le',
+    'S16BE': 's16be',
+    'S24LE': 's24le',
+    'S24BE': 's24be',
+    'S24_32LE': 's24-32le',
+    'S24_32BE': 's24-32be',
+    'S32LE': 's32le',
+    'S32BE': 's32be',
+    'F32LE': 'float32le',
+    'F32BE': 'float32be',
+    'F32P': 'float32le',
+    'S16P': 's16le',
+    'S32P': 's32le',
+}
+
+CHANNEL_POSITIONS = {
+    'MONO': 'mono',
+    'FL': 'front-left',
+    'FR': 'front-right',
+    'FC': 'front-center',
+    'LFE': 'lfe',
+    'SL': 'side-left',
+    'SR': 'side-right',
+    'RL': 'rear-left',
+    'RR': 'rear-right',
+    'RC': 'rear-center',
+    'FLC': 'front-left-of-center',
+    'FRC': 'front-right-of-center',
+}
+
+
+class PipeWireBackend(AudioBackend):
+    """
+    Reads the audio server state from 'pw-dump'.
+
+    Overlapping reads share one pw-dump call. While 'pw-dump --monitor'
+    runs (with monitor=True, or once anything subscribes) it keeps the
+    state current and reads never start a process.
+    """
+
+    def __init__(self, monitor: bool = False):
+        """
+        Args:
+            monitor: Follow 'pw-dump --monitor' from the start instead of
+                dumping on every read
+        """
+        self._state = None
+        self._dumped_at = -math.inf
+        self._dump_lock = threading.Lock()
+        self._retry_at = 0.0
+        self._stale = False
+
+        self._objects = {}
+        self._monitor = None
+        self._monitor_thread = None
+        self._monitor_lock = threading.Lock()
+        self._monitoring = False
+        self._listeners = []
+        self._stopping = threading.Event()
+        if monitor:
+            self._start_monitor()
+
+    @classmethod
+    def connect(cls, monitor: bool = False) -> Optional['PipeWireBackend']:
+        """
+        Create a backend if pw-dump is installed.
+
+        Returns:
+            A backend, or None if pw-dump is missing or PACTL_GUI_BACKEND=pactl
+        """
+        if os.environ.get(BACKEND_ENV) == 'pactl' or shutil.which('pw-dump') is None:
+            return None
+        return cls(monitor)
+
+    def close(self):
+        """Stop following 'pw-dump --monitor'; ends every subscription."""
+        self._stopping.set()
+        monitor = self._monitor
+        if monitor and monitor.poll() is None:
+            monitor.terminate()
+
+    # Reads
+
+    def get_state(self, kinds=('modules', 'sinks', 'sources'), logger=None,
+                  raise_errors: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch the requested object lists from one graph dump.
+
+        Falls back to PactlRunner while pw-dump is unusable.
+
+        Raises:
+            PactlError: With raise_errors, if the fallback pactl call fails
+        """
+        state = self._current_state(logger)
+        if state is None:
+            fetchers = {
+                'modules': PactlRunner.list_modules,
+                'sinks': PactlRunner.list_sinks,
+                'sources': PactlRunner.list_sources,
+            }
+            return {kind: fetchers[kind](logger, raise_errors) for kind in kinds}
+        return {kind: state[kind] for kind in kinds}
+
+    def list_sinks(self, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        return self.get_state(('sinks',), logger, raise_errors)['sinks']
+
+    def list_sources(self, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        return self.get_state(('sources',), logger, raise_errors)['sources']
+
+    def list_modules(self, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        return self.get_state(('modules',), logger, raise_errors)['modules']
+
+    def _current_state(self, logger) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        if self._monitoring and self._state is not None and not self._stale:
+            return self._state
+        if time.monotonic() < self._retry_at:
+            return None
+
+        requested = time.monotonic()
+        with self._dump_lock:
+            if self._state is not None and self._dumped_at >= requested:
+                # A dump finished while this call waited for the lock
+                if logger:
+                    logger("$ pw-dump")
+                    logger("Shared the result of the identical command already running")
+                return self._state
+
+            output, return_code = PactlRunner.run_program('pw-dump', [], logger, DUMP_TIMEOUT_SECONDS)
+            try:
+                if return_code != 0:
+                    raise ValueError(output.strip())
+                state = self.parse_dump(output)
+            except ValueError as e:
+                if logger:
+                    logger(f"pw-dump unusable ({e}); running pactl instead")
+                self._retry_at = time.monotonic() + RETRY_DELAY_SECONDS
+                return None
+
+            self._state = state
+            self._dumped_at = time.monotonic()
+            self._stale = False
+            return state
+
+    # Mapping
+
+    @staticmethod
+    def parse_dump(output: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Parse 'pw-dump' output into module, sink and source records.
+
+        Raises:
+            ValueError: The output is not a pw-dump object list
+        """
+        objects = json.loads(output)
+        if not isinstance(objects, list):
+            raise ValueError("pw-dump did not return a list of objects")
+        return PipeWireBackend.map_objects(objects)
+
+    @staticmethod
+    def map_objects(objects: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Map pw-dump objects onto the records PactlRunner produces."""
+        nodes, devices, pipewire_modules = [], {}, []
+        for obj in objects:
+            info = obj.get('info')
+            if not isinstance(info, dict):
+                continue
+            if obj.get('type') == NODE_TYPE:
+                nodes.append((obj['id'], info))
+            elif obj.get('type') == DEVICE_TYPE:
+                devices[obj['id']] = PipeWireBackend._device_summary(obj['id'], info.get('props', {}))
+            elif obj.get('type') == MODULE_TYPE:
+                pipewire_modules.append((obj['id'], info))
+
+        sinks, sources, modules = [], [], []
+        null_sink_modules = {}
+        for node_id, info in nodes:
+            props = info.get('props', {})
+            media_class = props.get('media.class', '')
+            lists = NODE_CLASSES.get(media_class)
+            if not lists:
+                continue
+            index = int(props.get('object.serial', node_id))
+
+            if 'sinks' in lists:
+                sink = PipeWireBackend._node_record(index, info, devices)
+                sink['monitor_source'] = f"{sink['name']}.monitor"
+                sinks.append(sink)
+                monitor = PipeWireBackend._node_record(index | MONITOR_FLAG, info, devices)
+                monitor['name'] = sink['monitor_source']
+                monitor['description'] = f"Monitor of {sink['description']}"
+                monitor['monitor_of_sink'] = sink['name']
+                monitor['properties']['device.class'] = 'monitor'
+                sources.append(monitor)
+            if 'sources' in lists:
+                sources.append(PipeWireBackend._node_record(index, info, devices))
+
+            module_id = props.get('pulse.module.id')
+            if module_id is not None and props.get('factory.name') == 'support.null-audio-sink':
+                null_sink_modules.setdefault(str(module_id), (media_class, info))
+
+        for module_id, info in pipewire_modules:
+            modules.append({
+                'id': str(module_id | MODULE_FLAG),
+                'properties': PipeWireBackend._string_props(info.get('props', {})),
+                'name': info.get('name', ''),
+                'argument': info.get('args') or '',
+            })
+        for module_id, (media_class, info) in sorted(null_sink_modules.items(), key=lambda item: int(item[0])):
+            modules.append({
+                'id': module_id,
+                'properties': {},
+                'name': 'module-null-sink',
+                'argument': PipeWireBackend._null_sink_argument(media_class, info),
+            })
+
+        return {'modules': modules, 'sinks': sinks, 'sources': sources}
+
+    @staticmethod
+    def _string_props(props: Dict[str, Any]) -> Dict[str, str]:
+        """Format property values the way pactl prints them."""
+        result = {}
+        for key, value in props.items():
+            if isinstance(value, bool):
+                value = 'true' if value else 'false'
+            result[key] = str(value)
+        return result
+
+    @staticmethod
+    def _device_summary(device_id: int, props: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            'id': str(device_id),
+            'name': str(props.get('device.name', '')),
+            'description': str(props.get('device.description') or props.get('device.nick') or ''),
+            'bus': str(props.get('device.bus', '')),
+            'api': str(props.get('device.api', '')),
+            'form_factor': str(props.get('device.form-factor', '')),
+        }
+
+    @staticmethod
+    def _audio_format(info: Dict[str, Any]) -> Dict[str, Any]:
+        params = info.get('params', {})
+        for name in ('Format', 'EnumFormat'):
+            for param in params.get(name) or []:
+                if isinstance(param, dict) and param.get('mediaType') == 'audio':
+                    return param
+        return {}
+
+    @staticmethod
+    def _node_record(index: int, info: Dict[str, Any], devices: Dict[int, Dict[str, str]]) -> Dict[str, Any]:
+        props = info.get('props', {})
+        name = str(props.get('node.name', ''))
+        record = {'id': str(index), 'properties': PipeWireBackend._string_props(props)}
+        record['state'] = NODE_STATES.get(info.get('state'), str(info.get('state', '')).upper())
+        record['name'] = name
+        record['description'] = str(props.get('node.description') or props.get('node.nick') or name)
+        record['driver'] = 'PipeWire'
+
+        audio = PipeWireBackend._audio_format(info)
+        positions = [CHANNEL_POSITIONS.get(str(p), str(p).lower()) for p in audio.get('position') or []]
+        channels = audio.get('channels') or len(positions) or props.get('audio.channels')
+        if audio.get('format') or channels or audio.get('rate'):
+            sample_format = SAMPLE_FORMATS.get(str(audio.get('format')), str(audio.get('format', '')).lower())
+            record['sample_spec'] = f"{sample_format} {channels}ch {audio.get('rate', '')}Hz"
+        if positions:
+            record['channel_map'] = ",".join(positions)
+        if 'pulse.module.id' in props:
+            record['owner_module'] = str(props['pulse.module.id'])
+
+        controls = (info.get('params', {}).get('Props') or [{}])[0]
+        if isinstance(controls, dict):
+            if 'mute' in controls:
+                record['mute'] = 'yes' if controls['mute'] else 'no'
+            volumes = controls.get('channelVolumes')
+            if volumes:
+                names = positions or [f"aux{n}" for n in range(len(volumes))]
+                record['volume'] = ",   ".join(
+                    f"{channel}: {PipeWireBackend._format_volume(volume)}" for channel, volume in zip(names, volumes)
+                )
+
+        device = devices.get(props.get('device.id'))
+        if device:
+            record['device'] = device
+        return record
+
+    @staticmethod
+    def _format_volume(linear: float) -> str:
+        """Format a linear PipeWire volume as pactl prints the pulse volume."""
+        cubic = max(0.0, linear) ** (1 / 3)
+        value = round(cubic * VOLUME_NORM)
+        decibels = f"{20 * math.log10(linear):0.2f} dB" if linear > 0 else "-inf dB"
+        return f"{value} / {round(cubic * 100):3d}% / {decibels}"
+
+    @staticmethod
+    def _null_sink_argument(media_class: str, info: Dict[str, Any]) -> str:
+        """
+        Rebuild a null sink's module arguments, in the order
+        PactlRunner.create_duplex_sink writes them, so presets and history
+        snapshots can recreate the sink as it is. Only the description is
+        kept from its properties; other sink_properties cannot be told
+        apart from the ones PipeWire adds.
+        """
+        props = info.get('props', {})
+        audio = PipeWireBackend._audio_format(info)
+        name = str(props.get('node.name', ''))
+        parts = []
+        if media_class == 'Audio/Duplex':
+            parts.append('media.class=Audio/Duplex')
+        parts.append(f"sink_name={name}")
+        channels = audio.get('channels') or props.get('audio.channels')
+        if channels:
+            parts.append(f"channels={channels}")
+        rate = audio.get('rate') or props.get('audio.rate')
+        if rate:
+            parts.append(f"rate={rate}")
+        sample_format = audio.get('format') or props.get('audio.format')
+        if sample_format:
+            parts.append(f"format={SAMPLE_FORMATS.get(str(sample_format), str(sample_format).lower())}")
+        positions = audio.get('position') or re.split(r'[\s,\[\]]+', str(props.get('audio.position', '')))
+        positions = [CHANNEL_POSITIONS.get(str(p), str(p).lower()) for p in positions if p]
+        if positions:
+            parts.append(f"channel_map={','.join(positions)}")
+        description = str(props.get('node.description') or '')
+        if description and description != name:
+            if re.search(r"[\s'\"]", description):
+                # Quoted twice, as pactl needs for a value inside sink_properties
+                outer, inner = ("'", '"') if "'" in description else ('"', "'")
+                description = f"{inner}{description}{inner}"
+                parts.append(f"sink_properties={outer}device.description={description}{outer}")
+            else:
+                parts.append(f"sink_properties=device.description={description}")
+        return " ".join(parts)
+
+    # Monitoring
+
+    def subscribe(self, on_event) -> Subscription:
+        """
+        Report graph changes from 'pw-dump --monitor', starting it if needed.
+
+        Every subscriber shares the one monitor process. When the monitor
+        (re)starts, a single ('change', 'server', '') event stands for
+        everything that may have changed in the meantime.
+        """
+        with self._monitor_lock:
+            self._listeners.append(on_event)
+        thread = self._start_monitor()
+
+        def unsubscribe():
+            with self._monitor_lock:
+                if on_event in self._listeners:
+                    self._listeners.remove(on_event)
+
+        return Subscription(thread=thread, on_close=unsubscribe)
+
+    def _start_monitor(self) -> threading.Thread:
+        with self._monitor_lock:
+            if self._monitor_thread is None:
+                self._monitor_thread = threading.Thread(target=self._monitor_loop, name="pw-dump-monitor", daemon=True)
+                self._monitor_thread.start()
+            return self._monitor_thread
+
+    def _monitor_loop(self):
+        """Follow 'pw-dump --monitor', applying every update to the object table."""
+        while not self._stopping.is_set():
+            try:
+                self._monitor = subprocess.Popen(
+                    ['pw-dump', '--monitor'],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    start_new_session=True
+                )
+            except OSError:
+                self._stopping.wait(MONITOR_RESTART_DELAY_SECONDS)
+                continue
+
+            self._objects = {}
+            first = True
+            chunk = []
+            for line in self._monitor.stdout:
+                chunk.append(line)
+                # Every update is a pretty-printed array closed at the start
+                # of a line, or '[]' on its own
+                if not line.startswith(']') and line.strip() != '[]':
+                    continue
+                try:
+                    update = json.loads("".join(chunk))
+                except ValueError:
+                    continue
+                chunk = []
+                self._apply_update(update, first)
+                first = False
+
+            self._monitor.wait()
+            self._monitoring = False
+            self._stopping.wait(MONITOR_RESTART_DELAY_SECONDS)
+
+    def _apply_update(self, update: List[Dict[str, Any]], first: bool):
+        events = []
+        for obj in update:
+            if not isinstance(obj, dict) or 'id' not in obj:
+                continue
+            previous = self._objects.get(obj['id'])
+            if obj.get('info') is None:
+                # Removed objects are reported with null info
+                self._objects.pop(obj['id'], None)
+                if previous is not None:
+                    events.extend(self._events('remove', previous))
+            else:
+                self._objects[obj['id']] = obj
+                events.extend(self._events('change' if previous is not None else 'new', obj))
+        self._state = self.map_objects(self._objects.values())
+        self._dumped_at = time.monotonic()
+        self._stale = False
+        self._monitoring = True
+
+        if first:
+            events = [AudioEvent('change', 'server', '')]
+        with self._monitor_lock:
+            listeners = list(self._listeners)
+        for event in events:
+            for listener in listeners:
+                listener(event)
+
+    @staticmethod
+    def _events(kind: str, obj: Dict[str, Any]) -> List[AudioEvent]:
+        """
+        Describe a change to a graph object in pactl's terms.
+
+        Like the pulse layer, a sink node also reports its monitor source and
+        a null sink its module, since map_objects derives records from them.
+        """
+        object_type = obj.get('type')
+        if object_type == DEVICE_TYPE:
+            return [AudioEvent(kind, 'card', str(obj['id']))]
+        if object_type == MODULE_TYPE:
+            return [AudioEvent(kind, 'module', str(obj['id'] | MODULE_FLAG))]
+        if object_type != NODE_TYPE:
+            return []
+
+        props = (obj.get('info') or {}).get('props', {})
+        media_class = props.get('media.class')
+        facility = EVENT_FACILITIES.get(media_class)
+        if not facility:
+            return []
+        index = int(props.get('object.serial', obj['id']))
+        events = [AudioEvent(kind, facility, str(index))]
+        if 'sinks' in NODE_CLASSES.get(media_class, ()):
+            events.append(AudioEvent(kind, 'source', str(index | MONITOR_FLAG)))
+            if 'sources' in NODE_CLASSES[media_class]:
+                events.append(AudioEvent(kind, 'source', str(index)))
+        module_id = props.get('pulse.module.id')
+        if module_id is not None and props.get('factory.name') == 'support.null-audio-sink':
+            events.append(AudioEvent(kind, 'module', str(module_id)))
+        return events
+
+    # Writes: the pulse layer accepts them; the next read sees the result
+
+    def invalidate(self):
+        """
+        Make the next read dump the graph again, e.g. after a write made
+        elsewhere; the monitor may not have reported the change yet.
+        """
+        self._dumped_at = -math.inf
+        self._stale = True
+
+    def load_module(self, module_name: str, argument: str = '', logger=None) -> bool:
+        try:
+            return PactlRunner.load_module(module_name, argument, logger)
+        finally:
+            self.invalidate()
+
+    def unload_module(self, module_id: str, logger=None) -> bool:
+        try:
+            return PactlRunner.unload_module(module_id, logger)
+        finally:
+            self.invalidate()
+
+    def create_duplex_sink(self, name: str, description: str, channels: int = 2, rate: Optional[int] = None,
+                           format: Optional[str] = None, channel_map: Optional[str] = None,
+                           sink_properties: Optional[str] = None, logger=None) -> bool:
+        try:
+            return PactlRunner.create_duplex_sink(name, description, channels, rate, format,
+                                                  channel_map, sink_properties, logger)
+        finally:
+            self.invalidate()
+
+    def unload_all_null_sinks(self, logger=None, cancel_event=None):
+        try:
+            return PactlRunner.unload_all_null_sinks(logger, cancel_event)
+        finally:
+            self.invalidate()
+
+    def set_sink_volume(self, sink: str, volume: str, logger=None) -> bool:
+        try:
+            return PactlRunner.set_sink_volume(sink, volume, logger)
+        finally:
+            self.invalidate()
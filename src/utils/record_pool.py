@@ -0,0 +1,108 @@
+"""
+Content-addressed pool of parsed records, shared from one listing to the next.
+
+Every refresh that finds a listing changed parses all of it again, and
+without the pool every record, property dict and string in it would be
+allocated anew, although usually only one or two objects changed (a volume
+was moved, a null sink was loaded). A long-running GUI or daemon refreshing
+on every server event would keep replacing identical data and keep the
+garbage collector busy with it.
+
+RecordPool keys each record by a digest of its bytes in the listing. A
+record whose bytes were in the previous listing is returned as the same
+dict, without being parsed. Property blocks are pooled the same way, so a
+sink whose volume changed keeps its properties dict. Property keys are
+interned, and property values go through a value table shared by every
+pool, so a monitor source and its sink, or two cards of the same model,
+hold one copy of each value they have in common.
+
+A pool keeps only the entries the latest listing used, so it never holds
+more than one listing's worth of records. Pooled records are shared by
+successive lists and must be treated as read-only, like any Records.
+"""
+
+import hashlib
+import sys
+import threading
+from typing import Callable, Dict, Optional
+
+# Size of the record and property block digests, in bytes
+DIGEST_SIZE = 16
+
+# The value table is emptied when it grows past this many strings; values
+# already in records stay shared, later ones start a new table
+MAX_VALUES = 2 ** 18
+
+# Property value -> the one str kept for it, shared by every pool
+_values: Dict[str, str] = {}
+
+
+def intern_properties(properties: Dict[str, str]) -> Dict[str, str]:
+    """Copy a property dict with interned keys and values from the shared value table."""
+    if len(_values) > MAX_VALUES:
+        _values.clear()
+    values = _values
+    return {sys.intern(key): values.setdefault(value, value) for key, value in properties.items()}
+
+
+class RecordPool:
+    """
+    The records and property dicts of the last listing of one kind, by
+    digest of their bytes.
+
+    A listing is parsed inside 'with pool:'; the entries it looked up or
+    added become the pool when the block ends, and the rest are dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = {}
+        self._properties = {}
+        self._next_records = None
+        self._next_properties = None
+        # Records of the last listing that were reused and that were parsed
+        self.reused = 0
+        self.parsed = 0
+
+    def __enter__(self) -> 'RecordPool':
+        self._lock.acquire()
+        self._next_records = {}
+        self._next_properties = {}
+        self.reused = self.parsed = 0
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self._records, self._properties = self._next_records, self._next_properties
+        self._next_records = self._next_properties = None
+        self._lock.release()
+
+    @staticmethod
+    def key(data: memoryview) -> bytes:
+        """Digest of a record's or property block's bytes."""
+        return hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+
+    def record(self, key: bytes) -> Optional[dict]:
+        """The record last parsed from the same bytes, or None."""
+        record = self._records.get(key)
+        if record is not None:
+            self._next_records[key] = record
+            self.reused += 1
+        return record
+
+    def add_record(self, key: bytes, record: dict):
+        """Keep a record that has just been parsed."""
+        self._next_records[key] = record
+        self.parsed += 1
+
+    def properties(self, block: memoryview, parse: Callable[[str], Dict[str, str]]) -> Dict[str, str]:
+        """
+        The properties dict for a property block: the one last parsed from
+        the same bytes, or parse(block decoded) with interned strings.
+        """
+        key = self.key(block)
+        properties = self._properties.get(key)
+        if properties is None:
+            properties = intern_properties(parse(str(block, 'utf-8', 'replace')))
+        self._next_properties[key] = properties
+        return properties
@@ -0,0 +1,370 @@
+"""
+Append-only snapshot history archive for pactl-gui.
+
+Snapshots are appended to an archive file as compact records (see
+snapshot_format.py): a full keyframe every few records and deltas in
+between. A fixed-size index file maps capture timestamps to byte offsets.
+Both files are read through mmap, so looking up any point in time touches
+only the index entries visited by a binary search and the handful of
+records needed to rebuild that state.
+"""
+
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from utils.snapshot_format import SnapshotFormat
+
+
+ARCHIVE_MAGIC = b'PGSA\x01\x00\x00\x00'
+
+# Index entry: timestamp (ms), record offset, record length, flags, keyframe entry number
+INDEX_ENTRY = struct.Struct('<qQIIQ')
+RECORD_HEADER = struct.Struct('<I')
+
+FLAG_KEYFRAME = 0x1
+
+# Store a full snapshot at least this often so rebuilding any state applies
+# a bounded number of deltas
+KEYFRAME_INTERVAL = 64
+
+# Number of rebuilt snapshots kept in memory for timeline browsing
+SNAPSHOT_CACHE_SIZE = 16
+
+
+class _TimestampView:
+    """Sequence view over the index timestamps, for use with bisect."""
+
+    def __init__(self, archive: 'SnapshotArchive'):
+        self.archive = archive
+
+    def __len__(self):
+        return len(self.archive)
+
+    def __getitem__(self, position):
+        return self.archive.entry(position)[0]
+
+
+class SnapshotArchive:
+    """
+    An append-only archive of timestamped snapshots.
+
+    Identical consecutive snapshots are not stored; the state at any time is
+    the last snapshot captured at or before it.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = 'gzip'):
+        """
+        Open (or lazily create) an archive.
+
+        Args:
+            path: Archive file; the index is stored next to it with an '.idx' suffix
+            compression: Compression applied to each record (None, 'gzip' or 'zstd')
+        """
+        self.path = path
+        self.index_path = path + '.idx'
+        self.compression = compression
+
+        self._index_map = None
+        self._index_size = 0
+        self._archive_map = None
+        self._archive_size = 0
+        self._cache = OrderedDict()
+        self._last_snapshot = None
+
+    def close(self):
+        """Release the memory maps."""
+        for mapping in (self._index_map, self._archive_map):
+            if mapping is not None:
+                mapping.close()
+        self._index_map = None
+        self._archive_map = None
+        self._index_size = 0
+        self._archive_size = 0
+
+    def __len__(self) -> int:
+        self._remap_index()
+        return self._index_size // INDEX_ENTRY.size
+
+    def entry(self, position: int) -> Tuple[int, int, int, int, int]:
+        """
+        Read one index entry.
+
+        Returns:
+            A tuple of (timestamp_ms, offset, length, flags, keyframe_position)
+        """
+        if position < 0:
+            position += len(self)
+        start = position * INDEX_ENTRY.size
+        if start + INDEX_ENTRY.size > self._index_size:
+            self._remap_index()
+        if position < 0 or start + INDEX_ENTRY.size > self._index_size:
+            raise IndexError(position)
+        return INDEX_ENTRY.unpack_from(self._index_map, start)
+
+    def timestamp(self, position: int) -> int:
+        """Capture time of an entry, in milliseconds since the epoch."""
+        return self.entry(position)[0]
+
+    def position_at(self, timestamp_ms: int) -> int:
+        """
+        Find the entry holding the state at a point in time.
+
+        Args:
+            timestamp_ms: Milliseconds since the epoch
+
+        Returns:
+            The entry position, or -1 if the archive starts later
+        """
+        return bisect_right(_TimestampView(self), timestamp_ms) - 1
+
+    def snapshot_at(self, timestamp_ms: int) -> Optional[Dict[str, Any]]:
+        """Return the state at a point in time, or None if nothing was captured yet."""
+        position = self.position_at(timestamp_ms)
+        if position < 0:
+            return None
+        return self.snapshot(position)
+
+    def snapshot(self, position: int) -> Dict[str, Any]:
+        """
+        Rebuild the snapshot stored at an entry position.
+
+        Starts from the nearest keyframe and applies the deltas after it.
+        The returned snapshot shares records with cached states and must
+        not be modified.
+        """
+        if position < 0:
+            position += len(self)
+        cached = self._cache.get(position)
+        if cached is not None:
+            self._cache.move_to_end(position)
+            return cached
+
+        keyframe = self.entry(position)[4]
+
+        # Resume from the closest cached state between the keyframe and the target
+        start = keyframe
+        snapshot = None
+        for candidate in range(position - 1, keyframe - 1, -1):
+            if candidate in self._cache:
+                start = candidate + 1
+                snapshot = self._cache[candidate]
+                break
+
+        for current in range(start, position + 1):
+            document = self._read_document(current)
+            if snapshot is None:
+                snapshot = SnapshotFormat.decode(document)
+            else:
+                snapshot = SnapshotFormat.apply_delta(snapshot, document)
+
+        self._remember(position, snapshot)
+        return snapshot
+
+    def append(self, snapshot: Dict[str, Any], timestamp_ms: Optional[int] = None) -> bool:
+        """
+        Append a snapshot to the archive.
+
+        Args:
+            snapshot: A snapshot dictionary
+            timestamp_ms: Capture time; defaults to now
+
+        Returns:
+            True if a record was written, False if the state was unchanged
+        """
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+
+        count = len(self)
+        previous = self._last_snapshot
+        if previous is None and count:
+            previous = self.snapshot(count - 1)
+
+        if previous is not None and self._same_state(previous, snapshot):
+            return False
+
+        if previous is None or count == 0:
+            keyframe = True
+        else:
+            last_keyframe = self.entry(count - 1)[4]
+            keyframe = count - last_keyframe >= KEYFRAME_INTERVAL
+
+        if keyframe:
+            document = SnapshotFormat.encode(snapshot)
+        else:
+            document = SnapshotFormat.diff(previous, snapshot)
+        payload = SnapshotFormat.dumps(document, self.compression)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self.path, 'ab') as archive_file:
+            if archive_file.tell() == 0:
+                archive_file.write(ARCHIVE_MAGIC)
+            offset = archive_file.tell()
+            archive_file.write(RECORD_HEADER.pack(len(payload)))
+            archive_file.write(payload)
+
+        keyframe_position = count if keyframe else self.entry(count - 1)[4]
+        flags = FLAG_KEYFRAME if keyframe else 0
+        # The index is written last: a record only becomes visible once its entry is complete
+        with open(self.index_path, 'ab') as index_file:
+            index_file.seek(count * INDEX_ENTRY.size)
+            index_file.truncate()
+            index_file.write(INDEX_ENTRY.pack(timestamp_ms, offset, len(payload), flags, keyframe_position))
+
+        self._last_snapshot = snapshot
+        self._remember(count, snapshot)
+        return True
+
+    def find_transition(
+        self,
+        predicate: Callable[[Dict[str, Any]], bool],
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Find the latest entry where a predicate stops holding.
+
+        Searches back from 'end' one keyframe interval at a time. Each
+        interval is rebuilt forward from its keyframe, which costs the same
+        as rebuilding its last entry, so every entry is tested and a state
+        that fails and holds again several times is handled; the search
+        stops at the newest interval containing a transition.
+
+        Args:
+            predicate: Function taking a snapshot and returning a bool
+            start: First entry position to consider
+            end: Last entry position to consider (defaults to the newest)
+
+        Returns:
+            The position of the latest entry where the predicate is false
+            right after an entry where it holds, or None if it never stops
+            holding between start and end
+        """
+        if end is None:
+            end = len(self) - 1
+        if end <= start:
+            return None
+
+        following = None  # Whether the predicate holds just after the interval
+        interval_end = end
+        while interval_end >= start:
+            interval_start = max(start, self.entry(interval_end)[4])
+            holds = [predicate(self.snapshot(position)) for position in range(interval_start, interval_end + 1)]
+            if following is not None:
+                holds.append(following)
+            for offset in range(len(holds) - 1, 0, -1):
+                if holds[offset - 1] and not holds[offset]:
+                    return interval_start + offset
+            following = holds[0]
+            interval_end = interval_start - 1
+        return None
+
+    def find_disappearance(
+        self,
+        device_name: str,
+        since_ms: Optional[int] = None,
+        until_ms: Optional[int] = None
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Find when a sink, source or module last disappeared.
+
+        Args:
+            device_name: Sink, source or module name
+            since_ms: Only search the states from this time on
+            until_ms: Only search the states up to this time
+
+        Returns:
+            A tuple of (last_seen_ms, first_missing_ms) for the latest
+            disappearance, or None if the device did not disappear within
+            the searched range
+        """
+        start = 0
+        if since_ms is not None:
+            start = max(0, self.position_at(since_ms))
+        end = None
+        if until_ms is not None:
+            end = self.position_at(until_ms)
+        position = self.find_transition(
+            lambda snapshot: SnapshotArchive.has_device(snapshot, device_name), start, end
+        )
+        if position is None:
+            return None
+        return self.timestamp(position - 1), self.timestamp(position)
+
+    @staticmethod
+    def has_device(snapshot: Dict[str, Any], device_name: str) -> bool:
+        """Check whether a snapshot contains a sink, source or module with the given name."""
+        for collection in ('sinks', 'sources', 'modules'):
+            for record in snapshot.get(collection, []):
+                if record.get('name') == device_name:
+                    return True
+        return False
+
+    @staticmethod
+    def _same_state(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+        return all(first.get(key) == second.get(key) for key in ('sinks', 'sources', 'modules'))
+
+    def _remember(self, position: int, snapshot: Dict[str, Any]):
+        self._cache[position] = snapshot
+        self._cache.move_to_end(position)
+        while len(self._cache) > SNAPSHOT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _read_document(self, position: int) -> Dict[str, Any]:
+        offset, length = self.entry(position)[1:3]
+        end = offset + RECORD_HEADER.size + length
+        if end > self._archive_size:
+            self._remap_archive()
+        if end > self._archive_size:
+            raise ValueError(f"Archive {self.path} is truncated at entry {position}")
+        (stored_length,) = RECORD_HEADER.unpack_from(self._archive_map, offset)
+        if stored_length != length:
+            raise ValueError(f"Archive {self.path} is corrupt at entry {position}")
+        start = offset + RECORD_HEADER.size
+        return SnapshotFormat.loads(self._archive_map[start:start + length])
+
+    def _remap_index(self):
+        """Map the index file, growing the mapping if entries were appended."""
+        try:
+            size = os.path.getsize(self.index_path)
+        except OSError:
+            size = 0
+        size -= size % INDEX_ENTRY.size  # Ignore a partially written trailing entry
+        if size == self._index_size:
+            return
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        self._index_size = 0
+        if size:
+            with open(self.index_path, 'rb') as index_file:
+                self._index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index_size = size
+
+    def _remap_archive(self):
+        if self._archive_map is not None:
+            self._archive_map.close()
+            self._archive_map = None
+        self._archive_size = 0
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size:
+            with open(self.path, 'rb') as archive_file:
+                if archive_file.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+                    raise ValueError(f"{self.path} is not a pactl-gui snapshot archive")
+                self._archive_map = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._archive_size = size
+
+    def summary(self) -> List[Tuple[int, bool]]:
+        """List (timestamp_ms, is_keyframe) for every entry."""
+        entries = (self.entry(position) for position in range(len(self)))
+        return [(entry[0], bool(entry[3] & FLAG_KEYFRAME)) for entry in entries]
@@ -0,0 +1,445 @@
+"""
+Compact snapshot file format for pactl-gui.
+
+A snapshot holds the 'sinks', 'sources' and 'modules' lists produced by
+PactlRunner. The compact encoding stores every key and value once in a
+shared string table, stores monitor sources as a property delta against
+their sink, and can store consecutive snapshots as deltas against a base.
+"""
+
+import gzip
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+
+FORMAT_NAME = "pactl-gui-snapshot"
+SERIES_FORMAT_NAME = "pactl-gui-snapshot-series"
+FORMAT_VERSION = 1
+
+COLLECTIONS = ('sinks', 'sources', 'modules')
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+class _StringTable:
+    """Assigns a stable index to every distinct string."""
+
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def add(self, value: str) -> int:
+        position = self.index.get(value)
+        if position is None:
+            position = len(self.strings)
+            self.strings.append(value)
+            self.index[value] = position
+        return position
+
+
+class SnapshotFormat:
+    """
+    Encode, decode, compress and diff pactl-gui snapshots.
+
+    A snapshot is a dictionary with 'sinks', 'sources' and 'modules' lists
+    plus optional 'name' and 'created' metadata, as written by
+    MainWindow.save_preset.
+    """
+
+    @staticmethod
+    def new_snapshot(
+        sinks: List[Dict[str, Any]],
+        sources: List[Dict[str, Any]],
+        modules: List[Dict[str, Any]],
+        name: str = ""
+    ) -> Dict[str, Any]:
+        """Build a snapshot dictionary stamped with the current time."""
+        return {
+            "sinks": sinks,
+            "sources": sources,
+            "modules": modules,
+            "name": name,
+            "created": datetime.now().isoformat()
+        }
+
+    @staticmethod
+    def encode(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encode a snapshot into the compact representation.
+
+        Args:
+            snapshot: A snapshot dictionary
+
+        Returns:
+            A JSON-serializable compact document
+        """
+        table = _StringTable()
+        sinks_by_name = {sink.get('name', ''): sink for sink in snapshot.get('sinks', [])}
+
+        document = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "name": snapshot.get("name", ""),
+            "created": snapshot.get("created", ""),
+        }
+        for collection in COLLECTIONS:
+            document[collection] = [
+                SnapshotFormat._encode_record(record, table, sinks_by_name)
+                for record in snapshot.get(collection, [])
+            ]
+        document["strings"] = table.strings
+        return document
+
+    @staticmethod
+    def decode(document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Decode a compact document back into a snapshot dictionary.
+
+        Args:
+            document: A document produced by encode
+
+        Returns:
+            The snapshot dictionary
+        """
+        strings = document.get("strings", [])
+        snapshot = {
+            "name": document.get("name", ""),
+            "created": document.get("created", ""),
+        }
+        sinks_by_name = {}
+        for collection in COLLECTIONS:
+            records = [
+                SnapshotFormat._decode_record(encoded, strings, sinks_by_name)
+                for encoded in document.get(collection, [])
+            ]
+            if collection == 'sinks':
+                sinks_by_name = {sink.get('name', ''): sink for sink in records}
+            snapshot[collection] = records
+        return snapshot
+
+    @staticmethod
+    def diff(base: Dict[str, Any], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encode a snapshot as a delta against a base snapshot.
+
+        Records are identified by their ID. Only added or changed records are
+        stored in full; removed records are stored as their ID.
+
+        Args:
+            base: The snapshot the delta is relative to
+            snapshot: The snapshot to encode
+
+        Returns:
+            A JSON-serializable delta document
+        """
+        table = _StringTable()
+        sinks_by_name = {sink.get('name', ''): sink for sink in snapshot.get('sinks', [])}
+
+        delta = {
+            "name": snapshot.get("name", ""),
+            "created": snapshot.get("created", ""),
+        }
+        for collection in COLLECTIONS:
+            old_records = {str(r.get('id', '')): r for r in base.get(collection, [])}
+            new_ids = set()
+            changed = []
+            for record in snapshot.get(collection, []):
+                record_id = str(record.get('id', ''))
+                new_ids.add(record_id)
+                if old_records.get(record_id) != record:
+                    changed.append(SnapshotFormat._encode_record(record, table, sinks_by_name))
+            removed = [table.add(record_id) for record_id in old_records if record_id not in new_ids]
+            if changed or removed:
+                delta[collection] = {"put": changed, "del": removed}
+        delta["strings"] = table.strings
+        return delta
+
+    @staticmethod
+    def apply_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reconstruct a snapshot from a base snapshot and a delta.
+
+        Args:
+            base: The snapshot the delta was computed against
+            delta: A delta document produced by diff
+
+        Returns:
+            The reconstructed snapshot; unchanged records are shared with base
+        """
+        strings = delta.get("strings", [])
+        snapshot = {
+            "name": delta.get("name", ""),
+            "created": delta.get("created", ""),
+        }
+        sinks_by_name = {}
+        for collection in COLLECTIONS:
+            records = list(base.get(collection, []))
+            change = delta.get(collection)
+            if change:
+                removed = {strings[i] for i in change.get("del", [])}
+                positions = {}
+                kept = []
+                for record in records:
+                    record_id = str(record.get('id', ''))
+                    if record_id not in removed:
+                        positions[record_id] = len(kept)
+                        kept.append(record)
+                records = kept
+                for encoded in change.get("put", []):
+                    record = SnapshotFormat._decode_record(encoded, strings, sinks_by_name)
+                    record_id = str(record.get('id', ''))
+                    if record_id in positions:
+                        records[positions[record_id]] = record
+                    else:
+                        positions[record_id] = len(records)
+                        records.append(record)
+            if collection == 'sinks':
+                sinks_by_name = {sink.get('name', ''): sink for sink in records}
+            snapshot[collection] = records
+        return snapshot
+
+    @staticmethod
+    def dumps(document: Dict[str, Any], compression: Optional[str] = None) -> bytes:
+        """
+        Serialize a document to bytes.
+
+        Args:
+            document: A compact, delta or series document
+            compression: None, 'gzip' or 'zstd'
+
+        Returns:
+            The serialized bytes
+        """
+        data = json.dumps(document, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        if compression is None:
+            return data
+        if compression == 'gzip':
+            return gzip.compress(data, compresslevel=6)
+        if compression == 'zstd':
+            if zstandard is None:
+                raise ValueError("zstd compression requires the 'zstandard' package")
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        raise ValueError(f"Unknown compression: {compression}")
+
+    @staticmethod
+    def loads(data: bytes) -> Dict[str, Any]:
+        """
+        Deserialize bytes written by dumps, detecting compression.
+
+        Args:
+            data: Serialized document bytes
+
+        Returns:
+            The document dictionary
+        """
+        if data[:2] == GZIP_MAGIC:
+            data = gzip.decompress(data)
+        elif data[:4] == ZSTD_MAGIC:
+            if zstandard is None:
+                raise ValueError("Reading zstd snapshots requires the 'zstandard' package")
+            data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        return json.loads(data.decode('utf-8'))
+
+    @staticmethod
+    def compression_for_path(path: str) -> Optional[str]:
+        """Pick a compression from a file name extension."""
+        if path.endswith('.gz'):
+            return 'gzip'
+        if path.endswith('.zst'):
+            return 'zstd'
+        return None
+
+    @staticmethod
+    def save(path: str, snapshot: Dict[str, Any], compression: Optional[str] = None):
+        """
+        Write a snapshot to a file in the compact format.
+
+        Args:
+            path: Destination file
+            snapshot: A snapshot dictionary
+            compression: None, 'gzip' or 'zstd'; defaults to the file extension
+        """
+        if compression is None:
+            compression = SnapshotFormat.compression_for_path(path)
+        data = SnapshotFormat.dumps(SnapshotFormat.encode(snapshot), compression)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    @staticmethod
+    def load(path: str) -> Dict[str, Any]:
+        """
+        Read a snapshot file.
+
+        Accepts compact snapshots, snapshot series (the latest state is
+        returned) and the legacy indented JSON written by older versions.
+
+        Args:
+            path: Snapshot file
+
+        Returns:
+            The snapshot dictionary
+        """
+        with open(path, 'rb') as f:
+            document = SnapshotFormat.loads(f.read())
+        return SnapshotFormat.from_document(document)
+
+    @staticmethod
+    def from_document(document: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn any supported document into a snapshot dictionary."""
+        if not isinstance(document, dict):
+            raise ValueError("Snapshot document must be a JSON object")
+        kind = document.get("format")
+        if kind == FORMAT_NAME:
+            return SnapshotFormat.decode(document)
+        if kind == SERIES_FORMAT_NAME:
+            return SnapshotFormat.expand_series(document)[-1]
+        # Legacy format: plain lists of records
+        return document
+
+    @staticmethod
+    def new_series(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Start a snapshot series with a full base snapshot."""
+        return {
+            "format": SERIES_FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "base": SnapshotFormat.encode(snapshot),
+            "deltas": []
+        }
+
+    @staticmethod
+    def expand_series(series: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Reconstruct every snapshot of a series.
+
+        Args:
+            series: A series document
+
+        Returns:
+            The snapshots in capture order, base first
+        """
+        snapshots = [SnapshotFormat.decode(series["base"])]
+        for delta in series.get("deltas", []):
+            snapshots.append(SnapshotFormat.apply_delta(snapshots[-1], delta))
+        return snapshots
+
+    @staticmethod
+    def append_to_series(path: str, snapshot: Dict[str, Any], compression: Optional[str] = None):
+        """
+        Append a snapshot to a series file, creating it if needed.
+
+        The snapshot is stored as a delta against the previous entry, so
+        periodic captures of a mostly unchanged server stay small.
+
+        Args:
+            path: Series file
+            snapshot: The snapshot to append
+            compression: None, 'gzip' or 'zstd'; defaults to the file extension
+        """
+        if compression is None:
+            compression = SnapshotFormat.compression_for_path(path)
+
+        try:
+            with open(path, 'rb') as f:
+                series = SnapshotFormat.loads(f.read())
+        except FileNotFoundError:
+            series = None
+
+        if series is None:
+            series = SnapshotFormat.new_series(snapshot)
+        else:
+            if series.get("format") != SERIES_FORMAT_NAME:
+                raise ValueError(f"{path} is not a snapshot series")
+            previous = SnapshotFormat.expand_series(series)[-1]
+            series["deltas"].append(SnapshotFormat.diff(previous, snapshot))
+
+        with open(path, 'wb') as f:
+            f.write(SnapshotFormat.dumps(series, compression))
+
+    @staticmethod
+    def _encode_record(record: Dict[str, Any], table: _StringTable, sinks_by_name: Dict[str, Any]) -> List[Any]:
+        """
+        Encode one record as a flat [key, value, key, value, ...] list.
+
+        Strings become table indices, string lists become index lists and the
+        properties dictionary becomes a flat index list. A monitor source's
+        properties are stored as a delta against its sink's properties.
+        """
+        encoded = []
+        for key, value in record.items():
+            encoded.append(table.add(key))
+            if isinstance(value, str):
+                encoded.append(table.add(value))
+            elif key == 'properties' and isinstance(value, dict):
+                encoded.append(SnapshotFormat._encode_properties(record, value, table, sinks_by_name))
+            elif isinstance(value, list) and all(isinstance(item, str) for item in value):
+                encoded.append([table.add(item) for item in value])
+            else:
+                encoded.append({"v": value})
+        return encoded
+
+    @staticmethod
+    def _encode_properties(record, properties, table, sinks_by_name) -> Dict[str, Any]:
+        # pactl names the monitored sink in 'Monitor of Sink', as does PipeWireBackend
+        base_name = str(record.get('monitor_of_sink', ''))
+        base_sink = sinks_by_name.get(base_name) if base_name else None
+        base = base_sink.get('properties') if base_sink else None
+
+        if not isinstance(base, dict):
+            flat = []
+            for key, value in properties.items():
+                flat.append(table.add(key))
+                flat.append(table.add(value))
+            return {"p": flat}
+
+        changed = []
+        for key, value in properties.items():
+            if base.get(key) != value:
+                changed.append(table.add(key))
+                changed.append(table.add(value))
+        removed = [table.add(key) for key in base if key not in properties]
+        order = [table.add(key) for key in properties]
+        encoded = {"b": table.add(base_name), "p": changed}
+        if removed:
+            encoded["d"] = removed
+        if order != [table.index[key] for key in base if key in properties] + \
+                [table.index[key] for key in properties if key not in base]:
+            encoded["o"] = order
+        return encoded
+
+    @staticmethod
+    def _decode_record(encoded: List[Any], strings: List[str], sinks_by_name: Dict[str, Any]) -> Dict[str, Any]:
+        record = {}
+        for position in range(0, len(encoded), 2):
+            key = strings[encoded[position]]
+            value = encoded[position + 1]
+            if isinstance(value, int):
+                record[key] = strings[value]
+            elif isinstance(value, list):
+                record[key] = [strings[item] for item in value]
+            elif "v" in value:
+                record[key] = value["v"]
+            else:
+                record[key] = SnapshotFormat._decode_properties(value, strings, sinks_by_name)
+        return record
+
+    @staticmethod
+    def _decode_properties(encoded, strings, sinks_by_name) -> Dict[str, str]:
+        flat = encoded.get("p", [])
+        changes = {strings[flat[i]]: strings[flat[i + 1]] for i in range(0, len(flat), 2)}
+        if "b" not in encoded:
+            return changes
+
+        base_sink = sinks_by_name.get(strings[encoded["b"]], {})
+        removed = {strings[i] for i in encoded.get("d", [])}
+        properties = {key: value for key, value in base_sink.get('properties', {}).items() if key not in removed}
+        properties.update(changes)
+        if "o" in encoded:
+            properties = {strings[i]: properties[strings[i]] for i in encoded["o"]}
+        return properties
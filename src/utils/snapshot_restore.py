@@ -0,0 +1,197 @@
+"""
+Snapshot restore engine for pactl-gui presets.
+
+Compares a saved snapshot against the live server and recreates only the
+virtual devices that are missing.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Tuple, Optional
+
+from utils.pactl_runner import PactlRunner
+
+
+SINK_NAME_PATTERN = re.compile(r'sink_name=["\']?([a-zA-Z0-9_.-]+)')
+
+# Upper bound on concurrent pactl invocations while applying a plan
+MAX_PARALLEL_OPERATIONS = 8
+
+
+class SnapshotRestorer:
+    """
+    Restore virtual devices from a snapshot by diffing against the live server.
+
+    Virtual devices are matched by their sink name, never by module ID, since
+    module IDs change every time the audio server restarts.
+    """
+
+    @staticmethod
+    def virtual_device_name(module: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the sink name of a null sink module.
+
+        Args:
+            module: A module dictionary as returned by PactlRunner.list_modules
+
+        Returns:
+            The sink name, or None if the module is not a named null sink
+        """
+        if module.get('name') != 'module-null-sink':
+            return None
+        match = SINK_NAME_PATTERN.search(module.get('argument', '') or '')
+        return match.group(1) if match else None
+
+    @staticmethod
+    def index_virtual_devices(modules: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Index null sink modules by sink name.
+
+        Args:
+            modules: A list of module dictionaries
+
+        Returns:
+            A dictionary mapping sink names to their module dictionaries
+        """
+        devices = {}
+        for module in modules:
+            name = SnapshotRestorer.virtual_device_name(module)
+            if name and name not in devices:
+                devices[name] = module
+        return devices
+
+    @staticmethod
+    def plan_restore(
+        snapshot: Dict[str, Any],
+        live_modules: List[Dict[str, Any]],
+        remove_extras: bool = False
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Work out which virtual devices have to be created or removed.
+
+        Args:
+            snapshot: Snapshot data as written by MainWindow.save_preset
+            live_modules: Currently loaded modules
+            remove_extras: Whether live virtual devices missing from the
+                snapshot should be scheduled for removal
+
+        Returns:
+            A dictionary with 'create', 'keep' and 'remove' lists. Each entry
+            holds the device 'name' and the relevant 'module' dictionary.
+        """
+        wanted = SnapshotRestorer.index_virtual_devices(snapshot.get('modules', []))
+        live = SnapshotRestorer.index_virtual_devices(live_modules)
+
+        plan = {'create': [], 'keep': [], 'remove': []}
+
+        for name in sorted(wanted):
+            if name in live:
+                plan['keep'].append({'name': name, 'module': live[name]})
+            else:
+                plan['create'].append({'name': name, 'module': wanted[name]})
+
+        if remove_extras:
+            for name in sorted(live):
+                if name not in wanted:
+                    plan['remove'].append({'name': name, 'module': live[name]})
+
+        return plan
+
+    @staticmethod
+    def apply_plan(
+        plan: Dict[str, List[Dict[str, Any]]],
+        logger=None,
+        max_workers: int = MAX_PARALLEL_OPERATIONS,
+        backend=PactlRunner
+    ) -> Tuple[int, List[str]]:
+        """
+        Execute a restore plan.
+
+        Removals run first so that recreated devices never collide with a
+        stale name. Each batch is run in parallel; log output is collected per
+        operation and replayed in plan order on the calling thread, so the
+        logger never has to be thread-safe.
+
+        Args:
+            plan: A plan as returned by plan_restore
+            logger: Optional callback function to log command execution
+            max_workers: Maximum number of concurrent pactl invocations
+            backend: The AudioBackend that runs the writes
+
+        Returns:
+            A tuple containing (number_of_successful_operations, list_of_errors)
+        """
+        successful = 0
+        errors = []
+
+        batches = [
+            ('remove', plan.get('remove', []), partial(SnapshotRestorer._remove_device, backend)),
+            ('create', plan.get('create', []), partial(SnapshotRestorer._create_device, backend)),
+        ]
+
+        for action, entries, operation in batches:
+            if not entries:
+                continue
+
+            workers = max(1, min(max_workers, len(entries)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(operation, entries))
+
+            for entry, (success, log_lines) in zip(entries, results):
+                if logger:
+                    for line in log_lines:
+                        logger(line)
+                if success:
+                    successful += 1
+                else:
+                    errors.append(f"Failed to {action} virtual device '{entry['name']}'")
+
+        return successful, errors
+
+    @staticmethod
+    def restore(
+        snapshot: Dict[str, Any],
+        remove_extras: bool = False,
+        logger=None,
+        backend=PactlRunner
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], int, List[str]]:
+        """
+        Restore the virtual devices of a snapshot against the live server.
+
+        Args:
+            snapshot: Snapshot data as written by MainWindow.save_preset
+            remove_extras: Whether to unload virtual devices not in the snapshot
+            logger: Optional callback function to log command execution
+            backend: The AudioBackend to read from and write to
+
+        Returns:
+            A tuple containing (plan, number_of_successful_operations, list_of_errors)
+
+        Raises:
+            PactlError: If the current modules could not be listed; nothing
+                is applied, since an empty list would recreate every device
+        """
+        live_modules = backend.list_modules(logger, raise_errors=True)
+        plan = SnapshotRestorer.plan_restore(snapshot, live_modules, remove_extras)
+        successful, errors = SnapshotRestorer.apply_plan(plan, logger, backend=backend)
+        return plan, successful, errors
+
+    @staticmethod
+    def _create_device(backend, entry: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        """Recreate a null sink with its original module arguments."""
+        log_lines = []
+        module = entry['module']
+        success = backend.load_module(
+            module.get('name', 'module-null-sink'),
+            module.get('argument', ''),
+            logger=log_lines.append
+        )
+        return success, log_lines
+
+    @staticmethod
+    def _remove_device(backend, entry: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        """Unload the module backing a virtual device."""
+        log_lines = []
+        success = backend.unload_module(str(entry['module'].get('id', '')), logger=log_lines.append)
+        return success, log_lines
@@ -0,0 +1,60 @@
+"""
+Last-known state cache for pactl-gui warm starts.
+
+On exit the GUI stores the live snapshot together with the expansion state
+of the Manage tab tree; on the next launch that state is shown immediately
+(marked as stale) while the live state is fetched in the background.
+"""
+
+import os
+from typing import List, Dict, Any, Optional, Tuple
+
+from utils.snapshot_format import SnapshotFormat
+
+
+class StateCache:
+    """Reads and writes the last-known state file."""
+
+    @staticmethod
+    def save(path: str, snapshot: Dict[str, Any], expanded: List[List[List[str]]]):
+        """
+        Store a snapshot and the tree expansion state.
+
+        The file is replaced atomically so an interrupted write never leaves
+        a truncated cache behind.
+
+        Args:
+            path: Cache file
+            snapshot: A snapshot dictionary
+            expanded: Paths of expanded tree items (see MainWindow._tree_item_path)
+        """
+        document = SnapshotFormat.encode(snapshot)
+        document["expanded"] = expanded
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = path + ".tmp"
+        with open(temporary, 'wb') as f:
+            f.write(SnapshotFormat.dumps(document))
+        os.replace(temporary, path)
+
+    @staticmethod
+    def load(path: str) -> Optional[Tuple[Dict[str, Any], List[List[List[str]]]]]:
+        """
+        Read the cached state.
+
+        Returns:
+            A tuple of (snapshot, expanded paths), or None if there is no
+            usable cache
+        """
+        try:
+            with open(path, 'rb') as f:
+                document = SnapshotFormat.loads(f.read())
+            snapshot = SnapshotFormat.from_document(document)
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return None
+        expanded = document.get("expanded", [])
+        if not isinstance(expanded, list):
+            expanded = []
+        return snapshot, expanded
@@ -0,0 +1,413 @@
+"""
+Background state daemon for pactl-gui.
+
+The daemon keeps one event subscription ('pactl subscribe', or the
+PipeWire graph monitor) and one snapshot of the server state, refreshed
+once per burst of change events, together with the Manage tab device
+grouping computed from it. GUI windows and CLI
+invocations read that state over a Unix socket instead of running and
+parsing 'pactl list' themselves. Write operations go through the daemon
+too and are executed one at a time, so concurrent clients never race.
+
+Protocol: JSON-RPC 2.0, one JSON object per line in each direction.
+"""
+
+import inspect
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from utils.audio_backend import AudioEvent, fingerprint_of
+from utils.device_grouping import DeviceGrouping
+from utils.event_coalescer import (
+    ALL_KINDS, DEFAULT_MAX_DELAY_SECONDS, DEFAULT_SETTLE_SECONDS, EventCoalescer, affected_kinds
+)
+from utils.pactl_runner import PactlRunner, PactlError
+from utils.snapshot_format import SnapshotFormat
+from utils.snapshot_restore import SnapshotRestorer
+
+
+PROTOCOL_VERSION = 1
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+# Delay before restarting 'pactl subscribe' after it exits (e.g. server restart)
+RESUBSCRIBE_DELAY_SECONDS = 2.0
+
+# Event facilities that can change the snapshot; stream and client events cannot
+WATCHED_FACILITIES = ('sink', 'source', 'module', 'card', 'server')
+
+# How long a read waits for the first snapshot after the daemon starts
+INITIAL_STATE_TIMEOUT_SECONDS = 10.0
+
+
+class DaemonRequestError(Exception):
+    """An error reported back to the client as a JSON-RPC error object."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Serves newline-delimited JSON-RPC requests on one client connection."""
+
+    def handle(self):
+        daemon = self.server.daemon
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = daemon.handle_line(line)
+            if response is not None:
+                self.wfile.write(response)
+                self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class StateDaemon:
+    """
+    Holds the shared snapshot and serves it to clients.
+
+    The current state is an immutable dictionary replaced as a whole on
+    every refresh, so reads never take a lock.
+    """
+
+    def __init__(self, socket_path: str, logger=None, backend=None,
+                 settle: float = DEFAULT_SETTLE_SECONDS, max_delay: float = DEFAULT_MAX_DELAY_SECONDS):
+        """
+        Args:
+            socket_path: Unix socket to listen on
+            logger: Optional callback function for diagnostic messages
+            backend: Where the state is read from, e.g. a PipeWireBackend
+                (defaults to PactlRunner)
+            settle: Seconds without events that end a burst
+            max_delay: Longest a refresh waits for a burst to end
+        """
+        self.socket_path = socket_path
+        self.logger = logger
+        self.backend = backend or PactlRunner()
+
+        self._state = None
+        self._state_ready = threading.Event()
+        self._version = 0
+        self._write_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._events = EventCoalescer(settle, max_delay)
+        self._stopping = threading.Event()
+        self._subscribed = False
+        self._subscription = None
+        self._server = None
+
+        self._methods = {
+            'status': self.rpc_status,
+            'get_state': self.rpc_get_state,
+            'get_grouping': self.rpc_get_grouping,
+            'refresh': self.rpc_refresh,
+            'load_module': self.rpc_load_module,
+            'unload_module': self.rpc_unload_module,
+            'create_duplex_sink': self.rpc_create_duplex_sink,
+            'unload_all_null_sinks': self.rpc_unload_all_null_sinks,
+            'set_sink_volume': self.rpc_set_sink_volume,
+            'apply_plan': self.rpc_apply_plan,
+        }
+
+    # Lifecycle
+
+    def serve_forever(self):
+        """Bind the socket, start watching the server and serve clients until shutdown."""
+        self._bind()
+        threading.Thread(target=self._subscribe_loop, name="subscribe", daemon=True).start()
+        threading.Thread(target=self._refresh_loop, name="refresh", daemon=True).start()
+        self._events.add(AudioEvent('change', 'server', ''))
+        self._log(f"Listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._cleanup()
+
+    def shutdown(self):
+        """Stop serving; safe to call from any thread except the serving one."""
+        self._stopping.set()
+        self._events.close()
+        subscription = self._subscription
+        if subscription:
+            subscription.close()
+        if self._server:
+            self._server.shutdown()
+
+    def _bind(self):
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                # Left behind by a daemon that did not shut down cleanly
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(f"Another pactl-gui daemon is already listening on {self.socket_path}")
+            finally:
+                probe.close()
+
+        # The socket directory is private (0700); restrict the socket itself too
+        self._server = _UnixServer(self.socket_path, _RequestHandler)
+        os.chmod(self.socket_path, 0o600)
+        self._server.daemon = self
+
+    def _cleanup(self):
+        self._server.server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+    def _log(self, text: str):
+        if self.logger:
+            self.logger(text)
+
+    # State
+
+    @property
+    def state(self) -> Optional[Dict[str, Any]]:
+        """The current state, or None before the first refresh completes."""
+        return self._state
+
+    def refresh(self, kinds=ALL_KINDS) -> Dict[str, Any]:
+        """
+        Fetch the server state and replace the shared snapshot.
+
+        Args:
+            kinds: The lists to fetch again ('modules', 'sinks', 'sources');
+                the others are kept from the current snapshot
+
+        Raises:
+            PactlError: A list command failed; the previous state is kept
+        """
+        with self._refresh_lock:
+            current = self._state['snapshot'] if self._state else None
+            if current is None:
+                kinds = ALL_KINDS
+            listers = {
+                'modules': self.backend.list_modules,
+                'sinks': self.backend.list_sinks,
+                'sources': self.backend.list_sources,
+            }
+            with ThreadPoolExecutor(max_workers=len(kinds)) as executor:
+                # Raise on failure (including timeouts) so a sick server leaves
+                # the previous state in place instead of an empty one
+                futures = {kind: executor.submit(listers[kind], None, True) for kind in kinds}
+                lists = {kind: future.result() for kind, future in futures.items()}
+            if current is not None and all(
+                fingerprint_of(records) is not None and fingerprint_of(records) == fingerprint_of(current[kind])
+                for kind, records in lists.items()
+            ):
+                # Byte-for-byte the same output as last time: keep the state and its version
+                return self._state
+            modules, sinks, sources = (lists[kind] if kind in lists else current[kind] for kind in ALL_KINDS)
+
+            self._version += 1
+            self._state = {
+                'version': self._version,
+                'updated': time.time(),
+                'snapshot': SnapshotFormat.new_snapshot(sinks, sources, modules),
+                'grouping': {
+                    False: DeviceGrouping.group_devices(modules, sinks, sources, show_monitors=False),
+                    True: DeviceGrouping.group_devices(modules, sinks, sources, show_monitors=True),
+                },
+                # Serialized results, filled in on first request
+                'encoded': {},
+            }
+            self._state_ready.set()
+            return self._state
+
+    def _current_state(self) -> Dict[str, Any]:
+        if not self._state_ready.wait(INITIAL_STATE_TIMEOUT_SECONDS):
+            raise DaemonRequestError(SERVER_ERROR, "Audio server state is not available yet")
+        return self._state
+
+    def _refresh_loop(self):
+        """Refresh once per burst of events, fetching only the lists the burst touched."""
+        while True:
+            events = self._events.next_burst()
+            if events is None:
+                return
+            kinds = affected_kinds(events)
+            if not kinds:
+                # Everything in the burst was created and removed again
+                continue
+            self._log(f"Refreshing {', '.join(kinds)} after {len(events)} change(s)")
+            try:
+                self.refresh(kinds)
+            except Exception as e:
+                self._log(f"Refresh failed: {e}")
+
+    def _subscribe_loop(self):
+        """Follow the backend's change events and queue every relevant one for coalescing."""
+        while not self._stopping.is_set():
+            try:
+                self._subscription = self.backend.subscribe(self._on_event)
+            except OSError as e:
+                self._log(f"Could not subscribe to server events: {e}")
+            else:
+                self._subscribed = True
+                # Catch up on anything that changed while we were not subscribed
+                self._events.add(AudioEvent('change', 'server', ''))
+                self._subscription.wait()
+                self._subscribed = False
+                if not self._stopping.is_set():
+                    self._log("Event subscription ended; reconnecting")
+            self._stopping.wait(RESUBSCRIBE_DELAY_SECONDS)
+
+    def _on_event(self, event: AudioEvent):
+        if event.facility in WATCHED_FACILITIES:
+            self._events.add(event)
+
+    @staticmethod
+    def is_watched_event(line: str) -> bool:
+        """Check whether a 'pactl subscribe' line reports a change to the snapshot."""
+        event = PactlRunner.parse_event(line)
+        return event is not None and event.facility in WATCHED_FACILITIES
+
+    # Request handling
+
+    def handle_line(self, line: bytes) -> Optional[bytes]:
+        """
+        Handle one request line.
+
+        Returns:
+            The encoded response line, or None for notifications
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self._error_response(None, PARSE_ERROR, "Invalid JSON")
+
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return self._error_response(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get('id')
+        params = request.get('params') or {}
+        handler = self._methods.get(request['method'])
+        if handler is None:
+            return self._error_response(request_id, METHOD_NOT_FOUND, f"Unknown method: {request['method']}")
+        if not isinstance(params, dict):
+            return self._error_response(request_id, INVALID_PARAMS, "Parameters must be an object")
+
+        try:
+            inspect.signature(handler).bind(**params)
+        except TypeError as e:
+            return self._error_response(request_id, INVALID_PARAMS, str(e))
+
+        try:
+            result = handler(**params)
+        except DaemonRequestError as e:
+            return self._error_response(request_id, e.code, str(e))
+        except Exception as e:
+            return self._error_response(request_id, SERVER_ERROR, f"{type(e).__name__}: {e}")
+
+        if 'id' not in request:
+            return None
+        # Read results arrive pre-serialized so the same state is only encoded once
+        encoded = result if isinstance(result, bytes) else json.dumps(result).encode()
+        return b'{"jsonrpc":"2.0","id":' + json.dumps(request_id).encode() + b',"result":' + encoded + b'}\n'
+
+    @staticmethod
+    def _error_response(request_id, code: int, message: str) -> bytes:
+        response = {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+        return json.dumps(response).encode() + b'\n'
+
+    def _encoded(self, state: Dict[str, Any], key, build) -> bytes:
+        """Serialize a read result once per state version."""
+        encoded = state['encoded'].get(key)
+        if encoded is None:
+            encoded = json.dumps(build()).encode()
+            state['encoded'][key] = encoded
+        return encoded
+
+    # Read methods
+
+    def rpc_status(self):
+        state = self._state
+        return {
+            'protocol': PROTOCOL_VERSION,
+            'pid': os.getpid(),
+            'subscribed': self._subscribed,
+            'version': state['version'] if state else 0,
+            'updated': state['updated'] if state else None,
+        }
+
+    def rpc_get_state(self, kinds=None):
+        state = self._current_state()
+        kinds = tuple(kinds or ('modules', 'sinks', 'sources'))
+        if any(kind not in ('modules', 'sinks', 'sources') for kind in kinds):
+            raise DaemonRequestError(INVALID_PARAMS, f"Unknown kind in {list(kinds)}")
+
+        def build():
+            result = {'version': state['version'], 'created': state['snapshot']['created']}
+            result.update({kind: state['snapshot'][kind] for kind in kinds})
+            return result
+        return self._encoded(state, ('get_state', kinds), build)
+
+    def rpc_get_grouping(self, show_monitors=False):
+        state = self._current_state()
+        show_monitors = bool(show_monitors)
+
+        def build():
+            return dict(state['grouping'][show_monitors], version=state['version'])
+        return self._encoded(state, ('get_grouping', show_monitors), build)
+
+    def rpc_refresh(self):
+        return {'version': self.refresh()['version']}
+
+    # Write methods: serialized, and followed by a refresh so the caller reads its own writes
+
+    def _write(self, operation):
+        log_lines = []
+        with self._write_lock:
+            result = operation(log_lines.append)
+            self.backend.invalidate()
+            try:
+                version = self.refresh()['version']
+            except PactlError as e:
+                # The write went through; the next successful refresh will show it
+                log_lines.append(f"Refresh after write failed: {e}")
+                version = self._version
+        return {'result': result, 'log': log_lines, 'version': version}
+
+    def rpc_load_module(self, module_name, argument=''):
+        return self._write(lambda logger: self.backend.load_module(module_name, argument, logger=logger))
+
+    def rpc_unload_module(self, module_id):
+        return self._write(lambda logger: self.backend.unload_module(str(module_id), logger=logger))
+
+    def rpc_create_duplex_sink(self, name, description, channels=2, rate=None, format=None,
+                               channel_map=None, sink_properties=None):
+        return self._write(lambda logger: self.backend.create_duplex_sink(
+            name, description, channels, rate=rate, format=format,
+            channel_map=channel_map, sink_properties=sink_properties, logger=logger
+        ))
+
+    def rpc_unload_all_null_sinks(self):
+        return self._write(lambda logger: list(self.backend.unload_all_null_sinks(logger)))
+
+    def rpc_set_sink_volume(self, sink, volume):
+        return self._write(lambda logger: self.backend.set_sink_volume(str(sink), str(volume), logger=logger))
+
+    def rpc_apply_plan(self, plan):
+        return self._write(lambda logger: list(SnapshotRestorer.apply_plan(plan, logger, backend=self.backend)))
@@ -0,0 +1,236 @@
+"""
+Two-tier listing: brief records for the tree, full records on demand.
+
+'pactl list sinks' prints every property of every object, which on a graph
+with hundreds of null sinks is megabytes of text per refresh, while the tree
+only shows ids, names, descriptions and states. TieredLister builds the
+lists from 'pactl list short' (one line per object) instead, takes the
+descriptions of null sinks and their monitors from their module arguments,
+and runs the full listing only when a full record is asked for: by the
+details panel, or for a sink or source that is not a null sink, because the
+hardware classifier needs its device properties.
+
+Full records are kept while the object's short row stays the same, so an
+unchanged server costs three short listings per refresh. The lists hold
+brief records, so snapshots are taken from full_state() instead, for the
+kinds that changed.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import namedtuple
+from typing import List, Dict, Any, Optional
+
+from utils.audio_backend import Records, fingerprint_of
+from utils.pactl_runner import FINGERPRINT_SIZE, SHORT_COLUMNS
+
+# Seconds a full record shown in the details panel may be reused; the short
+# row does not show volume or mute changes
+DETAILS_MAX_AGE_SECONDS = 2.0
+
+# Values in module arguments: quoted with either quote, or up to whitespace
+_VALUE = r"""(?:"([^"]*)"|'([^']*)'|([^\s"']+))"""
+SINK_NAME_PATTERN = re.compile(r"sink_name=" + _VALUE)
+DESCRIPTION_PATTERN = re.compile(r"device\.description=" + _VALUE)
+
+# A full record and the short row it was fetched for
+_Detail = namedtuple('_Detail', 'row record fetched_at')
+
+
+def _argument_value(pattern, argument: str) -> Optional[str]:
+    match = pattern.search(argument)
+    if not match:
+        return None
+    return next(group for group in match.groups() if group is not None)
+
+
+def short_row(kind: str, record: Dict[str, Any]) -> tuple:
+    """The values a record shows in 'pactl list short', for change detection."""
+    return tuple(record.get(column) for column in SHORT_COLUMNS[kind])
+
+
+def null_sink_names(modules: List[Dict[str, Any]]) -> Dict[str, tuple]:
+    """
+    Map each null sink's name to its module id and description, taken from
+    the module arguments; the description falls back to the sink name.
+    """
+    names = {}
+    for module in modules:
+        if module.get('name') != 'module-null-sink':
+            continue
+        argument = module.get('argument', '')
+        name = _argument_value(SINK_NAME_PATTERN, argument)
+        if name:
+            names[name] = (module.get('id', ''), _argument_value(DESCRIPTION_PATTERN, argument) or name)
+    return names
+
+
+class TieredLister:
+    """
+    Lists sinks, sources and modules for the tree through a backend's short
+    listing and keeps the full records fetched so far.
+
+    Backends without list_short() (PipeWire, the daemon) already read the
+    whole graph cheaply; for them list() and details() use the full lists.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.tiered = callable(getattr(backend, 'list_short', None))
+        self._full_listers = {
+            'modules': backend.list_modules,
+            'sinks': backend.list_sinks,
+            'sources': backend.list_sources,
+        }
+        self._lock = threading.Lock()
+        # kind -> id -> _Detail
+        self._details = {kind: {} for kind in SHORT_COLUMNS}
+        # kind -> id -> short row, as last listed, and when
+        self._rows = {kind: {} for kind in SHORT_COLUMNS}
+        self._listed_at = {}
+        # Last short module listing, for the null sink names
+        self._modules = None
+
+    def list(self, kind: str, logger=None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """
+        List 'modules', 'sinks' or 'sources' with the fields the tree needs.
+
+        Null sinks and their monitors get brief records; other sinks and
+        sources get full records, fetched with one full listing of the kind
+        if any of them is new or changed.
+        """
+        if not self.tiered:
+            return self._full_listers[kind](logger=logger, raise_errors=raise_errors)
+
+        listed_at = time.monotonic()
+        rows = self.backend.list_short(kind, logger=logger, raise_errors=raise_errors)
+        with self._lock:
+            self._rows[kind] = {row['id']: short_row(kind, row) for row in rows}
+            self._listed_at[kind] = listed_at
+            if kind == 'modules':
+                self._modules = rows
+                return rows
+            modules = self._modules
+
+        records = self.assemble(kind, rows, null_sink_names(modules or []))
+        if None in records:
+            # The rows may include null sinks loaded since the modules were
+            # last listed; a short module listing is cheaper than a full one
+            modules = self.list('modules', logger=logger, raise_errors=raise_errors)
+            records = self.assemble(kind, rows, null_sink_names(modules))
+        missing = [position for position, record in enumerate(records) if record is None]
+        if missing:
+            full = self._fetch(kind, logger, raise_errors)
+            for position in missing:
+                row = rows[position]
+                records[position] = full.get(row['id']) or dict(row, description=row['name'], properties={})
+
+        fingerprints = (fingerprint_of(rows), fingerprint_of(modules))
+        fingerprint = None
+        if None not in fingerprints:
+            fingerprint = hashlib.blake2b(b''.join(fingerprints), digest_size=FINGERPRINT_SIZE).digest()
+        return Records(records, fingerprint)
+
+    def assemble(self, kind: str, rows: List[Dict[str, Any]], null_sinks: Dict[str, tuple]) -> list:
+        """
+        Turn short rows into records: a brief record for null sinks and
+        their monitors, even when their full record is held, so a record's
+        fields do not depend on what the details panel has fetched; the
+        cached full record for other objects whose row is unchanged; and
+        None where a full record has to be fetched.
+        """
+        with self._lock:
+            details = self._details[kind]
+        records = []
+        for row in rows:
+            name = row['name']
+            cached = details.get(row['id'])
+            if kind == 'sinks' and name in null_sinks:
+                module_id, description = null_sinks[name]
+                records.append(dict(row, description=description, owner_module=module_id,
+                                    monitor_source=f"{name}.monitor", properties={}))
+            elif kind == 'sources' and name.endswith('.monitor') and name[:-len('.monitor')] in null_sinks:
+                module_id, description = null_sinks[name[:-len('.monitor')]]
+                records.append(dict(row, description=f"Monitor of {description}", owner_module=module_id,
+                                    properties={}))
+            elif kind == 'sources' and name in null_sinks:
+                # The source side of a duplex null sink
+                module_id, description = null_sinks[name]
+                records.append(dict(row, description=description, owner_module=module_id, properties={}))
+            elif cached is not None and cached.row == short_row(kind, row):
+                records.append(cached.record)
+            else:
+                records.append(None)
+        return records
+
+    def full_state(self, logger=None, raise_errors: bool = False,
+                   kinds=('modules', 'sinks', 'sources')) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        List kinds in full, for snapshots: the history archive and the
+        last-state cache keep full records, whichever records the tree was
+        built from. The full records are kept as if details() had fetched
+        them; a kind whose records were all fetched since its last short
+        listing (for the details panel, or for list()) is not listed again.
+
+        Returns:
+            A dictionary mapping each of the kinds to its list
+        """
+        if not self.tiered:
+            return {kind: self._full_listers[kind](logger=logger, raise_errors=raise_errors) for kind in kinds}
+        state = {}
+        for kind in kinds:
+            state[kind] = self._held(kind)
+            if state[kind] is None:
+                state[kind] = list(self._fetch(kind, logger, raise_errors).values())
+        return state
+
+    def _held(self, kind: str) -> Optional[List[Dict[str, Any]]]:
+        """The full records of every object in the last short listing, if all were fetched after it."""
+        with self._lock:
+            rows = self._rows[kind]
+            details = self._details[kind]
+            listed_at = self._listed_at.get(kind)
+        if listed_at is None:
+            return None
+        records = []
+        for record_id, row in rows.items():
+            cached = details.get(record_id)
+            if cached is None or cached.row != row or cached.fetched_at < listed_at:
+                return None
+            records.append(cached.record)
+        return records
+
+    def details(self, kind: str, record_id, logger=None,
+                max_age: float = DETAILS_MAX_AGE_SECONDS) -> Optional[Dict[str, Any]]:
+        """
+        Get the full record of one sink, source or module.
+
+        A full record fetched less than max_age seconds ago is reused if the
+        object's short row has not changed since; otherwise the kind is
+        listed in full once and every record in it is kept.
+
+        Returns:
+            The record, or None if no object of that kind has the id
+        """
+        record_id = str(record_id)
+        with self._lock:
+            cached = self._details[kind].get(record_id)
+            row = self._rows[kind].get(record_id)
+        if (cached is not None and (row is None or cached.row == row)
+                and time.monotonic() - cached.fetched_at <= max_age):
+            return cached.record
+        return self._fetch(kind, logger, False).get(record_id)
+
+    def _fetch(self, kind: str, logger, raise_errors: bool) -> Dict[str, Dict[str, Any]]:
+        """List a kind in full and keep its records; returns them by id."""
+        records = self._full_listers[kind](logger=logger, raise_errors=raise_errors)
+        fetched_at = time.monotonic()
+        by_id = {str(record.get('id', '')): record for record in records}
+        with self._lock:
+            self._details[kind] = {
+                record_id: _Detail(short_row(kind, record), record, fetched_at)
+                for record_id, record in by_id.items()
+            }
+        return by_id
@@ -0,0 +1,226 @@
+"""
+View model of the Manage tab tree, free of any GUI imports.
+
+TreeModel turns module, sink and source lists (or a device grouping from
+DeviceGrouping.group_devices or the daemon) into a tree of immutable
+TreeNode tuples holding everything the tree shows: label, kind, tags,
+whether the node starts expanded, and a key that stays the same across
+refreshes for as long as the object it shows exists. The Manage tab
+renders the nodes with ui/tree_adapter.py; the CLI 'tree' command prints
+them, so both show the same grouping.
+"""
+
+from collections import namedtuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from utils.device_grouping import DeviceGrouping
+
+# One tree item:
+#   key        unique in the tree and stable across refreshes: the parent's
+#              key, '/', and the node's own kind and name
+#   text       the label shown in the tree
+#   kind       'category', 'hardware_category', 'device_group',
+#              'hardware_device_group', 'module', 'sink' or 'source'
+#   entity_id  the module, sink or source id; '' for groups
+#   name       the object name, device name or category key
+#   label      the text without its 'Output: ' style prefix, e.g. a
+#              sink's description
+#   tags       Treeview tags
+#   open       whether the node starts expanded
+#   children   tuple of child nodes
+TreeNode = namedtuple('TreeNode', 'key text kind entity_id name label tags open children')
+
+# Hardware categories in the order they are shown, with their labels
+HARDWARE_CATEGORIES = {
+    'builtin': '🔌 Built-in Audio',
+    'usb': '🎧 USB Audio',
+    'bluetooth': '📡 Bluetooth Audio',
+    'hdmi': '📺 HDMI/DisplayPort',
+}
+
+VIRTUAL_DEVICES_KEY = 'virtual'
+SYSTEM_MODULES_KEY = 'system'
+
+
+class _Keys:
+    """Hands out node keys, adding '#2', '#3'... where a key is already taken."""
+
+    def __init__(self):
+        self._used = set()
+
+    def __call__(self, parent_key: str, kind: str, name) -> str:
+        base = f"{parent_key}/{kind}:{name}" if parent_key else f"{kind}:{name}"
+        key = base
+        number = 1
+        while key in self._used:
+            number += 1
+            key = f"{base}#{number}"
+        self._used.add(key)
+        return key
+
+
+class TreeModel:
+    """
+    Build the Manage tab tree as TreeNode tuples.
+    """
+
+    @staticmethod
+    def build(modules, sinks, sources, show_system=False, show_monitors=False) -> Tuple[TreeNode, ...]:
+        """
+        Build the top-level nodes for module, sink and source lists.
+
+        Args:
+            show_system: Add a 'System Modules' group with the modules that
+                belong to no device
+            show_monitors: Show monitor sources of hardware devices
+        """
+        grouping = DeviceGrouping.group_devices(modules, sinks, sources, show_monitors=show_monitors)
+        return TreeModel.from_grouping(grouping, modules, show_system, show_monitors)
+
+    @staticmethod
+    def from_grouping(grouping: Dict[str, Any], modules=(), show_system=False,
+                      show_monitors=False) -> Tuple[TreeNode, ...]:
+        """
+        Build the top-level nodes from a device grouping, as returned by
+        DeviceGrouping.group_devices() or the daemon's get_grouping.
+
+        Args:
+            modules: All modules; only needed with show_system
+        """
+        keys = _Keys()
+        added_modules = set()
+        roots = []
+
+        virtual_devices = []
+        for device_name in sorted(grouping['virtual']):
+            device = grouping['virtual'][device_name]
+            key = keys(VIRTUAL_DEVICES_KEY, 'device_group', device_name)
+            children = []
+            for module in device['modules']:
+                children.append(TreeModel._module(keys, key, module))
+                added_modules.add(module.get('id', ''))
+            children.extend(TreeModel._device(keys, key, 'sink', sink) for sink in device['sinks'])
+            children.extend(TreeModel._device(keys, key, 'source', source, monitor_label=False)
+                            for source in device['sources'])
+            virtual_devices.append(TreeNode(key, f"Virtual Device: {device_name}", 'device_group', '',
+                                            device_name, device_name, ('category',), False, tuple(children)))
+        roots.append(TreeNode(VIRTUAL_DEVICES_KEY, "Virtual Devices", 'category', '', '', "Virtual Devices",
+                              ('category',), True, tuple(virtual_devices)))
+
+        hardware = []
+        for category, display_name in HARDWARE_CATEGORIES.items():
+            entries = grouping['hardware'].get(category, [])
+            if not entries:
+                continue
+            key = keys('', 'hardware_category', category)
+            children = []
+            for entry in entries:
+                node = TreeModel._hardware_entry(keys, key, entry, show_monitors, added_modules)
+                if node is not None:
+                    children.append(node)
+            hardware.append(TreeNode(key, display_name, 'hardware_category', '', category, display_name,
+                                     ('category',), False, tuple(children)))
+
+        if show_system:
+            system_modules = tuple(
+                TreeModel._standalone_module(keys, SYSTEM_MODULES_KEY, module)
+                for module in modules if module.get('id', '') not in added_modules
+            )
+            roots.append(TreeNode(SYSTEM_MODULES_KEY, "System Modules", 'category', '', '', "System Modules",
+                                  ('category',), False, system_modules))
+        roots.extend(hardware)
+        return tuple(roots)
+
+    @staticmethod
+    def _module(keys, parent_key: str, module) -> TreeNode:
+        module_id = module.get('id', '')
+        module_name = module.get('name', '')
+        return TreeNode(keys(parent_key, 'module', module_id), f"Module: {module_name}", 'module', module_id,
+                        module_name, module_name, ('module',), False, ())
+
+    @staticmethod
+    def _standalone_module(keys, parent_key: str, module) -> TreeNode:
+        """A module outside any device, labelled with the device name taken from its argument."""
+        module_id = module.get('id', '')
+        module_name = module.get('name', '')
+        device_name = DeviceGrouping.extract_device_name(module_name, module.get('argument', ''))
+        return TreeNode(keys(parent_key, 'module', module_id), device_name, 'module', module_id,
+                        module_name, device_name, ('module',), False, ())
+
+    @staticmethod
+    def _device(keys, parent_key: str, kind: str, record, monitor_label=True) -> TreeNode:
+        """
+        A sink or source node. Sources are labelled 'Input', or 'Monitor' if
+        they are monitors and monitor_label is set.
+        """
+        record_id = record.get('id', '')
+        name = record.get('name', '')
+        description = record.get('description', name)
+        if kind == 'sink':
+            prefix = "Output"
+        elif monitor_label and '.monitor' in name:
+            prefix = "Monitor"
+        else:
+            prefix = "Input"
+        return TreeNode(keys(parent_key, kind, name), f"{prefix}: {description}", kind, record_id,
+                        name, description, (kind,), False, ())
+
+    @staticmethod
+    def _hardware_entry(keys, parent_key: str, entry, show_monitors: bool, added_modules: set) -> Optional[TreeNode]:
+        """A node for one entry of a hardware category, or None if it shows nothing."""
+        entry_type = entry.get('type')
+        if entry_type in ('orphaned_sink', 'orphaned_source'):
+            kind = 'sink' if entry_type == 'orphaned_sink' else 'source'
+            record = entry.get(kind)
+            return TreeModel._device(keys, parent_key, kind, record) if record else None
+
+        if entry_type == 'hardware_device_group':
+            device_name = entry['device_info']['device_name']
+            modules = entry.get('modules', [])
+        elif entry_type == 'hardware_device' and entry.get('module'):
+            # Entries from older groupings: one card module with its devices
+            module = entry['module']
+            sinks, sources = entry.get('sinks', []), entry.get('sources', [])
+            device_name = DeviceGrouping.extract_device_name(module.get('name', ''), module.get('argument', ''))
+            if sinks:
+                device_name = sinks[0].get('description', device_name)
+            elif sources:
+                device_name = sources[0].get('description', device_name)
+            modules = [module]
+        else:
+            return None
+
+        key = keys(parent_key, 'hardware_device_group', device_name)
+        children = []
+        for module in modules:
+            children.append(TreeModel._module(keys, key, module))
+            added_modules.add(module.get('id', ''))
+        children.extend(TreeModel._device(keys, key, 'sink', sink) for sink in entry.get('sinks', []))
+        children.extend(TreeModel._device(keys, key, 'source', source) for source in entry.get('sources', [])
+                        if show_monitors or '.monitor' not in source.get('name', ''))
+        return TreeNode(key, device_name, 'hardware_device_group', '', device_name, device_name,
+                        ('category',), False, tuple(children))
+
+    @staticmethod
+    def walk(nodes, parent_key: str = '') -> Iterator[Tuple[str, TreeNode]]:
+        """Yield (parent key, node) for every node, depth first, parents before children."""
+        for node in nodes:
+            yield parent_key, node
+            yield from TreeModel.walk(node.children, node.key)
+
+    @staticmethod
+    def count(nodes) -> int:
+        """Number of nodes in the tree."""
+        return sum(1 + TreeModel.count(node.children) for node in nodes)
+
+    @staticmethod
+    def to_lines(nodes, indent: str = "  ") -> List[str]:
+        """The tree as indented text, one node per line."""
+        lines = []
+
+        def add(children, depth):
+            for node in children:
+                lines.append(indent * depth + node.text)
+                add(node.children, depth + 1)
+        add(nodes, 0)
+        return lines
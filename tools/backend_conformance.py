@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Conformance checks for AudioBackend implementations.
+
+Runs every backend (or the ones named on the command line) against a fresh
+fake audio server from tools/fake_pactl.py and checks the behaviour the GUI,
+the CLI and the daemon rely on:
+
+    records      list methods return records in PactlRunner's format
+    create       create_duplex_sink makes the sink and its monitor appear
+    volume       set_sink_volume succeeds on an existing sink
+    unload       unload_module removes the sink; unknown ids fail
+    unload-all   unload_all_null_sinks removes every null sink
+    subscribe    a write is reported to subscribers; close() ends the stream
+
+    python3 tools/backend_conformance.py
+    python3 tools/backend_conformance.py pipewire daemon
+
+Exits with status 1 if any check fails.
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from backend_kit import BACKENDS, fake_server, open_backend
+from utils.audio_backend import AudioBackend, AudioEvent
+
+# Seconds a write may take to show up in reads and events
+SETTLE_SECONDS = 3.0
+
+REQUIRED_FIELDS = {
+    'sinks': ('id', 'name', 'description', 'driver', 'monitor_source', 'properties'),
+    'sources': ('id', 'name', 'description', 'driver', 'properties'),
+    'modules': ('id', 'name'),
+}
+
+
+class CheckFailed(Exception):
+    """A backend did not behave as AudioBackend requires."""
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+def wait_for(predicate, timeout=SETTLE_SECONDS):
+    """Poll predicate until it is true or timeout seconds have passed."""
+    deadline = time.monotonic() + timeout
+    while True:
+        if predicate():
+            return True
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+
+
+def names(records):
+    return {record.get('name') for record in records}
+
+
+def null_sink_module(backend, sink_name):
+    for module in backend.list_modules(raise_errors=True):
+        if module['name'] == 'module-null-sink' and f"sink_name={sink_name}" in module.get('argument', ''):
+            return module
+    return None
+
+
+def check_records(backend):
+    expect(isinstance(backend, AudioBackend), f"{type(backend).__name__} is not an AudioBackend")
+    lists = {
+        'sinks': backend.list_sinks(raise_errors=True),
+        'sources': backend.list_sources(raise_errors=True),
+        'modules': backend.list_modules(raise_errors=True),
+    }
+    for kind, records in lists.items():
+        expect(records, f"list_{kind} returned nothing")
+        for record in records:
+            missing = [field for field in REQUIRED_FIELDS[kind] if field not in record]
+            expect(not missing, f"{kind} record {record.get('name')!r} lacks {', '.join(missing)}")
+            expect(isinstance(record['id'], str) and record['id'], f"{kind} id {record['id']!r} is not a string")
+    sinks = names(lists['sinks'])
+    for sink in sinks:
+        expect(f"{sink}.monitor" in names(lists['sources']), f"sink {sink} has no monitor source")
+
+
+def check_create(backend):
+    expect(backend.create_duplex_sink('conformance_a', 'Conformance A'), "create_duplex_sink failed")
+    expect(wait_for(lambda: 'conformance_a' in names(backend.list_sinks())),
+           "new sink is not listed")
+    expect('conformance_a.monitor' in names(backend.list_sources()), "new sink has no monitor source")
+    expect(null_sink_module(backend, 'conformance_a') is not None, "new sink has no module")
+
+
+def check_volume(backend):
+    expect(backend.set_sink_volume('conformance_a', '50%'), "set_sink_volume failed on an existing sink")
+    expect(backend.set_sink_volume('conformance_a', '+5%'), "set_sink_volume failed with a relative volume")
+
+
+def check_unload(backend):
+    module = null_sink_module(backend, 'conformance_a')
+    expect(module is not None, "sink from the create check is gone")
+    expect(backend.unload_module(module['id']), "unload_module failed")
+    expect(wait_for(lambda: 'conformance_a' not in names(backend.list_sinks())),
+           "sink is still listed after unload_module")
+    log = []
+    expect(not backend.unload_module('999999', logger=log.append), "unloading an unknown module succeeded")
+
+
+def check_unload_all(backend):
+    for number in range(3):
+        expect(backend.create_duplex_sink(f"conformance_b{number}", f"Conformance B{number}"),
+               "create_duplex_sink failed")
+    count, errors = backend.unload_all_null_sinks()
+    expect(not errors, f"unload_all_null_sinks reported {errors}")
+    expect(count >= 3, f"unload_all_null_sinks unloaded {count} modules, expected at least 3")
+    expect(wait_for(lambda: not any(m['name'] == 'module-null-sink' for m in backend.list_modules())),
+           "null sinks are still loaded")
+
+
+def check_subscribe(backend):
+    events = []
+    received = threading.Event()
+
+    def on_event(event):
+        events.append(event)
+        received.set()
+
+    subscription = backend.subscribe(on_event)
+    try:
+        # Give the stream time to start before causing a change
+        time.sleep(0.5)
+        received.clear()
+        events.clear()
+        expect(backend.create_duplex_sink('conformance_c', 'Conformance C'), "create_duplex_sink failed")
+        expect(received.wait(SETTLE_SECONDS), "no event reported after a write")
+        expect(all(isinstance(event, AudioEvent) for event in events), "events are not AudioEvents")
+        expect(all(event.kind in ('new', 'change', 'remove') for event in events),
+               f"unknown event kinds in {events}")
+    finally:
+        subscription.close()
+        subscription.close()
+    expect(wait_for(lambda: not subscription.active), "subscription still active after close()")
+    backend.unload_all_null_sinks()
+
+
+CHECKS = [
+    ('records', check_records),
+    ('create', check_create),
+    ('volume', check_volume),
+    ('unload', check_unload),
+    ('unload-all', check_unload_all),
+    ('subscribe', check_subscribe),
+]
+
+
+def run_backend(name):
+    """Run every check against one backend; returns the number of failures."""
+    failures = 0
+    print(f"{name}: {BACKENDS[name][0]}")
+    with fake_server():
+        try:
+            opened = open_backend(name)
+            backend = opened.__enter__()
+        except Exception as e:
+            print(f"  FAIL  open: {e}")
+            return len(CHECKS)
+        try:
+            for check_name, check in CHECKS:
+                started = time.monotonic()
+                try:
+                    check(backend)
+                except CheckFailed as e:
+                    failures += 1
+                    print(f"  FAIL  {check_name}: {e}")
+                except Exception as e:
+                    failures += 1
+                    print(f"  FAIL  {check_name}: {type(e).__name__}: {e}")
+                else:
+                    print(f"  PASS  {check_name} ({(time.monotonic() - started) * 1000:.0f} ms)")
+        finally:
+            opened.__exit__(None, None, None)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check audio backends against the AudioBackend contract")
+    parser.add_argument("backends", nargs="*", metavar="BACKEND",
+                        help=f"backends to check (default: all of {', '.join(BACKENDS)})")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.backends if name not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backend: {', '.join(unknown)}")
+
+    failures = sum(run_backend(name) for name in args.backends or BACKENDS)
+    print("OK" if not failures else f"{failures} check(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Shared setup for tools/backend_conformance.py and tools/bench_backends.py.
+
+fake_server() points PATH at tools/fake_pactl.py under the names pactl,
+pacmd and pw-dump, with a fresh state file, so every backend talks to the
+same simulated audio server. BACKENDS maps a name to a factory that opens
+one backend against it; each factory is a context manager that closes the
+backend (and anything it started) when done.
+"""
+
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(TOOLS_DIR), "src")
+FAKE_PACTL = os.path.join(TOOLS_DIR, "fake_pactl.py")
+DAEMON_SCRIPT = os.path.join(SRC_DIR, "daemon.py")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from utils.pacmd_session import NO_SESSION_ENV  # noqa: E402
+from utils.pactl_runner import PactlRunner  # noqa: E402
+from utils.pipewire_backend import BACKEND_ENV, PipeWireBackend  # noqa: E402
+from utils.daemon_client import DaemonClient, NO_DAEMON_ENV  # noqa: E402
+
+DAEMON_START_TIMEOUT_SECONDS = 10.0
+
+
+@contextlib.contextmanager
+def _environment(**overrides):
+    """Set environment variables for the duration of the block."""
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update({name: value for name, value in overrides.items() if value is not None})
+    for name, value in overrides.items():
+        if value is None:
+            os.environ.pop(name, None)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@contextlib.contextmanager
+def fake_server(hardware=3, null_sinks=0, latency=0.0):
+    """
+    Run the block against a fresh fake audio server.
+
+    Yields:
+        The temporary directory holding the server state and the links
+    """
+    with tempfile.TemporaryDirectory(prefix="pactl-gui-backends-") as workdir:
+        bin_dir = os.path.join(workdir, "bin")
+        os.makedirs(bin_dir)
+        for name in ("pactl", "pacmd", "pw-dump"):
+            os.symlink(FAKE_PACTL, os.path.join(bin_dir, name))
+
+        with _environment(
+            PATH=bin_dir + os.pathsep + os.environ.get("PATH", ""),
+            FAKE_PACTL_STATE=os.path.join(workdir, "pactl_state.json"),
+            FAKE_PACTL_HARDWARE=str(hardware),
+            FAKE_PACTL_NULL_SINKS=str(null_sinks),
+            FAKE_PACTL_LATENCY=str(latency),
+            XDG_CACHE_HOME=os.path.join(workdir, "cache"),
+            XDG_STATE_HOME=os.path.join(workdir, "state"),
+            XDG_RUNTIME_DIR=workdir,
+            PACTL_GUI_NO_DAEMON=None,
+        ):
+            try:
+                yield workdir
+            finally:
+                # The shared pacmd session would otherwise outlive this server
+                PactlRunner._session.close()
+
+
+@contextlib.contextmanager
+def _pactl(use_pacmd=True):
+    with _environment(**{NO_SESSION_ENV: None if use_pacmd else "1"}):
+        backend = PactlRunner()
+        try:
+            yield backend
+        finally:
+            backend.close()
+
+
+@contextlib.contextmanager
+def _pipewire(monitor=False):
+    with _environment(**{BACKEND_ENV: None}):
+        backend = PipeWireBackend.connect(monitor=monitor)
+        if backend is None:
+            raise RuntimeError("pw-dump is not on PATH")
+        try:
+            yield backend
+        finally:
+            backend.close()
+
+
+@contextlib.contextmanager
+def _daemon():
+    """Start src/daemon.py on a private socket and connect to it."""
+    path = os.path.join(tempfile.mkdtemp(prefix="daemon-", dir=os.environ.get("XDG_RUNTIME_DIR")), "daemon.sock")
+    process = subprocess.Popen(
+        [sys.executable, DAEMON_SCRIPT, "--socket", path],
+        env=dict(os.environ, **{BACKEND_ENV: "pactl"}),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    try:
+        deadline = time.monotonic() + DAEMON_START_TIMEOUT_SECONDS
+        client = None
+        while client is None:
+            if process.poll() is not None:
+                raise RuntimeError(f"daemon exited: {process.stderr.read().strip()}")
+            if time.monotonic() > deadline:
+                raise RuntimeError("daemon did not start in time")
+            with _environment(**{NO_DAEMON_ENV: None}):
+                client = DaemonClient.connect(path)
+            if client is None:
+                time.sleep(0.05)
+        try:
+            yield client
+        finally:
+            client.close()
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stderr.close()
+
+
+# name -> (description, factory)
+BACKENDS = {
+    "pactl": ("PactlRunner, writes through a pacmd session", lambda: _pactl()),
+    "pactl-only": ("PactlRunner with PACTL_GUI_NO_PACMD set", lambda: _pactl(use_pacmd=False)),
+    "pipewire": ("PipeWireBackend, one pw-dump per read", lambda: _pipewire()),
+    "pipewire-monitor": ("PipeWireBackend following pw-dump --monitor", lambda: _pipewire(monitor=True)),
+    "daemon": ("DaemonClient against src/daemon.py over pactl", lambda: _daemon()),
+}
+
+
+def open_backend(name):
+    """Return the context manager that opens the named backend."""
+    try:
+        return BACKENDS[name][1]()
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}'; choose from {', '.join(BACKENDS)}") from None
+
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Per-operation latency and throughput of the audio backends.
+
+Runs the same operations against every backend (or the ones named on the
+command line), each on a fresh fake audio server from tools/fake_pactl.py,
+and prints them side by side:
+
+    list sinks     list_sinks
+    full read      list_modules, list_sinks and list_sources
+    set volume     set_sink_volume on a hardware sink
+    create+unload  create_duplex_sink, then unload_module of its module
+
+Latencies are per operation; ops/s is the number of operations completed
+per second of wall time over all iterations.
+
+    python3 tools/bench_backends.py --iterations 50
+    python3 tools/bench_backends.py pactl pipewire-monitor --latency 0.005
+"""
+
+import argparse
+import itertools
+import json
+import statistics
+import sys
+import time
+
+from backend_kit import BACKENDS, fake_server, open_backend
+
+
+def _full_read(backend):
+    backend.list_modules(raise_errors=True)
+    backend.list_sinks(raise_errors=True)
+    backend.list_sources(raise_errors=True)
+
+
+def _create_unload(backend, names=itertools.count()):
+    name = f"bench_{next(names)}"
+    if not backend.create_duplex_sink(name, name):
+        raise RuntimeError(f"create_duplex_sink({name!r}) failed")
+    for module in backend.list_modules(raise_errors=True):
+        if f"sink_name={name}" in module.get('argument', ''):
+            if not backend.unload_module(module['id']):
+                raise RuntimeError(f"unload_module({module['id']}) failed")
+            return
+    raise RuntimeError(f"module of {name!r} not listed")
+
+
+def _set_volume(backend):
+    sink = backend.list_sinks(raise_errors=True)[0]['name']
+    if not backend.set_sink_volume(sink, '50%'):
+        raise RuntimeError(f"set_sink_volume({sink!r}) failed")
+
+
+OPERATIONS = [
+    ('list sinks', lambda backend: backend.list_sinks(raise_errors=True)),
+    ('full read', _full_read),
+    ('set volume', _set_volume),
+    ('create+unload', _create_unload),
+]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(backend, operation, iterations, warmup):
+    """Time one operation; returns latencies in milliseconds and ops/s."""
+    for _ in range(warmup):
+        operation(backend)
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        before = time.perf_counter()
+        operation(backend)
+        samples.append((time.perf_counter() - before) * 1000)
+    elapsed = time.perf_counter() - started
+    return {
+        'median_ms': statistics.median(samples),
+        'p95_ms': percentile(samples, 0.95),
+        'ops_per_second': iterations / elapsed if elapsed else float('inf'),
+    }
+
+
+def run_backend(name, args):
+    with fake_server(args.hardware, args.null_sinks, args.latency):
+        with open_backend(name) as backend:
+            return {label: measure(backend, operation, args.iterations, args.warmup)
+                    for label, operation in OPERATIONS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare audio backend latency and throughput")
+    parser.add_argument("backends", nargs="*", metavar="BACKEND",
+                        help=f"backends to measure (default: all of {', '.join(BACKENDS)})")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed runs per operation (default: 20)")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed runs per operation (default: 2)")
+    parser.add_argument("--hardware", type=int, default=3, help="Hardware cards in the fake server")
+    parser.add_argument("--null-sinks", type=int, default=5, help="Null sinks in the fake server")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Extra seconds the fake server waits per process start")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.backends if name not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backend: {', '.join(unknown)}")
+
+    results = {}
+    for name in args.backends or BACKENDS:
+        try:
+            results[name] = run_backend(name, args)
+        except Exception as e:
+            print(f"{name}: {type(e).__name__}: {e}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0 if results else 1
+
+    print(f"{args.iterations} iterations, {args.hardware} hardware cards, {args.null_sinks} null sinks, "
+          f"{args.latency * 1000:.0f} ms added latency")
+    names = list(results)
+    print(f"{'':<26}" + "".join(f"{name:>18}" for name in names))
+    for label, _ in OPERATIONS:
+        for metric, unit in (('median_ms', 'median ms'), ('p95_ms', 'p95 ms'), ('ops_per_second', 'ops/s')):
+            row = f"{label if metric == 'median_ms' else '':<15}{unit:>11}"
+            print(row + "".join(f"{results[name][label][metric]:>18.1f}" for name in names))
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Idle-cost benchmark for pactl-gui.
+
+Launches the GUI against tools/fake_pactl.py, waits until the Manage tab
+tree is populated, then leaves the window alone and reports what keeping it
+open costs:
+
+    wakeups/min    timer callbacks per minute (polls, watchdog, fetches)
+    CPU            process CPU time as a percentage of one core
+    poll interval  the automatic refresh interval reached at the end
+
+The fake server does not change during the run, so automatic refresh backs
+off to its maximum interval. A display is required; on a headless machine
+run it under Xvfb:
+
+    xvfb-run -a python3 tools/bench_idle.py --seconds 300
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench_startup import MAIN_SCRIPT, make_environment
+
+
+def run_once(args):
+    """Start the GUI once and return its idle report."""
+    with tempfile.TemporaryDirectory(prefix="pactl-gui-idle-") as workdir:
+        env = make_environment(workdir, args)
+        del env["PACTL_GUI_STARTUP_PROBE"]
+        env["PACTL_GUI_IDLE_PROBE"] = str(args.seconds)
+        result = subprocess.run(
+            [sys.executable, MAIN_SCRIPT],
+            env=env, capture_output=True, text=True, timeout=args.seconds + args.timeout
+        )
+
+    for line in result.stdout.splitlines():
+        try:
+            report = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(report, dict) and "wakeups_per_minute" in report:
+            return report
+    raise RuntimeError(f"GUI run failed (exit {result.returncode}):\n{result.stderr.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the idle cost of an open pactl-gui window")
+    parser.add_argument("--seconds", type=float, default=120.0, help="Idle time to measure (default: 120)")
+    parser.add_argument("--hardware", type=int, default=3, help="Hardware cards in the fake server")
+    parser.add_argument("--null-sinks", type=int, default=5, help="Null sinks in the fake server")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Extra seconds the fake pactl waits per command")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="Seconds allowed for start-up and shutdown on top of --seconds")
+    parser.add_argument("--json", action="store_true", help="Print the raw report as JSON")
+    args = parser.parse_args()
+
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        parser.error("no display available; run under xvfb-run")
+
+    report = run_once(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"idle for {report['minutes']:.1f} min, {args.hardware} hardware cards, {args.null_sinks} null sinks")
+    print(f"wakeups/min      {report['wakeups_per_minute']:7.1f}")
+    print(f"CPU              {report['cpu_percent']:7.2f} %")
+    print(f"poll interval    {report['poll_interval']:7.0f} s")
+
+
+if __name__ == "__main__":
+    main()
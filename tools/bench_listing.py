@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Cost of one Manage tab refresh: full listings against the two-tier path.
+
+Runs against a fake audio server from tools/fake_pactl.py with many null
+sinks and compares, per refresh:
+
+    bytes      output read from pactl
+    parse ms   time spent turning that output into records (no processes)
+    refresh ms wall time of listing modules, sinks and sources, with the
+               parse cache cleared so every refresh parses
+    changed ms the same for a refresh after a change to every list, plus
+               the full listings the main window then takes for the
+               history snapshot (none on the full path, whose records
+               are already full)
+
+The full path is 'pactl list modules/sinks/sources'. The two-tier path is
+TieredLister from utils/tiered_listing.py after its first refresh, i.e.
+'pactl list short' plus the full records it has already kept.
+
+    python3 tools/bench_listing.py --null-sinks 1000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from backend_kit import fake_server
+from utils.pactl_runner import PactlRunner
+from utils.tiered_listing import TieredLister, null_sink_names
+
+KINDS = ('modules', 'sinks', 'sources')
+FULL_PARSERS = {
+    'modules': PactlRunner.parse_modules,
+    'sinks': PactlRunner.parse_sinks,
+    'sources': PactlRunner.parse_sources,
+}
+
+
+def timed(function, iterations):
+    """Median milliseconds of function() over iterations runs."""
+    samples = []
+    for _ in range(iterations):
+        before = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - before) * 1000)
+    return statistics.median(samples)
+
+
+def outputs(short):
+    """The raw output of each list command."""
+    result = {}
+    for kind in KINDS:
+        command = ['list', 'short', kind] if short else ['list', kind]
+        output, return_code = PactlRunner.run_command(command, binary=True)
+        if return_code != 0:
+            raise RuntimeError(f"pactl {' '.join(command)} failed: {output.strip()}")
+        result[kind] = output
+    return result
+
+
+def run(args):
+    with fake_server(args.hardware, args.null_sinks):
+        full_outputs = outputs(short=False)
+        short_outputs = outputs(short=True)
+
+        lister = TieredLister(PactlRunner())
+        for kind in KINDS:
+            lister.list(kind, raise_errors=True)
+
+        def parse_full():
+            for kind in KINDS:
+                FULL_PARSERS[kind](full_outputs[kind])
+
+        def parse_tiered():
+            rows = {kind: PactlRunner.parse_short(short_outputs[kind], kind) for kind in KINDS}
+            null_sinks = null_sink_names(rows['modules'])
+            for kind in ('sinks', 'sources'):
+                lister.assemble(kind, rows[kind], null_sinks)
+
+        def refresh(list_kind, snapshot=None):
+            def function():
+                PactlRunner._parsed.clear()
+                for kind in KINDS:
+                    list_kind(kind)
+                if snapshot:
+                    snapshot()
+            return function
+
+        def tiered_snapshot():
+            # As after a change: nothing has been fetched since the short listings
+            for kind in KINDS:
+                lister._listed_at[kind] = time.monotonic()
+            lister.full_state(raise_errors=True)
+
+        full_lister = {kind: getattr(PactlRunner, f"list_{kind}") for kind in KINDS}
+        return {
+            'full': {
+                'bytes': sum(len(output) for output in full_outputs.values()),
+                'parse_ms': timed(parse_full, args.iterations),
+                'refresh_ms': timed(refresh(lambda kind: full_lister[kind](raise_errors=True)), args.iterations),
+                'changed_ms': timed(refresh(lambda kind: full_lister[kind](raise_errors=True)), args.iterations),
+            },
+            'tiered': {
+                'bytes': sum(len(output) for output in short_outputs.values()),
+                'parse_ms': timed(parse_tiered, args.iterations),
+                'refresh_ms': timed(refresh(lambda kind: lister.list(kind, raise_errors=True)), args.iterations),
+                'changed_ms': timed(refresh(lambda kind: lister.list(kind, raise_errors=True), tiered_snapshot),
+                                    args.iterations),
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full and two-tier listing cost per refresh")
+    parser.add_argument("--iterations", type=int, default=10, help="Timed runs per measurement (default: 10)")
+    parser.add_argument("--hardware", type=int, default=3, help="Hardware cards in the fake server")
+    parser.add_argument("--null-sinks", type=int, default=500, help="Null sinks in the fake server (default: 500)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{args.hardware} hardware cards, {args.null_sinks} null sinks, median of {args.iterations}")
+    print(f"{'':<12}{'full':>12}{'two-tier':>12}{'ratio':>9}")
+    for metric, label in (('bytes', 'bytes'), ('parse_ms', 'parse ms'), ('refresh_ms', 'refresh ms'),
+                          ('changed_ms', 'changed ms')):
+        full, tiered = results['full'][metric], results['tiered'][metric]
+        ratio = full / tiered if tiered else float('inf')
+        print(f"{label:<12}{full:>12.1f}{tiered:>12.1f}{ratio:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark of the parallel 'pactl list' parser.
+
+Generates sink, source and module listings with tools/bench_parse.py and
+times utils/listing_parser.py on each: parse() in this process, then
+parse_parallel() split into 2, 4, ... chunks on the shared process pool.
+Every parallel result must equal the serial one; the benchmark stops if it
+does not. Reported per listing and worker count: median time and speedup
+over the serial parse.
+
+The pool is started and warmed up before timing, as it stays up in the GUI
+once a large listing has been parsed. Worker counts above the number of
+cores are still run, and show what oversubscription costs.
+
+    python3 tools/bench_parallel_parse.py --objects 50000 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from bench_parse import generate_devices, generate_modules
+from utils import listing_parser
+
+
+def timed(function, iterations):
+    """Median milliseconds of function() over iterations runs."""
+    samples = []
+    for _ in range(iterations):
+        before = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - before) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure parallel parsing of large pactl listings")
+    parser.add_argument("--objects", type=int, default=50000, help="Objects per listing (default: 50000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Worker counts to time (default: 1 2 4 8)")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed runs per measurement (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    listings = {
+        'sinks': generate_devices('sinks', args.objects).encode(),
+        'sources': generate_devices('sources', args.objects).encode(),
+        'modules': generate_modules(args.objects).encode(),
+    }
+    # Pool processes are started once; do not time their start-up
+    listing_parser.MAX_WORKERS = max(args.workers)
+    listing_parser.parse_parallel(listings['modules'], 'modules', max(args.workers))
+    if listing_parser._Pool.broken:
+        print("the process pool could not be started", file=sys.stderr)
+        return 1
+
+    results = {'cores': listing_parser.parallel_workers(), 'listings': {}}
+    for kind, raw in listings.items():
+        expected = listing_parser.parse(raw, kind)
+        serial_ms = timed(lambda: listing_parser.parse(raw, kind), args.iterations)
+        result = {'bytes': len(raw), 'serial_ms': serial_ms, 'parallel_ms': {}}
+        for workers in args.workers:
+            if listing_parser.parse_parallel(raw, kind, workers) != expected:
+                print(f"{kind}: {workers} workers disagree with the serial parse", file=sys.stderr)
+                return 1
+            result['parallel_ms'][workers] = timed(
+                lambda: listing_parser.parse_parallel(raw, kind, workers), args.iterations)
+        results['listings'][kind] = result
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{args.objects} objects per listing, {results['cores']} usable cores, median of {args.iterations}")
+    print(f"{'':<10}{'MiB':>7}{'serial ms':>11}" + "".join(f"{f'{n} workers':>17}" for n in args.workers))
+    for kind, result in results['listings'].items():
+        row = f"{kind:<10}{result['bytes'] / 2 ** 20:>7.1f}{result['serial_ms']:>11.1f}"
+        for workers in args.workers:
+            parallel = result['parallel_ms'][workers]
+            row += f"{parallel:>10.1f}{result['serial_ms'] / parallel:>6.2f}x"
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the 'pactl list' parsers.
+
+Generates sink, source and module listings in pactl's format (with ports,
+volume continuation lines and formats, as a real server prints them) and
+compares two ways of turning them into records:
+
+    text    decode the whole output (what text=True did) and parse it line
+            by line with splitlines(), strip() and split(), as PactlRunner
+            did before utils/listing_parser.py
+    bytes   utils/listing_parser.py on a memoryview of the raw output
+
+Both must produce the same records; the benchmark stops if they do not.
+Reported per listing: median time, and from tracemalloc the peak memory
+while parsing and how much of it was temporary (peak minus the records
+that are returned).
+
+    python3 tools/bench_parse.py --objects 10000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+import backend_kit  # noqa: F401 (puts src/ on sys.path)
+from utils.listing_parser import SINK_FIELDS, SOURCE_FIELDS, parse_devices, parse_modules
+
+
+def generate_devices(kind, count):
+    header, other = ('Sink', 'Monitor Source') if kind == 'sinks' else ('Source', 'Monitor of Sink')
+    blocks = []
+    for number in range(count):
+        name = f"alsa_output.pci-0000_00_1f.3.analog-stereo-{number}"
+        blocks.append("\n".join([
+            f"{header} #{number}",
+            "\tState: SUSPENDED",
+            f"\tName: {name}",
+            f"\tDescription: Built-in Audio Analog Stereo {number}",
+            "\tDriver: module-alsa-card.c",
+            "\tSample Specification: s16le 2ch 48000Hz",
+            "\tChannel Map: front-left,front-right",
+            "\tOwner Module: 7",
+            "\tMute: no",
+            "\tVolume: front-left: 39321 /  60% / -13.31 dB,   front-right: 39321 /  60% / -13.31 dB",
+            "\t        balance 0.00",
+            "\tBase Volume: 65536 / 100% / 0.00 dB",
+            f"\t{other}: {name}.monitor",
+            "\tLatency: 0 usec, configured 0 usec",
+            "\tFlags: HARDWARE HW_MUTE_CTRL HW_VOLUME_CTRL DECIBEL_VOLUME LATENCY",
+            "\tProperties:",
+            '\t\talsa.resolution_bits = "16"',
+            '\t\tdevice.api = "alsa"',
+            '\t\tdevice.class = "sound"',
+            '\t\talsa.class = "generic"',
+            '\t\talsa.subclass = "generic-mix"',
+            '\t\talsa.name = "ALC257 Analog"',
+            '\t\talsa.id = "ALC257 Analog"',
+            '\t\talsa.subdevice = "0"',
+            '\t\talsa.device = "0"',
+            '\t\talsa.card = "0"',
+            '\t\talsa.card_name = "HDA Intel PCH"',
+            '\t\talsa.long_card_name = "HDA Intel PCH at 0x6001120000 irq 147"',
+            '\t\talsa.driver_name = "snd_hda_intel"',
+            '\t\tdevice.bus_path = "pci-0000:00:1f.3"',
+            '\t\tsysfs.path = "/devices/pci0000:00/0000:00:1f.3/sound/card0"',
+            '\t\tdevice.bus = "pci"',
+            '\t\tdevice.vendor.id = "8086"',
+            '\t\tdevice.vendor.name = "Intel Corporation"',
+            '\t\tdevice.product.id = "02c8"',
+            '\t\tdevice.form_factor = "internal"',
+            f'\t\tdevice.string = "front:0,{number}"',
+            '\t\tdevice.buffering.buffer_size = "352800"',
+            '\t\tdevice.buffering.fragment_size = "176400"',
+            '\t\tdevice.access_mode = "mmap+timer"',
+            '\t\tdevice.profile.name = "analog-stereo"',
+            '\t\tdevice.profile.description = "Analog Stereo"',
+            f'\t\tdevice.description = "Built-in Audio Analog Stereo {number}"',
+            '\t\tmodule-udev-detect.discovered = "1"',
+            '\t\tdevice.icon_name = "audio-card-pci"',
+            "\tPorts:",
+            "\t\tanalog-output-speaker: Speakers (type: Speaker, priority: 10000, availability unknown)",
+            "\t\tanalog-output-headphones: Headphones (type: Headphones, priority: 9900, not available)",
+            "\tActive Port: analog-output-speaker",
+            "\tFormats:",
+            "\t\tpcm",
+        ]))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_modules(count):
+    blocks = []
+    for number in range(count):
+        blocks.append("\n".join([
+            f"Module #{number}",
+            "\tName: module-null-sink",
+            f"\tArgument: sink_name=virtual_{number} sink_properties=device.description=Virtual_{number}",
+            "\tUsage counter: 0",
+            "\tProperties:",
+            '\t\tmodule.author = "Lennart Poettering"',
+            '\t\tmodule.description = "Clocked NULL sink"',
+            '\t\tmodule.version = "16.1"',
+        ]))
+    return "\n\n".join(blocks) + "\n"
+
+
+def text_parse_devices(output, kind):
+    """The line-by-line parser PactlRunner used for sinks and sources."""
+    header, field_map = ('Sink #', SINK_FIELDS) if kind == 'sinks' else ('Source #', SOURCE_FIELDS)
+    devices = []
+    current = None
+    section = None
+    for line in output.splitlines():
+        line_stripped = line.strip()
+        if line.startswith(header):
+            if current:
+                devices.append(current)
+            current = {'id': line.split('#')[1].strip(), 'properties': {}}
+            section = None
+        elif current:
+            if line_stripped.startswith('Properties:'):
+                section = 'properties'
+            elif line_stripped.startswith('Formats:'):
+                section = 'formats'
+                current['formats'] = []
+            elif section == 'properties' and '=' in line_stripped:
+                parts = line_stripped.split(' = ', 1)
+                if len(parts) == 2:
+                    current['properties'][parts[0].strip()] = parts[1].strip().strip('"')
+            elif section == 'formats' and line_stripped:
+                current['formats'].append(line_stripped)
+            elif ':' in line and section not in ['properties', 'formats']:
+                key, value = line.split(':', 1)
+                key = key.strip()
+                current[field_map.get(key, key.lower().replace(' ', '_'))] = value.strip()
+    if current:
+        devices.append(current)
+    return devices
+
+
+def text_parse_modules(output):
+    """The line-by-line parser PactlRunner used for modules (single-line arguments)."""
+    modules = []
+    current = None
+    section = None
+    for line in output.splitlines():
+        line_stripped = line.strip()
+        if line.startswith('Module #'):
+            if current:
+                modules.append(current)
+            current = {'id': line.split('#')[1].strip(), 'properties': {}}
+            section = None
+        elif current:
+            if line_stripped.startswith('Properties:'):
+                section = 'properties'
+            elif section == 'properties' and '=' in line_stripped:
+                parts = line_stripped.split(' = ', 1)
+                if len(parts) == 2:
+                    current['properties'][parts[0].strip()] = parts[1].strip().strip('"')
+            elif line_stripped.startswith('Name: '):
+                current['name'] = line_stripped[6:].strip()
+            elif line_stripped.startswith('Argument: '):
+                current['argument'] = line_stripped[10:].strip()
+            elif line_stripped.startswith('Usage counter: '):
+                current['usage_counter'] = line_stripped[15:].strip()
+                section = None
+    if current:
+        modules.append(current)
+    return modules
+
+
+def measure(parse, raw, iterations):
+    """Median milliseconds, and the peak and temporary MiB of one run."""
+    samples = []
+    for _ in range(iterations):
+        before = time.perf_counter()
+        parse(raw)
+        samples.append((time.perf_counter() - before) * 1000)
+
+    tracemalloc.start()
+    result = parse(raw)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        'median_ms': statistics.median(samples),
+        'peak_mib': peak / 2 ** 20,
+        'temporary_mib': (peak - retained) / 2 ** 20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the text and bytes pactl list parsers")
+    parser.add_argument("--objects", type=int, default=10000, help="Objects per listing (default: 10000)")
+    parser.add_argument("--iterations", type=int, default=5, help="Timed runs per parser (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    listings = {
+        'sinks': (generate_devices('sinks', args.objects),
+                  lambda raw: text_parse_devices(raw.decode(), 'sinks'),
+                  lambda raw: parse_devices(raw, 'sinks')),
+        'sources': (generate_devices('sources', args.objects),
+                    lambda raw: text_parse_devices(raw.decode(), 'sources'),
+                    lambda raw: parse_devices(raw, 'sources')),
+        'modules': (generate_modules(args.objects),
+                    lambda raw: text_parse_modules(raw.decode()),
+                    parse_modules),
+    }
+
+    results = {}
+    for listing, (output, text_parse, bytes_parse) in listings.items():
+        raw = output.encode()
+        if text_parse(raw) != bytes_parse(raw):
+            print(f"{listing}: the parsers disagree", file=sys.stderr)
+            return 1
+        results[listing] = {
+            'bytes': len(raw),
+            'text': measure(text_parse, raw, args.iterations),
+            'bytes_parser': measure(bytes_parse, raw, args.iterations),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{args.objects} objects per listing, median of {args.iterations}")
+    print(f"{'':<10}{'MiB in':>8}{'ms':>18}{'peak MiB':>18}{'temporary MiB':>18}")
+    print(f"{'':<18}" + f"{'text':>9}{'bytes':>9}" * 3)
+    for listing, result in results.items():
+        text, raw = result['text'], result['bytes_parser']
+        row = f"{listing:<10}{result['bytes'] / 2 ** 20:>8.1f}"
+        for metric in ('median_ms', 'peak_mib', 'temporary_mib'):
+            row += f"{text[metric]:>9.1f}{raw[metric]:>9.1f}"
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark of the record pool over many refresh cycles.
+
+Generates sink, source and module listings with tools/bench_parse.py and
+runs a number of refresh cycles in which one object of each kind changes
+(its volume, or its usage counter), so every listing has to be parsed
+again, as after a server event. Two ways are compared:
+
+    fresh    utils/listing_parser.py without a pool: every record, property
+             dict and string is allocated again on every cycle
+    pooled   with one utils/record_pool.py RecordPool per kind, as
+             PactlRunner parses: unchanged records are reused, property
+             keys are interned and values are shared
+
+The last --keep snapshots are held, as the GUI holds the tree it shows
+while the next refresh is parsed. Pooled results must equal fresh ones; the
+benchmark stops if they do not. Reported from tracemalloc: memory held by
+the kept snapshots at the end, and the median memory allocated per cycle
+(peak minus what was held before it); and from gc the collections run
+during the cycles, and the median time per cycle.
+
+    python3 tools/bench_record_pool.py --cycles 1000 --objects 100
+"""
+
+import argparse
+import collections
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bench_parse import generate_devices, generate_modules
+from utils import listing_parser, record_pool
+from utils.record_pool import RecordPool
+
+KINDS = ('sinks', 'sources', 'modules')
+
+
+def listing_blocks(objects):
+    """Each kind's listing, as a list of record texts."""
+    return {
+        'sinks': generate_devices('sinks', objects).rstrip('\n').split('\n\n'),
+        'sources': generate_devices('sources', objects).rstrip('\n').split('\n\n'),
+        'modules': generate_modules(objects).rstrip('\n').split('\n\n'),
+    }
+
+
+def cycle_outputs(blocks, cycle):
+    """The listings of one cycle: one record of each kind differs from the original."""
+    outputs = {}
+    for kind, records in blocks.items():
+        position = cycle % len(records)
+        changed = records[position].replace(' 60% ', f' {cycle % 100}% ').replace(
+            'Usage counter: 0', f'Usage counter: {cycle % 100}')
+        outputs[kind] = '\n\n'.join(records[:position] + [changed] + records[position + 1:]).encode() + b'\n'
+    return outputs
+
+
+def run(blocks, args, pools):
+    """Run the cycles with or without pools and return the measurements."""
+    kept = collections.deque(maxlen=args.keep)
+    gc.collect()
+    collections_before = [stats['collections'] for stats in gc.get_stats()]
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    allocated = []
+    samples = []
+
+    for cycle in range(args.cycles):
+        # Building the listings is not part of a refresh: do it before measuring
+        outputs = cycle_outputs(blocks, cycle)
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        before = time.perf_counter()
+        kept.append({kind: listing_parser.parse_listing(outputs[kind], kind, pools.get(kind))
+                     for kind in KINDS})
+        samples.append((time.perf_counter() - before) * 1000)
+        allocated.append(tracemalloc.get_traced_memory()[1] - held)
+
+    del outputs
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    top = tracemalloc.take_snapshot().statistics('lineno')[:args.top]
+    tracemalloc.stop()
+    collections_after = [stats['collections'] for stats in gc.get_stats()]
+    return kept[-1], {
+        'held_mib': held / 2 ** 20,
+        'allocated_kib_per_cycle': statistics.median(allocated) / 2 ** 10,
+        'gc_collections': [after - before for before, after in zip(collections_before, collections_after)],
+        'median_ms': statistics.median(samples),
+        'top': [f"{stat.traceback[0].filename.rsplit('/', 1)[-1]}:{stat.traceback[0].lineno} "
+                f"{stat.size / 2 ** 10:.0f} KiB in {stat.count} blocks" for stat in top],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare parsing with and without the record pool")
+    parser.add_argument("--cycles", type=int, default=1000, help="Refresh cycles (default: 1000)")
+    parser.add_argument("--objects", type=int, default=100, help="Objects per listing (default: 100)")
+    parser.add_argument("--keep", type=int, default=2, help="Snapshots held at a time (default: 2)")
+    parser.add_argument("--top", type=int, default=0, help="Also list the top allocation sites held at the end")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    blocks = listing_blocks(args.objects)
+    fresh_snapshot, fresh = run(blocks, args, {})
+    record_pool._values.clear()
+    pooled_snapshot, pooled = run(blocks, args, {kind: RecordPool() for kind in KINDS})
+    if fresh_snapshot != pooled_snapshot:
+        print("pooled records differ from freshly parsed ones", file=sys.stderr)
+        return 1
+
+    results = {'fresh': fresh, 'pooled': pooled}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{args.cycles} cycles, {args.objects} objects per listing, {args.keep} snapshots held")
+    print(f"{'':<22}{'fresh':>10}{'pooled':>10}")
+    print(f"{'held MiB':<22}{fresh['held_mib']:>10.2f}{pooled['held_mib']:>10.2f}")
+    print(f"{'allocated KiB/cycle':<22}{fresh['allocated_kib_per_cycle']:>10.0f}"
+          f"{pooled['allocated_kib_per_cycle']:>10.0f}")
+    for generation in range(3):
+        print(f"{f'gc gen {generation} collections':<22}{fresh['gc_collections'][generation]:>10}"
+              f"{pooled['gc_collections'][generation]:>10}")
+    print(f"{'ms/cycle':<22}{fresh['median_ms']:>10.2f}{pooled['median_ms']:>10.2f}")
+    for mode in ('fresh', 'pooled'):
+        if results[mode]['top']:
+            print(f"\ntop allocations held, {mode}:")
+            for line in results[mode]['top']:
+                print(f"  {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for pactl-gui.
+
+Launches the GUI repeatedly against tools/fake_pactl.py and reports two
+milestones, measured from process launch:
+
+    first paint      the main window is first exposed on screen
+    populated tree   the Manage tab tree shows the audio server state
+
+Each run uses a fresh temporary state and XDG directories, so nothing is
+reused between runs. A display is required; on a headless machine run it
+under Xvfb:
+
+    xvfb-run -a python3 tools/bench_startup.py --runs 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_SCRIPT = os.path.join(os.path.dirname(TOOLS_DIR), "src", "main.py")
+FAKE_PACTL = os.path.join(TOOLS_DIR, "fake_pactl.py")
+
+
+def make_environment(workdir, args):
+    """Build an environment with the fake pactl first on PATH."""
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir)
+    shim = os.path.join(bin_dir, "pactl")
+    with open(shim, "w") as shim_file:
+        shim_file.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_PACTL}" "$@"\n')
+    os.chmod(shim, 0o755)
+
+    env = dict(os.environ)
+    env.update({
+        "PATH": bin_dir + os.pathsep + env.get("PATH", ""),
+        "FAKE_PACTL_STATE": os.path.join(workdir, "pactl_state.json"),
+        "FAKE_PACTL_HARDWARE": str(args.hardware),
+        "FAKE_PACTL_NULL_SINKS": str(args.null_sinks),
+        "FAKE_PACTL_LATENCY": str(args.latency),
+        "XDG_CACHE_HOME": os.path.join(workdir, "cache"),
+        "XDG_STATE_HOME": os.path.join(workdir, "state"),
+        "PACTL_GUI_STARTUP_PROBE": "1",
+    })
+    return env
+
+
+def run_once(args):
+    """Start the GUI once and return the milestone times in milliseconds."""
+    with tempfile.TemporaryDirectory(prefix="pactl-gui-bench-") as workdir:
+        env = make_environment(workdir, args)
+        started = time.time()
+        result = subprocess.run(
+            [sys.executable, MAIN_SCRIPT],
+            env=env, capture_output=True, text=True, timeout=args.timeout
+        )
+
+    events = {}
+    for line in result.stdout.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and "event" in record:
+            events[record["event"]] = (record["time"] - started) * 1000
+
+    if result.returncode != 0 or "tree_populated" not in events:
+        raise RuntimeError(f"GUI run failed (exit {result.returncode}):\n{result.stderr.strip()}")
+    return events
+
+
+def describe(label, samples):
+    return (f"{label:<16} median {statistics.median(samples):7.1f} ms   "
+            f"min {min(samples):7.1f} ms   max {max(samples):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure pactl-gui cold-start time")
+    parser.add_argument("--runs", type=int, default=10, help="Number of launches (default: 10)")
+    parser.add_argument("--hardware", type=int, default=3, help="Hardware cards in the fake server")
+    parser.add_argument("--null-sinks", type=int, default=5, help="Null sinks in the fake server")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Extra seconds the fake pactl waits per command")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before a run is aborted")
+    parser.add_argument("--json", action="store_true", help="Print raw per-run results as JSON")
+    args = parser.parse_args()
+
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        parser.error("no display available; run under xvfb-run")
+
+    runs = [run_once(args) for _ in range(args.runs)]
+
+    if args.json:
+        print(json.dumps(runs, indent=2))
+        return
+
+    print(f"{args.runs} runs, {args.hardware} hardware cards, {args.null_sinks} null sinks")
+    paints = [run["first_paint"] for run in runs if "first_paint" in run]
+    if paints:
+        print(describe("first paint", paints))
+    print(describe("populated tree", [run["tree_populated"] for run in runs]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Headless benchmark of the Manage tab tree view model.
+
+Reads the state of a fake audio server from tools/fake_pactl.py with many
+null sinks (each shows as a device group with its module, sink and monitor
+source) and times, without a display:
+
+    grouping   DeviceGrouping.group_devices()
+    model      TreeModel.from_grouping() on that grouping
+    build      TreeModel.build(), i.e. both
+
+with monitor sources and system modules shown, so every object gets a node.
+
+    python3 tools/bench_tree_model.py --null-sinks 2500
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from backend_kit import fake_server
+from utils.device_grouping import DeviceGrouping
+from utils.pactl_runner import PactlRunner
+from utils.tree_model import TreeModel
+
+
+def timed(function, iterations):
+    """Median milliseconds of function() over iterations runs."""
+    samples = []
+    for _ in range(iterations):
+        before = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - before) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time building the Manage tab tree model headlessly")
+    parser.add_argument("--null-sinks", type=int, default=2500,
+                        help="Null sinks in the fake server (default: 2500, about 10,000 nodes)")
+    parser.add_argument("--hardware", type=int, default=3, help="Hardware cards in the fake server")
+    parser.add_argument("--iterations", type=int, default=10, help="Timed runs per measurement (default: 10)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    with fake_server(args.hardware, args.null_sinks):
+        modules = PactlRunner.list_modules(raise_errors=True)
+        sinks = PactlRunner.list_sinks(raise_errors=True)
+        sources = PactlRunner.list_sources(raise_errors=True)
+
+    grouping = DeviceGrouping.group_devices(modules, sinks, sources, show_monitors=True)
+    nodes = TreeModel.from_grouping(grouping, modules, show_system=True, show_monitors=True)
+    results = {
+        'nodes': TreeModel.count(nodes),
+        'grouping_ms': timed(lambda: DeviceGrouping.group_devices(modules, sinks, sources, show_monitors=True),
+                             args.iterations),
+        'model_ms': timed(lambda: TreeModel.from_grouping(grouping, modules, show_system=True, show_monitors=True),
+                          args.iterations),
+        'build_ms': timed(lambda: TreeModel.build(modules, sinks, sources, show_system=True, show_monitors=True),
+                          args.iterations),
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{len(modules)} modules, {len(sinks)} sinks, {len(sources)} sources -> {results['nodes']} nodes, "
+          f"median of {args.iterations}")
+    print(f"grouping   {results['grouping_ms']:8.1f} ms")
+    print(f"model      {results['model_ms']:8.1f} ms")
+    print(f"build      {results['build_ms']:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Stand-in for pactl used by the benchmarks and soak runs in this directory.
+
+It keeps a small simulated audio server in a JSON state file and prints
+the same output format as pactl for the commands pactl-gui uses, so the
+application can be exercised without a running PulseAudio or PipeWire.
+
+Invoked through a link named pacmd, it instead reads commands from stdin
+like a pacmd session: successful commands print nothing and failures print
+an error message. Through a link named pw-dump it prints the same state as
+a PipeWire graph dump, and follows changes with --monitor.
+
+Environment:
+    FAKE_PACTL_STATE       State file (default: /tmp/fake_pactl_state.json)
+    FAKE_PACTL_HARDWARE    Number of hardware cards in a fresh state (default: 3)
+    FAKE_PACTL_NULL_SINKS  Number of null sinks in a fresh state (default: 0)
+    FAKE_PACTL_LATENCY     Seconds to sleep before answering (default: 0)
+"""
+
+import contextlib
+import fcntl
+import io
+import json
+import os
+import shlex
+import sys
+import time
+
+STATE_FILE = os.environ.get('FAKE_PACTL_STATE', '/tmp/fake_pactl_state.json')
+HARDWARE_DEVICES = int(os.environ.get('FAKE_PACTL_HARDWARE', '3'))
+NULL_SINKS = int(os.environ.get('FAKE_PACTL_NULL_SINKS', '0'))
+LATENCY = float(os.environ.get('FAKE_PACTL_LATENCY', '0'))
+
+
+def _initial_state():
+    state = {'next_module': 100, 'next_sink': 50, 'next_source': 80, 'modules': [], 'sinks': [], 'sources': []}
+    udev_module = _add_module(state, 'module-udev-detect', '')
+    for number in range(HARDWARE_DEVICES):
+        card = f"usb-Vendor{number}_Interface{number}-00"
+        properties = {'device.bus': 'usb', 'device.api': 'alsa'}
+        _add_sink(state, f"alsa_output.{card}.analog-stereo", f"Interface {number} Analog Stereo",
+                  udev_module, 'alsa_sink', properties)
+        _add_source(state, f"alsa_input.{card}.analog-stereo", f"Interface {number} Analog Stereo",
+                    udev_module, 'alsa_source', dict(properties, **{'device.description': f"Interface {number}"}))
+    for number in range(NULL_SINKS):
+        _add_null_sink(state, f"sink_name=virtual_{number} sink_properties=device.description=Virtual_{number}")
+    return state
+
+
+def _add_module(state, name, argument):
+    module_id = state['next_module']
+    state['next_module'] += 1
+    state['modules'].append({'id': module_id, 'name': name, 'argument': argument})
+    return module_id
+
+
+def _add_null_sink(state, argument):
+    name = 'null'
+    description = None
+    # Quoted like pactl's module arguments, e.g. sink_properties="device.description='A B'"
+    try:
+        tokens = shlex.split(argument)
+    except ValueError:
+        tokens = argument.split()
+    for token in tokens:
+        if token.startswith('sink_name='):
+            name = token.split('=', 1)[1].strip('"\'')
+        elif token.startswith('sink_properties=device.description='):
+            description = token.split('=', 2)[2].strip('"\'')
+    module_id = _add_module(state, 'module-null-sink', argument)
+    _add_sink(state, name, description or name, module_id, 'module-null-sink.c')
+    return module_id
+
+
+def _add_sink(state, name, description, owner, driver, extra=None):
+    sink_id = state['next_sink']
+    state['next_sink'] += 1
+    properties = {'device.description': description, 'node.name': name}
+    properties.update(extra or {})
+    state['sinks'].append({'id': sink_id, 'name': name, 'description': description, 'owner': owner,
+                           'driver': driver, 'properties': properties})
+    _add_source(state, name + '.monitor', 'Monitor of ' + description, owner, driver,
+                dict(properties, **{'device.class': 'monitor'}), monitor_of=name)
+
+
+def _add_source(state, name, description, owner, driver, properties=None, monitor_of=None):
+    source_id = state['next_source']
+    state['next_source'] += 1
+    properties = dict(properties or {'device.description': description})
+    state['sources'].append({'id': source_id, 'name': name, 'description': description, 'owner': owner,
+                             'driver': driver, 'monitor_of': monitor_of, 'properties': properties})
+
+
+def _load():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE) as state_file:
+            return json.load(state_file)
+    return _initial_state()
+
+
+def _save(state):
+    temporary = STATE_FILE + '.tmp'
+    with open(temporary, 'w') as state_file:
+        json.dump(state, state_file)
+    os.replace(temporary, STATE_FILE)
+
+
+def _format_device(kind, device):
+    lines = [
+        f"{kind} #{device['id']}",
+        "\tState: SUSPENDED",
+        f"\tName: {device['name']}",
+        f"\tDescription: {device['description']}",
+        f"\tDriver: {device['driver']}",
+        "\tSample Specification: s16le 2ch 48000Hz",
+        "\tChannel Map: front-left,front-right",
+        f"\tOwner Module: {device['owner']}",
+        "\tMute: no",
+        "\tVolume: front-left: 65536 / 100% / 0.00 dB,   front-right: 65536 / 100% / 0.00 dB",
+        "\t        balance 0.00",
+        "\tBase Volume: 65536 / 100% / 0.00 dB",
+    ]
+    if kind == 'Sink':
+        lines.append(f"\tMonitor Source: {device['name']}.monitor")
+    else:
+        # pactl prints the monitored sink's name
+        monitor_of = device.get('monitor_of')
+        lines.append(f"\tMonitor of Sink: {monitor_of if monitor_of is not None else 'n/a'}")
+    lines.append("\tLatency: 0 usec, configured 0 usec")
+    lines.append("\tFlags: DECIBEL_VOLUME LATENCY")
+    lines.append("\tProperties:")
+    for key, value in device['properties'].items():
+        lines.append(f'\t\t{key} = "{value}"')
+    lines.append("\tFormats:")
+    lines.append("\t\tpcm")
+    return "\n".join(lines)
+
+
+def _format_module(module):
+    return (f"Module #{module['id']}\n\tName: {module['name']}\n\tArgument: {module['argument']}\n"
+            f"\tUsage counter: n/a\n\tProperties:\n\t\tmodule.author = \"Fake\"")
+
+
+def subscribe():
+    """Print a change event whenever the state file is rewritten."""
+    last = None
+    while True:
+        try:
+            current = os.stat(STATE_FILE).st_mtime_ns
+        except OSError:
+            current = None
+        if last is not None and current != last:
+            print("Event 'change' on server", flush=True)
+        last = current
+        time.sleep(0.05)
+
+
+def main(argv, latency=LATENCY):
+    if latency:
+        time.sleep(latency)
+    state = _load()
+
+    if argv[:1] == ['list'] and len(argv) > 1:
+        short = argv[1] == 'short'
+        what = argv[2] if short and len(argv) > 2 else argv[1]
+        blocks = []
+        if what == 'modules':
+            for module in state['modules']:
+                if short:
+                    blocks.append(f"{module['id']}\t{module['name']}\t{module['argument']}\t")
+                else:
+                    blocks.append(_format_module(module))
+        elif what in ('sinks', 'sources'):
+            kind = 'Sink' if what == 'sinks' else 'Source'
+            for device in state[what]:
+                if short:
+                    blocks.append(f"{device['id']}\t{device['name']}\t{device['driver']}\t"
+                                  f"s16le 2ch 48000Hz\tSUSPENDED")
+                else:
+                    blocks.append(_format_device(kind, device))
+        else:
+            print(f"Unsupported list target: {what}", file=sys.stderr)
+            return 1
+        print(("\n" if short else "\n\n").join(blocks))
+        return 0
+
+    if argv[:2] == ['load-module', 'module-null-sink']:
+        module_id = _add_null_sink(state, " ".join(argv[2:]))
+        _save(state)
+        print(module_id)
+        return 0
+
+    if argv[:1] == ['unload-module'] and len(argv) > 1:
+        module_id = int(argv[1])
+        if not any(module['id'] == module_id for module in state['modules']):
+            print("Failure: No such entity", file=sys.stderr)
+            return 1
+        state['modules'] = [module for module in state['modules'] if module['id'] != module_id]
+        state['sinks'] = [sink for sink in state['sinks'] if sink['owner'] != module_id]
+        state['sources'] = [source for source in state['sources'] if source['owner'] != module_id]
+        _save(state)
+        return 0
+
+    if argv[:1] in (['set-sink-volume'], ['set-source-volume'], ['set-sink-mute'], ['set-source-mute']):
+        return 0
+
+    if argv[:1] == ['info']:
+        print("Server Name: fake-pactl\nServer Version: 16.1")
+        return 0
+
+    print(f"Unknown command: {' '.join(argv)}", file=sys.stderr)
+    return 1
+
+
+def _pw_node(object_id, media_class, device, serial, device_ids):
+    properties = dict(device['properties'])
+    properties.update({'media.class': media_class, 'node.name': device['name'],
+                       'node.description': device['description'], 'object.serial': serial})
+    card = device['name'].split('.')[1] if device['name'].startswith('alsa_') else None
+    if card in device_ids:
+        properties['device.id'] = device_ids[card]
+    if device['driver'] == 'module-null-sink.c':
+        properties.update({'factory.name': 'support.null-audio-sink', 'pulse.module.id': device['owner']})
+    audio = {'mediaType': 'audio', 'mediaSubtype': 'raw', 'format': 'S16LE', 'rate': 48000,
+             'channels': 2, 'position': ['FL', 'FR']}
+    return {'id': object_id, 'type': 'PipeWire:Interface:Node',
+            'info': {'state': 'suspended', 'props': properties,
+                     'params': {'Format': [audio], 'Props': [{'mute': False, 'channelVolumes': [1.0, 1.0]}]}}}
+
+
+def pw_dump_objects(state):
+    """Describe the state as the objects pw-dump prints."""
+    objects = []
+    device_ids = {}
+    for sink in state['sinks']:
+        if sink['name'].startswith('alsa_'):
+            card = sink['name'].split('.')[1]
+            device_ids[card] = 1000 + len(device_ids)
+            objects.append({'id': device_ids[card], 'type': 'PipeWire:Interface:Device',
+                            'info': {'props': {'device.name': f"alsa_card.{card}", 'device.api': 'alsa',
+                                               'device.bus': sink['properties'].get('device.bus', 'pci'),
+                                               'device.description': sink['description']}}})
+    for module in state['modules']:
+        if module['name'] != 'module-null-sink':
+            objects.append({'id': module['id'], 'type': 'PipeWire:Interface:Module',
+                            'info': {'name': module['name'], 'args': module['argument'] or None, 'props': {}}})
+    for sink in state['sinks']:
+        objects.append(_pw_node(2000 + sink['id'], 'Audio/Sink', sink, sink['id'], device_ids))
+    for source in state['sources']:
+        if source.get('monitor_of') is None:
+            objects.append(_pw_node(3000 + source['id'], 'Audio/Source', source, source['id'], device_ids))
+    return objects
+
+
+def pw_dump(monitor):
+    """Print the state like pw-dump, then (with monitor) every change."""
+    if LATENCY:
+        time.sleep(LATENCY)
+    previous = {}
+    first = True
+    last = None
+    while True:
+        current = os.stat(STATE_FILE).st_mtime_ns if os.path.exists(STATE_FILE) else None
+        if first or current != last:
+            objects = {obj['id']: obj for obj in pw_dump_objects(_load())}
+            update = [obj for object_id, obj in objects.items() if previous.get(object_id) != obj]
+            update += [{'id': object_id, 'info': None} for object_id in previous if object_id not in objects]
+            if update or first:
+                print(json.dumps(update, indent=2), flush=True)
+            previous = objects
+        first = False
+        last = current
+        if not monitor:
+            return
+        time.sleep(0.05)
+
+
+def pacmd_session():
+    """Answer commands from stdin the way a pacmd session does."""
+    if LATENCY:
+        time.sleep(LATENCY)
+    for line in sys.stdin:
+        argv = line.split(None, 2) if line.startswith('load-module') else line.split()
+        if not argv:
+            continue
+        output = io.StringIO()
+        with open(STATE_FILE + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                return_code = main(argv, latency=0)
+        if return_code != 0:
+            sys.stdout.write(output.getvalue())
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    if os.path.basename(sys.argv[0]) == 'pacmd':
+        pacmd_session()
+        sys.exit(0)
+    if os.path.basename(sys.argv[0]) == 'pw-dump':
+        try:
+            pw_dump('--monitor' in sys.argv[1:] or '-m' in sys.argv[1:])
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+    if sys.argv[1:2] == ['subscribe']:
+        try:
+            subscribe()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+    with open(STATE_FILE + '.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Long-run soak test of the GUI for memory and handle leaks.
+
+Opens the main window in this process against a fake audio server from
+tools/fake_pactl.py and drives it through thousands of cycles of what a
+window left open all day goes through. Each cycle:
+
+    create    creates a duplex sink from the Create tab
+    select    selects a few random items in the Manage tab tree
+    unload    selects the new sink's module and unloads it
+    refresh   runs refresh_all_views()
+
+Every action goes through the window's own methods and is logged in the
+Output tab as usual; confirmation dialogs are answered yes, and any error
+dialog fails the run. Every --sample-every cycles the harness records:
+
+    RSS           resident memory of the process
+    heap          memory traced by tracemalloc
+    fds           open file descriptors
+    tree items    items in the Manage tab tree
+    output lines  lines in the Output tab
+    tcl commands  commands in the Tcl interpreter (leaked callbacks)
+    after events  pending Tk timers
+    widgets       Tk widgets under the root window
+    threads       Python threads
+
+Samples are compared with the one taken after --warmup cycles, when caches
+and the history archive are primed. The run fails (exit status 1) when
+any of them grew beyond its limit, or the Output tab holds more than its
+line cap, and lists the allocation sites whose memory grew most. A display
+is required; on a headless machine run it under Xvfb:
+
+    xvfb-run -a python3 tools/soak_gui.py --cycles 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+from backend_kit import fake_server
+
+# Seconds a refresh may take before the harness gives up
+SETTLE_TIMEOUT_SECONDS = 30.0
+
+COUNTS = ('fds', 'tree_items', 'tcl_commands', 'after_events', 'widgets', 'threads')
+
+
+def settle(root, app):
+    """Process Tk events until no refresh is running or queued and the tree is filled in."""
+    deadline = time.monotonic() + SETTLE_TIMEOUT_SECONDS
+    root.update()
+    while app._fetch is not None or app._refresh_pending or app.tree_renderer.busy:
+        if time.monotonic() > deadline:
+            raise RuntimeError("a refresh did not finish")
+        time.sleep(0.005)
+        root.update()
+    root.update()
+
+
+def tree_items(tree, parent=''):
+    """All items under parent, depth first."""
+    for item in tree.get_children(parent):
+        yield item
+        yield from tree_items(tree, item)
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def sample(cycle, root, app):
+    """Measure the process and the window."""
+    with open('/proc/self/statm') as statm:
+        resident_pages = int(statm.read().split()[1])
+    return {
+        'cycle': cycle,
+        'rss_mib': resident_pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20,
+        'heap_mib': tracemalloc.get_traced_memory()[0] / 2 ** 20,
+        'fds': len(os.listdir('/proc/self/fd')),
+        'tree_items': sum(1 for _ in tree_items(app.unified_tree)),
+        'output_lines': int(app.output_text.index('end-1c').split('.')[0]),
+        'tcl_commands': len(root.tk.splitlist(root.tk.call('info', 'commands'))),
+        'after_events': len(root.tk.splitlist(root.tk.call('after', 'info'))),
+        'widgets': count_widgets(root),
+        'threads': threading.active_count(),
+    }
+
+
+def find_module_item(app, sink_name):
+    """The tree item of the module that created a sink, or None."""
+    modules = app.runner.list_modules()
+    module_ids = {str(module['id']) for module in modules
+                  if f"sink_name={sink_name}" in module.get('argument', '').split()}
+    for item in tree_items(app.unified_tree):
+        values = app.unified_tree.item(item, 'values')
+        if len(values) > 1 and values[1] == 'module' and str(values[0]) in module_ids:
+            return item
+    return None
+
+
+def run_cycle(cycle, root, app, rng, args):
+    """Create, select, unload and refresh once."""
+    sink_name = f"soak_{cycle}"
+    app.sink_name_var.set(sink_name)
+    app.sink_desc_var.set(f"Soak test {cycle}")
+    app.create_duplex_sink()
+    settle(root, app)
+
+    items = list(tree_items(app.unified_tree))
+    for item in rng.sample(items, min(args.selects, len(items))):
+        app.unified_tree.selection_set(item)
+        root.update()
+
+    item = find_module_item(app, sink_name)
+    if item is None:
+        raise RuntimeError(f"the module of {sink_name} is not in the tree")
+    app.unified_tree.selection_set(item)
+    root.update()
+    app.unload_selected_from_tree()
+    settle(root, app)
+
+    app.refresh_all_views()
+    settle(root, app)
+
+
+def check(baseline, final, args, max_output_lines):
+    """List the limits the final sample exceeds."""
+    limits = {'rss_mib': args.max_rss_growth, 'heap_mib': args.max_heap_growth, 'fds': args.max_fd_growth}
+    failures = []
+    for metric in ('rss_mib',) + ('heap_mib',) + COUNTS:
+        growth = final[metric] - baseline[metric]
+        limit = limits.get(metric, args.max_count_growth)
+        if growth > limit:
+            failures.append(f"{metric} grew by {growth:g} (limit {limit:g})")
+    if final['output_lines'] > max_output_lines + 1:
+        failures.append(f"the Output tab holds {final['output_lines']} lines (cap {max_output_lines})")
+    return failures
+
+
+def run(args):
+    import tkinter as tk
+    from tkinter import messagebox
+    from ui import main_window
+    from ui.main_window import MainWindow
+
+    errors = []
+    messagebox.askyesno = lambda *a, **k: True
+    messagebox.showinfo = lambda *a, **k: None
+    messagebox.showerror = lambda title, message, **k: errors.append(message)
+
+    tracemalloc.start()
+    root = tk.Tk()
+    app = MainWindow(root)
+    app._ensure_tab_built(app.create_tab)
+    app._ensure_tab_built(app.output_tab)
+    settle(root, app)
+
+    rng = random.Random(args.seed)
+    samples = []
+    baseline_snapshot = None
+    started = time.monotonic()
+    try:
+        for cycle in range(1, args.cycles + 1):
+            run_cycle(cycle, root, app, rng, args)
+            if errors:
+                raise RuntimeError(f"error dialog in cycle {cycle}: {errors[0]}")
+            if cycle == args.warmup:
+                baseline_snapshot = tracemalloc.take_snapshot()
+            if cycle == args.warmup or cycle % args.sample_every == 0 or cycle == args.cycles:
+                samples.append(sample(cycle, root, app))
+                if not args.json:
+                    print(format_sample(samples[-1]), flush=True)
+        final_snapshot = tracemalloc.take_snapshot()
+    finally:
+        app.on_close()
+        tracemalloc.stop()
+
+    baseline = next((entry for entry in samples if entry['cycle'] == args.warmup), samples[0])
+    growth = []
+    if baseline_snapshot is not None:
+        for stat in final_snapshot.compare_to(baseline_snapshot, 'lineno')[:args.top]:
+            frame = stat.traceback[0]
+            growth.append(f"{frame.filename.rsplit('/', 1)[-1]}:{frame.lineno} "
+                          f"{stat.size_diff / 2 ** 10:+.0f} KiB, {stat.count_diff:+d} blocks")
+    return {
+        'cycles': args.cycles,
+        'seconds': time.monotonic() - started,
+        'samples': samples,
+        'top_growth': growth,
+        'failures': check(baseline, samples[-1], args, main_window.MAX_OUTPUT_LINES),
+    }
+
+
+def format_sample(entry):
+    return (f"{entry['cycle']:>7}{entry['rss_mib']:>9.1f}{entry['heap_mib']:>9.2f}"
+            + "".join(f"{entry[metric]:>9}" for metric in COUNTS[:2])
+            + f"{entry['output_lines']:>9}"
+            + "".join(f"{entry[metric]:>9}" for metric in COUNTS[2:]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak the GUI and fail on memory or handle growth")
+    parser.add_argument("--cycles", type=int, default=2000, help="Create/select/unload/refresh cycles (default: 2000)")
+    parser.add_argument("--warmup", type=int, default=100, help="Cycles before the baseline sample (default: 100)")
+    parser.add_argument("--sample-every", type=int, default=100, help="Cycles between samples (default: 100)")
+    parser.add_argument("--selects", type=int, default=3, help="Random tree selections per cycle (default: 3)")
+    parser.add_argument("--hardware", type=int, default=3, help="Hardware cards in the fake server")
+    parser.add_argument("--null-sinks", type=int, default=20, help="Null sinks in the fake server (default: 20)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the random selections")
+    parser.add_argument("--max-rss-growth", type=float, default=32.0, help="Allowed RSS growth in MiB (default: 32)")
+    parser.add_argument("--max-heap-growth", type=float, default=8.0,
+                        help="Allowed tracemalloc growth in MiB (default: 8)")
+    parser.add_argument("--max-fd-growth", type=int, default=4, help="Allowed growth in open fds (default: 4)")
+    parser.add_argument("--max-count-growth", type=int, default=50,
+                        help="Allowed growth of tree items, Tcl commands, timers, widgets and threads (default: 50)")
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites to list by growth (default: 10)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.warmup >= args.cycles:
+        parser.error("--warmup must be smaller than --cycles")
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        parser.error("no display available; run under xvfb-run")
+
+    with fake_server(args.hardware, args.null_sinks):
+        # Talk to the fake server through pactl only, never a real daemon or session
+        os.environ.update({"PACTL_GUI_BACKEND": "pactl", "PACTL_GUI_NO_DAEMON": "1", "PACTL_GUI_NO_PACMD": "1"})
+        if not args.json:
+            print(f"{'cycle':>7}{'RSS MiB':>9}{'heap MiB':>9}{'fds':>9}{'items':>9}{'output':>9}"
+                  f"{'tcl cmds':>9}{'afters':>9}{'widgets':>9}{'threads':>9}")
+        report = run(args)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"\n{report['cycles']} cycles in {report['seconds']:.0f} s")
+        if report['top_growth']:
+            print("allocation sites that grew most since the baseline:")
+            for line in report['top_growth']:
+                print(f"  {line}")
+        for failure in report['failures']:
+            print(f"FAIL: {failure}")
+        if not report['failures']:
+            print("PASS")
+    return 1 if report['failures'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -39,7 +39,7 @@ else
     echo -e "${YELLOW}Application directory not found, skipping...${NC}"
 fi
 
-# Remove symlink from bin directory
+# Remove symlinks from bin directory
 if [ -L "$BIN_DIR/pactl-gui" ] || [ -f "$BIN_DIR/pactl-gui" ]; then
     echo -e "${YELLOW}Removing symlink from $BIN_DIR...${NC}"
     rm -f "$BIN_DIR/pactl-gui"
@@ -48,6 +48,16 @@ else
     echo -e "${YELLOW}Command-line launcher not found, skipping...${NC}"
 fi
 
+if [ -L "$BIN_DIR/pactl-gui-cli" ] || [ -f "$BIN_DIR/pactl-gui-cli" ]; then
+    rm -f "$BIN_DIR/pactl-gui-cli"
+    echo -e "${GREEN}✓ Headless CLI launcher removed${NC}"
+fi
+
+if [ -L "$BIN_DIR/pactl-gui-daemon" ] || [ -f "$BIN_DIR/pactl-gui-daemon" ]; then
+    rm -f "$BIN_DIR/pactl-gui-daemon"
+    echo -e "${GREEN}✓ Daemon launcher removed${NC}"
+fi
+
 # Remove desktop file
 if [ -f "$DESKTOP_DIR/pactl-gui.desktop" ]; then
     echo -e "${YELLOW}Removing desktop file...${NC}"